@@ -0,0 +1,258 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from HMI.hmi_engine import ValidationConfig, evaluate_single_screenshot
+from HMI.hmi_indexer import load_library_index
+from HMI.hmi_state_file import merge_state_file
+
+
+COMPARE_WORKERS_DEFAULT = max(1, min(4, (os.cpu_count() or 2) - 1))
+COMPARE_QUEUE_LIMIT = 8
+STATE_EXPORT_INTERVAL_S = 0.5
+LAG_EMA_ALPHA = 0.2
+LAG_SAMPLES = 512
+
+_WORKER_INDEX: Optional[Dict[str, Any]] = None
+_WORKER_CFG: Optional[ValidationConfig] = None
+
+
+def _init_compare_worker(index_path: str, cfg: ValidationConfig) -> None:
+    global _WORKER_INDEX, _WORKER_CFG
+    _WORKER_INDEX = load_library_index(index_path)
+    _WORKER_CFG = cfg
+
+
+def _compare_in_worker(file_path: str) -> Dict[str, Any]:
+    return evaluate_single_screenshot(file_path, _WORKER_INDEX, _WORKER_CFG)
+
+
+@dataclass
+class CompareJob:
+    file_name: str
+    file_path: str
+    capture_source: str
+    enqueued_at: float
+
+
+class CompareStage:
+    """Comparacao com varios workers, fila limitada e descarte de frames superados.
+
+    Cada origem de captura (touch, screen_change, ...) tem no maximo um frame aguardando:
+    um frame novo da mesma origem substitui o anterior, que e contado como descartado.
+    Em modo processo cada worker carrega o indice uma vez; `on_result` roda no processo
+    principal, serializado, entao so ele grava o arquivo de resultados.
+    """
+
+    def __init__(
+        self,
+        on_result: Callable[[CompareJob, Dict[str, Any]], None],
+        workers: int = COMPARE_WORKERS_DEFAULT,
+        queue_limit: int = COMPARE_QUEUE_LIMIT,
+        index_path: str = "",
+        library_index: Optional[Dict[str, Any]] = None,
+        cfg: Optional[ValidationConfig] = None,
+        use_processes: bool = True,
+        state_path: str = "",
+        compare_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+        log: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.on_result = on_result
+        self.workers = max(1, int(workers))
+        self.queue_limit = max(1, int(queue_limit))
+        self.index_path = str(index_path or "")
+        self.library_index = library_index
+        self.cfg = cfg
+        self.state_path = state_path
+        self._compare_fn = compare_fn
+        self._log = log or (lambda message: None)
+        self._lock = threading.RLock()
+        self._result_lock = threading.Lock()
+        self._pending: "OrderedDict[str, CompareJob]" = OrderedDict()
+        self._in_flight = 0
+        self._last_export = 0.0
+        self._closed = False
+        self._lags: Deque[float] = deque(maxlen=LAG_SAMPLES)
+        self.stats: Dict[str, Any] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "last_lag_s": 0.0,
+            "avg_lag_s": 0.0,
+            "max_lag_s": 0.0,
+        }
+        self.mode = "process" if use_processes and compare_fn is None and self.index_path and cfg is not None else "thread"
+        self._executor = self._build_executor()
+
+    # ---------- executores ----------
+    def _build_executor(self) -> Executor:
+        if self.mode == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_compare_worker,
+                initargs=(self.index_path, self.cfg),
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hmi_compare")
+
+    def _thread_compare(self, file_path: str) -> Dict[str, Any]:
+        if self._compare_fn is not None:
+            return self._compare_fn(file_path)
+        if self.library_index is None and self.index_path:
+            self.library_index = load_library_index(self.index_path)
+        return evaluate_single_screenshot(file_path, self.library_index, self.cfg)
+
+    def _fallback_to_threads(self, reason: Any) -> None:
+        if self.mode == "thread":
+            return
+        self._log(f"workers de comparacao em processo indisponiveis ({reason}); usando threads")
+        broken = self._executor
+        self.mode = "thread"
+        self._executor = self._build_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- fila ----------
+    def submit(self, file_name: str, file_path: str, capture_source: str = "") -> bool:
+        """Enfileira um frame. Retorna False se o estagio ja foi encerrado."""
+        job = CompareJob(file_name, file_path, str(capture_source or ""), time.monotonic())
+        with self._lock:
+            if self._closed:
+                return False
+            self.stats["submitted"] += 1
+            if self._in_flight < self.workers:
+                self._dispatch_locked(job)
+            else:
+                superseded = self._pending.pop(job.capture_source, None)
+                if superseded is not None:
+                    self._drop_locked(superseded, job.file_name)
+                self._pending[job.capture_source] = job
+                while len(self._pending) > self.queue_limit:
+                    _, oldest = self._pending.popitem(last=False)
+                    self._drop_locked(oldest, "")
+            self._export_state_locked()
+        return True
+
+    def _drop_locked(self, job: CompareJob, replaced_by: str) -> None:
+        self.stats["dropped"] += 1
+        suffix = f" por {replaced_by}" if replaced_by else " (fila cheia)"
+        self._log(f"comparacao de {job.file_name} descartada{suffix}")
+
+    def _dispatch_locked(self, job: CompareJob) -> None:
+        fn = _compare_in_worker if self.mode == "process" else self._thread_compare
+        try:
+            future = self._executor.submit(fn, job.file_path)
+        except (BrokenProcessPool, RuntimeError) as exc:
+            self._fallback_to_threads(exc)
+            future = self._executor.submit(self._thread_compare, job.file_path)
+        self._in_flight += 1
+        future.add_done_callback(partial(self._on_done, job))
+
+    def _on_done(self, job: CompareJob, future) -> None:
+        try:
+            result = future.result()
+        except BrokenProcessPool as exc:
+            with self._lock:
+                self._in_flight -= 1
+                if self._executor is not None:
+                    self._fallback_to_threads(exc)
+                    self._dispatch_locked(job)
+            return
+        except Exception as exc:
+            result = None
+            self._log(f"falha ao comparar {job.file_name}: {exc}")
+        if result is not None:
+            try:
+                with self._result_lock:
+                    self.on_result(job, result)
+            except Exception as exc:
+                result = None
+                self._log(f"falha ao registrar comparacao de {job.file_name}: {exc}")
+        lag = time.monotonic() - job.enqueued_at
+        with self._lock:
+            self._in_flight -= 1
+            if result is None:
+                self.stats["failed"] += 1
+            else:
+                self.stats["completed"] += 1
+                self._lags.append(lag)
+                self.stats["last_lag_s"] = round(lag, 3)
+                self.stats["max_lag_s"] = round(max(float(self.stats["max_lag_s"]), lag), 3)
+                previous = float(self.stats["avg_lag_s"])
+                average = lag if self.stats["completed"] == 1 else previous + LAG_EMA_ALPHA * (lag - previous)
+                self.stats["avg_lag_s"] = round(average, 3)
+            if self._pending and self._executor is not None:
+                _, next_job = self._pending.popitem(last=False)
+                self._dispatch_locked(next_job)
+            self._export_state_locked(force=not self._pending and self._in_flight == 0)
+
+    # ---------- estado ----------
+    def lag_percentiles(self, fractions: tuple = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        """Percentis do atraso enfileiramento -> resultado nas ultimas `LAG_SAMPLES` comparacoes."""
+        with self._lock:
+            ordered: List[float] = sorted(self._lags)
+        result: Dict[str, float] = {}
+        for fraction in fractions:
+            key = f"p{int(round(fraction * 100))}_lag_s"
+            if not ordered:
+                result[key] = 0.0
+                continue
+            position = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+            result[key] = round(ordered[position], 3)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        percentiles = self.lag_percentiles((0.5, 0.95))
+        with self._lock:
+            now = time.monotonic()
+            oldest = min((job.enqueued_at for job in self._pending.values()), default=now)
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "queue_depth": len(self._pending),
+                "in_flight": self._in_flight,
+                "oldest_pending_s": round(now - oldest, 3),
+                **self.stats,
+                **percentiles,
+                "updated_at": datetime.now().isoformat(),
+            }
+
+    def _export_state_locked(self, force: bool = False) -> None:
+        if not self.state_path:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_export < STATE_EXPORT_INTERVAL_S:
+            return
+        self._last_export = now
+        try:
+            merge_state_file(self.state_path, "compare_stage", self.snapshot())
+        except OSError as exc:
+            self._log(f"falha ao exportar estado da comparacao: {exc}")
+
+    def drain(self, timeout: float = 30.0) -> bool:
+        deadline = time.monotonic() + max(0.0, float(timeout))
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._pending and self._in_flight == 0:
+                    return True
+            time.sleep(0.05)
+        return False
+
+    def close(self, drain_timeout: float = 30.0) -> None:
+        if drain_timeout > 0:
+            self.drain(drain_timeout)
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            self._export_state_locked(force=True)
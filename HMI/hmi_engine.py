@@ -7,6 +7,7 @@ import numpy as np
 
 from Dashboard.diff_engine import DiffConfig, compare_images
 from HMI.hmi_ai import compare_texts, cosine_similarity_from_lists, extract_ocr_text, extract_semantic_embedding, get_backend_status
+from HMI.hmi_hashing import average_hash, difference_hash, hash_to_bits
 
 try:
     from skimage.metrics import structural_similarity as ssim
@@ -397,18 +398,11 @@ def _heatmap_from_delta(delta_map: np.ndarray) -> np.ndarray:
 
 
 def _average_hash_local(img_bgr: np.ndarray, hash_size: int = 8) -> str:
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    resized = cv2.resize(gray, (hash_size, hash_size), interpolation=cv2.INTER_AREA)
-    avg = float(resized.mean())
-    bits = (resized >= avg).astype(np.uint8).flatten()
-    return "".join(str(int(bit)) for bit in bits)
+    return hash_to_bits(average_hash(img_bgr, hash_size), hash_size)
 
 
 def _difference_hash_local(img_bgr: np.ndarray, hash_size: int = 8) -> str:
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
-    bits = (resized[:, 1:] >= resized[:, :-1]).astype(np.uint8).flatten()
-    return "".join(str(int(bit)) for bit in bits)
+    return hash_to_bits(difference_hash(img_bgr, hash_size), hash_size)
 
 
 def _color_histogram_local(img_bgr: np.ndarray, bins: int = 8) -> List[float]:
@@ -513,6 +507,179 @@ def _build_context_stage(
     }
 
 
+def _score_candidate(
+    entry: Dict[str, Any],
+    reference: np.ndarray,
+    screenshot: np.ndarray,
+    rank_score: float,
+    hash_distance: int,
+    screenshot_diff_hash: str,
+    screenshot_embedding: Optional[np.ndarray],
+    screenshot_text: str,
+    stage1: Dict[str, Any],
+    cfg: ValidationConfig,
+) -> Dict[str, Any]:
+    """Metricas, pontuacao final e status de um screenshot contra uma referencia ja carregada."""
+    aligned_shot, alignment_score = _align_image(reference, screenshot, cfg.allow_alignment)
+    ignore_regions = entry.get("ignore_regions", [])
+    diff_cfg = DiffConfig(
+        ignore_regions=ignore_regions,
+        min_area=40,
+        max_area=300000,
+        diff_threshold=max(10, int(cfg.point_tolerance)),
+        use_alignment=False,
+    )
+    diff_result = compare_images(reference, aligned_shot, diff_cfg)
+    delta_map = _delta_map(reference, aligned_shot)
+    exact_mask = _exact_diff_mask(delta_map, cfg.point_tolerance, ignore_regions)
+    total_area = int(reference.shape[0]) * int(reference.shape[1])
+    changed_pixels = int(np.count_nonzero(exact_mask))
+    diff_area_ratio = float(changed_pixels) / float(max(total_area, 1))
+    pixel_metrics = _pixel_metrics(delta_map, cfg.point_tolerance)
+    edge_score = _edge_score(reference, aligned_shot, ignore_regions)
+    grid_metrics = _grid_metrics(delta_map, cfg.point_tolerance, cfg.grid_rows, cfg.grid_cols, ignore_regions)
+    global_score = _global_similarity(reference, aligned_shot)
+    structure_score = _structure_score(_diff_area_ratio(diff_result["diffs"], total_area))
+    component_score = _component_score(diff_result["toggle_changes"], diff_area_ratio)
+    semantic_similarity = cosine_similarity_from_lists(entry.get("semantic_embedding"), screenshot_embedding)
+    text_similarity = compare_texts(entry.get("ocr_text", ""), screenshot_text)
+    semantic_score = _soft_score(semantic_similarity, 0.0)
+    text_score = _soft_score(text_similarity, 0.0)
+    critical_failures = _critical_region_metrics(delta_map, entry.get("critical_regions", []), cfg.point_tolerance)
+    weighted_scores = [
+        (global_score, cfg.global_weight),
+        (pixel_metrics["pixel_match_ratio"], cfg.pixel_weight),
+        (edge_score, cfg.edge_weight),
+        (grid_metrics["avg_score"], cfg.grid_weight),
+        (structure_score, cfg.structure_weight),
+        (component_score, cfg.component_weight),
+    ]
+    if semantic_similarity is not None:
+        weighted_scores.append((semantic_score, cfg.semantic_weight))
+    if text_similarity is not None:
+        weighted_scores.append((text_score, cfg.text_weight))
+
+    total_weight = sum(weight for _, weight in weighted_scores)
+    final_score = (
+        sum(score * weight for score, weight in weighted_scores) / float(max(total_weight, 1e-9))
+    )
+    status = _classify_result(
+        final_score,
+        diff_result["toggle_changes"],
+        diff_area_ratio,
+        pixel_metrics["pixel_match_ratio"],
+        grid_metrics["min_score"],
+        critical_failures,
+        cfg,
+    )
+
+    return {
+        "screen_id": entry["screen_id"],
+        "screen_name": entry["name"],
+        "feature_context": _feature_context_from_entry(entry),
+        "reference_path": entry["path"],
+        "relative_reference_path": entry["relative_path"],
+        "stage1": stage1,
+        "rank_score": round(float(rank_score), 6),
+        "hash_distance": hash_distance,
+        "difference_hash_distance": _hash_distance(
+            entry.get("difference_hash", entry["average_hash"]),
+            screenshot_diff_hash,
+        ),
+        "scores": {
+            "global": round(global_score, 4),
+            "pixel": round(pixel_metrics["pixel_match_ratio"], 4),
+            "edge": round(edge_score, 4),
+            "grid_avg": round(grid_metrics["avg_score"], 4),
+            "grid_min": round(grid_metrics["min_score"], 4),
+            "structure": round(structure_score, 4),
+            "component": round(component_score, 4),
+            "semantic": round(semantic_score, 4) if semantic_similarity is not None else None,
+            "text": round(text_score, 4) if text_similarity is not None else None,
+            "alignment": round(alignment_score, 4),
+            "final": round(final_score, 4),
+        },
+        "diff_summary": {
+            "diff_count": len(diff_result["diffs"]),
+            "toggle_count": len(diff_result["toggle_changes"]),
+            "diff_area_ratio": round(diff_area_ratio, 6),
+            "pixel_match_ratio": round(pixel_metrics["pixel_match_ratio"], 6),
+            "changed_pixels": changed_pixels,
+            "mean_delta": round(pixel_metrics["mean_delta"], 4),
+            "p95_delta": round(pixel_metrics["p95_delta"], 4),
+            "worst_cell_score": round(grid_metrics["min_score"], 4),
+            "semantic_score": round(semantic_score, 4) if semantic_similarity is not None else None,
+            "text_score": round(text_score, 4) if text_similarity is not None else None,
+        },
+        "toggle_changes": diff_result["toggle_changes"],
+        "critical_region_failures": critical_failures,
+        "status": status,
+        "reason": _build_reason(
+            status,
+            entry["name"],
+            diff_area_ratio,
+            len(diff_result["toggle_changes"]),
+            pixel_metrics["pixel_match_ratio"],
+            grid_metrics["min_score"],
+            critical_failures,
+        ),
+        "debug_images": {
+            "overlay": _compose_overlay(reference, diff_result, exact_mask, grid_metrics["worst_cell"], critical_failures),
+            "diff_mask": exact_mask,
+            "heatmap": _heatmap_from_delta(delta_map),
+            "aligned": aligned_shot,
+        },
+    }
+
+
+def _no_match_result(
+    screenshot_path: str,
+    feature_context: str,
+    stage1: Dict[str, Any],
+    candidate_results: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
+        "screenshot_path": screenshot_path,
+        "status": "FAIL_SCREEN_MISMATCH",
+        "reason": "Nenhuma referencia valida encontrada na biblioteca.",
+        "scores": {
+            "global": 0.0,
+            "pixel": 0.0,
+            "edge": 0.0,
+            "grid_avg": 0.0,
+            "grid_min": 0.0,
+            "structure": 0.0,
+            "component": 0.0,
+            "semantic": 0.0,
+            "text": 0.0,
+            "alignment": 0.0,
+            "final": 0.0,
+        },
+        "diff_summary": {
+            "diff_count": 0,
+            "toggle_count": 0,
+            "diff_area_ratio": 1.0,
+            "pixel_match_ratio": 0.0,
+            "changed_pixels": 0,
+            "mean_delta": 0.0,
+            "p95_delta": 0.0,
+            "worst_cell_score": 0.0,
+            "semantic_score": 0.0,
+            "text_score": 0.0,
+        },
+        "toggle_changes": [],
+        "critical_region_failures": [],
+        "reference_path": None,
+        "relative_reference_path": None,
+        "screen_id": None,
+        "screen_name": None,
+        "feature_context": feature_context,
+        "stage1": stage1,
+        "candidate_results": candidate_results,
+        "debug_images": {},
+    }
+
+
 def evaluate_single_screenshot(
     screenshot_path: str,
     library_index: Dict,
@@ -570,117 +737,18 @@ def evaluate_single_screenshot(
         if hash_distance > cfg.hash_distance_limit:
             continue
 
-        reference = _load_image(entry["path"])
-        aligned_shot, alignment_score = _align_image(reference, screenshot, cfg.allow_alignment)
-        ignore_regions = entry.get("ignore_regions", [])
-        diff_cfg = DiffConfig(
-            ignore_regions=ignore_regions,
-            min_area=40,
-            max_area=300000,
-            diff_threshold=max(10, int(cfg.point_tolerance)),
-            use_alignment=False,
-        )
-        diff_result = compare_images(reference, aligned_shot, diff_cfg)
-        delta_map = _delta_map(reference, aligned_shot)
-        exact_mask = _exact_diff_mask(delta_map, cfg.point_tolerance, ignore_regions)
-        total_area = int(reference.shape[0]) * int(reference.shape[1])
-        changed_pixels = int(np.count_nonzero(exact_mask))
-        diff_area_ratio = float(changed_pixels) / float(max(total_area, 1))
-        pixel_metrics = _pixel_metrics(delta_map, cfg.point_tolerance)
-        edge_score = _edge_score(reference, aligned_shot, ignore_regions)
-        grid_metrics = _grid_metrics(delta_map, cfg.point_tolerance, cfg.grid_rows, cfg.grid_cols, ignore_regions)
-        global_score = _global_similarity(reference, aligned_shot)
-        structure_score = _structure_score(_diff_area_ratio(diff_result["diffs"], total_area))
-        component_score = _component_score(diff_result["toggle_changes"], diff_area_ratio)
-        semantic_similarity = cosine_similarity_from_lists(entry.get("semantic_embedding"), screenshot_embedding)
-        text_similarity = compare_texts(entry.get("ocr_text", ""), screenshot_text)
-        semantic_score = _soft_score(semantic_similarity, 0.0)
-        text_score = _soft_score(text_similarity, 0.0)
-        critical_failures = _critical_region_metrics(delta_map, entry.get("critical_regions", []), cfg.point_tolerance)
-        weighted_scores = [
-            (global_score, cfg.global_weight),
-            (pixel_metrics["pixel_match_ratio"], cfg.pixel_weight),
-            (edge_score, cfg.edge_weight),
-            (grid_metrics["avg_score"], cfg.grid_weight),
-            (structure_score, cfg.structure_weight),
-            (component_score, cfg.component_weight),
-        ]
-        if semantic_similarity is not None:
-            weighted_scores.append((semantic_score, cfg.semantic_weight))
-        if text_similarity is not None:
-            weighted_scores.append((text_score, cfg.text_weight))
-
-        total_weight = sum(weight for _, weight in weighted_scores)
-        final_score = (
-            sum(score * weight for score, weight in weighted_scores) / float(max(total_weight, 1e-9))
-        )
-        status = _classify_result(
-            final_score,
-            diff_result["toggle_changes"],
-            diff_area_ratio,
-            pixel_metrics["pixel_match_ratio"],
-            grid_metrics["min_score"],
-            critical_failures,
+        candidate_result = _score_candidate(
+            entry,
+            _load_image(entry["path"]),
+            screenshot,
+            rank_score,
+            hash_distance,
+            screenshot_diff_hash,
+            screenshot_embedding,
+            screenshot_text,
+            stage1,
             cfg,
         )
-
-        candidate_result = {
-            "screen_id": entry["screen_id"],
-            "screen_name": entry["name"],
-            "feature_context": _feature_context_from_entry(entry),
-            "reference_path": entry["path"],
-            "relative_reference_path": entry["relative_path"],
-            "stage1": stage1,
-            "rank_score": round(float(rank_score), 6),
-            "hash_distance": hash_distance,
-            "difference_hash_distance": _hash_distance(
-                entry.get("difference_hash", entry["average_hash"]),
-                screenshot_diff_hash,
-            ),
-            "scores": {
-                "global": round(global_score, 4),
-                "pixel": round(pixel_metrics["pixel_match_ratio"], 4),
-                "edge": round(edge_score, 4),
-                "grid_avg": round(grid_metrics["avg_score"], 4),
-                "grid_min": round(grid_metrics["min_score"], 4),
-                "structure": round(structure_score, 4),
-                "component": round(component_score, 4),
-                "semantic": round(semantic_score, 4) if semantic_similarity is not None else None,
-                "text": round(text_score, 4) if text_similarity is not None else None,
-                "alignment": round(alignment_score, 4),
-                "final": round(final_score, 4),
-            },
-            "diff_summary": {
-                "diff_count": len(diff_result["diffs"]),
-                "toggle_count": len(diff_result["toggle_changes"]),
-                "diff_area_ratio": round(diff_area_ratio, 6),
-                "pixel_match_ratio": round(pixel_metrics["pixel_match_ratio"], 6),
-                "changed_pixels": changed_pixels,
-                "mean_delta": round(pixel_metrics["mean_delta"], 4),
-                "p95_delta": round(pixel_metrics["p95_delta"], 4),
-                "worst_cell_score": round(grid_metrics["min_score"], 4),
-                "semantic_score": round(semantic_score, 4) if semantic_similarity is not None else None,
-                "text_score": round(text_score, 4) if text_similarity is not None else None,
-            },
-            "toggle_changes": diff_result["toggle_changes"],
-            "critical_region_failures": critical_failures,
-            "status": status,
-            "reason": _build_reason(
-                status,
-                entry["name"],
-                diff_area_ratio,
-                len(diff_result["toggle_changes"]),
-                pixel_metrics["pixel_match_ratio"],
-                grid_metrics["min_score"],
-                critical_failures,
-            ),
-            "debug_images": {
-                "overlay": _compose_overlay(reference, diff_result, exact_mask, grid_metrics["worst_cell"], critical_failures),
-                "diff_mask": exact_mask,
-                "heatmap": _heatmap_from_delta(delta_map),
-                "aligned": aligned_shot,
-            },
-        }
         candidate_results.append(candidate_result)
         if best_result is None:
             best_result = candidate_result
@@ -697,46 +765,7 @@ def evaluate_single_screenshot(
     )
 
     if best_result is None:
-        return {
-            "screenshot_path": screenshot_path,
-            "status": "FAIL_SCREEN_MISMATCH",
-            "reason": "Nenhuma referencia valida encontrada na biblioteca.",
-            "scores": {
-                "global": 0.0,
-                "pixel": 0.0,
-                "edge": 0.0,
-                "grid_avg": 0.0,
-                "grid_min": 0.0,
-                "structure": 0.0,
-                "component": 0.0,
-                "semantic": 0.0,
-                "text": 0.0,
-                "alignment": 0.0,
-                "final": 0.0,
-            },
-            "diff_summary": {
-                "diff_count": 0,
-                "toggle_count": 0,
-                "diff_area_ratio": 1.0,
-                "pixel_match_ratio": 0.0,
-                "changed_pixels": 0,
-                "mean_delta": 0.0,
-                "p95_delta": 0.0,
-                "worst_cell_score": 0.0,
-                "semantic_score": 0.0,
-                "text_score": 0.0,
-            },
-            "toggle_changes": [],
-            "critical_region_failures": [],
-            "reference_path": None,
-            "relative_reference_path": None,
-            "screen_id": None,
-            "screen_name": None,
-            "feature_context": routed_context,
-            "stage1": stage1,
-            "candidate_results": candidate_results,
-            "debug_images": {},
-        }
+        return _no_match_result(screenshot_path, routed_context, stage1, candidate_results)
 
     best_payload = dict(best_result)
     best_payload["screenshot_path"] = screenshot_path
@@ -744,6 +773,73 @@ def evaluate_single_screenshot(
     return best_payload
 
 
+def _pair_reference_entry(reference_path: str, reference: np.ndarray, meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Entrada equivalente a de `build_library_index` para uma referencia avulsa."""
+    file_name = os.path.basename(reference_path)
+    return {
+        "screen_id": meta.get("screen_id") or os.path.splitext(file_name)[0],
+        "name": meta.get("name") or file_name,
+        "path": os.path.normpath(os.path.abspath(reference_path)),
+        "relative_path": file_name,
+        "average_hash": _average_hash_local(reference),
+        "difference_hash": _difference_hash_local(reference),
+        "semantic_embedding": meta.get("semantic_embedding"),
+        "ocr_text": meta.get("ocr_text", ""),
+        "feature_context": str(meta.get("feature_context") or file_name),
+        "ignore_regions": meta.get("ignore_regions", []),
+        "critical_regions": meta.get("critical_regions", []),
+    }
+
+
+def compare_screenshot_pair(
+    screenshot_path: str,
+    reference_path: str,
+    cfg: Optional[ValidationConfig] = None,
+    reference_meta: Optional[Dict[str, Any]] = None,
+) -> Dict:
+    """Pontua um screenshot contra uma referencia explicita, sem montar indice.
+
+    Mesmas metricas, pesos e status de `evaluate_single_screenshot` com uma biblioteca de
+    uma tela so, mas a referencia e lida uma vez e nada e copiado nem indexado.
+    `reference_meta` aceita os campos do sidecar `.meta.json` (regioes, nome, contexto).
+    """
+    cfg = cfg or ValidationConfig()
+    screenshot = _load_image(screenshot_path)
+    reference = _load_image(reference_path)
+    entry = _pair_reference_entry(reference_path, reference, dict(reference_meta or {}))
+    stage1 = _build_context_stage([(entry, 0.0)], 1)
+    screenshot_hash = _average_hash_local(screenshot)
+    hash_distance = _hash_distance(entry["average_hash"], screenshot_hash)
+    if hash_distance > cfg.hash_distance_limit:
+        return _no_match_result(screenshot_path, entry["feature_context"], stage1, [])
+
+    screenshot_embedding = None
+    screenshot_text = ""
+    if (cfg.enable_semantic and entry["semantic_embedding"]) or (cfg.enable_text and entry["ocr_text"]):
+        backend_status = get_backend_status()
+        if cfg.enable_semantic and entry["semantic_embedding"] and backend_status.semantic_available:
+            screenshot_embedding = extract_semantic_embedding(screenshot)
+        if cfg.enable_text and entry["ocr_text"] and backend_status.ocr_available:
+            screenshot_text = extract_ocr_text(screenshot)
+
+    result = _score_candidate(
+        entry,
+        reference,
+        screenshot,
+        0.0,
+        hash_distance,
+        _difference_hash_local(screenshot),
+        screenshot_embedding,
+        screenshot_text,
+        stage1,
+        cfg,
+    )
+    payload = dict(result)
+    payload["screenshot_path"] = screenshot_path
+    payload["candidate_results"] = [dict(result)]
+    return payload
+
+
 def validate_execution_images(
     screenshot_paths: List[str],
     library_index: Dict,
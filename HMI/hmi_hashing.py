@@ -0,0 +1,60 @@
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+HASH_SIZE = 8
+NO_HASH_DISTANCE = 999
+
+_GRAY_CONVERSIONS = {
+    "bgr": cv2.COLOR_BGR2GRAY,
+    "rgb": cv2.COLOR_RGB2GRAY,
+    "bgra": cv2.COLOR_BGRA2GRAY,
+    "rgba": cv2.COLOR_RGBA2GRAY,
+}
+
+
+def to_gray(image: np.ndarray, color_order: str = "bgr") -> np.ndarray:
+    """Cinza pelos mesmos pesos do OpenCV para qualquer ordem de canais (ou ja em cinza)."""
+    frame = np.asarray(image)
+    if frame.ndim == 2:
+        return frame
+    if frame.ndim == 3 and frame.shape[2] == 1:
+        return frame[:, :, 0]
+    return cv2.cvtColor(frame, _GRAY_CONVERSIONS[color_order.lower()])
+
+
+def pack_bits(bits: np.ndarray) -> int:
+    """Bits em ordem de linha (o primeiro e o mais significativo) como inteiro."""
+    return int.from_bytes(np.packbits(np.asarray(bits, dtype=np.uint8).reshape(-1)).tobytes(), "big") >> (
+        (-int(np.asarray(bits).size)) % 8
+    )
+
+
+def average_hash(image: np.ndarray, hash_size: int = HASH_SIZE, color_order: str = "bgr") -> int:
+    """aHash empacotado: miniatura INTER_AREA `hash_size`x`hash_size` contra a propria media."""
+    resized = cv2.resize(to_gray(image, color_order), (hash_size, hash_size), interpolation=cv2.INTER_AREA)
+    return pack_bits(resized >= float(resized.mean()))
+
+
+def difference_hash(image: np.ndarray, hash_size: int = HASH_SIZE, color_order: str = "bgr") -> int:
+    """dHash empacotado: gradiente horizontal numa miniatura (`hash_size` + 1) x `hash_size`."""
+    resized = cv2.resize(to_gray(image, color_order), (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return pack_bits(resized[:, 1:] >= resized[:, :-1])
+
+
+def hash_distance(left: Optional[int], right: Optional[int]) -> int:
+    """Distancia de Hamming por popcount; hash ausente conta como totalmente diferente."""
+    if left is None or right is None:
+        return NO_HASH_DISTANCE
+    return (int(left) ^ int(right)).bit_count()
+
+
+def hash_to_bits(value: int, hash_size: int = HASH_SIZE) -> str:
+    """Formato texto ("0101...") usado no indice da biblioteca."""
+    return format(int(value), f"0{hash_size * hash_size}b")
+
+
+def bits_to_hash(bits: str) -> int:
+    return int(bits, 2) if bits else 0
@@ -8,6 +8,7 @@ import cv2
 import numpy as np
 
 from HMI.hmi_ai import embedding_to_list, extract_ocr_text, extract_semantic_embedding, get_backend_status
+from HMI.hmi_hashing import average_hash, difference_hash, hash_to_bits
 
 
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
@@ -45,18 +46,11 @@ def _infer_screen_type(relative_path: str) -> str:
 
 
 def _average_hash(img_bgr: np.ndarray, hash_size: int = 8) -> str:
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    resized = cv2.resize(gray, (hash_size, hash_size), interpolation=cv2.INTER_AREA)
-    avg = float(resized.mean())
-    bits = (resized >= avg).astype(np.uint8).flatten()
-    return "".join(str(int(bit)) for bit in bits)
+    return hash_to_bits(average_hash(img_bgr, hash_size), hash_size)
 
 
 def _difference_hash(img_bgr: np.ndarray, hash_size: int = 8) -> str:
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
-    bits = (resized[:, 1:] >= resized[:, :-1]).astype(np.uint8).flatten()
-    return "".join(str(int(bit)) for bit in bits)
+    return hash_to_bits(difference_hash(img_bgr, hash_size), hash_size)
 
 
 def _color_histogram(img_bgr: np.ndarray, bins: int = 8) -> List[float]:
@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except Exception:  # pragma: no cover - watchdog e opcional
+    FileSystemEventHandler = object
+    Observer = None
+
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+TEMP_PREFIXES = ("hmi_watch_", "scrcpy_watch_", "touch_native_")
+STABLE_AGE_S = 0.3
+POLL_INTERVAL_S = 1.0
+CURSOR_FILENAME = "lookup_cursor.json"
+MAX_RETRY_ATTEMPTS = 3
+
+_WATCHERS: Dict[str, "LiveShotsWatcher"] = {}
+_WATCHERS_LOCK = threading.Lock()
+
+
+def is_capture_name(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS and not name.startswith(TEMP_PREFIXES)
+
+
+class _ShotsEventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "LiveShotsWatcher") -> None:
+        super().__init__()
+        self.watcher = watcher
+
+    def on_created(self, event) -> None:
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_modified(self, event) -> None:
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+
+    def on_moved(self, event) -> None:
+        if not event.is_directory:
+            self.watcher.notify(event.dest_path)
+
+
+class LiveShotsWatcher:
+    """Fila incremental das capturas do lookup ao vivo.
+
+    Com watchdog, eventos do SO (inotify/ReadDirectoryChangesW) alimentam a fila; sem ele,
+    um scandir limitado a `poll_interval_s` faz o papel. O cursor `(mtime_ns, nome)` da
+    ultima captura consumida fica em disco, entao um rerun ou reinicio so ve arquivos novos.
+    Capturas que falharam (`fail`) ficam num conjunto de retentativa salvo junto do cursor e
+    continuam saindo em `take_stable` mesmo depois que o cursor passa delas, ate
+    `MAX_RETRY_ATTEMPTS` falhas.
+    """
+
+    def __init__(
+        self,
+        shots_dir: str,
+        cursor_path: str,
+        use_watchdog: bool = True,
+        poll_interval_s: float = POLL_INTERVAL_S,
+    ) -> None:
+        self.shots_dir = shots_dir
+        self.cursor_path = cursor_path
+        self.poll_interval_s = float(poll_interval_s)
+        self.mode = "watchdog" if use_watchdog and Observer is not None else "polling"
+        self._lock = threading.Lock()
+        self._retry: Dict[str, int] = {}
+        self._cursor: Tuple[int, str] = self._load_cursor()
+        self._pending: Dict[str, None] = dict.fromkeys(self._retry)
+        self._scan_mark: Tuple[int, str] = self._cursor
+        self._latest: Tuple[int, str] = self._cursor
+        self._latest_event = ""
+        self._last_poll = 0.0
+        self._observer = None
+        self._started = False
+
+    # ---------- cursor ----------
+    def _load_cursor(self) -> Tuple[int, str]:
+        try:
+            with open(self.cursor_path, "r", encoding="utf-8") as fh:
+                payload = json.load(fh)
+            retry = payload.get("retry") or {}
+            if isinstance(retry, dict):
+                self._retry = {str(name): int(attempts) for name, attempts in retry.items()}
+            return int(payload.get("mtime_ns", 0) or 0), str(payload.get("name") or "")
+        except (OSError, ValueError, AttributeError, TypeError):
+            return 0, ""
+
+    def _save_cursor(self) -> None:
+        os.makedirs(os.path.dirname(self.cursor_path) or ".", exist_ok=True)
+        tmp_path = f"{self.cursor_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"mtime_ns": self._cursor[0], "name": self._cursor[1], "retry": self._retry}, fh)
+        os.replace(tmp_path, self.cursor_path)
+
+    @property
+    def cursor(self) -> Tuple[int, str]:
+        return self._cursor
+
+    # ---------- ciclo de vida ----------
+    def start(self) -> "LiveShotsWatcher":
+        if self._started:
+            return self
+        self._started = True
+        os.makedirs(self.shots_dir, exist_ok=True)
+        if self.mode == "watchdog":
+            try:
+                observer = Observer()
+                observer.schedule(_ShotsEventHandler(self), self.shots_dir, recursive=False)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except Exception:
+                self.mode = "polling"
+        # backlog: o que chegou desde o ultimo cursor (antes do observer existir)
+        self._scan()
+        return self
+
+    def close(self) -> None:
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=2)
+
+    # ---------- entrada ----------
+    def notify(self, path: str) -> None:
+        name = os.path.basename(path)
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.shots_dir) or not is_capture_name(name):
+            return
+        with self._lock:
+            self._pending[name] = None
+            self._latest_event = name
+
+    def _scan(self) -> None:
+        found: List[Tuple[int, str]] = []
+        try:
+            with os.scandir(self.shots_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not is_capture_name(entry.name):
+                        continue
+                    key = (entry.stat().st_mtime_ns, entry.name)
+                    if key > self._scan_mark:
+                        found.append(key)
+        except OSError:
+            return
+        with self._lock:
+            for key in found:
+                self._pending[key[1]] = None
+            if found:
+                self._scan_mark = max(self._scan_mark, max(found))
+                self._latest = max(self._latest, self._scan_mark)
+        self._last_poll = time.monotonic()
+
+    def _poll_if_due(self) -> None:
+        if self.mode == "polling" and time.monotonic() - self._last_poll >= self.poll_interval_s:
+            self._scan()
+
+    # ---------- saida ----------
+    def take_stable(self, stable_age_s: float = STABLE_AGE_S) -> List[Tuple[str, str, int]]:
+        """Capturas prontas (sem escrita ha `stable_age_s`), em ordem de chegada: (nome, caminho, mtime_ns)."""
+        self._poll_if_due()
+        with self._lock:
+            names = list(self._pending)
+        now_ns = time.time_ns()
+        ready: List[Tuple[int, str]] = []
+        gone: List[str] = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.shots_dir, name))
+            except OSError:
+                gone.append(name)
+                continue
+            key = (stat.st_mtime_ns, name)
+            if key <= self._cursor and name not in self._retry:
+                gone.append(name)
+                continue
+            if key > self._latest:
+                self._latest = key
+            if stat.st_size > 0 and now_ns - stat.st_mtime_ns >= int(stable_age_s * 1e9):
+                ready.append(key)
+        with self._lock:
+            for name in gone:
+                self._pending.pop(name, None)
+            dropped_retry = [name for name in gone if self._retry.pop(name, None) is not None]
+        if dropped_retry:
+            self._save_cursor()
+        return [(name, os.path.join(self.shots_dir, name), mtime_ns) for mtime_ns, name in sorted(ready)]
+
+    def commit(self, name: str, mtime_ns: int) -> None:
+        """Marca a captura como consumida e avanca o cursor persistente."""
+        with self._lock:
+            self._pending.pop(name, None)
+            was_retry = self._retry.pop(str(name), None) is not None
+            key = (int(mtime_ns), str(name))
+            if key > self._cursor:
+                self._cursor = key
+            elif not was_retry:
+                return
+        self._save_cursor()
+
+    def fail(self, name: str, mtime_ns: int) -> bool:
+        """Registra uma falha; a captura volta em `take_stable` ate `MAX_RETRY_ATTEMPTS` (False = desistiu)."""
+        with self._lock:
+            attempts = self._retry.get(str(name), 0) + 1
+            if attempts >= MAX_RETRY_ATTEMPTS:
+                self._retry.pop(str(name), None)
+                self._pending.pop(name, None)
+                retrying = False
+            else:
+                self._retry[str(name)] = attempts
+                self._pending[name] = None
+                retrying = True
+        self._save_cursor()
+        return retrying
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def latest_path(self) -> str:
+        """Captura mais recente vista, sem listar a pasta (ultimo evento ou ultimo scan)."""
+        self._poll_if_due()
+        with self._lock:
+            candidates = {self._latest[1], self._latest_event} - {""}
+        for name in candidates:
+            try:
+                key = (os.stat(os.path.join(self.shots_dir, name)).st_mtime_ns, name)
+            except OSError:
+                continue
+            if key > self._latest:
+                self._latest = key
+        name = self._latest[1]
+        path = os.path.join(self.shots_dir, name) if name else ""
+        return path if path and os.path.exists(path) else ""
+
+
+def get_live_watcher(shots_dir: str, cursor_path: str) -> LiveShotsWatcher:
+    """Watcher unico por pasta, reaproveitado entre reruns do Streamlit."""
+    key = os.path.abspath(shots_dir)
+    with _WATCHERS_LOCK:
+        watcher = _WATCHERS.get(key)
+        if watcher is None:
+            watcher = LiveShotsWatcher(shots_dir, cursor_path).start()
+            _WATCHERS[key] = watcher
+        return watcher
+
+
+def reset_live_watcher(shots_dir: str, cursor_path: str = "") -> None:
+    with _WATCHERS_LOCK:
+        watcher = _WATCHERS.pop(os.path.abspath(shots_dir), None)
+    if watcher is not None:
+        watcher.close()
+    if cursor_path and os.path.exists(cursor_path):
+        try:
+            os.remove(cursor_path)
+        except OSError:
+            pass
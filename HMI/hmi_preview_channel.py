@@ -0,0 +1,213 @@
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from dataclasses import dataclass, replace
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+
+PREVIEW_CHANNEL_FILENAME = "preview_channel.json"
+MAGIC = b"HMIP"
+VERSION = 1
+HEADER_FORMAT = "<4sIQIIId"
+HEADER_SIZE = 64
+READ_RETRIES = 3
+
+
+def preview_channel_path(root_dir: str) -> str:
+    return os.path.join(root_dir, PREVIEW_CHANNEL_FILENAME)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # Sem isso o resource_tracker do leitor apaga o segmento do monitor ao sair (bpo-39959).
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    except Exception:
+        pass
+    return shm
+
+
+@dataclass
+class PreviewFrame:
+    seq: int
+    timestamp: float
+    image: Any  # array RGB; em `read_encoded`, o que `encode` devolveu
+
+
+class PreviewChannelWriter:
+    """Lado do monitor: publica frames RGB brutos num segmento de memoria compartilhada.
+
+    Cabecalho de 64 bytes com contador de sequencia (impar = escrita em andamento) seguido
+    dos pixels. O nome do segmento fica em `preview_channel.json`; se um frame nao couber,
+    um segmento maior e criado e o descritor e trocado.
+    """
+
+    def __init__(self, descriptor_path: str) -> None:
+        self.descriptor_path = descriptor_path
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._generation = 0
+        self._seq = 0
+
+    def _allocate(self, nbytes: int) -> shared_memory.SharedMemory:
+        self._release()
+        self._generation += 1
+        tag = zlib.crc32(os.path.abspath(self.descriptor_path).encode("utf-8"))
+        name = f"hmip_{tag:08x}_{os.getpid() % 100000}_{self._generation}"
+        shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_SIZE + nbytes)
+        shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        self._shm = shm
+        os.makedirs(os.path.dirname(self.descriptor_path) or ".", exist_ok=True)
+        tmp_path = f"{self.descriptor_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"name": shm.name, "capacity": nbytes, "pid": os.getpid()}, fh)
+        os.replace(tmp_path, self.descriptor_path)
+        return shm
+
+    def publish(self, image: np.ndarray) -> int:
+        frame = np.ascontiguousarray(image, dtype=np.uint8)
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+        height, width, channels = frame.shape
+        shm = self._shm
+        if shm is None or shm.size < HEADER_SIZE + frame.nbytes:
+            shm = self._allocate(frame.nbytes)
+        self._seq += 1
+        struct.pack_into("<Q", shm.buf, 8, self._seq)
+        target = np.ndarray(frame.shape, dtype=np.uint8, buffer=shm.buf, offset=HEADER_SIZE)
+        np.copyto(target, frame)
+        del target
+        self._seq += 1
+        struct.pack_into(HEADER_FORMAT, shm.buf, 0, MAGIC, VERSION, self._seq, width, height, channels, time.time())
+        return self._seq
+
+    def _release(self) -> None:
+        shm, self._shm = self._shm, None
+        if shm is not None:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        self._release()
+        try:
+            with open(self.descriptor_path, "r", encoding="utf-8") as fh:
+                owner = json.load(fh).get("pid")
+            if owner == os.getpid():
+                os.remove(self.descriptor_path)
+        except (OSError, ValueError):
+            pass
+
+
+class PreviewChannelReader:
+    """Lado da UI: le o ultimo frame sem decodificar PNG.
+
+    `read()` devolve uma view sobre a memoria compartilhada (sem copia); use `still_valid`
+    depois de consumir a view para saber se o monitor sobrescreveu o frame no meio.
+    """
+
+    def __init__(self, descriptor_path: str) -> None:
+        self.descriptor_path = descriptor_path
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._name = ""
+        self._descriptor_mtime = 0.0
+
+    def _descriptor(self) -> Dict[str, Any]:
+        try:
+            mtime = os.path.getmtime(self.descriptor_path)
+        except OSError:
+            return {}
+        if self._shm is not None and mtime == self._descriptor_mtime:
+            return {"name": self._name}
+        try:
+            with open(self.descriptor_path, "r", encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        self._descriptor_mtime = mtime
+        return payload if isinstance(payload, dict) else {}
+
+    def _ensure_attached(self) -> Optional[shared_memory.SharedMemory]:
+        name = str(self._descriptor().get("name") or "")
+        if not name:
+            self.close()
+            return None
+        if self._shm is not None and name == self._name:
+            return self._shm
+        self.close()
+        try:
+            self._shm = _attach(name)
+            self._name = name
+        except (FileNotFoundError, OSError, ValueError):
+            self._shm = None
+            self._name = ""
+        return self._shm
+
+    def _header(self, shm: shared_memory.SharedMemory):
+        return struct.unpack_from(HEADER_FORMAT, shm.buf, 0)
+
+    def read(self, after_seq: int = 0, copy: bool = False) -> Optional[PreviewFrame]:
+        shm = self._ensure_attached()
+        if shm is None:
+            return None
+        for _ in range(READ_RETRIES):
+            magic, version, seq, width, height, channels, timestamp = self._header(shm)
+            if magic != MAGIC or version != VERSION or seq == 0:
+                return None
+            if seq % 2:
+                time.sleep(0.001)
+                continue
+            if seq <= after_seq:
+                return None
+            if HEADER_SIZE + width * height * channels > shm.size:
+                return None
+            view = np.ndarray((height, width, channels), dtype=np.uint8, buffer=shm.buf, offset=HEADER_SIZE)
+            image = view.copy() if copy else view
+            if copy and self._header(shm)[2] != seq:
+                continue
+            return PreviewFrame(int(seq), float(timestamp), image)
+        return None
+
+    def read_encoded(self, encode: Callable[[np.ndarray], Any], after_seq: int = 0) -> Optional[PreviewFrame]:
+        """Aplica `encode` direto na view compartilhada e so copia o frame se ele mudar no meio.
+
+        O contador de sequencia e conferido depois do encode; quando o monitor sobrescreveu
+        o frame em todas as tentativas, a ultima le uma copia consistente e codifica ela.
+        """
+        for _ in range(READ_RETRIES):
+            frame = self.read(after_seq)
+            if frame is None:
+                return None
+            encoded = encode(frame.image)
+            frame.image = None
+            if self.still_valid(frame):
+                return replace(frame, image=encoded)
+        frame = self.read(after_seq, copy=True)
+        if frame is None:
+            return None
+        return replace(frame, image=encode(frame.image))
+
+    def still_valid(self, frame: PreviewFrame) -> bool:
+        shm = self._shm
+        return shm is not None and self._header(shm)[2] == frame.seq
+
+    def close(self) -> None:
+        shm, self._shm = self._shm, None
+        self._name = ""
+        if shm is not None:
+            try:
+                shm.close()
+            except BufferError:
+                # ainda ha views vivas; o segmento e liberado quando elas forem coletadas
+                pass
@@ -0,0 +1,230 @@
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from PIL import Image
+
+from app.shared.frame_sources import FrameSource
+
+try:
+    import psutil  # type: ignore
+except Exception:  # pragma: no cover - dependencia opcional
+    psutil = None
+
+try:
+    import resource
+except Exception:  # pragma: no cover - indisponivel no Windows
+    resource = None
+
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
+MANIFEST_NAME = "manifest.jsonl"
+REPLAY_REPORT_NAME = "replay_report.json"
+REPLAY_TIMING_DEFAULT = "recorded"
+
+
+@dataclass
+class ReplayFrame:
+    file_name: str
+    path: str
+    offset_s: float
+    action: str = ""
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def load_replay_frames(folder: str) -> List[ReplayFrame]:
+    """Frames gravados em ordem, com o deslocamento (s) desde o primeiro.
+
+    Usa o `manifest.jsonl` da pasta (mesmo formato do monitor / HMI_TESTE); sem manifest,
+    cai para as imagens da pasta ordenadas por data de modificacao.
+    """
+    rows: List[tuple] = []
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    payload = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(payload, dict):
+                    continue
+                name = str(payload.get("file") or "")
+                path = os.path.join(folder, name)
+                stamp = _parse_timestamp(payload.get("captured_at"))
+                if name and stamp is not None and os.path.isfile(path):
+                    rows.append((stamp, name, path, str(payload.get("action") or "")))
+    else:
+        for entry in os.scandir(folder):
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                rows.append((entry.stat().st_mtime, entry.name, entry.path, ""))
+    rows.sort(key=lambda row: (row[0], row[1]))
+    if not rows:
+        return []
+    start = rows[0][0]
+    return [ReplayFrame(name, path, max(0.0, stamp - start), action) for stamp, name, path, action in rows]
+
+
+@dataclass
+class ReplayTiming:
+    """Perfil de tempo do replay: "recorded" (intervalos gravados), "max" ou "fps=<n>"."""
+
+    mode: str = REPLAY_TIMING_DEFAULT
+    fps: float = 0.0
+    speed: float = 1.0
+
+    @classmethod
+    def parse(cls, spec: str, speed: float = 1.0) -> "ReplayTiming":
+        text = str(spec or REPLAY_TIMING_DEFAULT).strip().lower()
+        speed = float(speed) if float(speed or 0) > 0 else 1.0
+        if text in {"recorded", "max"}:
+            return cls(text, 0.0, speed)
+        key, _, raw = text.partition("=")
+        if key == "fps":
+            try:
+                fps = float(raw)
+            except ValueError:
+                fps = 0.0
+            if fps > 0:
+                return cls("fps", fps, speed)
+        raise ValueError(f"perfil de replay invalido '{spec}': use recorded, max ou fps=<n>")
+
+    def schedule(self, frames: Iterable[ReplayFrame]) -> List[float]:
+        """Instante (s desde o inicio) em que cada frame fica disponivel."""
+        frames = list(frames)
+        if self.mode == "max":
+            return [0.0] * len(frames)
+        if self.mode == "fps":
+            return [index / (self.fps * self.speed) for index in range(len(frames))]
+        return [frame.offset_s / self.speed for frame in frames]
+
+    def label(self) -> str:
+        base = f"fps={self.fps:g}" if self.mode == "fps" else self.mode
+        return base if self.mode == "max" or self.speed == 1.0 else f"{base} x{self.speed:g}"
+
+
+class ReplayFrameSource(FrameSource):
+    """Entrega frames gravados no ritmo do perfil, como uma fonte ao vivo.
+
+    Com "max" todo frame e entregue assim que pedido. Nos perfis com relogio, se o consumidor
+    atrasar, frames ja superados pelo seguinte sao pulados (como o slot de ultimo frame das
+    fontes ADB) e contados em `frames_skipped`.
+    """
+
+    def __init__(self, frames: List[ReplayFrame], timing: ReplayTiming) -> None:
+        self.frames = list(frames)
+        self.timing = timing
+        self._due = timing.schedule(self.frames)
+        self._index = 0
+        self._started_at = 0.0
+        self.frames_read = 0
+        self.frames_skipped = 0
+
+    def start(self) -> "ReplayFrameSource":
+        self._started_at = time.monotonic()
+        return self
+
+    def read(self, timeout: float = 1.0) -> Optional[Image.Image]:
+        if self._index >= len(self.frames):
+            return None
+        if not self._started_at:
+            self.start()
+        elapsed = time.monotonic() - self._started_at
+        if self.timing.mode != "max":
+            while self._index + 1 < len(self.frames) and self._due[self._index + 1] <= elapsed:
+                self._index += 1
+                self.frames_skipped += 1
+            wait_s = self._due[self._index] - elapsed
+            if wait_s > timeout:
+                time.sleep(max(0.0, timeout))
+                return None
+            if wait_s > 0:
+                time.sleep(wait_s)
+        frame = self.frames[self._index]
+        self._index += 1
+        with Image.open(frame.path) as image:
+            image.load()
+            self.frames_read += 1
+            return image.convert("RGB") if image.mode not in {"RGB", "RGBA"} else image.copy()
+
+    def closed(self) -> bool:
+        return self._index >= len(self.frames)
+
+    def close(self) -> None:
+        self._index = len(self.frames)
+
+
+def _peak_rss_bytes() -> int:
+    if resource is None:
+        return 0
+    peak = int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    # ru_maxrss vem em bytes no macOS e em KiB no Linux/BSD.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class ResourceMeter:
+    """CPU (processo + filhos) e RSS entre `start()` e `stop()`; usa psutil quando instalado."""
+
+    def __init__(self) -> None:
+        self._process = psutil.Process() if psutil is not None else None
+        self._wall = 0.0
+        self._cpu = 0.0
+
+    def _cpu_seconds(self) -> float:
+        if self._process is not None:
+            total = sum(self._process.cpu_times()[:2])
+            for child in self._process.children(recursive=True):
+                try:
+                    total += sum(child.cpu_times()[:2])
+                except Exception:
+                    continue
+            return float(total)
+        seconds = time.process_time()
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            seconds += usage.ru_utime + usage.ru_stime
+        return float(seconds)
+
+    def _rss_bytes(self) -> Dict[str, int]:
+        if self._process is not None:
+            info = self._process.memory_info()
+            peak = int(getattr(info, "peak_wset", 0) or 0)
+            if not peak:
+                peak = _peak_rss_bytes()
+            return {"rss_bytes": int(info.rss), "peak_rss_bytes": max(peak, int(info.rss))}
+        rss = 0
+        try:
+            with open("/proc/self/statm", "r", encoding="ascii") as fh:
+                rss = int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError, AttributeError):
+            rss = 0
+        peak = _peak_rss_bytes()
+        return {"rss_bytes": rss, "peak_rss_bytes": max(peak, rss)}
+
+    def start(self) -> "ResourceMeter":
+        self._wall = time.monotonic()
+        self._cpu = self._cpu_seconds()
+        return self
+
+    def stop(self) -> Dict[str, Any]:
+        wall = max(1e-9, time.monotonic() - self._wall)
+        cpu = max(0.0, self._cpu_seconds() - self._cpu)
+        memory = self._rss_bytes()
+        return {
+            "wall_s": round(wall, 3),
+            "cpu_s": round(cpu, 3),
+            "cpu_percent": round(100.0 * cpu / wall, 1),
+            "rss_mb": round(memory["rss_bytes"] / (1024 * 1024), 1),
+            "peak_rss_mb": round(memory["peak_rss_bytes"] / (1024 * 1024), 1),
+            "meter": "psutil" if self._process is not None else "stdlib",
+        }
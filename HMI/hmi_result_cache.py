@@ -0,0 +1,103 @@
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from HMI.hmi_hashing import average_hash, difference_hash, hash_distance, to_gray
+
+
+DEDUP_CACHE_SIZE = 32
+DEDUP_CONFIRM_DISTANCE = 6
+CONFIRM_MAX_MEAN_DIFF = 2.0
+CONFIRM_MAX_PIXEL_DIFF = 24
+
+
+@dataclass
+class CachedValidation:
+    file_name: str
+    file_path: str
+    ahash: int
+    dhash: int
+    result: Dict[str, Any]
+
+
+def frame_hashes(image: np.ndarray, hash_size: int = 8, color_order: str = "bgr") -> Tuple[int, int]:
+    """aHash e dHash (mesma receita do indice da biblioteca) de um frame ja em memoria."""
+    gray = to_gray(image, color_order)
+    return average_hash(gray, hash_size), difference_hash(gray, hash_size)
+
+
+def frame_hashes_from_path(image_path: str, hash_size: int = 8) -> Tuple[int, int]:
+    """aHash e dHash (mesma receita do indice da biblioteca) empacotados como inteiros."""
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError(f"imagem ilegivel: {image_path}")
+    return frame_hashes(gray, hash_size)
+
+
+def thumbnails_match(
+    path_a: str,
+    path_b: str,
+    max_mean_diff: float = CONFIRM_MAX_MEAN_DIFF,
+    max_pixel_diff: int = CONFIRM_MAX_PIXEL_DIFF,
+) -> bool:
+    """Confirmacao em 1/4 da resolucao: diferenca media pequena e nenhum pixel muito diferente.
+
+    O limite por pixel pega mudancas pequenas e localizadas (um digito, um toggle) que quase
+    nao mexem na media nem no hash 8x8.
+    """
+    gray_a = cv2.imread(path_a, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    gray_b = cv2.imread(path_b, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if gray_a is None or gray_b is None:
+        return False
+    if gray_b.shape != gray_a.shape:
+        gray_b = cv2.resize(gray_b, (gray_a.shape[1], gray_a.shape[0]), interpolation=cv2.INTER_AREA)
+    diff = cv2.absdiff(gray_a, gray_b)
+    return float(diff.mean()) <= float(max_mean_diff) and int(diff.max()) <= int(max_pixel_diff)
+
+
+class ValidationResultCache:
+    """Resultados recentes indexados por aHash + dHash do frame validado.
+
+    Os hashes so selecionam candidatos (distancia ate `confirm_distance` nos dois); o
+    resultado so e reaproveitado se `confirm(novo, validado)` aceitar. Hash 8x8 proximo nao
+    basta: um digito ou toggle diferente cabe em poucos bits. Sem `confirm`, nada e reaproveitado.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEDUP_CACHE_SIZE,
+        confirm_distance: int = DEDUP_CONFIRM_DISTANCE,
+        confirm: Optional[Callable[[str, str], bool]] = thumbnails_match,
+    ) -> None:
+        self.confirm_distance = max(0, int(confirm_distance))
+        self.confirm = confirm
+        self._entries: Deque[CachedValidation] = deque(maxlen=max(1, int(max_entries)))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def remember(self, file_name: str, file_path: str, ahash: int, dhash: int, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.append(CachedValidation(file_name, file_path, int(ahash), int(dhash), result))
+
+    def lookup(self, file_path: str, ahash: int, dhash: int) -> Optional[Tuple[CachedValidation, int, int]]:
+        """Entrada reaproveitavel mais proxima, com as distancias (aHash, dHash), ou None."""
+        candidates = []
+        with self._lock:
+            for entry in reversed(self._entries):
+                distance_a = hash_distance(ahash, entry.ahash)
+                distance_d = hash_distance(dhash, entry.dhash)
+                worst = max(distance_a, distance_d)
+                if worst <= self.confirm_distance:
+                    candidates.append((worst, distance_a, distance_d, entry))
+        if self.confirm is not None:
+            for _worst, distance_a, distance_d, entry in sorted(candidates, key=lambda item: item[0]):
+                if self.confirm(file_path, entry.file_path):
+                    self.hits += 1
+                    return entry, distance_a, distance_d
+        self.misses += 1
+        return None
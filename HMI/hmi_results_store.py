@@ -0,0 +1,161 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+
+RESULTS_DB_NAME = "results.sqlite3"
+HISTORY_LIMIT = 50
+FULL_RESULTS_LIMIT = 100
+BUSY_TIMEOUT_S = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_name TEXT NOT NULL UNIQUE,
+    capture_source TEXT NOT NULL DEFAULT '',
+    processed_at TEXT NOT NULL,
+    history_json TEXT NOT NULL,
+    result_json TEXT NOT NULL
+)
+"""
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def results_store_files(path: str) -> List[str]:
+    """Arquivos que compoem o banco (principal + WAL + memoria compartilhada)."""
+    return [path, f"{path}-wal", f"{path}-shm"]
+
+
+class LiveResultsStore:
+    """Resultados do lookup ao vivo em SQLite (WAL): insercao O(1), ultimos N e `processed`.
+
+    O monitor grava e o dashboard le ao mesmo tempo sem reescrever arquivo: cada comparacao
+    vira uma linha; `file_name` unico torna a insercao idempotente.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self) -> "LiveResultsStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def add(
+        self,
+        file_name: str,
+        history_row: Dict[str, Any],
+        result: Dict[str, Any],
+        capture_source: str = "",
+    ) -> bool:
+        """Registra um resultado. Retorna False se `file_name` ja estava processado."""
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO results (file_name, capture_source, processed_at, history_json, result_json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    str(file_name),
+                    str(capture_source or ""),
+                    str(history_row.get("processed_at") or ""),
+                    _dumps(history_row),
+                    _dumps(result),
+                ),
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def contains(self, file_name: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM results WHERE file_name = ? LIMIT 1", (str(file_name),)
+            ).fetchone()
+        return row is not None
+
+    def processed(self, file_names: Optional[Iterable[str]] = None) -> set:
+        """Nomes ja processados; com `file_names`, apenas a intersecao (consulta pela chave unica)."""
+        with self._lock:
+            conn = self._connection()
+            if file_names is None:
+                rows = conn.execute("SELECT file_name FROM results").fetchall()
+            else:
+                names = [str(name) for name in file_names]
+                rows = []
+                for start in range(0, len(names), 500):
+                    chunk = names[start : start + 500]
+                    placeholders = ",".join("?" for _ in chunk)
+                    rows.extend(
+                        conn.execute(f"SELECT file_name FROM results WHERE file_name IN ({placeholders})", chunk).fetchall()
+                    )
+        return {str(row[0]) for row in rows}
+
+    def count(self) -> int:
+        with self._lock:
+            row = self._connection().execute("SELECT COUNT(*) FROM results").fetchone()
+        return int(row[0] if row else 0)
+
+    def _last(self, column: str, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT {column} FROM results ORDER BY id DESC LIMIT ?", (max(0, int(limit)),)
+            ).fetchall()
+        items: List[Dict[str, Any]] = []
+        for (raw,) in reversed(rows):
+            try:
+                item = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(item, dict):
+                items.append(item)
+        return items
+
+    def history(self, limit: int = HISTORY_LIMIT) -> List[Dict[str, Any]]:
+        return self._last("history_json", limit)
+
+    def full_results(self, limit: int = FULL_RESULTS_LIMIT) -> List[Dict[str, Any]]:
+        return self._last("result_json", limit)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        items = self.full_results(1)
+        return items[0] if items else None
+
+    def payload(self, history_limit: int = HISTORY_LIMIT, full_limit: int = FULL_RESULTS_LIMIT) -> Dict[str, Any]:
+        """Visao no formato do antigo results.json (sem a lista `processed`)."""
+        return {
+            "processed_count": self.count(),
+            "history": self.history(history_limit),
+            "full_results": self.full_results(full_limit),
+        }
+
+
+def load_results_payload(path: str) -> Dict[str, Any]:
+    """Leitura avulsa para o dashboard; banco ausente equivale a payload vazio."""
+    if not path or not os.path.exists(path):
+        return {"processed_count": 0, "history": [], "full_results": []}
+    with LiveResultsStore(path) as store:
+        return store.payload()
@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from HMI.hmi_live_watcher import is_capture_name
+
+
+MANIFEST_NAME = "manifest.jsonl"
+ARCHIVE_DIRNAME = "archive"
+ARCHIVE_INDEX_NAME = "index.jsonl"
+TRIM_RATIO = 0.9
+AGE_CHECK_INTERVAL_S = 60.0
+
+_MANIFEST_LOCKS: Dict[str, threading.Lock] = {}
+_MANIFEST_LOCKS_GUARD = threading.Lock()
+
+
+def manifest_lock(directory: str) -> threading.Lock:
+    """Lock por pasta compartilhado entre quem acrescenta e quem compacta o manifest."""
+    key = os.path.abspath(directory)
+    with _MANIFEST_LOCKS_GUARD:
+        lock = _MANIFEST_LOCKS.get(key)
+        if lock is None:
+            lock = _MANIFEST_LOCKS[key] = threading.Lock()
+        return lock
+
+
+def perceptual_hash(image_path: str, hash_size: int = 8) -> str:
+    """pHash (DCT 32x32, bloco 8x8 de baixa frequencia contra a mediana) em hexadecimal."""
+    gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        raise ValueError(f"imagem ilegivel: {image_path}")
+    side = hash_size * 4
+    resized = cv2.resize(gray, (side, side), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(resized)[:hash_size, :hash_size].flatten()
+    bits = low[1:] > float(np.median(low[1:]))
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return f"{value:0{(hash_size * hash_size) // 4}x}"
+
+
+@dataclass
+class RetentionPolicy:
+    max_files: int = 0
+    max_bytes: int = 0
+    max_age_s: float = 0.0
+    archive: bool = False
+    keep_recent: int = 8
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_files > 0 or self.max_bytes > 0 or self.max_age_s > 0
+
+    @classmethod
+    def parse(cls, spec: str) -> "RetentionPolicy":
+        """Le "files=2000,mb=500,hours=24,archive=1,keep=8"; texto vazio desliga a retencao."""
+        policy = cls()
+        for chunk in str(spec or "").split(","):
+            if not chunk.strip():
+                continue
+            key, _, raw = chunk.partition("=")
+            key = key.strip().lower()
+            raw = raw.strip()
+            try:
+                if key == "files":
+                    policy.max_files = int(raw)
+                elif key == "mb":
+                    policy.max_bytes = int(float(raw) * 1024 * 1024)
+                elif key == "hours":
+                    policy.max_age_s = float(raw) * 3600.0
+                elif key == "archive":
+                    policy.archive = raw.lower() in {"1", "true", "sim", "yes", "on"}
+                elif key == "keep":
+                    policy.keep_recent = int(raw)
+                else:
+                    raise ValueError(f"chave de retencao desconhecida: {key}")
+            except ValueError as exc:
+                raise ValueError(f"politica de retencao invalida '{spec}': {exc}") from None
+        return policy
+
+
+class CaptureRetention:
+    """Ring buffer de capturas de uma pasta com limites de quantidade, bytes e idade.
+
+    Ao estourar um limite, remove as mais antigas ate `TRIM_RATIO` do limite (em lote, para
+    reescrever o manifest poucas vezes). Com `archive`, a captura removida vai para
+    `archive/<phash>.png` — telas identicas ficam guardadas uma vez so — e a linha do
+    manifest passa a apontar para o arquivo compactado; sem `archive`, a linha sai junto.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        policy: RetentionPolicy,
+        log: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.directory = directory
+        self.policy = policy
+        self.archive_dir = os.path.join(directory, ARCHIVE_DIRNAME)
+        self._log = log or (lambda message: None)
+        self._lock = threading.Lock()
+        self._ring: Deque[Tuple[str, int, float]] = deque()
+        self._bytes = 0
+        self._last_age_check = 0.0
+        self.removed_total = 0
+        self.archived_total = 0
+        self._load_existing()
+
+    def _load_existing(self) -> None:
+        entries: List[Tuple[float, str, int]] = []
+        try:
+            with os.scandir(self.directory) as items:
+                for entry in items:
+                    if entry.is_file() and is_capture_name(entry.name):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name, stat.st_size))
+        except OSError:
+            return
+        for mtime, name, size in sorted(entries):
+            self._ring.append((name, size, mtime))
+            self._bytes += size
+
+    @property
+    def file_count(self) -> int:
+        return len(self._ring)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def track(self, file_name: str) -> List[str]:
+        """Registra uma captura nova e aplica a politica. Retorna os nomes retirados da pasta."""
+        if not self.policy.enabled or not is_capture_name(file_name):
+            return []
+        try:
+            stat = os.stat(os.path.join(self.directory, file_name))
+        except OSError:
+            return []
+        with self._lock:
+            self._ring.append((file_name, stat.st_size, stat.st_mtime))
+            self._bytes += stat.st_size
+        return self.enforce()
+
+    def _over_limit(self, files: int, size: int) -> bool:
+        return (self.policy.max_files > 0 and files > self.policy.max_files) or (
+            self.policy.max_bytes > 0 and size > self.policy.max_bytes
+        )
+
+    def _select_locked(self, now: float) -> List[Tuple[str, int, float]]:
+        selected: List[Tuple[str, int, float]] = []
+        keep = max(0, int(self.policy.keep_recent))
+        if self._over_limit(len(self._ring), self._bytes):
+            target_files = int(self.policy.max_files * TRIM_RATIO) if self.policy.max_files > 0 else None
+            target_bytes = int(self.policy.max_bytes * TRIM_RATIO) if self.policy.max_bytes > 0 else None
+            while len(self._ring) > keep and (
+                (target_files is not None and len(self._ring) > target_files)
+                or (target_bytes is not None and self._bytes > target_bytes)
+            ):
+                item = self._ring.popleft()
+                self._bytes -= item[1]
+                selected.append(item)
+        if self.policy.max_age_s > 0 and now - self._last_age_check >= AGE_CHECK_INTERVAL_S:
+            self._last_age_check = now
+            cutoff = time.time() - self.policy.max_age_s
+            while len(self._ring) > keep and self._ring[0][2] < cutoff:
+                item = self._ring.popleft()
+                self._bytes -= item[1]
+                selected.append(item)
+        return selected
+
+    def enforce(self) -> List[str]:
+        with self._lock:
+            selected = self._select_locked(time.monotonic())
+        if not selected:
+            return []
+        archived: Dict[str, str] = {}
+        removed: List[str] = []
+        for name, _size, _mtime in selected:
+            path = os.path.join(self.directory, name)
+            if self.policy.archive:
+                try:
+                    archived[name] = self._archive(path, name)
+                except (OSError, ValueError) as exc:
+                    self._log(f"retencao: falha ao compactar {name}: {exc}")
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                self._log(f"retencao: falha ao remover {name}: {exc}")
+                continue
+            removed.append(name)
+        self._rewrite_manifest(set(removed), archived)
+        self.removed_total += len(removed)
+        self.archived_total += len(archived)
+        self._log(
+            f"retencao em {self.directory}: {len(removed)} captura(s) retirada(s)"
+            + (f", {len(archived)} compactada(s) no arquivo" if archived else "")
+            + f"; restam {len(self._ring)} ({self._bytes / (1024 * 1024):.1f} MB)"
+        )
+        return removed
+
+    def _archive(self, path: str, name: str) -> str:
+        digest = perceptual_hash(path)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        ext = os.path.splitext(name)[1].lower() or ".png"
+        archive_name = f"{digest}{ext}"
+        archive_path = os.path.join(self.archive_dir, archive_name)
+        if not os.path.exists(archive_path):
+            os.replace(path, archive_path)
+        with open(os.path.join(self.archive_dir, ARCHIVE_INDEX_NAME), "a", encoding="utf-8") as fh:
+            payload = {"file": name, "archive": archive_name, "phash": digest, "archived_at": datetime.now().isoformat()}
+            fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        return f"{ARCHIVE_DIRNAME}/{archive_name}"
+
+    def _rewrite_manifest(self, removed: set, archived: Dict[str, str]) -> None:
+        if not removed:
+            return
+        manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        with manifest_lock(self.directory):
+            if not os.path.exists(manifest_path):
+                return
+            tmp_path = f"{manifest_path}.tmp"
+            with open(manifest_path, "r", encoding="utf-8") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+                for line in src:
+                    try:
+                        payload = json.loads(line)
+                    except ValueError:
+                        continue
+                    name = str(payload.get("file") or "") if isinstance(payload, dict) else ""
+                    if name in archived:
+                        payload["archived"] = archived[name]
+                    elif name in removed:
+                        continue
+                    dst.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, manifest_path)
+
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+try:
+    import msvcrt  # Windows
+except ImportError:
+    msvcrt = None
+
+try:
+    import fcntl  # Linux/Mac
+except ImportError:
+    fcntl = None
+
+
+# Painel (ao iniciar o monitor), CompareStage e HybridCollector gravam o mesmo monitor_state.json:
+# todos passam por este lock e trocam o arquivo por rename, entao leitores nunca veem JSON truncado.
+_STATE_FILE_LOCK = threading.Lock()
+
+
+@contextmanager
+def _state_file_lock(path: str) -> Iterator[None]:
+    """Serializa escritores do arquivo de estado: threads via lock global, processos via `<path>.lock`."""
+    with _STATE_FILE_LOCK:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.lock", "a+", encoding="utf-8") as lock_fh:
+            try:
+                if msvcrt:
+                    lock_fh.seek(0)
+                    msvcrt.locking(lock_fh.fileno(), msvcrt.LK_LOCK, 1)
+                elif fcntl:
+                    fcntl.flock(lock_fh, fcntl.LOCK_EX)
+            except OSError:
+                pass
+            try:
+                yield
+            finally:
+                try:
+                    if msvcrt:
+                        lock_fh.seek(0)
+                        msvcrt.locking(lock_fh.fileno(), msvcrt.LK_UNLCK, 1)
+                    elif fcntl:
+                        fcntl.flock(lock_fh, fcntl.LOCK_UN)
+                except OSError:
+                    pass
+
+
+def _replace_json(path: str, payload: Dict[str, Any]) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def merge_state_file(path: str, key: str, value: Any) -> bool:
+    """Atualiza uma chave do arquivo de estado do monitor preservando o restante.
+
+    Se o arquivo existir mas nao puder ser lido como objeto JSON, nada e gravado (retorna
+    False): reescrever so com `key` apagaria `pid`/`session_token` gravados pelo painel.
+    """
+    with _state_file_lock(path):
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except FileNotFoundError:
+            payload = {}
+        except (OSError, ValueError):
+            return False
+        if not isinstance(payload, dict):
+            return False
+        payload[key] = value
+        _replace_json(path, payload)
+    return True
+
+
+def write_state_file(path: str, payload: Dict[str, Any]) -> None:
+    """Substitui o arquivo de estado inteiro (usado pelo painel ao iniciar uma sessao)."""
+    with _state_file_lock(path):
+        _replace_json(path, payload)
@@ -1,9 +1,11 @@
+import io
 import json
 import os
 import re
 import signal
 import subprocess
 import sys
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
@@ -12,6 +14,10 @@ from typing import Any, Dict, Optional
 import numpy as np
 import streamlit as st
 from PIL import Image
+from HMI.hmi_live_watcher import CURSOR_FILENAME, get_live_watcher, is_capture_name, reset_live_watcher
+from HMI.hmi_preview_channel import PreviewChannelReader, PreviewFrame, preview_channel_path
+from HMI.hmi_results_store import RESULTS_DB_NAME, LiveResultsStore, load_results_payload, results_store_files
+from HMI.hmi_state_file import write_state_file
 from app.shared.adb_utils import resolve_adb_path
 from app.shared.project_paths import root_path
 from app.shared.ui_theme import apply_dark_background
@@ -87,18 +93,23 @@ def _load_hmi_modules() -> Dict[str, Any]:
 def _load_visual_qa_modules() -> Dict[str, Any]:
     from visual_qa.application.use_cases.build_vector_index import BuildVectorIndex
     from visual_qa.application.use_cases.classify_screenshot import ClassifyScreenshot
+    from visual_qa.application.use_cases.generate_report import GenerateReport
+    from visual_qa.application.use_cases.report_worker import ReportWorker
     from visual_qa.application.use_cases.validate_screenshot import ValidateScreenshot
     from visual_qa.config import VisualQaConfig, load_config
     from visual_qa.infrastructure.embeddings.factory import build_embedding_provider
     from visual_qa.infrastructure.llm.factory import build_report_generator
     from visual_qa.infrastructure.llm.null_report_generator import NullReportGenerator
     from visual_qa.infrastructure.pixel_compare.existing_pixel_adapter import ExistingPixelAdapter
+    from visual_qa.infrastructure.registry import get_registry
     from visual_qa.infrastructure.storage.local_artifact_store import LocalArtifactStore
     from visual_qa.infrastructure.vector_index.faiss_repository import FaissVectorIndexRepository
 
     return {
         "BuildVectorIndex": BuildVectorIndex,
         "ClassifyScreenshot": ClassifyScreenshot,
+        "GenerateReport": GenerateReport,
+        "ReportWorker": ReportWorker,
         "ValidateScreenshot": ValidateScreenshot,
         "VisualQaConfig": VisualQaConfig,
         "load_config": load_config,
@@ -108,6 +119,7 @@ def _load_visual_qa_modules() -> Dict[str, Any]:
         "ExistingPixelAdapter": ExistingPixelAdapter,
         "LocalArtifactStore": LocalArtifactStore,
         "FaissVectorIndexRepository": FaissVectorIndexRepository,
+        "get_registry": get_registry,
     }
 
 
@@ -784,6 +796,7 @@ def _safe_serial_name(serial: str) -> str:
 
 
 DEFAULT_LIVE_CAPTURE_SIZE = (1600, 900)
+LIVE_PREVIEW_READERS: Dict[str, PreviewChannelReader] = {}
 
 
 def _preferred_live_capture_size(library_index: Optional[Dict[str, Any]]) -> tuple[int, int]:
@@ -805,19 +818,18 @@ def _preferred_live_capture_size(library_index: Optional[Dict[str, Any]]) -> tup
     return max(counts.items(), key=lambda item: (item[1], item[0][0] * item[0][1]))[0]
 
 
+def _live_lookup_watcher(cache_root: str, serial: str):
+    return get_live_watcher(
+        _live_lookup_shots_dir(cache_root, serial),
+        os.path.join(_live_lookup_root(cache_root, serial), CURSOR_FILENAME),
+    )
+
+
 def _latest_live_screenshot_path(cache_root: str, serial: str) -> str:
     shots_dir = _live_lookup_shots_dir(cache_root, serial)
     if not os.path.isdir(shots_dir):
         return ""
-    files = [
-        os.path.join(shots_dir, name)
-        for name in os.listdir(shots_dir)
-        if os.path.splitext(name)[1].lower() in {".png", ".jpg", ".jpeg", ".bmp", ".webp"}
-        and not name.startswith(("hmi_watch_", "scrcpy_watch_"))
-    ]
-    if not files:
-        return ""
-    return max(files, key=os.path.getmtime)
+    return _live_lookup_watcher(cache_root, serial).latest_path()
 
 
 def _live_activity_state_key(serial: str) -> str:
@@ -874,20 +886,38 @@ def _live_lookup_preview_path(cache_root: str, serial: str) -> str:
     return os.path.join(_live_lookup_root(cache_root, serial), "preview_latest.png")
 
 
-def _live_lookup_results_path(cache_root: str, serial: str) -> str:
-    return os.path.join(_live_lookup_root(cache_root, serial), "results.json")
+def _live_lookup_preview_channel_path(cache_root: str, serial: str) -> str:
+    return preview_channel_path(_live_lookup_root(cache_root, serial))
 
 
-def _empty_live_lookup_results() -> Dict[str, Any]:
-    return {
-        "processed": [],
-        "history": [],
-        "full_results": [],
-    }
+def _encode_preview_jpeg(pixels: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def _live_preview_frame(cache_root: str, serial: str) -> Optional[PreviewFrame]:
+    """Ultimo frame publicado pelo monitor em memoria compartilhada, ja em JPEG, ou None."""
+    descriptor_path = _live_lookup_preview_channel_path(cache_root, serial)
+    reader = LIVE_PREVIEW_READERS.get(descriptor_path)
+    if reader is None:
+        reader = LIVE_PREVIEW_READERS[descriptor_path] = PreviewChannelReader(descriptor_path)
+    try:
+        return reader.read_encoded(_encode_preview_jpeg)
+    except Exception:
+        reader.close()
+        return None
+
+
+def _live_lookup_results_path(cache_root: str, serial: str) -> str:
+    return os.path.join(_live_lookup_root(cache_root, serial), RESULTS_DB_NAME)
 
 
 def _load_live_lookup_results(cache_root: str, serial: str) -> Dict[str, Any]:
-    return _load_json(_live_lookup_results_path(cache_root, serial)) or _empty_live_lookup_results()
+    try:
+        return load_results_payload(_live_lookup_results_path(cache_root, serial))
+    except Exception:
+        return {"processed_count": 0, "history": [], "full_results": []}
 
 
 def _live_lookup_full_results(payload: Optional[Dict[str, Any]]) -> list[Dict[str, Any]]:
@@ -915,6 +945,13 @@ def _latest_live_result_bundle(
     }
 
 
+def _file_mtime(path: str) -> float:
+    try:
+        return float(os.path.getmtime(path)) if path else 0.0
+    except OSError:
+        return 0.0
+
+
 def _file_age_seconds(path: str) -> Optional[float]:
     if not path or not os.path.exists(path):
         return None
@@ -1017,6 +1054,7 @@ def _live_monitor_log_path(cache_root: str, serial: str) -> str:
 def _reset_live_lookup_session(cache_root: str, serial: str) -> None:
     root_dir = _live_lookup_root(cache_root, serial)
     shots_dir = _live_lookup_shots_dir(cache_root, serial)
+    reset_live_watcher(shots_dir, os.path.join(root_dir, CURSOR_FILENAME))
     os.makedirs(shots_dir, exist_ok=True)
 
     removable_names = {"manifest.jsonl", "stop.flag"}
@@ -1034,7 +1072,8 @@ def _reset_live_lookup_session(cache_root: str, serial: str) -> None:
 
     for path in (
         _live_lookup_preview_path(cache_root, serial),
-        _live_lookup_results_path(cache_root, serial),
+        _live_lookup_preview_channel_path(cache_root, serial),
+        *results_store_files(_live_lookup_results_path(cache_root, serial)),
         _live_lookup_monitor_state_path(cache_root, serial),
         _live_lookup_stop_flag(cache_root, serial),
         _live_lookup_shots_stop_flag(cache_root, serial),
@@ -1120,6 +1159,20 @@ def _load_live_monitor_state(cache_root: str, serial: str) -> Dict[str, Any]:
     return _load_json(_live_lookup_monitor_state_path(cache_root, serial)) or {}
 
 
+def _live_compare_stage_caption(state: Optional[Dict[str, Any]]) -> str:
+    stage = (state or {}).get("compare_stage")
+    if not isinstance(stage, dict):
+        return ""
+    return (
+        f"Comparacao: {int(stage.get('workers', 0) or 0)} worker(s) ({_safe_str(stage.get('mode'), '-')}), "
+        f"fila {int(stage.get('queue_depth', 0) or 0)}/{int(stage.get('queue_limit', 0) or 0)}, "
+        f"em andamento {int(stage.get('in_flight', 0) or 0)}, "
+        f"atraso {float(stage.get('last_lag_s', 0.0) or 0.0):.1f}s "
+        f"(media {float(stage.get('avg_lag_s', 0.0) or 0.0):.1f}s), "
+        f"descartadas {int(stage.get('dropped', 0) or 0)}."
+    )
+
+
 def _live_monitor_belongs_to_session(state: Optional[Dict[str, Any]], session_token: str) -> bool:
     if not session_token:
         return True
@@ -1234,7 +1287,7 @@ def _start_live_monitor(
             creationflags=creationflags,
             startupinfo=startupinfo,
         )
-    _save_json(
+    write_state_file(
         _live_lookup_monitor_state_path(cache_root, serial),
         {
             "pid": proc.pid,
@@ -1314,23 +1367,6 @@ def _result_to_history_row(result: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _is_stable_image_file(path: str, min_size_bytes: int = 512) -> bool:
-    if not path or not os.path.exists(path):
-        return False
-    try:
-        size_before = os.path.getsize(path)
-    except OSError:
-        return False
-    if size_before < min_size_bytes:
-        return False
-    time.sleep(0.15)
-    try:
-        size_after = os.path.getsize(path)
-    except OSError:
-        return False
-    return size_before == size_after
-
-
 def _process_live_lookup_queue(
     hmi: Dict[str, Any],
     cache_root: str,
@@ -1340,87 +1376,75 @@ def _process_live_lookup_queue(
 ) -> Dict[str, Any]:
     if status_hook is None:
         status_hook = lambda _phase, _message, _progress, _preview_path="": None
+    with LiveResultsStore(_live_lookup_results_path(cache_root, serial)) as store:
+        return _process_live_lookup_files(hmi, cache_root, serial, library_index, store, status_hook)
+
+
+def _process_live_lookup_files(
+    hmi: Dict[str, Any],
+    cache_root: str,
+    serial: str,
+    library_index: Dict[str, Any],
+    store: LiveResultsStore,
+    status_hook,
+) -> Dict[str, Any]:
     shots_dir = _live_lookup_shots_dir(cache_root, serial)
-    state_path = _live_lookup_results_path(cache_root, serial)
-    payload = _load_live_lookup_results(cache_root, serial)
-    processed = set(str(name) for name in payload.get("processed", []))
-    history = list(payload.get("history", []))
-    full_results = [item for item in payload.get("full_results", []) if isinstance(item, dict)]
+    history = store.history()
     latest_bundle = st.session_state.get("hmi_lookup_result")
     latest_result = latest_bundle.get("result") if isinstance(latest_bundle, dict) else None
     latest_path = _safe_str(latest_result.get("screenshot_path")) if isinstance(latest_result, dict) else ""
-    stored_latest = full_results[-1] if full_results else None
-    stored_latest_path = _safe_str(stored_latest.get("screenshot_path")) if isinstance(stored_latest, dict) else ""
     cfg = _default_lookup_cfg(hmi)
 
     if not os.path.isdir(shots_dir):
         status_hook("waiting", "Aguardando a primeira captura da bancada ou do scrcpy.", 0.02, "")
         return {"new_count": 0, "history": history, "latest_bundle": latest_bundle}
 
-    files = []
-    for name in sorted(os.listdir(shots_dir)):
-        ext = os.path.splitext(name)[1].lower()
-        if ext in {".png", ".jpg", ".jpeg", ".bmp", ".webp"}:
-            files.append(name)
-
-    new_count = 0
-    latest_file_path = ""
-    if stored_latest_path and stored_latest_path != latest_path and os.path.exists(stored_latest_path):
-        try:
-            status_hook(
-                "comparing",
-                f"Sincronizando a ultima comparacao salva ({os.path.basename(stored_latest_path)})...",
-                0.55,
-                stored_latest_path,
-            )
-            synced_result = hmi["evaluate_single_screenshot"](stored_latest_path, library_index, cfg)
-            latest_bundle = {
-                "lookup_dir": _live_lookup_root(cache_root, serial),
-                "actual_path": stored_latest_path,
-                "result": synced_result,
-            }
-        except Exception:
-            latest_bundle = {
-                "lookup_dir": _live_lookup_root(cache_root, serial),
-                "actual_path": stored_latest_path,
-                "result": stored_latest,
-            }
+    # O resultado salvo ja e a comparacao da ultima captura: reaproveita em vez de recalcular.
+    stored_latest = store.latest()
+    stored_latest_path = _safe_str(stored_latest.get("screenshot_path")) if isinstance(stored_latest, dict) else ""
+    if stored_latest_path and stored_latest_path != latest_path:
+        latest_bundle = {
+            "lookup_dir": _live_lookup_root(cache_root, serial),
+            "actual_path": stored_latest_path,
+            "result": stored_latest,
+        }
         st.session_state["hmi_lookup_result"] = latest_bundle
-        latest_result = latest_bundle.get("result") if isinstance(latest_bundle, dict) else None
-        latest_path = _safe_str(latest_result.get("screenshot_path")) if isinstance(latest_result, dict) else ""
 
+    watcher = _live_lookup_watcher(cache_root, serial)
     status_hook("scanning", "Procurando novas capturas na pasta monitorada...", 0.08, "")
-    for name in files:
-        file_path = os.path.join(shots_dir, name)
+    ready = watcher.take_stable()
+    processed = store.processed(name for name, _path, _mtime in ready)
+    new_count = 0
+    latest_file_path = ""
+    for name, file_path, mtime_ns in ready:
         latest_file_path = file_path
         if name in processed:
-            continue
-        status_hook("capturing", f"Preparando a captura {name} para comparacao...", 0.2, file_path)
-        if not _is_stable_image_file(file_path):
+            watcher.commit(name, mtime_ns)
             continue
         try:
             status_hook("comparing", f"Comparando {name} com a biblioteca...", 0.6, file_path)
             result = hmi["evaluate_single_screenshot"](file_path, library_index, cfg)
         except Exception:
-            status_hook("comparing", f"Falha ao comparar {name}; tentando novamente no proximo ciclo.", 0.6, file_path)
+            if watcher.fail(name, mtime_ns):
+                status_hook("comparing", f"Falha ao comparar {name}; tentando novamente no proximo ciclo.", 0.6, file_path)
+            else:
+                status_hook("comparing", f"Falha ao comparar {name}; captura ignorada apos varias tentativas.", 0.6, file_path)
             continue
         compact_result = _compact_live_result(result)
-        history.append(_result_to_history_row(compact_result))
-        full_results.append(compact_result)
-        processed.add(name)
+        store.add(name, _result_to_history_row(compact_result), compact_result)
+        watcher.commit(name, mtime_ns)
         latest_bundle = {"lookup_dir": _live_lookup_root(cache_root, serial), "actual_path": file_path, "result": result}
         st.session_state["hmi_lookup_result"] = latest_bundle
         new_count += 1
         status_hook("done", f"Comparacao concluida para {name}.", 1.0, file_path)
 
-    if not latest_bundle and latest_file_path:
+    latest_file_path = latest_file_path or watcher.latest_path()
+    if not latest_bundle and latest_file_path and is_capture_name(os.path.basename(latest_file_path)):
         result = hmi["evaluate_single_screenshot"](latest_file_path, library_index, cfg)
         latest_bundle = {"lookup_dir": _live_lookup_root(cache_root, serial), "actual_path": latest_file_path, "result": result}
         st.session_state["hmi_lookup_result"] = latest_bundle
 
-    history = history[-50:]
-    full_results = full_results[-100:]  # Keep last 100 full results for report generation
-    _save_json(state_path, {"processed": sorted(processed), "history": history, "full_results": full_results})
+    history = store.history() if new_count else history
     if new_count == 0:
         status_hook(
             "waiting",
@@ -1444,6 +1468,17 @@ def _load_vqa_runs(runs_dir: str) -> list[Dict[str, Any]]:
     return rows
 
 
+def _vqa_report_state(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Bloco `report` do run; enquanto pendente, o `report_status.json` do worker tem o estado atual."""
+    report = dict(payload.get("report") or {})
+    report.setdefault("status", "done")
+    if report["status"] == "pending":
+        status = _load_json(_safe_str(report.get("status_path")))
+        if status:
+            report.update(status)
+    return report
+
+
 def _live_monitor_mode_options() -> list[tuple[str, str]]:
     if os.name == "nt":
         return [
@@ -1547,7 +1582,14 @@ def _render_live_capture_dashboard(
         )
         st.caption(capture_caption)
         st.markdown("**Ultima tela capturada**")
-        if live_preview_path:
+        preview_frame = _live_preview_frame(cache_root, selected_serial) if live_running else None
+        if preview_frame is not None and preview_frame.timestamp >= _file_mtime(live_preview_path):
+            st.image(
+                preview_frame.image,
+                caption=f"Preview ao vivo #{preview_frame.seq // 2}",
+                use_container_width=True,
+            )
+        elif live_preview_path:
             _safe_show_image(
                 live_preview_path,
                 f"Captura {os.path.basename(live_preview_path)}",
@@ -1612,21 +1654,63 @@ def _make_vqa_config(vqa: Dict[str, Any], reference_dir: str, index_dir: str, ru
         ollama_model=_safe_str(st.session_state.get("vqa_ollama_model", base.ollama_model)),
         ollama_timeout_s=base.ollama_timeout_s,
         config_path=None,
+        index_type=base.index_type,
+        index_nprobe=base.index_nprobe,
+        index_ef_search=base.index_ef_search,
+        report_workers=base.report_workers,
     )
 
 
+_VQA_REPORT_BACKENDS: Dict[tuple, tuple] = {}
+_VQA_REPORT_BACKENDS_LOCK = threading.Lock()
+
+
+def _vqa_report_backend(vqa: Dict[str, Any], cfg: Any) -> tuple:
+    """Store e fila de reports por pasta de runs, reaproveitados entre reruns do Streamlit.
+
+    O report (LLM) roda em background: o resultado da validacao aparece assim que o pixel
+    compare termina, com `report.status = pending`, e o report entra quando o worker conclui.
+    """
+    key = (str(cfg.runs_dir), cfg.report_mode, cfg.ollama_base_url, cfg.ollama_model)
+    with _VQA_REPORT_BACKENDS_LOCK:
+        backend = _VQA_REPORT_BACKENDS.get(key)
+        if backend is None:
+            if cfg.report_mode == "ollama":
+                report_generator = vqa["build_report_generator"](cfg)
+            else:
+                report_generator = vqa["NullReportGenerator"]()
+            store = vqa["LocalArtifactStore"](runs_dir=str(cfg.runs_dir))
+            worker = vqa["ReportWorker"](
+                vqa["GenerateReport"](report_generator=report_generator),
+                store,
+                max_workers=cfg.report_workers,
+            )
+            backend = (store, worker)
+            _VQA_REPORT_BACKENDS[key] = backend
+        return backend
+
+
 def _make_vqa_use_cases(vqa: Dict[str, Any], cfg: Any) -> Dict[str, Any]:
-    embedding = vqa["build_embedding_provider"](cfg)
-    build_repo = vqa["FaissVectorIndexRepository"](index_dir=str(cfg.index_dir), embedding_provider=embedding, use_faiss=True)
-    query_repo = vqa["FaissVectorIndexRepository"](index_dir=str(cfg.index_dir), use_faiss=True)
-    report_generator = vqa["build_report_generator"](cfg) if cfg.report_mode == "ollama" else vqa["NullReportGenerator"]()
+    # Modelo e indice ficam no registro do processo: cada rerun do Streamlit reaproveita.
+    registry = vqa["get_registry"]()
+    embedding = registry.get_provider(cfg)
+    build_repo = vqa["FaissVectorIndexRepository"](
+        index_dir=str(cfg.index_dir), embedding_provider=embedding, use_faiss=True, index_type=cfg.index_type
+    )
+    index_dir = str(cfg.index_dir)
+    if os.path.exists(os.path.join(index_dir, "index.faiss")) and os.path.exists(os.path.join(index_dir, "metadata.json")):
+        query_repo = registry.get_index(index_dir)
+    else:
+        query_repo = vqa["FaissVectorIndexRepository"](index_dir=index_dir, use_faiss=True)
+    query_repo.configure_search(nprobe=cfg.index_nprobe, ef_search=cfg.index_ef_search)
+    store, report_worker = _vqa_report_backend(vqa, cfg)
     return {
         "build_index": vqa["BuildVectorIndex"](embedding_provider=embedding, vector_repo=build_repo),
         "validate": vqa["ValidateScreenshot"](
             classifier=vqa["ClassifyScreenshot"](embedding_provider=embedding, vector_repo=query_repo),
             pixel_comparator=vqa["ExistingPixelAdapter"](),
-            report_generator=report_generator,
-            artifact_store=vqa["LocalArtifactStore"](runs_dir=str(cfg.runs_dir)),
+            artifact_store=store,
+            report_worker=report_worker,
         ),
     }
 
@@ -1795,6 +1879,9 @@ def render_hmi_validation_page(base_dir: str, data_root: str) -> None:
                     f"{_live_monitor_mode_label(_safe_str(live_state.get('monitor_mode'), selected_mode))}. "
                     "Para trocar a forma de captura, pare e inicie novamente."
                 )
+                compare_caption = _live_compare_stage_caption(live_state)
+                if compare_caption:
+                    st.caption(compare_caption)
             else:
                 st.caption(
                     "A validacao sempre comeca inativa. O dashboard apenas exibe a ultima captura salva pelo monitor."
@@ -2171,12 +2258,16 @@ def render_hmi_validation_page(base_dir: str, data_root: str) -> None:
                                                     "pixel_status": run.pixel_result.status if run.pixel_result else "NO_PIXEL",
                                                     "result_json": str(run.json_path) if run.json_path else None,
                                                     "report_path": str(run.report_path) if run.report_path else None,
+                                                    "report_status": run.report_status,
                                                 }
                                             )
                                         progress.progress(1.0)
                                         _save_json(_vqa_summary_path(test_dir), {"total": len(rows), "rows": rows})
                                         st.session_state["hmi_last_vqa_summary"] = {"execution": selected, "total": len(rows)}
-                                        st.success(f"Visual QA executado para {len(rows)} screenshot(s).")
+                                        st.success(
+                                            f"Visual QA executado para {len(rows)} screenshot(s). "
+                                            "Os reports sao gerados em segundo plano e aparecem em Resultados."
+                                        )
                                     except Exception as exc:
                                         st.error(f"Falha no Visual QA: {exc}")
 
@@ -2311,6 +2402,7 @@ def render_hmi_validation_page(base_dir: str, data_root: str) -> None:
                                 "pixel_status": pixel.get("status"),
                                 "diff_percent": pixel.get("difference_percent"),
                                 "ssim": pixel.get("ssim_score"),
+                                "report": _vqa_report_state(payload).get("status"),
                             }
                         )
                     if table:
@@ -2330,8 +2422,20 @@ def render_hmi_validation_page(base_dir: str, data_root: str) -> None:
                                 _safe_show_image(pixel.get("diff_image_path") if pixel else None, "Diff", "Indisponivel")
                             if cls.get("top_k"):
                                 st.dataframe(cls.get("top_k"), use_container_width=True, hide_index=True)
-                            report_path = _safe_str((payload.get("report") or {}).get("report_path"))
-                            if report_path and os.path.exists(report_path):
+                            report_state = _vqa_report_state(payload)
+                            if report_state.get("status") in {"pending", "running"}:
+                                st.info("Report em geracao em segundo plano.")
+                                partial_path = _safe_str(report_state.get("partial_path"))
+                                if partial_path and os.path.exists(partial_path):
+                                    try:
+                                        with open(partial_path, "r", encoding="utf-8") as fh:
+                                            st.markdown(fh.read())
+                                    except OSError:
+                                        pass
+                            elif report_state.get("status") == "failed":
+                                st.warning(f"Falha ao gerar report: {_safe_str(report_state.get('error'), '-')}")
+                            report_path = _safe_str(report_state.get("report_path"))
+                            if report_state.get("status") not in {"pending", "running"} and report_path and os.path.exists(report_path):
                                 st.markdown("**Report**")
                                 try:
                                     with open(report_path, "r", encoding="utf-8") as fh:
@@ -1,16 +1,22 @@
 ﻿import os
 import platform
 import subprocess
-import pandas as pd
 import threading
+import atexit
 import time
 import sys
 import json
 import csv
 import re
+import tarfile
+import math
+import posixpath
+from fnmatch import fnmatchcase
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from skimage.metrics import structural_similarity as ssim
 import cv2
+import numpy as np
 import tempfile
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -18,6 +24,7 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from app.shared.adb_utils import resolve_adb_path
+from app.shared.runner_control import RunnerControl
 
 sys.stdout.reconfigure(encoding='utf-8')
 
@@ -41,6 +48,15 @@ PAUSA_ENTRE_ACOES = 1.7              # segundos entre cada aÃ§Ã£o (mais lent
 ESPERA_POS_ACAO_S = 1.9              # espera apos cada acao antes do screenshot
 SIMILARIDADE_HOME_OK = 0.85        # limite mÃ­nimo para considerar OK
 ADB_TIMEOUT = 25                   # timeout padrÃ£o para chamadas ADB (seg)
+SSIM_MODO = "rapido"               # "rapido" (box filter OpenCV, reduzido) ou "completo" (skimage, resolucao total)
+SSIM_ESCALA = 0.5                  # fator de reducao aplicado antes do SSIM no modo rapido
+SSIM_JANELA = 7                    # janela do SSIM (mesma do skimage)
+SSIM_TOLERANCIA_VALIDACAO = 0.02   # diferenca maxima aceita entre modo rapido e completo
+IGNORE_REGIONS_FILENAME = "ignore.json"
+LOG_CAPTURE_MODO = "bulk"          # "bulk" (um tar no dispositivo via exec-out) ou "arquivo" (um pull por arquivo)
+LOG_CAPTURE_BULK_GZIP = False      # comprime o tar no dispositivo (troca CPU do radio por banda USB)
+LOG_CAPTURE_BULK_TIMEOUT_S = 600
+LOG_CAPTURE_BULK_CHUNK = 1024 * 1024
 LOG_CAPTURE_STEP_WAIT_S = 1.1
 LOG_CAPTURE_SEQUENCE_FILENAMES = (
     "failure_log_sequence.csv",
@@ -249,32 +265,193 @@ def capturar_screenshot(pasta, nome, serial=None):
     return caminho_local
 
 
-def comparar_imagens(img1_path, img2_path):
-    """Compara duas imagens e retorna o Ã­ndice de similaridade (SSIM)"""
+def capturar_screenshot_em_memoria(pasta, nome, serial=None):
+    """Captura via exec-out, grava o PNG e devolve (caminho, frame BGR) sem reler do disco."""
+    os.makedirs(pasta, exist_ok=True)
+    caminho_local = os.path.join(pasta, nome)
     try:
-        img1 = cv2.imread(img1_path)
-        img2 = cv2.imread(img2_path)
+        result = subprocess.run(
+            adb_cmd(serial) + ["exec-out", "screencap", "-p"],
+            timeout=ADB_TIMEOUT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        payload = result.stdout if result.returncode == 0 else b""
+    except Exception:
+        payload = b""
 
-        if img1 is None or img2 is None:
-            return 0.0
+    frame = None
+    if payload:
+        frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        caminho = capturar_screenshot(pasta, nome, serial)
+        return caminho, None
 
-        img1_gray = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
-        img2_gray = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
+    with open(caminho_local, "wb") as handle:
+        handle.write(payload)
+    return caminho_local, frame
 
-        score, _ = ssim(img1_gray, img2_gray, full=True)
-        return float(score)
+
+_CACHE_FRAMES_ESPERADOS = {}
+
+
+def _carregar_ignore_regions(frames_dir):
+    """Le frames/ignore.json (lista de [x, y, w, h]) no mesmo formato do visualizador."""
+    ignore_path = os.path.join(frames_dir, IGNORE_REGIONS_FILENAME)
+    if not os.path.exists(ignore_path):
+        return []
+    try:
+        with open(ignore_path, "r", encoding="utf-8") as handle:
+            loaded = json.load(handle)
     except Exception:
-        return 0.0
+        return []
+    if not isinstance(loaded, list):
+        return []
+    return [list(region) for region in loaded if isinstance(region, (list, tuple)) and len(region) == 4]
 
 
-def _sanitize_scalar(value):
-    if value is None:
+def _para_cinza(imagem):
+    if imagem is None:
         return None
-    try:
-        if pd.isna(value):
+    if isinstance(imagem, str):
+        imagem = cv2.imread(imagem)
+        if imagem is None:
             return None
+    if imagem.ndim == 2:
+        return imagem
+    return cv2.cvtColor(imagem, cv2.COLOR_BGR2GRAY)
+
+
+def _reduzir(gray, escala):
+    if not escala or escala >= 1.0:
+        return gray
+    largura = max(SSIM_JANELA, int(round(gray.shape[1] * escala)))
+    altura = max(SSIM_JANELA, int(round(gray.shape[0] * escala)))
+    return cv2.resize(gray, (largura, altura), interpolation=cv2.INTER_AREA)
+
+
+def _carregar_frame_esperado(caminho, escala):
+    """Decodifica o frame esperado uma unica vez por passo (cache por caminho, mtime e escala)."""
+    try:
+        mtime = os.path.getmtime(caminho)
+    except OSError:
+        return None
+    chave = (os.path.abspath(caminho), escala)
+    cached = _CACHE_FRAMES_ESPERADOS.get(chave)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    gray = _para_cinza(caminho)
+    if gray is None:
+        return None
+    gray = _reduzir(gray, escala)
+    _CACHE_FRAMES_ESPERADOS[chave] = (mtime, gray)
+    return gray
+
+
+def _mascara_valida(shape, ignore_regions, escala):
+    if not ignore_regions:
+        return None
+    mascara = np.ones(shape[:2], dtype=bool)
+    fator = escala if escala and escala < 1.0 else 1.0
+    altura, largura = shape[:2]
+    for region in ignore_regions:
+        x, y, w, h = [float(v) for v in region]
+        x1 = max(0, int(np.floor(x * fator)))
+        y1 = max(0, int(np.floor(y * fator)))
+        x2 = min(largura, int(np.ceil((x + w) * fator)))
+        y2 = min(altura, int(np.ceil((y + h) * fator)))
+        mascara[y1:y2, x1:x2] = False
+    return mascara
+
+
+def _ssim_box(gray_a, gray_b, mascara=None, janela=SSIM_JANELA, full=False):
+    """SSIM com box filter do OpenCV, numericamente equivalente ao skimage (janela uniforme)."""
+    a = gray_a.astype(np.float64)
+    b = gray_b.astype(np.float64)
+    ksize = (janela, janela)
+    borda = cv2.BORDER_REFLECT
+    ux = cv2.boxFilter(a, cv2.CV_64F, ksize, borderType=borda)
+    uy = cv2.boxFilter(b, cv2.CV_64F, ksize, borderType=borda)
+    uxx = cv2.boxFilter(a * a, cv2.CV_64F, ksize, borderType=borda)
+    uyy = cv2.boxFilter(b * b, cv2.CV_64F, ksize, borderType=borda)
+    uxy = cv2.boxFilter(a * b, cv2.CV_64F, ksize, borderType=borda)
+
+    np_janela = janela * janela
+    cov_norm = np_janela / (np_janela - 1.0)
+    vx = cov_norm * (uxx - ux * ux)
+    vy = cov_norm * (uyy - uy * uy)
+    vxy = cov_norm * (uxy - ux * uy)
+
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    mapa = ((2 * ux * uy + c1) * (2 * vxy + c2)) / ((ux * ux + uy * uy + c1) * (vx + vy + c2))
+
+    pad = (janela - 1) // 2
+    interior = mapa[pad:-pad, pad:-pad] if pad else mapa
+    if mascara is not None:
+        mascara_interior = mascara[pad:-pad, pad:-pad] if pad else mascara
+        valores = interior[mascara_interior]
+        score = float(valores.mean()) if valores.size else 1.0
+    else:
+        score = float(interior.mean())
+    if full:
+        return score, mapa
+    return score
+
+
+def comparar_imagens(img1, img2, modo=None, escala=None, ignore_regions=None, full=False):
+    """Compara duas imagens (caminho ou array BGR) e retorna o indice de similaridade (SSIM).
+
+    No modo rapido o frame esperado (img2) e decodificado uma vez e mantido em cache,
+    as imagens sao reduzidas por `escala` e o SSIM e calculado com box filter. O mapa
+    completo so e construido quando `full=True`; nesse caso retorna (score, mapa).
+    """
+    modo = modo or SSIM_MODO
+    escala = SSIM_ESCALA if escala is None else escala
+    try:
+        if modo != "rapido":
+            escala = 1.0
+        if isinstance(img2, str):
+            gray2 = _carregar_frame_esperado(img2, escala)
+        else:
+            gray2 = _reduzir(_para_cinza(img2), escala) if img2 is not None else None
+        gray1 = _para_cinza(img1)
+        if gray1 is None or gray2 is None:
+            return (0.0, None) if full else 0.0
+        gray1 = _reduzir(gray1, escala)
+        if gray1.shape != gray2.shape:
+            return (0.0, None) if full else 0.0
+
+        mascara = _mascara_valida(gray1.shape, ignore_regions, escala)
+        if modo == "rapido" or mascara is not None:
+            return _ssim_box(gray1, gray2, mascara=mascara, full=full)
+
+        if full:
+            score, mapa = ssim(gray1, gray2, full=True)
+            return float(score), mapa
+        return float(ssim(gray1, gray2))
     except Exception:
-        pass
+        return (0.0, None) if full else 0.0
+
+
+def validar_comparacao_rapida(img1, img2, ignore_regions=None, tolerancia=SSIM_TOLERANCIA_VALIDACAO):
+    """Confere se o modo rapido fica dentro da tolerancia do SSIM completo do skimage."""
+    completo = comparar_imagens(img1, img2, modo="completo", ignore_regions=ignore_regions)
+    rapido = comparar_imagens(img1, img2, modo="rapido", ignore_regions=ignore_regions)
+    diferenca = abs(completo - rapido)
+    return {
+        "completo": completo,
+        "rapido": rapido,
+        "diferenca": diferenca,
+        "dentro_tolerancia": diferenca <= tolerancia,
+    }
+
+
+def _sanitize_scalar(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
     if isinstance(value, str):
         value = value.strip()
         return value or None
@@ -365,7 +542,7 @@ def _listar_matches_device_glob(pattern, serial=None):
     return sorted(set(matches))
 
 
-def preparar_logs_pos_falha(serial=None):
+def _preparar_logs_pos_falha_por_padrao(serial=None):
     cleaned = []
     for pattern in DEFAULT_FAILURE_LOG_PATTERNS:
         script = f'for p in {pattern}; do if [ -e "$p" ]; then rm -rf "$p"; fi; done'
@@ -380,31 +557,52 @@ def preparar_logs_pos_falha(serial=None):
     return cleaned
 
 
-def _log_capture_dir(base_dir, started_at):
-    return os.path.join(base_dir, "logs", started_at.strftime("%Y%m%d_%H%M%S"))
+def _preparar_logs_pos_falha_bulk(serial=None):
+    """Limpa todos os padroes em um unico spawn; cada padrao ecoa seu proprio status."""
+    partes = []
+    for idx, pattern in enumerate(DEFAULT_FAILURE_LOG_PATTERNS):
+        partes.append(
+            f'rc=0; for p in {pattern}; do if [ -e "$p" ]; then rm -rf "$p" || rc=1; fi; done; echo "{idx}:$rc"'
+        )
+    result = run_subprocess(
+        adb_cmd(serial) + ["shell", "sh", "-c", "; ".join(partes)],
+        timeout=max(ADB_TIMEOUT, 120),
+        quiet=True,
+    )
+    if result is None or result.returncode != 0:
+        return None
 
+    codigos = {}
+    for line in (result.stdout or "").splitlines():
+        idx, _, rc = line.strip().partition(":")
+        if idx.isdigit():
+            codigos[int(idx)] = rc.strip()
+    if len(codigos) != len(DEFAULT_FAILURE_LOG_PATTERNS):
+        return None
 
-def _executar_captura_logs_default(categoria, nome_teste, serial, motivo):
-    started_at = datetime.now()
-    base_dir = _status_dir(categoria, nome_teste)
-    capture_dir = _log_capture_dir(base_dir, started_at)
-    logs_root = os.path.join(capture_dir, "radio_logs")
-    os.makedirs(logs_root, exist_ok=True)
+    return [
+        {
+            "pattern": pattern,
+            "status": "ok" if codigos.get(idx) == "0" else "erro",
+            "error": None if codigos.get(idx) == "0" else "falha ao limpar origem remota",
+        }
+        for idx, pattern in enumerate(DEFAULT_FAILURE_LOG_PATTERNS)
+    ]
+
+
+def preparar_logs_pos_falha(serial=None):
+    if LOG_CAPTURE_MODO == "bulk":
+        cleaned = _preparar_logs_pos_falha_bulk(serial)
+        if cleaned is not None:
+            return cleaned
+    return _preparar_logs_pos_falha_por_padrao(serial)
 
-    metadata_path = os.path.join(capture_dir, "capture_metadata.json")
-    metadata = {
-        "categoria": categoria,
-        "teste": nome_teste,
-        "serial": serial,
-        "motivo": motivo,
-        "mode": "default_auto_capture",
-        "status": "executando",
-        "started_at": started_at.isoformat(),
-        "finished_at": None,
-        "patterns": [],
-    }
-    atomic_write_json(metadata_path, metadata)
 
+def _log_capture_dir(base_dir, started_at):
+    return os.path.join(base_dir, "logs", started_at.strftime("%Y%m%d_%H%M%S"))
+
+
+def _capturar_padroes_por_arquivo(serial, logs_root, capture_dir, metadata, metadata_path):
     total_artifacts = 0
     for idx, pattern in enumerate(DEFAULT_FAILURE_LOG_PATTERNS, start=1):
         label = _default_log_label(pattern)
@@ -436,6 +634,213 @@ def _executar_captura_logs_default(categoria, nome_teste, serial, motivo):
 
         metadata["patterns"].append(pattern_payload)
         atomic_write_json(metadata_path, metadata)
+    return total_artifacts
+
+
+def _script_tar_bulk(patterns, gzip=False):
+    globs = " ".join(patterns)
+    flags = "-czf" if gzip else "-cf"
+    return (
+        f'set --; for p in {globs}; do if [ -e "$p" ]; then set -- "$@" "$p"; fi; done; '
+        f'if [ $# -gt 0 ]; then tar {flags} - "$@" 2>/dev/null; fi; exit 0'
+    )
+
+
+def _match_raiz_do_membro(member_path, pattern):
+    """Retorna o match de glob (caminho de nivel superior) ao qual o membro do tar pertence."""
+    partes = member_path.strip("/").split("/")
+    for fim in range(1, len(partes) + 1):
+        candidato = "/" + "/".join(partes[:fim])
+        if fnmatchcase(candidato, pattern):
+            return candidato
+    return None
+
+
+class _TeeStream:
+    """Leitor que copia tudo o que e lido do pipe do adb para o arquivo local do tar."""
+
+    def __init__(self, source, sink):
+        self.source = source
+        self.sink = sink
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = self.source.read(size)
+        if chunk:
+            self.sink.write(chunk)
+            self.bytes_read += len(chunk)
+        return chunk
+
+    def drain(self):
+        while self.read(LOG_CAPTURE_BULK_CHUNK):
+            pass
+
+
+def _extrair_tar_stream(stream, logs_root, capture_dir, patterns, metadata=None, metadata_path=None):
+    """Extrai o tar incrementalmente, membro a membro, distribuindo por padrao de origem.
+
+    Mantem o mesmo layout do modo por arquivo (`NN_label/<match>/...`) e atualiza
+    `capture_metadata.json` a cada novo match encontrado.
+    """
+    payloads = []
+    for idx, pattern in enumerate(patterns, start=1):
+        payloads.append(
+            {
+                "pattern": pattern,
+                "label": _default_log_label(pattern),
+                "match_count": 0,
+                "status": "vazio",
+                "artifacts": [],
+                "error": None,
+                "_dir": f"{idx:02d}_{_default_log_label(pattern)}",
+                "_matches": set(),
+            }
+        )
+
+    total_membros = 0
+    with tarfile.open(fileobj=stream, mode="r|*") as archive:
+        for member in archive:
+            member_path = "/" + posixpath.normpath(member.name.lstrip("/"))
+            if ".." in member_path.split("/") or not (member.isfile() or member.isdir()):
+                continue
+            destino = None
+            for payload in payloads:
+                raiz = _match_raiz_do_membro(member_path, payload["pattern"])
+                if raiz is None:
+                    continue
+                relativo = posixpath.relpath(member_path, posixpath.dirname(raiz))
+                destino = os.path.join(logs_root, payload["_dir"], *relativo.split("/"))
+                if raiz not in payload["_matches"]:
+                    payload["_matches"].add(raiz)
+                    payload["match_count"] = len(payload["_matches"])
+                    nome_raiz = posixpath.basename(raiz) or payload["label"]
+                    payload["artifacts"].append(
+                        os.path.relpath(os.path.join(logs_root, payload["_dir"], nome_raiz), capture_dir)
+                    )
+                    payload["status"] = "capturado"
+                    if metadata is not None and metadata_path:
+                        metadata["patterns"] = [_payload_publico(item) for item in payloads]
+                        atomic_write_json(metadata_path, metadata)
+                break
+            if destino is None:
+                continue
+
+            if member.isdir():
+                os.makedirs(destino, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            origem = archive.extractfile(member)
+            if origem is None:
+                continue
+            with origem, open(destino, "wb") as handle:
+                while True:
+                    chunk = origem.read(LOG_CAPTURE_BULK_CHUNK)
+                    if not chunk:
+                        break
+                    handle.write(chunk)
+            total_membros += 1
+
+    return [_payload_publico(item) for item in payloads], total_membros
+
+
+def _payload_publico(payload):
+    return {key: value for key, value in payload.items() if not key.startswith("_")}
+
+
+def _capturar_padroes_bulk(serial, logs_root, capture_dir, metadata, metadata_path):
+    """Um unico `tar` no dispositivo, transmitido por exec-out. Retorna None para cair no modo por arquivo."""
+    archive_name = "radio_logs.tar.gz" if LOG_CAPTURE_BULK_GZIP else "radio_logs.tar"
+    archive_path = os.path.join(capture_dir, archive_name)
+    script = _script_tar_bulk(DEFAULT_FAILURE_LOG_PATTERNS, gzip=LOG_CAPTURE_BULK_GZIP)
+    metadata["transfer"] = "bulk_tar"
+    metadata["archive"] = archive_name
+    atomic_write_json(metadata_path, metadata)
+
+    try:
+        proc = subprocess.Popen(
+            adb_cmd(serial) + ["exec-out", "sh", "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except Exception as exc:
+        print_color(f"âš ï¸ Captura em lote indisponivel ({exc}); usando modo por arquivo.", "yellow")
+        return None
+
+    timer = threading.Timer(LOG_CAPTURE_BULK_TIMEOUT_S, proc.kill)
+    timer.start()
+    try:
+        with open(archive_path, "wb") as sink:
+            tee = _TeeStream(proc.stdout, sink)
+            try:
+                patterns, _ = _extrair_tar_stream(
+                    tee, logs_root, capture_dir, DEFAULT_FAILURE_LOG_PATTERNS, metadata, metadata_path
+                )
+            except tarfile.ReadError:
+                if tee.bytes_read == 0:
+                    patterns = [
+                        {
+                            "pattern": pattern,
+                            "label": _default_log_label(pattern),
+                            "match_count": 0,
+                            "status": "vazio",
+                            "artifacts": [],
+                            "error": None,
+                        }
+                        for pattern in DEFAULT_FAILURE_LOG_PATTERNS
+                    ]
+                else:
+                    raise
+            tee.drain()
+        proc.wait(timeout=ADB_TIMEOUT)
+    except Exception as exc:
+        proc.kill()
+        print_color(f"âš ï¸ Falha na captura em lote ({exc}); usando modo por arquivo.", "yellow")
+        return None
+    finally:
+        timer.cancel()
+
+    if proc.returncode != 0:
+        print_color("âš ï¸ tar no dispositivo falhou; usando modo por arquivo.", "yellow")
+        return None
+
+    if os.path.exists(archive_path) and os.path.getsize(archive_path) == 0:
+        os.remove(archive_path)
+        metadata["archive"] = None
+    metadata["patterns"] = patterns
+    atomic_write_json(metadata_path, metadata)
+    return sum(len(item["artifacts"]) for item in patterns)
+
+
+def _executar_captura_logs_default(categoria, nome_teste, serial, motivo):
+    started_at = datetime.now()
+    base_dir = _status_dir(categoria, nome_teste)
+    capture_dir = _log_capture_dir(base_dir, started_at)
+    logs_root = os.path.join(capture_dir, "radio_logs")
+    os.makedirs(logs_root, exist_ok=True)
+
+    metadata_path = os.path.join(capture_dir, "capture_metadata.json")
+    metadata = {
+        "categoria": categoria,
+        "teste": nome_teste,
+        "serial": serial,
+        "motivo": motivo,
+        "mode": "default_auto_capture",
+        "status": "executando",
+        "started_at": started_at.isoformat(),
+        "finished_at": None,
+        "patterns": [],
+    }
+    atomic_write_json(metadata_path, metadata)
+
+    total_artifacts = None
+    if LOG_CAPTURE_MODO == "bulk":
+        total_artifacts = _capturar_padroes_bulk(serial, logs_root, capture_dir, metadata, metadata_path)
+    if total_artifacts is None:
+        metadata["transfer"] = "arquivo"
+        metadata.pop("archive", None)
+        metadata["patterns"] = []
+        atomic_write_json(metadata_path, metadata)
+        total_artifacts = _capturar_padroes_por_arquivo(serial, logs_root, capture_dir, metadata, metadata_path)
 
     final_shot = capturar_screenshot(capture_dir, "estado_final.png", serial)
     metadata["status"] = "capturado" if total_artifacts > 0 else "sem_artefatos"
@@ -1046,6 +1451,151 @@ def atualizar_status_captura_logs(
     }
     salvar_status(status, categoria, teste_nome, serial=bancada_key)
 
+# =========================
+# DATASET COMPILADO
+# =========================
+DATASET_COMPILADO_SUFIXO = ".compilado.json"
+DATASET_COMPILADO_VERSAO = 1
+
+
+@dataclass
+class AcaoCompilada:
+    """Acao do dataset ja validada, com tipos resolvidos e swipe_inicio/swipe_fim pareados."""
+
+    __slots__ = ("idx", "linha", "tipo", "x", "y", "x2", "y2", "duracao_ms", "coordenadas")
+
+    idx: int
+    linha: int
+    tipo: str
+    x: object
+    y: object
+    x2: object
+    y2: object
+    duracao_ms: int
+    coordenadas: dict
+
+
+def _valor_csv(texto):
+    """Converte celulas do CSV para o tipo nativo (int, float, str ou None)."""
+    if texto is None:
+        return None
+    texto = str(texto).strip()
+    if not texto:
+        return None
+    try:
+        return int(texto)
+    except ValueError:
+        pass
+    try:
+        valor = float(texto)
+    except ValueError:
+        return texto
+    return None if math.isnan(valor) else valor
+
+
+def _ler_linhas_dataset(dataset_path):
+    with open(dataset_path, "r", encoding="utf-8-sig", newline="") as handle:
+        return [{k: _valor_csv(v) for k, v in row.items() if k is not None} for row in csv.DictReader(handle)]
+
+
+def compilar_dataset(linhas):
+    """Compila as linhas do dataset em acoes tipadas.
+
+    Retorna (acoes, erros, avisos). Erros impedem a execucao; avisos reproduzem
+    o comportamento anterior (acao ignorada, mas com screenshot e comparacao).
+    """
+    acoes = []
+    erros = []
+    avisos = []
+    for pos, row in enumerate(linhas):
+        linha = pos + 1
+        tipo = str(_pick_action_value(row, "tipo", default="tap")).lower()
+        if tipo == "swipe_fim":
+            continue
+
+        x = y = x2 = y2 = None
+        duracao_ms = 0
+        if tipo == "tap":
+            x = _pick_int_value(row, "x")
+            y = _pick_int_value(row, "y")
+            if x is None or y is None:
+                erros.append(f"linha {linha}: tap exige colunas x e y")
+        elif tipo == "long_press":
+            x = _pick_int_value(row, "x")
+            y = _pick_int_value(row, "y")
+            duracao_s = _pick_float_value(row, "duracao_s", default=1.0)
+            duracao_ms = int(duracao_s * 1000)
+            if x is None or y is None:
+                erros.append(f"linha {linha}: long_press exige colunas x e y")
+        elif tipo in {"swipe", "swipe_inicio"}:
+            x = _pick_int_value(row, "x1", "x", default=0)
+            y = _pick_int_value(row, "y1", "y", default=0)
+            duracao_ms = _pick_int_value(row, "duracao_ms", default=300)
+            if tipo == "swipe":
+                x2 = _pick_int_value(row, "x2", "x", default=0)
+                y2 = _pick_int_value(row, "y2", "y", default=0)
+            elif pos + 1 < len(linhas):
+                proxima = linhas[pos + 1]
+                prox_tipo = str(_pick_action_value(proxima, "tipo", default="")).lower()
+                if prox_tipo in {"swipe_fim", "swipe"}:
+                    x2 = _pick_int_value(proxima, "x2", "x", default=0)
+                    y2 = _pick_int_value(proxima, "y2", "y", default=0)
+            if x2 is None or y2 is None:
+                avisos.append(f"linha {linha}: swipe sem fim valido sera ignorado")
+        else:
+            avisos.append(f"linha {linha}: tipo de acao '{tipo}' nao reconhecido sera ignorado")
+
+        acoes.append(
+            AcaoCompilada(
+                idx=len(acoes) + 1,
+                linha=linha,
+                tipo=tipo,
+                x=x,
+                y=y,
+                x2=x2,
+                y2=y2,
+                duracao_ms=int(duracao_ms or 0),
+                coordenadas=dict(row),
+            )
+        )
+    return acoes, erros, avisos
+
+
+def _dataset_assinatura(dataset_path):
+    stat = os.stat(dataset_path)
+    return {"mtime_ns": int(stat.st_mtime_ns), "size": int(stat.st_size), "versao": DATASET_COMPILADO_VERSAO}
+
+
+def carregar_dataset_compilado(dataset_path):
+    """Carrega o sidecar `<dataset>.compilado.json` ou recompila quando o CSV mudou."""
+    sidecar_path = dataset_path + DATASET_COMPILADO_SUFIXO
+    assinatura = _dataset_assinatura(dataset_path)
+    if os.path.exists(sidecar_path):
+        try:
+            with open(sidecar_path, "r", encoding="utf-8") as handle:
+                cached = json.load(handle)
+            if cached.get("assinatura") == assinatura:
+                acoes = [AcaoCompilada(**item) for item in cached.get("acoes", [])]
+                return acoes, list(cached.get("erros", [])), list(cached.get("avisos", []))
+        except Exception:
+            pass
+
+    acoes, erros, avisos = compilar_dataset(_ler_linhas_dataset(dataset_path))
+    try:
+        atomic_write_json(
+            sidecar_path,
+            {
+                "assinatura": assinatura,
+                "acoes": [asdict(acao) for acao in acoes],
+                "erros": erros,
+                "avisos": avisos,
+            },
+        )
+    except Exception as exc:
+        print_color(f"âš ï¸ Nao foi possivel salvar dataset compilado: {exc}", "yellow")
+    return acoes, erros, avisos
+
+
 # =========================
 # MAIN
 # =========================
@@ -1075,6 +1625,17 @@ def main():
     # âœ… Define identificador Ãºnico da bancada (corrige o NameError)
     bancada_key = _bancada_key_from_serial(serial)
 
+    # Canal de controle (pause/resume/stop/step) por serial; pause.flag segue como fallback.
+    pause_path = os.path.join(BASE_DIR, "pause.flag")
+    if os.path.exists(pause_path):
+        print_color("âš ï¸ Arquivo de pausa residual detectado â€” removendo para evitar travamento.", "yellow")
+        try:
+            os.remove(pause_path)
+        except Exception as e:
+            print_color(f"âš ï¸ NÃ£o foi possÃ­vel remover pause.flag: {e}", "red")
+    controle = RunnerControl(serial, role="runner", pause_flag=pause_path, flag_poll_s=2.0).start()
+    atexit.register(controle.close)
+
     def concluir_execucao(status_execucao, resultado_final, motivo=None, capturar_logs=False):
         capture_status = "nao_necessario"
         capture_dir = None
@@ -1212,114 +1773,93 @@ def main():
         return
 
     os.makedirs(resultados_dir, exist_ok=True)
+    ignore_regions = _carregar_ignore_regions(frames_dir)
     try:
-        df = pd.read_csv(dataset_path)
+        acoes, erros_dataset, avisos_dataset = carregar_dataset_compilado(dataset_path)
     except Exception as e:
         print_color(f"âŒ Falha ao ler dataset.csv: {e}", "red")
         concluir_execucao("erro", "erro_tecnico", motivo="dataset", capturar_logs=False)
         return
 
-    total_acoes = sum(1 for _, r in df.iterrows() if str(r.get("tipo", "")).lower() != "swipe_fim")
+    for aviso in avisos_dataset:
+        print_color(f"âš ï¸ Dataset: {aviso}", "yellow")
+    if erros_dataset:
+        for erro in erros_dataset:
+            print_color(f"âŒ Dataset: {erro}", "red")
+        concluir_execucao("erro", "erro_tecnico", motivo="dataset", capturar_logs=False)
+        return
+
+    total_acoes = len(acoes)
     print_color(f"\nðŸŽ¬ Executando {total_acoes} aÃ§Ãµes do dataset...\n", "cyan")
     log = []
     houve_divergencia = False
+    interrompido = False
 
     # ðŸ”¹ Inicializa status
     inicializar_status_bancada(bancada_key, categoria, nome_teste, total_acoes)
 
-    action_idx = 0
-    for i, row in df.iterrows():
-        try:
-            tipo = str(row.get("tipo", "tap")).lower()
-        except Exception:
-            tipo = "tap"
+    for acao in acoes:
+        tipo = acao.tipo
+        print_color(f"â–¶ï¸ AÃ§Ã£o {acao.idx}/{total_acoes} ({tipo})", "white")
 
-        if tipo == "swipe_fim":
-            # swipe_fim Ã© consumido pelo swipe_inicio e nÃ£o deve gerar aÃ§Ã£o/screenshot
-            continue
-
-        print_color(f"â–¶ï¸ AÃ§Ã£o {action_idx+1}/{total_acoes} ({tipo})", "white")
-
-        # Pausa se necessÃ¡rio (auto-limpa se sobrou de execuÃ§Ã£o anterior)
-        pause_path = os.path.join(BASE_DIR, "pause.flag")
-        if os.path.exists(pause_path):
-            print_color("âš ï¸ Arquivo de pausa residual detectado â€” removendo para evitar travamento.", "yellow")
-            try:
-                os.remove(pause_path)
-            except Exception as e:
-                print_color(f"âš ï¸ NÃ£o foi possÃ­vel remover pause.flag: {e}", "red")
-
-        while os.path.exists(pause_path):
-            print_color("â¸ï¸ ExecuÃ§Ã£o pausada... aguardando retomada.", "yellow")
-            time.sleep(2)
+        # Pausa/step/stop com efeito imediato via canal de controle
+        if not controle.wait_if_paused(
+            on_wait=lambda: print_color("â¸ï¸ ExecuÃ§Ã£o pausada... aguardando retomada.", "yellow")
+        ):
+            interrompido = True
+            break
 
         inicio = time.time()
 
         # ===== Executa aÃ§Ã£o =====
         try:
             if tipo == "tap":
-                res = executar_tap(int(row["x"]), int(row["y"]), serial)
+                res = executar_tap(acao.x, acao.y, serial)
                 if res is None:
                     print_color("âŒ Falha na execuÃ§Ã£o do TAP â€” interrompendo teste.", "red")
                     concluir_execucao("erro", "erro_tecnico", motivo="adb", capturar_logs=True)
                     return
 
-
             elif tipo in ["swipe", "swipe_inicio"]:
-                # Busca coordenadas do swipe (prioriza x1/y1/x2/y2 se existirem)
-                x1 = int(row.get("x1", row.get("x", 0)))
-                y1 = int(row.get("y1", row.get("y", 0)))
-                dur = int(row.get("duracao_ms", 300))
-                x2, y2 = None, None
-
-                if tipo == "swipe":
-                    x2 = int(row.get("x2", row.get("x", 0)))
-                    y2 = int(row.get("y2", row.get("y", 0)))
-                else:
-                    # Busca prÃ³ximo registro com tÃ©rmino do swipe
-                    if i + 1 < len(df):
-                        proxima = df.iloc[i + 1]
-                        prox_tipo = str(proxima.get("tipo", "")).lower()
-                        if prox_tipo in ["swipe_fim", "swipe"]:
-                            x2 = int(proxima.get("x2", proxima.get("x", 0)))
-                            y2 = int(proxima.get("y2", proxima.get("y", 0)))
-
-                if x2 is not None and y2 is not None:
-                    res = executar_swipe(x1, y1, x2, y2, duracao=dur, serial=serial)
+                if acao.x2 is not None and acao.y2 is not None:
+                    res = executar_swipe(acao.x, acao.y, acao.x2, acao.y2, duracao=acao.duracao_ms, serial=serial)
                     if res is None:
                         print_color("âŒ Falha na execuÃ§Ã£o do SWIPE â€” interrompendo teste.", "red")
                         concluir_execucao("erro", "erro_tecnico", motivo="adb", capturar_logs=True)
                         return
                 else:
-                    print_color("âš ï¸ swipe sem fim vÃ¡lido â€” ignorado.", "yellow")
+                    print_color("âš ï¸ swipe sem fim vÃ¡lido â€” ignorado.", "yellow")
 
             elif tipo == "long_press":
-                duracao_press_ms = float(row.get("duracao_s", 1.0)) * 1000
-                res = executar_long_press(int(row["x"]), int(row["y"]), duracao_press_ms, serial)
+                res = executar_long_press(acao.x, acao.y, acao.duracao_ms, serial)
                 if res is None:
                     print_color("âŒ Falha na execuÃ§Ã£o do LONG PRESS â€” interrompendo teste.", "red")
                     concluir_execucao("erro", "erro_tecnico", motivo="adb", capturar_logs=True)
                     return
 
             else:
-                print_color(f"âš ï¸ Tipo de aÃ§Ã£o '{tipo}' nÃ£o reconhecido â€” ignorado.", "yellow")
+                print_color(f"âš ï¸ Tipo de aÃ§Ã£o '{tipo}' nÃ£o reconhecido â€” ignorado.", "yellow")
 
         except Exception as e:
-            print_color(f"âš ï¸ Erro ao executar aÃ§Ã£o {i+1}: {e}", "red")
+            print_color(f"âš ï¸ Erro ao executar aÃ§Ã£o {acao.linha}: {e}", "red")
             concluir_execucao("erro", "erro_tecnico", motivo="execucao_acao", capturar_logs=True)
             return
 
         # Aguarda a UI estabilizar apÃ³s a aÃ§Ã£o antes de capturar o screenshot.
         time.sleep(ESPERA_POS_ACAO_S)
         # ===== Screenshot e Similaridade =====
-        action_idx += 1
+        action_idx = acao.idx
         screenshot_nome = f"resultado_{action_idx:02d}.png"
-        screenshot_path = capturar_screenshot(resultados_dir, screenshot_nome, serial)
+        screenshot_path, screenshot_frame = capturar_screenshot_em_memoria(resultados_dir, screenshot_nome, serial)
 
         esperado_rel = os.path.join("frames", f"frame_{action_idx:02d}.png")
         esperado_abs = os.path.join(teste_dir, esperado_rel)
 
-        similaridade = comparar_imagens(screenshot_path, esperado_abs)
+        similaridade = comparar_imagens(
+            screenshot_frame if screenshot_frame is not None else screenshot_path,
+            esperado_abs,
+            ignore_regions=ignore_regions,
+        )
         status_txt = "OK" if similaridade >= SIMILARIDADE_HOME_OK else "Divergente"
         if status_txt != "OK":
             houve_divergencia = True
@@ -1331,10 +1871,10 @@ def main():
 
         # Monta registro de log da aÃ§Ã£o
         registro = {
-            "id": i + 1,
+            "id": acao.linha,
             "timestamp": datetime.now().isoformat(),
             "acao": tipo,
-            "coordenadas": {k: (None if pd.isna(v) else v) for k, v in row.to_dict().items()},
+            "coordenadas": acao.coordenadas,
             "screenshot": os.path.join("resultados", screenshot_nome),
             "frame_esperado": esperado_rel,
             "similaridade": similaridade,
@@ -1366,6 +1906,11 @@ def main():
     except Exception as e:
         print_color(f"âŒ Falha ao salvar log final: {e}", "red")
 
+    if interrompido:
+        print_color("âš ï¸ ExecuÃ§Ã£o interrompida pelo operador.", "yellow")
+        concluir_execucao("finalizado", "interrompido", motivo="parado_pelo_operador", capturar_logs=False)
+        return
+
     resultado_final = "reprovado" if houve_divergencia else "aprovado"
     motivo_final = "divergencia_visual" if houve_divergencia else None
     concluir_execucao("finalizado", resultado_final, motivo=motivo_final, capturar_logs=houve_divergencia)
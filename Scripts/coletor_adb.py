@@ -5,6 +5,8 @@ import math
 import time
 import sys
 import platform
+import queue
+import threading
 import pyfiglet
 import signal
 import colorama
@@ -18,6 +20,7 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from app.shared.adb_utils import resolve_adb_path
+from app.shared.runner_control import RunnerControl
 colorama.init()
 
 # =========================
@@ -138,126 +141,217 @@ def scale_to_px(val, min_v, max_v, px_max):
 # =========================
 # COLETA DE GESTOS
 # =========================
-HEX_VAL = re.compile(r"\s([0-9a-fA-F]{8})\s*$")
+GETEVENT_LINE = re.compile(
+    r"^\[\s*(?P<ts>\d+\.\d+)\]\s+(?:(?P<dev>/dev/\S+):\s+)?(?P<type>EV_\w+)\s+(?P<code>\S+)\s+(?P<value>\S+)\s*$"
+)
+X_CODES = {"ABS_MT_POSITION_X", "ABS_X"}
+Y_CODES = {"ABS_MT_POSITION_Y", "ABS_Y"}
 
-def hex_last_int(line):
-    m = HEX_VAL.search(line)
-    return int(m.group(1), 16) if m else None
+def parse_getevent_line(line):
+    """Quebra uma linha do `getevent -lt` em (timestamp_kernel, tipo, codigo, valor)."""
+    m = GETEVENT_LINE.match(line)
+    if not m:
+        return None
+    return float(m.group("ts")), m.group("type"), m.group("code"), m.group("value")
 
 
+class GestureParser:
+    """Maquina de estados de toque sobre o `getevent -lt`.
 
-def collect_gestures_loop(dev_path, frames_dir, screen_res, abs_ranges, serial=None):
-    actions = []
-    idx = 1
-    in_touch = False
-    sx_raw = sy_raw = None
-    lx_raw = ly_raw = None
-    t_start = None
-
-    while True:
-        proc = subprocess.Popen(
-            adb_cmd(serial) + ["shell", "getevent", "-lt", dev_path],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            bufsize=0,
-        )
-
-        if proc.stdout is None:
-            break
-
-        try:
-            for raw_line in proc.stdout:
-                line = raw_line.decode(errors="ignore").rstrip()
-
-                if stop_requested or os.path.exists(os.path.join(PROJECT_ROOT, "stop.flag")):
-                    break
-
-                # Inicio do toque
-                if "EV_KEY" in line and "BTN_TOUCH" in line and "DOWN" in line:
-                    in_touch = True
-                    t_start = time.time()
-                    sx_raw = sy_raw = lx_raw = ly_raw = None
-
-                # Captura das coordenadas
-                if "EV_ABS" in line:
-                    if "ABS_MT_POSITION_X" in line or "ABS_X" in line:
-                        val = hex_last_int(line)
-                        if val is not None:
-                            lx_raw = val
-                            if sx_raw is None:
-                                sx_raw = val
-                    elif "ABS_MT_POSITION_Y" in line or "ABS_Y" in line:
-                        val = hex_last_int(line)
-                        if val is not None:
-                            ly_raw = val
-                            if sy_raw is None:
-                                sy_raw = val
-
-                # Final do toque
-                end_touch = False
-                if "EV_KEY" in line and "BTN_TOUCH" in line and "UP" in line:
-                    end_touch = True
-                if "EV_ABS" in line and "ABS_MT_TRACKING_ID" in line and "ffffffff" in line:
-                    end_touch = True
-
-                if in_touch and end_touch:
-                    in_touch = False
-                    dur_ms = int((time.time() - t_start) * 1000)
-                    if None in (sx_raw, sy_raw, lx_raw, ly_raw):
-                        continue
+    A duracao vem dos horarios de evento do kernel, entao nao depende de quando
+    a linha foi lida do pipe.
+    """
 
-                    sx_px = scale_to_px(sx_raw, abs_ranges["ABS_MT_POSITION_X"]["min"], abs_ranges["ABS_MT_POSITION_X"]["max"], screen_res[0])
-                    sy_px = scale_to_px(sy_raw, abs_ranges["ABS_MT_POSITION_Y"]["min"], abs_ranges["ABS_MT_POSITION_Y"]["max"], screen_res[1])
-                    lx_px = scale_to_px(lx_raw, abs_ranges["ABS_MT_POSITION_X"]["min"], abs_ranges["ABS_MT_POSITION_X"]["max"], screen_res[0])
-                    ly_px = scale_to_px(ly_raw, abs_ranges["ABS_MT_POSITION_Y"]["min"], abs_ranges["ABS_MT_POSITION_Y"]["max"], screen_res[1])
-
-                    dist = math.hypot(lx_px - sx_px, ly_px - sy_px)
-                    dur_s = dur_ms / 1000.0
-
-                    if dist <= MOV_THRESH_PX and dur_s > 0.8:
-                        action = {"tipo": "long_press", "x": sx_px, "y": sy_px, "duracao_s": round(dur_s, 2)}
-                    elif dist <= MOV_THRESH_PX:
-                        action = {"tipo": "tap", "x": sx_px, "y": sy_px, "duracao_s": round(dur_s, 2)}
-                    else:
-                        action = {"tipo": "swipe", "x1": sx_px, "y1": sy_px, "x2": lx_px, "y2": ly_px, "duracao_ms": dur_ms}
-
-                    # Captura rapida do frame
-                    time.sleep(SCREENSHOT_DELAY_S)
-                    img_name = f"frame_{idx:02d}.png"
-                    img_path = os.path.join(frames_dir, img_name)
-                    shot_path = take_screenshot(img_path, serial)
-
-                    actions.append({"id": idx, "timestamp": datetime.now().isoformat(), "imagem": img_name, "acao": action})
-
-                    if action.get("tipo") == "tap":
-                        printc(f"TAP {idx}: ({sx_px},{sy_px})", "green")
-                    elif action.get("tipo") == "swipe":
-                        printc(f"SWIPE {idx}: ({sx_px},{sy_px})->({lx_px},{ly_px})", "green")
-                    elif action.get("tipo") == "long_press":
-                        printc(f"LONG_PRESS {idx}: ({sx_px},{sy_px})", "green")
-
-                    captured_ok = bool(shot_path) and os.path.exists(shot_path) and os.path.getsize(shot_path) > 0
-                    if captured_ok:
-                        printc(f"IMG {idx}: OK ({img_name})", "cyan")
-                    else:
-                        printc(f"IMG {idx}: FALHA ({img_name})", "red")
-
-                    idx += 1
-
-        except KeyboardInterrupt:
-            pass
-        finally:
+    def __init__(self, screen_res, abs_ranges):
+        self.screen_res = screen_res
+        self.abs_ranges = abs_ranges
+        self.in_touch = False
+        self.t_start = None
+        self.sx_raw = self.sy_raw = None
+        self.lx_raw = self.ly_raw = None
+
+    def _to_px(self, raw, axis):
+        key = "ABS_MT_POSITION_X" if axis == 0 else "ABS_MT_POSITION_Y"
+        return scale_to_px(raw, self.abs_ranges[key]["min"], self.abs_ranges[key]["max"], self.screen_res[axis])
+
+    def feed(self, line):
+        parsed = parse_getevent_line(line)
+        if parsed is None:
+            return None
+        ts, ev_type, code, value = parsed
+
+        if ev_type == "EV_KEY" and code == "BTN_TOUCH":
+            if value == "DOWN":
+                self.in_touch = True
+                self.t_start = ts
+                self.sx_raw = self.sy_raw = self.lx_raw = self.ly_raw = None
+                return None
+            if value == "UP":
+                return self._finish(ts)
+            return None
+
+        if ev_type != "EV_ABS":
+            return None
+        if code in X_CODES or code in Y_CODES:
+            try:
+                raw = int(value, 16)
+            except ValueError:
+                # Linha truncada/corrompida no pipe: descarta sem derrubar a thread de leitura.
+                printc(f"getevent: valor invalido ignorado: {line.strip()}", "yellow")
+                return None
+        if code in X_CODES:
+            self.lx_raw = raw
+            if self.sx_raw is None:
+                self.sx_raw = raw
+        elif code in Y_CODES:
+            self.ly_raw = raw
+            if self.sy_raw is None:
+                self.sy_raw = raw
+        elif code == "ABS_MT_TRACKING_ID" and value.lower() == "ffffffff":
+            return self._finish(ts)
+        return None
+
+    def _finish(self, ts):
+        if not self.in_touch:
+            return None
+        self.in_touch = False
+        if None in (self.sx_raw, self.sy_raw, self.lx_raw, self.ly_raw):
+            return None
+
+        dur_ms = int(round((ts - self.t_start) * 1000))
+        sx_px = self._to_px(self.sx_raw, 0)
+        sy_px = self._to_px(self.sy_raw, 1)
+        lx_px = self._to_px(self.lx_raw, 0)
+        ly_px = self._to_px(self.ly_raw, 1)
+
+        dist = math.hypot(lx_px - sx_px, ly_px - sy_px)
+        dur_s = dur_ms / 1000.0
+
+        if dist <= MOV_THRESH_PX and dur_s > 0.8:
+            return {"tipo": "long_press", "x": sx_px, "y": sy_px, "duracao_s": round(dur_s, 2)}
+        if dist <= MOV_THRESH_PX:
+            return {"tipo": "tap", "x": sx_px, "y": sy_px, "duracao_s": round(dur_s, 2)}
+        return {"tipo": "swipe", "x1": sx_px, "y1": sy_px, "x2": lx_px, "y2": ly_px, "duracao_ms": dur_ms}
+
+
+def _print_action(idx, action):
+    if action.get("tipo") == "tap":
+        printc(f"TAP {idx}: ({action['x']},{action['y']})", "green")
+    elif action.get("tipo") == "swipe":
+        printc(f"SWIPE {idx}: ({action['x1']},{action['y1']})->({action['x2']},{action['y2']})", "green")
+    elif action.get("tipo") == "long_press":
+        printc(f"LONG_PRESS {idx}: ({action['x']},{action['y']})", "green")
+
+
+class GeteventReader(threading.Thread):
+    """Thread dedicada a ler e interpretar o getevent; gestos prontos vao para a fila de captura."""
+
+    def __init__(self, dev_path, parser, capture_queue, serial=None):
+        super().__init__(name="coletor-getevent", daemon=True)
+        self.dev_path = dev_path
+        self.parser = parser
+        self.capture_queue = capture_queue
+        self.serial = serial
+        self.next_idx = 1
+        self._stop_event = threading.Event()
+        self._proc = None
+
+    def stop(self):
+        self._stop_event.set()
+        proc = self._proc
+        if proc is not None:
             try:
                 proc.terminate()
-                proc.wait(timeout=1)
             except Exception:
                 pass
 
-        if stop_requested or os.path.exists(os.path.join(PROJECT_ROOT, "stop.flag")):
+    def run(self):
+        while not self._stop_event.is_set():
+            proc = subprocess.Popen(
+                adb_cmd(self.serial) + ["shell", "getevent", "-lt", self.dev_path],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._proc = proc
+            try:
+                for raw_line in proc.stdout:
+                    if self._stop_event.is_set():
+                        break
+                    action = self.parser.feed(raw_line.decode(errors="ignore"))
+                    if action is None:
+                        continue
+                    idx = self.next_idx
+                    self.next_idx += 1
+                    _print_action(idx, action)
+                    self.capture_queue.put((idx, action, time.monotonic() + SCREENSHOT_DELAY_S, datetime.now().isoformat()))
+            finally:
+                try:
+                    proc.terminate()
+                    proc.wait(timeout=1)
+                except Exception:
+                    pass
+                self._proc = None
+
+            # Se getevent encerrou sem stop, tenta reconectar
+            if self._stop_event.wait(1):
+                break
+
+
+def capture_worker(capture_queue, frames_dir, actions, serial=None):
+    """Consome a fila de gestos e captura cada frame apos SCREENSHOT_DELAY_S do fim do gesto."""
+    while True:
+        item = capture_queue.get()
+        if item is None:
             break
+        idx, action, ready_at, timestamp = item
+        delay = ready_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        img_name = f"frame_{idx:02d}.png"
+        img_path = os.path.join(frames_dir, img_name)
+        shot_path = take_screenshot(img_path, serial)
+        actions.append({"id": idx, "timestamp": timestamp, "imagem": img_name, "acao": action})
+
+        captured_ok = bool(shot_path) and os.path.exists(shot_path) and os.path.getsize(shot_path) > 0
+        if captured_ok:
+            printc(f"IMG {idx}: OK ({img_name})", "cyan")
+        else:
+            printc(f"IMG {idx}: FALHA ({img_name})", "red")
+
+
+def _stop_pedido(control=None):
+    if stop_requested:
+        return True
+    if control is not None:
+        return control.stop_requested()
+    return os.path.exists(os.path.join(PROJECT_ROOT, "stop.flag"))
+
 
-        # Se getevent encerrou sem stop, tenta reconectar
-        time.sleep(1)
+def collect_gestures_loop(dev_path, frames_dir, screen_res, abs_ranges, serial=None, control=None):
+    actions = []
+    capture_queue = queue.Queue()
+    capturer = threading.Thread(
+        target=capture_worker,
+        args=(capture_queue, frames_dir, actions, serial),
+        name="coletor-captura",
+        daemon=True,
+    )
+    capturer.start()
+    reader = GeteventReader(dev_path, GestureParser(screen_res, abs_ranges), capture_queue, serial)
+    reader.start()
+
+    try:
+        while reader.is_alive() and not _stop_pedido(control):
+            reader.join(timeout=0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.stop()
+        reader.join(timeout=2)
+        # Drena as capturas pendentes antes de gravar o acoes.json
+        capture_queue.put(None)
+        capturer.join()
 
     return actions
 
@@ -288,7 +382,11 @@ def main():
     screen_res = get_resolution(serial)
     dev = autodetect_touch_device(serial)
     abs_ranges = get_abs_ranges_for_device(dev, serial)
-    actions = collect_gestures_loop(dev, frames_dir, screen_res, abs_ranges, serial)
+    control = RunnerControl(serial, role="coletor", stop_flag=os.path.join(PROJECT_ROOT, "stop.flag")).start()
+    try:
+        actions = collect_gestures_loop(dev, frames_dir, screen_res, abs_ranges, serial, control=control)
+    finally:
+        control.close()
     final_img = take_screenshot(os.path.join(base_dir, "resultado_final.png"), serial)
 
     saida = {
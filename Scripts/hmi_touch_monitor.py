@@ -1,28 +1,54 @@
 import argparse
+import asyncio
+import atexit
 import json
 import math
 import os
 import re
-import shutil
 import signal
 import subprocess
 import sys
+import threading
 import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 from typing import Any, Optional
 
+import numpy as np
 from PIL import Image
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from HMI.hmi_engine import ValidationConfig, evaluate_single_screenshot
+from HMI.hmi_compare_stage import (
+    COMPARE_QUEUE_LIMIT,
+    COMPARE_WORKERS_DEFAULT,
+    CompareJob,
+    CompareStage,
+)
+from HMI.hmi_engine import ValidationConfig
+from HMI.hmi_hashing import average_hash, hash_distance
 from HMI.hmi_indexer import load_library_index
+from HMI.hmi_preview_channel import PreviewChannelWriter, preview_channel_path
+from HMI.hmi_replay import (
+    REPLAY_REPORT_NAME,
+    REPLAY_TIMING_DEFAULT,
+    ReplayFrameSource,
+    ReplayTiming,
+    ResourceMeter,
+    load_replay_frames,
+)
+from HMI.hmi_result_cache import ValidationResultCache, frame_hashes
+from HMI.hmi_results_store import RESULTS_DB_NAME, LiveResultsStore
+from HMI.hmi_retention import CaptureRetention, RetentionPolicy, manifest_lock
+from HMI.hmi_state_file import merge_state_file
 from app.shared.adb_utils import resolve_adb_path
+from app.shared.frame_sources import FRAME_SOURCE_KINDS, FrameSource, build_frame_source, capture_screencap_image
 from app.shared.win_window_capture import capture_window_client_image
 
 
@@ -31,9 +57,25 @@ DEFAULT_RES = (1920, 1080)
 SCREENSHOT_DELAY_S = 1.05
 HOST_CLICK_CAPTURE_DELAY_S = 0.25
 SCREEN_WATCH_INTERVAL_S = 0.25
+INPUT_POLL_INTERVAL_S = 0.015
+SCRCPY_WINDOW_CACHE_TTL_S = 2.0
+CLICK_LATENCY_WINDOW = 200
+REPLAY_DRAIN_TIMEOUT_S = 120.0
 SCREEN_CHANGE_HASH_THRESHOLD = 1
+SCREEN_WATCH_FRAME_SOURCE = "stream"
 STOP_REQUESTED = False
-COMPARE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hmi_compare")
+COMPARE_STAGE: Optional[CompareStage] = None
+RESULTS_STORES: dict[str, LiveResultsStore] = {}
+RETENTION: dict[str, CaptureRetention] = {}
+RESULT_CACHE = ValidationResultCache()
+PENDING_HASHES: dict[str, tuple[int, int]] = {}
+PENDING_HASHES_LIMIT = 256
+PREVIEW_CHANNEL: Optional[PreviewChannelWriter] = None
+PREVIEW_PNG_INTERVAL_S = 1.0
+_LAST_PREVIEW_PNG_AT = 0.0
+_PENDING_PREVIEW_PNG: Optional[tuple[Image.Image, str]] = None
+OUTPUT_RETENTION_SPEC = ""
+HMI_TESTE_RETENTION_SPEC = ""
 HEX_VAL = re.compile(r"\s([0-9a-fA-F]{8})\s*$")
 CREATE_FLAGS = 0
 STARTUPINFO = None
@@ -142,33 +184,6 @@ def log_message(message: str) -> None:
     print(f"[hmi_touch_monitor] {message}", flush=True)
 
 
-def _default_results_payload() -> dict[str, Any]:
-    return {
-        "processed": [],
-        "history": [],
-        "full_results": [],
-    }
-
-
-def _load_json_dict(path: str) -> dict[str, Any]:
-    if not path or not os.path.exists(path):
-        return {}
-    try:
-        with open(path, "r", encoding="utf-8") as fh:
-            payload = json.load(fh)
-        return payload if isinstance(payload, dict) else {}
-    except Exception:
-        return {}
-
-
-def _save_json_dict(path: str, payload: dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    tmp_path = f"{path}.tmp"
-    with open(tmp_path, "w", encoding="utf-8") as fh:
-        json.dump(payload, fh, ensure_ascii=False, indent=2)
-    os.replace(tmp_path, path)
-
-
 def _json_safe_value(value: Any, seen: Optional[set[int]] = None) -> Any:
     if seen is None:
         seen = set()
@@ -225,33 +240,29 @@ def _result_to_history_row(result: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _results_store(results_path: str) -> LiveResultsStore:
+    store = RESULTS_STORES.get(results_path)
+    if store is None:
+        store = RESULTS_STORES.setdefault(results_path, LiveResultsStore(results_path))
+    return store
+
+
 def _store_validation_result(
     results_path: str,
     file_name: str,
     result: dict[str, Any],
     capture_source: str = "",
-) -> dict[str, Any]:
-    payload = _load_json_dict(results_path) or _default_results_payload()
-    processed = set(str(name) for name in payload.get("processed", []))
-    history = list(payload.get("history", []))
-    full_results = [item for item in payload.get("full_results", []) if isinstance(item, dict)]
-
+) -> bool:
     result_payload = dict(result)
     if capture_source:
         result_payload["capture_source"] = capture_source
     compact_result = _compact_result(result_payload)
-    if file_name not in processed:
-        history.append(_result_to_history_row(compact_result))
-        full_results.append(compact_result)
-        processed.add(file_name)
-
-    payload = {
-        "processed": sorted(processed),
-        "history": history[-50:],
-        "full_results": full_results[-100:],
-    }
-    _save_json_dict(results_path, payload)
-    return payload
+    return _results_store(results_path).add(
+        file_name,
+        _result_to_history_row(compact_result),
+        compact_result,
+        capture_source=capture_source,
+    )
 
 
 def _build_lookup_cfg() -> ValidationConfig:
@@ -267,20 +278,18 @@ def _build_lookup_cfg() -> ValidationConfig:
     )
 
 
-def _hash_distance(hash_a: str, hash_b: str) -> int:
-    if not hash_a or not hash_b:
-        return 999
-    return sum(left != right for left, right in zip(hash_a, hash_b))
+def _hash_distance(hash_a: Optional[int], hash_b: Optional[int]) -> int:
+    return hash_distance(hash_a, hash_b)
 
 
-def _average_hash_from_path(image_path: str, hash_size: int = 8) -> str:
-    with Image.open(image_path) as img:
-        gray = img.convert("L").resize((hash_size, hash_size))
-        pixels = list(gray.getdata())
-    if not pixels:
-        return ""
-    avg = sum(int(value) for value in pixels) / float(len(pixels))
-    return "".join("1" if int(value) >= avg else "0" for value in pixels)
+def _average_hash_from_image(image: Image.Image, hash_size: int = 8) -> int:
+    """aHash do frame em memoria, bit a bit igual ao `_average_hash_local` do engine."""
+    return average_hash(np.asarray(image.convert("RGB")), hash_size, color_order="rgb")
+
+
+def _frame_hashes_from_image(image: Image.Image) -> tuple[int, int]:
+    """aHash/dHash do frame em memoria para o cache de resultados (sem reabrir o PNG salvo)."""
+    return frame_hashes(np.asarray(image.convert("RGB")), color_order="rgb")
 
 
 def _resize_image(local_path: str, target_size: tuple[int, int] | None) -> None:
@@ -309,21 +318,23 @@ def take_screenshot(local_path: str, serial: str | None = None, target_size: tup
     return local_path
 
 
-def _capture_native_screenshot(local_path: str, serial: str | None = None) -> str:
-    return take_screenshot(local_path, serial, target_size=None)
+def _capture_device_image(serial: str | None = None) -> Image.Image:
+    """Frame nativo do aparelho decodificado uma vez, direto do pipe do `screencap -p`."""
+    return capture_screencap_image(adb_cmd(serial), _run_kwargs())
 
 
-def _finalize_capture_from_native(native_path: str, final_path: str, target_size: tuple[int, int] | None) -> None:
-    os.makedirs(os.path.dirname(final_path), exist_ok=True)
-    if not target_size:
-        os.replace(native_path, final_path)
-        return
-    shutil.copyfile(native_path, final_path)
-    _resize_image(final_path, target_size)
-    try:
-        os.remove(native_path)
-    except OSError:
-        pass
+def _save_capture_image(image: Image.Image, file_path: str, target_size: tuple[int, int] | None) -> Image.Image:
+    """Grava a captura (redimensionada para `target_size`) de forma atomica e devolve o que foi gravado."""
+    if target_size:
+        width, height = int(target_size[0]), int(target_size[1])
+        if width > 0 and height > 0 and image.size != (width, height):
+            resampling = getattr(Image, "Resampling", Image)
+            image = image.resize((width, height), resampling.LANCZOS)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temp_path = f"{file_path}.tmp"
+    image.save(temp_path, format="PNG")
+    os.replace(temp_path, file_path)
+    return image
 
 
 def get_resolution(serial: str | None = None) -> tuple[int, int]:
@@ -411,26 +422,64 @@ def _preview_output_path(output_dir: str) -> str:
     return os.path.join(os.path.dirname(output_dir), "preview_latest.png")
 
 
-def _refresh_preview_image(source_path: str, output_dir: str) -> None:
-    if not source_path or not os.path.exists(source_path):
-        return
-    preview_path = _preview_output_path(output_dir)
-    os.makedirs(os.path.dirname(preview_path), exist_ok=True)
-    temp_preview = f"{preview_path}.tmp"
-    shutil.copyfile(source_path, temp_preview)
-    os.replace(temp_preview, preview_path)
+def _monitor_state_output_path(output_dir: str) -> str:
+    return os.path.join(os.path.dirname(output_dir), "monitor_state.json")
+
 
+def _replay_output_dir(output_dir: str, replay_output_dir: str = "") -> str:
+    """Pasta de capturas do replay, fora da sessao ao vivo.
 
-def _refresh_preview_from_scrcpy_window(output_dir: str) -> bool:
+    Tudo que o monitor deriva da pasta-mae (resultados, monitor_state.json, preview e
+    relatorio) fica em `<pasta-mae>/replay/<timestamp>/`, sem tocar no que o dashboard le.
+    """
+    if replay_output_dir:
+        return os.path.abspath(replay_output_dir)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    root = os.path.join(os.path.dirname(os.path.abspath(output_dir)), "replay", stamp)
+    return os.path.join(root, os.path.basename(os.path.normpath(output_dir)))
+
+
+def _refresh_preview_from_scrcpy_window(output_dir: str, window_info: Optional[dict[str, Any]] = None) -> bool:
     if os.name != "nt" or USER32 is None:
         return False
-    window_info = _find_scrcpy_window_info()
+    window_info = window_info if isinstance(window_info, dict) else _find_scrcpy_window_info()
     hwnd = window_info.get("hwnd")
     if not hwnd:
         return False
     image = capture_window_client_image(hwnd)
     if image is None:
         return False
+    return _write_preview_image(image, output_dir)
+
+
+def _write_preview_image(image: Image.Image, output_dir: str) -> bool:
+    """Publica o preview na memoria compartilhada; o PNG vira fallback com taxa limitada."""
+    global _LAST_PREVIEW_PNG_AT, _PENDING_PREVIEW_PNG
+    if PREVIEW_CHANNEL is not None:
+        try:
+            PREVIEW_CHANNEL.publish(np.asarray(image.convert("RGB")))
+        except Exception as exc:
+            log_message(f"falha ao publicar preview em memoria compartilhada: {exc}")
+        now = time.monotonic()
+        if now - _LAST_PREVIEW_PNG_AT < PREVIEW_PNG_INTERVAL_S:
+            # Guarda o frame pulado para o PNG final nao ficar com uma tela antiga.
+            _PENDING_PREVIEW_PNG = (image, output_dir)
+            return True
+        _LAST_PREVIEW_PNG_AT = now
+    _PENDING_PREVIEW_PNG = None
+    return _write_preview_png(image, output_dir)
+
+
+def _flush_preview_png() -> bool:
+    """Grava o ultimo frame que a limitacao de taxa deixou so na memoria compartilhada."""
+    global _PENDING_PREVIEW_PNG
+    pending, _PENDING_PREVIEW_PNG = _PENDING_PREVIEW_PNG, None
+    if pending is None:
+        return False
+    return _write_preview_png(*pending)
+
+
+def _write_preview_png(image: Image.Image, output_dir: str) -> bool:
     preview_path = _preview_output_path(output_dir)
     os.makedirs(os.path.dirname(preview_path), exist_ok=True)
     temp_preview = f"{preview_path}.tmp"
@@ -697,8 +746,33 @@ def append_manifest(output_dir: str, file_name: str, action_type: str, x: int, y
         "x": x,
         "y": y,
     }
-    with open(manifest_path, "a", encoding="utf-8") as fh:
-        fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    with manifest_lock(output_dir):
+        with open(manifest_path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    retention = RETENTION.get(os.path.abspath(output_dir))
+    if retention is not None:
+        retention.track(file_name)
+
+
+def _configure_retention(directory: str, spec: str) -> None:
+    policy = RetentionPolicy.parse(spec)
+    key = os.path.abspath(directory)
+    if not policy.enabled:
+        RETENTION.pop(key, None)
+        return
+    os.makedirs(directory, exist_ok=True)
+    RETENTION[key] = CaptureRetention(directory, policy, log=log_message)
+    limits = []
+    if policy.max_files:
+        limits.append(f"{policy.max_files} arquivos")
+    if policy.max_bytes:
+        limits.append(f"{policy.max_bytes // (1024 * 1024)} MB")
+    if policy.max_age_s:
+        limits.append(f"{policy.max_age_s / 3600.0:g} h")
+    log_message(
+        f"retencao em {directory}: {', '.join(limits)}"
+        + (" com arquivo deduplicado por pHash" if policy.archive else "")
+    )
 
 
 def _capture_output_frame(
@@ -709,31 +783,21 @@ def _capture_output_frame(
     y: int,
     target_size: tuple[int, int] | None,
     refresh_preview: bool = True,
-) -> tuple[str, str]:
+) -> tuple[str, str, tuple[int, int]]:
+    """Captura via ADB em memoria; devolve nome, caminho e os hashes do frame para o dedup."""
     file_name = f"touch_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.png"
     file_path = os.path.join(output_dir, file_name)
-    with NamedTemporaryFile(prefix="touch_native_", suffix=".png", dir=output_dir, delete=False) as temp_file:
-        native_path = temp_file.name
+    image = _capture_device_image(serial)
+    if refresh_preview:
+        _write_preview_image(image, output_dir)
+    _save_capture_image(image, file_path, target_size)
     try:
-        _capture_native_screenshot(native_path, serial)
-        if refresh_preview:
-            _refresh_preview_image(native_path, output_dir)
-        _finalize_capture_from_native(native_path, file_path, target_size)
-        try:
-            with Image.open(native_path) as image:
-                hmi_teste_path = _save_hmi_teste_capture(image.copy(), file_name, action_type, x, y)
-            log_message(f"captura ADB salva em {hmi_teste_path}")
-        except Exception as exc:
-            log_message(f"falha ao salvar captura ADB em HMI_TESTE: {exc}")
-    except Exception:
-        try:
-            if os.path.exists(native_path):
-                os.remove(native_path)
-        except OSError:
-            pass
-        raise
+        hmi_teste_path = _save_hmi_teste_capture(image, file_name, action_type, x, y)
+        log_message(f"captura ADB salva em {hmi_teste_path}")
+    except Exception as exc:
+        log_message(f"falha ao salvar captura ADB em HMI_TESTE: {exc}")
     append_manifest(output_dir, file_name, action_type, x, y)
-    return file_name, file_path
+    return file_name, file_path, _frame_hashes_from_image(image)
 
 
 def _capture_and_compare(
@@ -747,8 +811,8 @@ def _capture_and_compare(
     library_index: Optional[dict[str, Any]] = None,
     cfg: Optional[ValidationConfig] = None,
     refresh_preview: bool = True,
-) -> tuple[str, str, str]:
-    file_name, file_path = _capture_output_frame(
+) -> tuple[str, str, Optional[int]]:
+    file_name, file_path, hashes = _capture_output_frame(
         output_dir,
         serial,
         action_type,
@@ -757,7 +821,6 @@ def _capture_and_compare(
         target_size,
         refresh_preview=refresh_preview,
     )
-    frame_hash = _average_hash_from_path(file_path)
     _queue_compare_capture_if_configured(
         file_name,
         file_path,
@@ -765,31 +828,75 @@ def _capture_and_compare(
         library_index,
         cfg,
         capture_source=action_type,
+        hashes=hashes,
+    )
+    return file_name, file_path, hashes[0]
+
+
+def _store_compare_result(results_path: str, job: CompareJob, result: dict[str, Any]) -> None:
+    _store_validation_result(results_path, job.file_name, result, capture_source=job.capture_source)
+    hashes = PENDING_HASHES.pop(job.file_name, None)
+    if hashes is not None:
+        RESULT_CACHE.remember(job.file_name, job.file_path, hashes[0], hashes[1], _compact_result(result))
+    log_message(
+        "comparacao concluida "
+        f"{job.file_name} -> {str(result.get('screen_name') or 'sem_match')} "
+        f"[{str(result.get('status') or 'SEM_STATUS')}] "
+        f"origem={job.capture_source or 'desconhecida'}"
     )
-    return file_name, file_path, frame_hash
 
 
-def _compare_capture_if_configured(
+def _reuse_cached_validation(
     file_name: str,
     file_path: str,
-    results_path: str | None,
+    results_path: str,
+    capture_source: str,
+    hashes: Optional[tuple[int, int]] = None,
+) -> bool:
+    """Reaproveita o resultado de um frame recente quase identico. Retorna False se precisa comparar.
+
+    `hashes` vem do frame ja decodificado por quem capturou; sem eles nao ha como deduplicar
+    sem reabrir o PNG, entao a captura segue para a comparacao.
+    """
+    if hashes is None:
+        return False
+    ahash, dhash = hashes
+    match = RESULT_CACHE.lookup(file_path, ahash, dhash)
+    if match is None:
+        PENDING_HASHES[file_name] = (ahash, dhash)
+        while len(PENDING_HASHES) > PENDING_HASHES_LIMIT:
+            PENDING_HASHES.pop(next(iter(PENDING_HASHES)))
+        return False
+    entry, distance_a, distance_d = match
+    result = dict(entry.result)
+    result["screenshot_path"] = file_path
+    result["dedup"] = {"reused_from": entry.file_name, "ahash_distance": distance_a, "dhash_distance": distance_d}
+    _store_validation_result(results_path, file_name, result, capture_source=capture_source)
+    RESULT_CACHE.remember(file_name, file_path, ahash, dhash, entry.result)
+    log_message(
+        f"resultado reaproveitado {file_name} <- {entry.file_name} "
+        f"(aHash={distance_a}, dHash={distance_d}) -> {str(result.get('screen_name') or 'sem_match')} "
+        f"[reusos={RESULT_CACHE.hits}, comparacoes={RESULT_CACHE.misses}]"
+    )
+    return True
+
+
+def _compare_stage(
+    results_path: str,
     library_index: Optional[dict[str, Any]],
     cfg: Optional[ValidationConfig],
-    capture_source: str = "",
-) -> None:
-    if not results_path or library_index is None or cfg is None:
-        return
-    try:
-        result = evaluate_single_screenshot(file_path, library_index, cfg)
-        _store_validation_result(results_path, file_name, result, capture_source=capture_source)
-        log_message(
-            "comparacao concluida "
-            f"{file_name} -> {str(result.get('screen_name') or 'sem_match')} "
-            f"[{str(result.get('status') or 'SEM_STATUS')}] "
-            f"origem={capture_source or 'desconhecida'}"
+) -> CompareStage:
+    global COMPARE_STAGE
+    if COMPARE_STAGE is None:
+        COMPARE_STAGE = CompareStage(
+            on_result=partial(_store_compare_result, results_path),
+            workers=1,
+            library_index=library_index,
+            cfg=cfg,
+            use_processes=False,
+            log=log_message,
         )
-    except Exception as exc:
-        log_message(f"falha ao comparar {file_name}: {exc}")
+    return COMPARE_STAGE
 
 
 def _queue_compare_capture_if_configured(
@@ -799,57 +906,97 @@ def _queue_compare_capture_if_configured(
     library_index: Optional[dict[str, Any]],
     cfg: Optional[ValidationConfig],
     capture_source: str = "",
+    hashes: Optional[tuple[int, int]] = None,
 ) -> None:
     if not results_path or library_index is None or cfg is None:
         return
-    COMPARE_EXECUTOR.submit(
-        _compare_capture_if_configured,
-        file_name,
-        file_path,
-        results_path,
-        library_index,
-        cfg,
-        capture_source,
-    )
-    log_message(f"comparacao enfileirada para {file_name}")
+    if _reuse_cached_validation(file_name, file_path, results_path, capture_source, hashes):
+        return
+    if _compare_stage(results_path, library_index, cfg).submit(file_name, file_path, capture_source):
+        log_message(f"comparacao enfileirada para {file_name}")
 
 
 def _capture_screen_change_frame(
     output_dir: str,
     serial: str | None,
     target_size: tuple[int, int] | None,
-    previous_hash: str,
+    previous_hash: Optional[int],
     min_hash_distance: int = SCREEN_CHANGE_HASH_THRESHOLD,
-) -> tuple[str, Optional[str], Optional[str]]:
-    with NamedTemporaryFile(prefix="hmi_watch_native_", suffix=".png", dir=output_dir, delete=False) as temp_file:
-        native_path = temp_file.name
-    try:
-        _capture_native_screenshot(native_path, serial)
-        _refresh_preview_image(native_path, output_dir)
-        frame_hash = _average_hash_from_path(native_path)
-        if previous_hash and _hash_distance(previous_hash, frame_hash) < max(1, int(min_hash_distance)):
-            os.remove(native_path)
-            return previous_hash, None, None
-        file_name = f"screen_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.png"
-        file_path = os.path.join(output_dir, file_name)
-        _finalize_capture_from_native(native_path, file_path, target_size)
-        append_manifest(output_dir, file_name, "screen_change", -1, -1)
-        return frame_hash, file_name, file_path
-    except Exception:
+) -> tuple[Optional[tuple[int, int]], Optional[str], Optional[str]]:
+    """Uma amostra via ADB: hash em memoria e PNG so quando a tela mudou.
+
+    Devolve (hashes, nome, caminho) da captura salva, ou (None, None, None) sem mudanca.
+    """
+    image = _capture_device_image(serial)
+    _write_preview_image(image, output_dir)
+    hashes = _frame_hashes_from_image(image)
+    if previous_hash is not None and _hash_distance(previous_hash, hashes[0]) < max(1, int(min_hash_distance)):
+        return None, None, None
+    file_name, file_path = _save_screen_change_image(image, output_dir, target_size)
+    return hashes, file_name, file_path
+
+
+def _save_screen_change_image(
+    image: Image.Image,
+    output_dir: str,
+    target_size: tuple[int, int] | None,
+) -> tuple[str, str]:
+    file_name = f"screen_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.png"
+    file_path = os.path.join(output_dir, file_name)
+    _save_capture_image(image, file_path, target_size)
+    append_manifest(output_dir, file_name, "screen_change", -1, -1)
+    return file_name, file_path
+
+
+def _watch_frame_source(
+    output_dir: str,
+    frame_source: FrameSource,
+    target_size: tuple[int, int] | None,
+    results_path: str | None = None,
+    library_index: Optional[dict[str, Any]] = None,
+    cfg: Optional[ValidationConfig] = None,
+    min_hash_distance: int = SCREEN_CHANGE_HASH_THRESHOLD,
+) -> int:
+    """Consome frames em memoria; so frames com mudanca visual viram PNG, preview e comparacao."""
+    last_saved_hash: Optional[int] = None
+    saved = 0
+    while not should_stop(output_dir):
+        image = frame_source.read(timeout=max(0.5, SCREEN_WATCH_INTERVAL_S * 4))
+        if image is None:
+            if frame_source.closed():
+                break
+            continue
+        hashes = _frame_hashes_from_image(image)
+        if last_saved_hash is not None and _hash_distance(last_saved_hash, hashes[0]) < max(1, int(min_hash_distance)):
+            continue
         try:
-            if os.path.exists(native_path):
-                os.remove(native_path)
-        except OSError:
-            pass
-        raise
+            _write_preview_image(image, output_dir)
+            file_name, file_path = _save_screen_change_image(image, output_dir, target_size)
+        except Exception as exc:
+            log_message(f"falha ao salvar mudanca de tela: {exc}")
+            continue
+        last_saved_hash = hashes[0]
+        saved += 1
+        log_message(f"capturado {file_name} apos mudanca visual de tela")
+        _queue_compare_capture_if_configured(
+            file_name,
+            file_path,
+            results_path,
+            library_index,
+            cfg,
+            capture_source="screen_change",
+            hashes=hashes,
+        )
+    _flush_preview_png()
+    return saved
 
 
 def _capture_scrcpy_window_frame(
     output_dir: str,
     target_size: tuple[int, int] | None,
-    previous_hash: str,
+    previous_hash: Optional[int],
     min_hash_distance: int = SCREEN_CHANGE_HASH_THRESHOLD,
-) -> tuple[str, Optional[str], Optional[str]]:
+) -> tuple[Optional[int], Optional[str], Optional[str]]:
     if os.name != "nt" or USER32 is None:
         return previous_hash, None, None
     window_info = _find_scrcpy_window_info()
@@ -858,18 +1005,18 @@ def _capture_scrcpy_window_frame(
     if not hwnd or not bbox:
         return previous_hash, None, None
 
+    image = capture_window_client_image(hwnd)
+    if image is None:
+        return previous_hash, None, None
+    _write_preview_image(image, output_dir)
+    frame_hash = _average_hash_from_image(image)
+    if previous_hash is not None and _hash_distance(previous_hash, frame_hash) < max(1, int(min_hash_distance)):
+        return previous_hash, None, None
+
     with NamedTemporaryFile(prefix="scrcpy_watch_", suffix=".png", dir=output_dir, delete=False) as temp_file:
         temp_path = temp_file.name
     try:
-        image = capture_window_client_image(hwnd)
-        if image is None:
-            return previous_hash, None, None
-        image.save(temp_path)
-        _refresh_preview_image(temp_path, output_dir)
-        frame_hash = _average_hash_from_path(temp_path)
-        if previous_hash and _hash_distance(previous_hash, frame_hash) < max(1, int(min_hash_distance)):
-            os.remove(temp_path)
-            return previous_hash, None, None
+        image.save(temp_path, format="PNG")
         title_slug = re.sub(r"[^a-z0-9]+", "_", str(window_info.get("title") or "").strip().lower()).strip("_") or "scrcpy"
         file_name = f"{title_slug}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.png"
         file_path = os.path.join(output_dir, file_name)
@@ -892,7 +1039,7 @@ def _capture_scrcpy_window_output(
     y: int,
     target_size: tuple[int, int] | None = None,
     window_info: Optional[dict[str, Any]] = None,
-) -> tuple[str, str, str]:
+) -> tuple[str, str, tuple[int, int]]:
     if os.name != "nt" or USER32 is None:
         raise RuntimeError("captura direta do scrcpy disponivel apenas no Windows")
     window_info = window_info if isinstance(window_info, dict) and window_info.get("hwnd") else _find_scrcpy_window_info()
@@ -911,11 +1058,7 @@ def _capture_scrcpy_window_output(
     image = capture_window_client_image(hwnd)
     if image is None:
         raise RuntimeError("falha ao capturar a janela do scrcpy via PrintWindow")
-    preview_path = _preview_output_path(output_dir)
-    os.makedirs(os.path.dirname(preview_path), exist_ok=True)
-    temp_preview = f"{preview_path}.tmp"
-    image.save(temp_preview, format="PNG")
-    os.replace(temp_preview, preview_path)
+    _write_preview_image(image, output_dir)
     hmi_teste_path = _save_hmi_teste_capture(image, file_name, action_type, x, y)
     if target_size:
         width, height = int(target_size[0]), int(target_size[1])
@@ -925,8 +1068,7 @@ def _capture_scrcpy_window_output(
     image.save(file_path)
     append_manifest(output_dir, file_name, action_type, x, y)
     log_message(f"captura malagueta salva em {hmi_teste_path}")
-    frame_hash = _average_hash_from_path(file_path)
-    return file_name, file_path, frame_hash
+    return file_name, file_path, _frame_hashes_from_image(image)
 
 
 def _scrcpy_window_available() -> bool:
@@ -943,35 +1085,322 @@ def collect_screen_watch_screenshots(
     results_path: str | None = None,
     library_index: Optional[dict[str, Any]] = None,
     cfg: Optional[ValidationConfig] = None,
+    frame_source: str = SCREEN_WATCH_FRAME_SOURCE,
 ) -> None:
-    last_saved_hash = ""
-    log_message("monitorando mudancas reais de tela")
-    while not should_stop(output_dir):
+    source = build_frame_source(
+        frame_source,
+        adb_cmd(serial),
+        interval_s=SCREEN_WATCH_INTERVAL_S,
+        popen_kwargs=_run_kwargs(),
+        log=log_message,
+    )
+    log_message(f"monitorando mudancas reais de tela (fonte={source.name})")
+    try:
+        _watch_frame_source(output_dir, source, target_size, results_path, library_index, cfg)
+    finally:
+        source.close()
+
+
+class ScrcpyWindowCache:
+    """Resultado de `_find_scrcpy_window_info` reaproveitado ate expirar ou a janela sumir.
+
+    O EnumWindows percorre todas as janelas do desktop; no modo hibrido ele roda numa task
+    propria e quem captura ou desenha o preview so le o cache. Resultado negativo (sem
+    janela) tambem fica em cache pelo mesmo TTL.
+    """
+
+    def __init__(self, ttl_s: float = SCRCPY_WINDOW_CACHE_TTL_S, finder=None) -> None:
+        self.ttl_s = float(ttl_s)
+        self._finder = finder or _find_scrcpy_window_info
+        self._lock = threading.Lock()
+        self._info: dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self.lookups = 0
+
+    def _still_valid(self, info: dict[str, Any]) -> bool:
+        hwnd = info.get("hwnd")
+        return not hwnd or USER32 is None or bool(USER32.IsWindow(hwnd))
+
+    def peek(self) -> dict[str, Any]:
+        with self._lock:
+            return self._info
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def refresh(self) -> dict[str, Any]:
+        info = self._finder()
+        with self._lock:
+            self._info = info if isinstance(info, dict) else {}
+            self._fetched_at = time.monotonic()
+            self.lookups += 1
+            return self._info
+
+    def get(self) -> dict[str, Any]:
+        with self._lock:
+            info, fetched_at = self._info, self._fetched_at
+        if fetched_at and time.monotonic() - fetched_at < self.ttl_s and self._still_valid(info):
+            return info
+        return self.refresh()
+
+
+class _Win32ClickPoller:
+    """Borda de subida do botao esquerdo com o scrcpy em primeiro plano -> posicao do cursor.
+
+    `GetAsyncKeyState` e barato e roda a cada poll; a checagem de processo da janela em
+    primeiro plano so acontece no clique e e evitada quando o hwnd bate com o cache.
+    """
+
+    def __init__(self, window_cache: ScrcpyWindowCache) -> None:
+        self.window_cache = window_cache
+        self._prev_left_down = False
+
+    def __call__(self) -> Optional[tuple[int, int]]:
+        left_down = bool(USER32.GetAsyncKeyState(VK_LBUTTON) & 0x8000)
+        pressed = left_down and not self._prev_left_down
+        self._prev_left_down = left_down
+        if not pressed:
+            return None
+        hwnd = USER32.GetForegroundWindow()
+        if not hwnd or hwnd != self.window_cache.peek().get("hwnd"):
+            info = _foreground_window_info()
+            if not _is_scrcpy_foreground(info):
+                return None
+            self.window_cache.invalidate()
+            hwnd = info.get("hwnd")
+        return _pointer_position_in_window(hwnd)
+
+
+@dataclass
+class ClickEvent:
+    x: int
+    y: int
+    detected_at: float
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(math.ceil(fraction * len(ordered))) - 1))]
+
+
+class HybridCollector:
+    """Modo hibrido em asyncio: entrada, janela do scrcpy e captura em tasks separadas.
+
+    A task de entrada so le o mouse (sem I/O) e enfileira cliques com o instante da deteccao;
+    a task de captura roda `screencap`/comparacao em threads, entao um ADB lento nao
+    atrasa a deteccao do proximo clique. A latencia clique -> captura salva e registrada no
+    log e em `monitor_state.json` (chave `hybrid_latency`).
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        serial: str | None,
+        target_size: tuple[int, int] | None,
+        results_path: str | None = None,
+        library_index: Optional[dict[str, Any]] = None,
+        cfg: Optional[ValidationConfig] = None,
+        click_poller=None,
+        window_cache: Optional[ScrcpyWindowCache] = None,
+    ) -> None:
+        self.output_dir = output_dir
+        self.serial = serial
+        self.target_size = target_size
+        self.results_path = results_path
+        self.library_index = library_index
+        self.cfg = cfg
+        self.window_cache = window_cache if window_cache is not None else (ScrcpyWindowCache() if USER32 else None)
+        if click_poller is None and USER32 and self.window_cache is not None:
+            click_poller = _Win32ClickPoller(self.window_cache)
+        self.click_poller = click_poller
+        self.last_saved_hash: Optional[int] = None
+        self.latencies_s: deque[float] = deque(maxlen=CLICK_LATENCY_WINDOW)
+        self.clicks_detected = 0
+        self.clicks_captured = 0
+        self.clicks_coalesced = 0
+        self._clicks: Optional[asyncio.Queue] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    # ---------- tasks ----------
+    async def _watch_stop(self) -> None:
+        while not should_stop(self.output_dir):
+            await asyncio.sleep(0.1)
+        self._stopping.set()
+
+    async def _poll_input(self) -> None:
+        while True:
+            try:
+                position = self.click_poller()
+            except Exception as exc:
+                log_message(f"falha ao ler o mouse: {exc}")
+                position = None
+            if position is not None:
+                self.clicks_detected += 1
+                self._clicks.put_nowait(ClickEvent(int(position[0]), int(position[1]), time.monotonic()))
+            await asyncio.sleep(INPUT_POLL_INTERVAL_S)
+
+    async def _track_window(self) -> None:
+        last_hwnd = None
+        while True:
+            info = await asyncio.to_thread(self.window_cache.refresh)
+            hwnd = info.get("hwnd")
+            if hwnd != last_hwnd:
+                if hwnd:
+                    log_message(f"janela do scrcpy rastreada: '{str(info.get('title') or '')}'")
+                else:
+                    log_message("janela do scrcpy nao encontrada; seguindo apenas com ADB")
+                last_hwnd = hwnd
+            await asyncio.sleep(max(0.2, self.window_cache.ttl_s / 2.0))
+
+    async def _capture_loop(self) -> None:
+        next_scan_at = 0.0
+        while True:
+            # clique pendente tem prioridade sobre a varredura visual
+            timeout = max(0.0, next_scan_at - time.monotonic())
+            click: Optional[ClickEvent] = None
+            if not self._clicks.empty():
+                click = self._clicks.get_nowait()
+            elif timeout > 0:
+                try:
+                    click = await asyncio.wait_for(self._clicks.get(), timeout)
+                except asyncio.TimeoutError:
+                    click = None
+            if click is not None:
+                coalesced = 0
+                while not self._clicks.empty():
+                    click = self._clicks.get_nowait()
+                    coalesced += 1
+                self.clicks_coalesced += coalesced
+                delay = click.detected_at + HOST_CLICK_CAPTURE_DELAY_S - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await asyncio.to_thread(self._capture_click, click, coalesced)
+                continue
+            next_scan_at = time.monotonic() + SCREEN_WATCH_INTERVAL_S
+            await asyncio.to_thread(self._scan_screen_change)
+
+    # ---------- trabalho bloqueante (threads) ----------
+    def _window_info(self) -> Optional[dict[str, Any]]:
+        return self.window_cache.get() if self.window_cache is not None else None
+
+    def _capture_initial_state(self) -> None:
         try:
-            frame_hash, file_name, file_path = _capture_screen_change_frame(
-                output_dir,
-                serial,
-                target_size,
-                last_saved_hash,
+            file_name, _file_path, self.last_saved_hash = _capture_and_compare(
+                self.output_dir,
+                self.serial,
+                "initial_state",
+                -1,
+                -1,
+                self.target_size,
+                results_path=self.results_path,
+                library_index=self.library_index,
+                cfg=self.cfg,
             )
+            _refresh_preview_from_scrcpy_window(self.output_dir, self._window_info())
+            log_message(f"capturado {file_name} no estado inicial via ADB")
         except Exception as exc:
-            log_message(f"falha ao observar mudanca de tela: {exc}")
-            time.sleep(SCREEN_WATCH_INTERVAL_S)
-            continue
+            log_message(f"falha ao capturar estado inicial: {exc}")
+
+    def _capture_click(self, click: ClickEvent, coalesced: int = 0) -> None:
+        try:
+            preview_from_window = _refresh_preview_from_scrcpy_window(self.output_dir, self._window_info())
+            file_name, _file_path, self.last_saved_hash = _capture_and_compare(
+                self.output_dir,
+                self.serial,
+                "host_click",
+                click.x,
+                click.y,
+                self.target_size,
+                results_path=self.results_path,
+                library_index=self.library_index,
+                cfg=self.cfg,
+                refresh_preview=not preview_from_window,
+            )
+        except Exception as exc:
+            if self.window_cache is not None:
+                self.window_cache.invalidate()
+            log_message(f"falha ao capturar interacao do scrcpy: {exc}")
+            return
+        latency_s = time.monotonic() - click.detected_at
+        self.latencies_s.append(latency_s)
+        self.clicks_captured += 1
+        log_message(
+            f"capturado {file_name} apos interacao detectada no scrcpy via ADB "
+            f"(cursor={click.x},{click.y}; clique->captura {latency_s * 1000:.0f} ms"
+            + (f"; {coalesced} clique(s) agrupado(s)" if coalesced else "")
+            + ")"
+        )
+        self._export_latency()
 
-        if file_name and file_path:
-            last_saved_hash = frame_hash
-            log_message(f"capturado {file_name} apos mudanca visual de tela")
+    def _scan_screen_change(self) -> None:
+        try:
+            hashes, file_name, file_path = _capture_screen_change_frame(
+                self.output_dir,
+                self.serial,
+                self.target_size,
+                self.last_saved_hash,
+            )
+        except Exception as exc:
+            log_message(f"falha ao observar mudanca de tela no modo hibrido: {exc}")
+            return
+        if hashes and file_name and file_path:
+            self.last_saved_hash = hashes[0]
+            log_message(f"capturado {file_name} apos mudanca visual detectada")
             _queue_compare_capture_if_configured(
                 file_name,
                 file_path,
-                results_path,
-                library_index,
-                cfg,
+                self.results_path,
+                self.library_index,
+                self.cfg,
                 capture_source="screen_change",
+                hashes=hashes,
             )
 
-        time.sleep(SCREEN_WATCH_INTERVAL_S)
+    def latency_snapshot(self) -> dict[str, Any]:
+        values = list(self.latencies_s)
+        return {
+            "clicks_detected": self.clicks_detected,
+            "clicks_captured": self.clicks_captured,
+            "clicks_coalesced": self.clicks_coalesced,
+            "capture_delay_ms": round(HOST_CLICK_CAPTURE_DELAY_S * 1000.0, 1),
+            "last_ms": round(values[-1] * 1000.0, 1) if values else 0.0,
+            "p50_ms": round(_percentile(values, 0.50) * 1000.0, 1),
+            "p95_ms": round(_percentile(values, 0.95) * 1000.0, 1),
+            "max_ms": round(max(values) * 1000.0, 1) if values else 0.0,
+        }
+
+    def _export_latency(self) -> None:
+        try:
+            merge_state_file(_monitor_state_output_path(self.output_dir), "hybrid_latency", self.latency_snapshot())
+        except OSError as exc:
+            log_message(f"falha ao exportar latencia do modo hibrido: {exc}")
+
+    # ---------- ciclo ----------
+    async def run(self) -> None:
+        self._clicks = asyncio.Queue()
+        self._stopping = asyncio.Event()
+        tasks = [asyncio.create_task(self._watch_stop())]
+        if self.click_poller is not None:
+            tasks.append(asyncio.create_task(self._poll_input()))
+        if self.window_cache is not None and USER32:
+            tasks.append(asyncio.create_task(self._track_window()))
+        await asyncio.to_thread(self._capture_initial_state)
+        tasks.append(asyncio.create_task(self._capture_loop()))
+        try:
+            await self._stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self.clicks_captured:
+            snapshot = self.latency_snapshot()
+            log_message(
+                f"latencia clique->captura: p50={snapshot['p50_ms']:.0f} ms p95={snapshot['p95_ms']:.0f} ms "
+                f"max={snapshot['max_ms']:.0f} ms em {self.clicks_captured} captura(s)"
+            )
 
 
 def collect_hybrid_screenshots(
@@ -982,95 +1411,83 @@ def collect_hybrid_screenshots(
     library_index: Optional[dict[str, Any]] = None,
     cfg: Optional[ValidationConfig] = None,
 ) -> None:
-    last_saved_hash = ""
-    prev_left_down = False
-    pending_click: dict[str, Any] | None = None
-    next_visual_scan_at = 0.0
     log_message("monitorando em modo hibrido: cliques do scrcpy + mudancas visuais do radio via ADB")
+    collector = HybridCollector(
+        output_dir,
+        serial,
+        target_size,
+        results_path=results_path,
+        library_index=library_index,
+        cfg=cfg,
+    )
+    asyncio.run(collector.run())
 
-    try:
-        file_name, _file_path, last_saved_hash = _capture_and_compare(
-            output_dir,
-            serial,
-            "initial_state",
-            -1,
-            -1,
-            target_size,
-            results_path=results_path,
-            library_index=library_index,
-            cfg=cfg,
-        )
-        _refresh_preview_from_scrcpy_window(output_dir)
-        log_message(f"capturado {file_name} no estado inicial via ADB")
-    except Exception as exc:
-        log_message(f"falha ao capturar estado inicial: {exc}")
-
-    while not should_stop(output_dir):
-        now = time.time()
-
-        if USER32:
-            info = _foreground_window_info()
-            left_down = bool(USER32.GetAsyncKeyState(VK_LBUTTON) & 0x8000)
-            if _is_scrcpy_foreground(info) and left_down and not prev_left_down:
-                click_x, click_y = _pointer_position_in_window(info.get("hwnd"))
-                pending_click = {
-                    "capture_at": now + HOST_CLICK_CAPTURE_DELAY_S,
-                    "x": click_x,
-                    "y": click_y,
-                }
-                log_message(
-                    f"atividade scrcpy detectada; captura agendada em {HOST_CLICK_CAPTURE_DELAY_S:.2f}s "
-                    f"(cursor={click_x},{click_y})"
-                )
-            prev_left_down = left_down
-
-        if pending_click and now >= float(pending_click.get("capture_at", 0.0) or 0.0):
-            try:
-                preview_from_window = _refresh_preview_from_scrcpy_window(output_dir)
-                file_name, _file_path, last_saved_hash = _capture_and_compare(
-                    output_dir,
-                    serial,
-                    "host_click",
-                    int(pending_click.get("x", -1) or -1),
-                    int(pending_click.get("y", -1) or -1),
-                    target_size,
-                    results_path=results_path,
-                    library_index=library_index,
-                    cfg=cfg,
-                    refresh_preview=not preview_from_window,
-                )
-                log_message(f"capturado {file_name} apos interacao detectada no scrcpy via ADB")
-            except Exception as exc:
-                log_message(f"falha ao capturar interacao do scrcpy: {exc}")
-            pending_click = None
-
-        if now >= next_visual_scan_at:
-            next_visual_scan_at = now + SCREEN_WATCH_INTERVAL_S
-            try:
-                frame_hash, file_name, file_path = _capture_screen_change_frame(
-                    output_dir,
-                    serial,
-                    target_size,
-                    last_saved_hash,
-                )
-            except Exception as exc:
-                log_message(f"falha ao observar mudanca de tela no modo hibrido: {exc}")
-                time.sleep(0.12)
-                continue
 
-            if file_name and file_path:
-                last_saved_hash = frame_hash
-                log_message(f"capturado {file_name} apos mudanca visual detectada")
-                _queue_compare_capture_if_configured(
-                    file_name,
-                    file_path,
-                    results_path,
-                    library_index,
-                    cfg,
-                    capture_source="screen_change",
-                )
-
-        time.sleep(0.08 if pending_click else 0.12)
+def replay_recorded_frames(
+    output_dir: str,
+    replay_dir: str,
+    timing: ReplayTiming,
+    target_size: tuple[int, int] | None,
+    results_path: str | None = None,
+    library_index: Optional[dict[str, Any]] = None,
+    cfg: Optional[ValidationConfig] = None,
+    report_path: str = "",
+) -> dict[str, Any]:
+    """Reproduz uma pasta gravada pelo mesmo caminho do screen_watch e mede o pipeline.
+
+    Os frames passam pela deteccao de mudanca, pelo reaproveitamento de resultados e pelo
+    estagio de comparacao exatamente como no modo ao vivo; o relatorio traz frames/s,
+    percentis do atraso de comparacao e CPU/RSS do processo.
+    """
+    frames = load_replay_frames(replay_dir)
+    if not frames:
+        raise RuntimeError(f"nenhum frame gravado em {replay_dir}")
+    source = ReplayFrameSource(frames, timing)
+    cache_hits, cache_misses = RESULT_CACHE.hits, RESULT_CACHE.misses
+    log_message(f"replay de {len(frames)} frame(s) de {replay_dir} com perfil {timing.label()}")
+    meter = ResourceMeter().start()
+    started_at = time.monotonic()
+    saved = _watch_frame_source(
+        output_dir,
+        source.start(),
+        target_size,
+        results_path=results_path,
+        library_index=library_index,
+        cfg=cfg,
+    )
+    capture_elapsed = max(1e-9, time.monotonic() - started_at)
+    drained = COMPARE_STAGE.drain(REPLAY_DRAIN_TIMEOUT_S) if COMPARE_STAGE is not None else True
+    resources = meter.stop()
+    compare: dict[str, Any] = {}
+    if COMPARE_STAGE is not None:
+        compare = {**COMPARE_STAGE.snapshot(), **COMPARE_STAGE.lag_percentiles()}
+    report = {
+        "replay_dir": os.path.abspath(replay_dir),
+        "timing": timing.label(),
+        "frames_total": len(frames),
+        "frames_read": source.frames_read,
+        "frames_skipped": source.frames_skipped,
+        "frames_saved": saved,
+        "recorded_duration_s": round(frames[-1].offset_s, 3),
+        "capture_elapsed_s": round(capture_elapsed, 3),
+        "frames_per_s": round(source.frames_read / capture_elapsed, 2),
+        "compare_drained": drained,
+        "compare": compare,
+        "dedup": {"hits": RESULT_CACHE.hits - cache_hits, "misses": RESULT_CACHE.misses - cache_misses},
+        "resources": resources,
+        "finished_at": datetime.now().isoformat(),
+    }
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+    log_message(
+        f"replay concluido: {source.frames_read} frame(s) em {capture_elapsed:.2f}s "
+        f"({report['frames_per_s']:.1f} frames/s), {saved} mudanca(s), "
+        f"atraso p50={float(compare.get('p50_lag_s', 0.0)):.3f}s p95={float(compare.get('p95_lag_s', 0.0)):.3f}s, "
+        f"CPU {resources['cpu_percent']:.0f}% RSS {resources['rss_mb']:.0f} MB"
+    )
+    return report
 
 
 def collect_host_click_screenshots(
@@ -1111,7 +1528,7 @@ def collect_host_click_screenshots(
         return
 
     try:
-        file_name, file_path, _frame_hash = _capture_scrcpy_window_output(
+        file_name, file_path, hashes = _capture_scrcpy_window_output(
             output_dir,
             "initial_state",
             -1,
@@ -1126,6 +1543,7 @@ def collect_host_click_screenshots(
             library_index,
             cfg,
             capture_source="scrcpy_window",
+            hashes=hashes,
         )
         log_message(f"capturado {file_name} no estado inicial da janela '{target_title}'")
     except Exception as exc:
@@ -1148,7 +1566,7 @@ def collect_host_click_screenshots(
                 time.sleep(HOST_CLICK_CAPTURE_DELAY_S)
                 if should_stop(output_dir):
                     break
-                file_name, file_path, _frame_hash = _capture_scrcpy_window_output(
+                file_name, file_path, hashes = _capture_scrcpy_window_output(
                     output_dir,
                     "host_click",
                     click_x,
@@ -1165,6 +1583,7 @@ def collect_host_click_screenshots(
                     library_index,
                     cfg,
                     capture_source="host_click",
+                    hashes=hashes,
                 )
 
         prev_left_down = left_down
@@ -1260,7 +1679,7 @@ def collect_touch_screenshots(
                     action_type = "long_press"
 
                 time.sleep(SCREENSHOT_DELAY_S)
-                file_name, file_path = _capture_output_frame(
+                file_name, file_path, hashes = _capture_output_frame(
                     output_dir,
                     serial,
                     action_type,
@@ -1276,6 +1695,7 @@ def collect_touch_screenshots(
                     library_index,
                     cfg,
                     capture_source=action_type,
+                    hashes=hashes,
                 )
 
         finally:
@@ -1291,32 +1711,82 @@ def collect_touch_screenshots(
 
 
 def main() -> None:
+    global COMPARE_STAGE, PREVIEW_CHANNEL
     parser = argparse.ArgumentParser()
     parser.add_argument("--serial", default=None)
     parser.add_argument("--output-dir", required=True)
-    parser.add_argument("--monitor-mode", choices=("auto", "hybrid", "device", "host_click", "screen_watch"), default="auto")
+    parser.add_argument(
+        "--monitor-mode",
+        choices=("auto", "hybrid", "device", "host_click", "screen_watch", "replay"),
+        default="auto",
+    )
     parser.add_argument("--index-path", default="")
     parser.add_argument("--results-path", default="")
     parser.add_argument("--target-width", type=int, default=0)
     parser.add_argument("--target-height", type=int, default=0)
+    parser.add_argument("--frame-source", choices=FRAME_SOURCE_KINDS, default=SCREEN_WATCH_FRAME_SOURCE)
+    parser.add_argument("--compare-workers", type=int, default=COMPARE_WORKERS_DEFAULT)
+    parser.add_argument("--compare-queue", type=int, default=COMPARE_QUEUE_LIMIT)
+    parser.add_argument("--retention", default=OUTPUT_RETENTION_SPEC, help="desligada por padrao; ex.: files=5000,mb=500,hours=24,archive=1")
+    parser.add_argument("--hmi-teste-retention", default=HMI_TESTE_RETENTION_SPEC)
+    parser.add_argument("--replay-dir", default="", help="pasta gravada (ex.: Data/HMI_TESTE) para o modo replay")
+    parser.add_argument("--replay-timing", default=REPLAY_TIMING_DEFAULT, help="recorded, max ou fps=<n>")
+    parser.add_argument("--replay-speed", type=float, default=1.0)
+    parser.add_argument("--replay-report", default="")
+    parser.add_argument(
+        "--replay-output-dir",
+        default="",
+        help="capturas do replay (padrao: <pasta-mae de --output-dir>/replay/<timestamp>/)",
+    )
     args = parser.parse_args()
+    replay_timing: Optional[ReplayTiming] = None
+    if args.monitor_mode == "replay":
+        if not str(args.replay_dir or "").strip():
+            parser.error("--replay-dir e obrigatorio no modo replay")
+        try:
+            replay_timing = ReplayTiming.parse(args.replay_timing, args.replay_speed)
+        except ValueError as exc:
+            parser.error(str(exc))
+        args.output_dir = _replay_output_dir(args.output_dir, str(args.replay_output_dir or "").strip())
 
     os.makedirs(args.output_dir, exist_ok=True)
-    screen_res = get_resolution(args.serial)
-    dev_path = autodetect_touch_device(args.serial)
-    abs_ranges = get_abs_ranges_for_device(dev_path, args.serial)
+    PREVIEW_CHANNEL = PreviewChannelWriter(preview_channel_path(os.path.dirname(args.output_dir)))
+    atexit.register(PREVIEW_CHANNEL.close)
+    atexit.register(_flush_preview_png)
+    _configure_retention(args.output_dir, args.retention)
+    _configure_retention(_hmi_teste_output_dir(), args.hmi_teste_retention)
+    if replay_timing is not None:
+        screen_res, dev_path, abs_ranges = DEFAULT_RES, "", {}
+    else:
+        screen_res = get_resolution(args.serial)
+        dev_path = autodetect_touch_device(args.serial)
+        abs_ranges = get_abs_ranges_for_device(dev_path, args.serial)
     target_size = None
     if int(args.target_width or 0) > 0 and int(args.target_height or 0) > 0:
         target_size = (int(args.target_width), int(args.target_height))
-    results_path = str(args.results_path or "").strip() or os.path.join(os.path.dirname(args.output_dir), "results.json")
+    results_path = str(args.results_path or "").strip() or os.path.join(os.path.dirname(args.output_dir), RESULTS_DB_NAME)
     library_index: Optional[dict[str, Any]] = None
     compare_cfg: Optional[ValidationConfig] = None
     if str(args.index_path or "").strip():
         try:
             library_index = load_library_index(str(args.index_path).strip())
             compare_cfg = _build_lookup_cfg()
-            _save_json_dict(results_path, _load_json_dict(results_path) or _default_results_payload())
-            log_message(f"comparacao automatica habilitada com biblioteca {args.index_path}")
+            _results_store(results_path).count()
+            COMPARE_STAGE = CompareStage(
+                on_result=partial(_store_compare_result, results_path),
+                workers=args.compare_workers,
+                queue_limit=args.compare_queue,
+                index_path=str(args.index_path).strip(),
+                library_index=library_index,
+                cfg=compare_cfg,
+                use_processes=int(args.compare_workers) > 1,
+                state_path=_monitor_state_output_path(args.output_dir),
+                log=log_message,
+            )
+            log_message(
+                f"comparacao automatica habilitada com biblioteca {args.index_path} "
+                f"({COMPARE_STAGE.workers} worker(s) em {COMPARE_STAGE.mode})"
+            )
         except Exception as exc:
             log_message(f"falha ao carregar biblioteca para comparacao automatica: {exc}")
             library_index = None
@@ -1332,7 +1802,19 @@ def main() -> None:
             f"normalizando capturas de {screen_res[0]}x{screen_res[1]} "
             f"para {int(target_size[0])}x{int(target_size[1])}"
         )
-    if args.monitor_mode == "hybrid":
+    if replay_timing is not None:
+        replay_recorded_frames(
+            args.output_dir,
+            str(args.replay_dir).strip(),
+            replay_timing,
+            target_size,
+            results_path=results_path,
+            library_index=library_index,
+            cfg=compare_cfg,
+            report_path=str(args.replay_report or "").strip()
+            or os.path.join(os.path.dirname(args.output_dir), REPLAY_REPORT_NAME),
+        )
+    elif args.monitor_mode == "hybrid":
         collect_hybrid_screenshots(
             args.output_dir,
             args.serial,
@@ -1349,6 +1831,7 @@ def main() -> None:
             results_path=results_path,
             library_index=library_index,
             cfg=compare_cfg,
+            frame_source=args.frame_source,
         )
     elif args.monitor_mode == "host_click":
         collect_host_click_screenshots(
@@ -1401,6 +1884,10 @@ def main() -> None:
                 library_index=library_index,
                 cfg=compare_cfg,
             )
+    if COMPARE_STAGE is not None:
+        COMPARE_STAGE.close()
+    for store in RESULTS_STORES.values():
+        store.close()
     log_message("monitor finalizado")
 
 
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import io
+import struct
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+from PIL import Image
+
+try:
+    import av  # type: ignore
+except Exception:  # pragma: no cover - dependencia opcional
+    av = None
+
+
+FRAME_SOURCE_KINDS = ("stream", "h264", "poll")
+RAW_HEADER_SIZES = (12, 16)
+STREAM_RESTART_DELAY_S = 1.0
+PROBE_TIMEOUT_S = 8.0
+
+# android.graphics.PixelFormat -> (bytes por pixel, modo PIL de origem)
+RAW_PIXEL_FORMATS: dict[int, tuple[int, str]] = {
+    1: (4, "RGBA"),  # RGBA_8888
+    2: (4, "RGBX"),  # RGBX_8888
+    3: (3, "RGB"),  # RGB_888
+    4: (2, "BGR;16"),  # RGB_565
+    5: (4, "BGRA"),  # BGRA_8888
+}
+
+
+def _pixel_format(fmt: int) -> tuple[int, str]:
+    try:
+        return RAW_PIXEL_FORMATS[int(fmt)]
+    except KeyError:
+        raise ValueError(f"formato de pixel do screencap nao suportado: {fmt}") from None
+
+
+def detect_raw_header_size(sample: bytes) -> int:
+    """Descobre o tamanho do cabecalho do `screencap` bruto (12 bytes ate Android 8, 16 com colorspace)."""
+    if len(sample) < 12:
+        raise ValueError("amostra do screencap curta demais")
+    width, height, fmt = struct.unpack_from("<III", sample, 0)
+    bpp, _ = _pixel_format(fmt)
+    extra = len(sample) - width * height * bpp
+    if extra not in RAW_HEADER_SIZES:
+        raise ValueError(f"tamanho inesperado do screencap bruto: {len(sample)} bytes para {width}x{height}")
+    return extra
+
+
+def _read_exact(stream: Any, size: int) -> bytes | None:
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def raw_frame_to_image(width: int, height: int, fmt: int, payload: bytes) -> Image.Image:
+    _, raw_mode = _pixel_format(fmt)
+    if raw_mode == "RGB":
+        return Image.frombuffer("RGB", (width, height), payload, "raw", "RGB", 0, 1)
+    if raw_mode == "BGR;16":
+        return Image.frombuffer("RGB", (width, height), payload, "raw", raw_mode, 0, 1)
+    return Image.frombuffer("RGBA", (width, height), payload, "raw", raw_mode, 0, 1).convert("RGB")
+
+
+def read_raw_frame(stream: Any, header_size: int = 16) -> Image.Image | None:
+    """Le um frame `screencap` bruto (cabecalho + pixels) do pipe. Retorna None no fim do stream."""
+    header = _read_exact(stream, header_size)
+    if header is None:
+        return None
+    width, height, fmt = struct.unpack_from("<III", header, 0)
+    bpp, _ = _pixel_format(fmt)
+    payload = _read_exact(stream, width * height * bpp)
+    if payload is None:
+        return None
+    return raw_frame_to_image(width, height, fmt, payload)
+
+
+def capture_screencap_image(adb_prefix: list[str], popen_kwargs: Optional[dict] = None) -> Image.Image:
+    """Um `screencap -p` decodificado direto do pipe, sem passar por arquivo."""
+    proc = subprocess.run(
+        list(adb_prefix) + ["exec-out", "screencap", "-p"],
+        capture_output=True,
+        timeout=PROBE_TIMEOUT_S,
+        check=True,
+        **dict(popen_kwargs or {}),
+    )
+    with Image.open(io.BytesIO(proc.stdout)) as image:
+        return image.convert("RGB")
+
+
+class FrameSource(ABC):
+    """Fonte de frames em memoria para o modo screen_watch.
+
+    `read(timeout)` devolve o frame mais recente ainda nao entregue, ou None se nenhum
+    frame novo chegou no prazo. Frames intermediarios podem ser descartados: quem consome
+    so precisa do estado atual da tela.
+    """
+
+    name = "base"
+
+    def start(self) -> "FrameSource":
+        return self
+
+    @abstractmethod
+    def read(self, timeout: float = 1.0) -> Image.Image | None:
+        pass
+
+    def closed(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        return None
+
+    def __enter__(self) -> "FrameSource":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class _LatestFrameSource(FrameSource):
+    """Base com thread produtora e um slot com o ultimo frame (sem fila acumulando atraso)."""
+
+    def __init__(self, log: Optional[Callable[[str], None]] = None) -> None:
+        self._log = log or (lambda message: None)
+        self._cond = threading.Condition()
+        self._frame: Image.Image | None = None
+        self._seq = 0
+        self._delivered = 0
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        self.frames_received = 0
+
+    def start(self) -> "_LatestFrameSource":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"frame-source-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _publish(self, frame: Image.Image) -> None:
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self.frames_received += 1
+            self._cond.notify_all()
+
+    def read(self, timeout: float = 1.0) -> Image.Image | None:
+        deadline = time.monotonic() + max(0.0, float(timeout))
+        with self._cond:
+            while self._seq == self._delivered and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(timeout=remaining)
+            if self._seq == self._delivered:
+                return None
+            self._delivered = self._seq
+            return self._frame
+
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while not self._closed:
+            try:
+                self._produce()
+            except Exception as exc:
+                if not self._closed:
+                    self._log(f"fonte de frames {self.name} interrompida: {exc}")
+            if not self._closed:
+                time.sleep(STREAM_RESTART_DELAY_S)
+
+    @abstractmethod
+    def _produce(self) -> None:
+        pass
+
+
+class _ProcessFrameSource(_LatestFrameSource):
+    def __init__(self, adb_prefix: list[str], popen_kwargs: Optional[dict] = None, log=None) -> None:
+        super().__init__(log=log)
+        self.adb_prefix = list(adb_prefix)
+        self.popen_kwargs = dict(popen_kwargs or {})
+        self._proc: subprocess.Popen | None = None
+
+    def _spawn(self, args: list[str]) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            self.adb_prefix + args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            **self.popen_kwargs,
+        )
+        self._proc = proc
+        return proc
+
+    def _reap(self, proc: subprocess.Popen) -> None:
+        if proc.poll() is None:
+            proc.kill()
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
+        if proc.stdout is not None:
+            proc.stdout.close()
+
+    def close(self) -> None:
+        super().close()
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+
+class AdbStreamFrameSource(_ProcessFrameSource):
+    """Um unico `adb exec-out` com laco de `screencap` bruto no aparelho, lido de um pipe.
+
+    Evita um spawn de adb, um encode PNG no aparelho e um decode no host por amostra.
+    """
+
+    name = "stream"
+
+    def __init__(self, adb_prefix: list[str], interval_s: float = 0.25, popen_kwargs=None, log=None) -> None:
+        super().__init__(adb_prefix, popen_kwargs=popen_kwargs, log=log)
+        self.interval_s = max(0.0, float(interval_s))
+        self.header_size: int | None = None
+
+    def probe(self) -> int:
+        proc = subprocess.run(
+            self.adb_prefix + ["exec-out", "screencap"],
+            capture_output=True,
+            timeout=PROBE_TIMEOUT_S,
+            check=True,
+            **self.popen_kwargs,
+        )
+        self.header_size = detect_raw_header_size(proc.stdout)
+        return self.header_size
+
+    def device_loop_command(self) -> str:
+        # sleep fracionario existe no toybox; em toolbox antigo cai para 1 s em vez de girar sem pausa.
+        interval = f"{self.interval_s:.3f}".rstrip("0").rstrip(".") or "0"
+        return f"while true; do screencap; sleep {interval} 2>/dev/null || sleep 1; done"
+
+    def start(self) -> "AdbStreamFrameSource":
+        if self.header_size is None:
+            self.probe()
+        return super().start()
+
+    def _produce(self) -> None:
+        proc = self._spawn(["exec-out", self.device_loop_command()])
+        try:
+            while not self._closed:
+                frame = read_raw_frame(proc.stdout, self.header_size or 16)
+                if frame is None:
+                    raise RuntimeError("pipe do screencap encerrado")
+                self._publish(frame)
+        finally:
+            self._reap(proc)
+
+
+class ScreenrecordH264FrameSource(_ProcessFrameSource):
+    """Alternativa opcional: H.264 do `screenrecord` decodificado com PyAV.
+
+    Menos banda que o bruto, mas depende do encoder do aparelho e do pacote `av`.
+    O screenrecord encerra sozinho apos ~3 min; o laco da base reabre o pipe.
+    """
+
+    name = "h264"
+
+    def __init__(self, adb_prefix: list[str], interval_s: float = 0.25, bit_rate: int = 8_000_000, popen_kwargs=None, log=None) -> None:
+        super().__init__(adb_prefix, popen_kwargs=popen_kwargs, log=log)
+        self.interval_s = max(0.0, float(interval_s))
+        self.bit_rate = int(bit_rate)
+
+    @staticmethod
+    def available() -> bool:
+        return av is not None
+
+    def start(self) -> "ScreenrecordH264FrameSource":
+        if av is None:
+            raise RuntimeError("PyAV (pacote 'av') nao instalado")
+        return super().start()
+
+    def _produce(self) -> None:
+        proc = self._spawn(
+            ["exec-out", "screenrecord", "--output-format=h264", f"--bit-rate={self.bit_rate}", "-"]
+        )
+        try:
+            container = av.open(proc.stdout, format="h264", mode="r")
+            last_publish = 0.0
+            for packet_frame in container.decode(video=0):
+                if self._closed:
+                    break
+                now = time.monotonic()
+                if now - last_publish < self.interval_s:
+                    continue
+                last_publish = now
+                self._publish(packet_frame.to_image().convert("RGB"))
+            container.close()
+        finally:
+            self._reap(proc)
+
+
+class PollingFrameSource(_LatestFrameSource):
+    """Fallback: um `screencap -p` por amostra, decodificado em memoria (sem arquivo temporario)."""
+
+    name = "poll"
+
+    def __init__(self, adb_prefix: list[str], interval_s: float = 0.25, popen_kwargs=None, log=None) -> None:
+        super().__init__(log=log)
+        self.adb_prefix = list(adb_prefix)
+        self.interval_s = max(0.0, float(interval_s))
+        self.popen_kwargs = dict(popen_kwargs or {})
+
+    def capture(self) -> Image.Image:
+        return capture_screencap_image(self.adb_prefix, self.popen_kwargs)
+
+    def _produce(self) -> None:
+        while not self._closed:
+            started = time.monotonic()
+            self._publish(self.capture())
+            elapsed = time.monotonic() - started
+            if elapsed < self.interval_s:
+                time.sleep(self.interval_s - elapsed)
+
+
+def build_frame_source(
+    kind: str,
+    adb_prefix: list[str],
+    interval_s: float = 0.25,
+    popen_kwargs: Optional[dict] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> FrameSource:
+    """Cria e inicia a fonte pedida, caindo para `poll` se a escolhida nao puder iniciar."""
+    log = log or (lambda message: None)
+    kind = str(kind or "stream").strip().lower()
+    if kind not in FRAME_SOURCE_KINDS:
+        raise ValueError(f"fonte de frames desconhecida: {kind}")
+    candidates: list[type[_LatestFrameSource]] = []
+    if kind == "h264":
+        candidates.append(ScreenrecordH264FrameSource)
+    if kind in ("h264", "stream"):
+        candidates.append(AdbStreamFrameSource)
+    candidates.append(PollingFrameSource)
+    for factory in candidates:
+        source = factory(adb_prefix, interval_s=interval_s, popen_kwargs=popen_kwargs, log=log)
+        try:
+            return source.start()
+        except Exception as exc:
+            source.close()
+            if factory is PollingFrameSource:
+                raise
+            log(f"fonte de frames {factory.name} indisponivel ({exc}); tentando alternativa")
+    raise RuntimeError("nenhuma fonte de frames disponivel")
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+
+from app.shared.project_paths import root_path
+
+
+CONTROL_DIR = root_path("Data", "runner_control")
+CONTROL_COMMANDS = ("pause", "resume", "stop", "step", "status")
+CLIENT_TIMEOUT_S = 2.0
+
+
+def _safe_name(value: str | None) -> str:
+    text = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in str(value or "").strip())
+    return text or "default"
+
+
+def endpoint_path(serial: str | None, role: str = "runner", control_dir: str | None = None) -> str:
+    return os.path.join(control_dir or CONTROL_DIR, f"{_safe_name(role)}_{_safe_name(serial)}.json")
+
+
+class RunnerControl:
+    """Canal de controle por execucao: socket TCP local (127.0.0.1) por serial e papel.
+
+    O processo controlado publica `Data/runner_control/<papel>_<serial>.json` com a porta
+    e um token. Comandos chegam como uma linha JSON e tem efeito imediato. Os arquivos
+    pause.flag/stop.flag continuam valendo como fallback, consultados com baixa frequencia.
+    """
+
+    def __init__(
+        self,
+        serial: str | None,
+        role: str = "runner",
+        pause_flag: str | None = None,
+        stop_flag: str | None = None,
+        flag_poll_s: float = 0.5,
+        control_dir: str | None = None,
+    ) -> None:
+        self.serial = serial
+        self.role = role
+        self.pause_flag = pause_flag
+        self.stop_flag = stop_flag
+        self.flag_poll_s = float(flag_poll_s)
+        self.endpoint = endpoint_path(serial, role, control_dir)
+        self._token = secrets.token_hex(8)
+        self._cond = threading.Condition()
+        self._paused = False
+        self._stop = False
+        self._steps = 0
+        self._last_flag_check = 0.0
+        self._flag_paused = False
+        self._flag_stop = False
+        self._sock: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+
+    # ---------- ciclo de vida ----------
+    def start(self) -> "RunnerControl":
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(("127.0.0.1", 0))
+            sock.listen(4)
+        except OSError:
+            return self
+        self._sock = sock
+        self._thread = threading.Thread(target=self._serve, name=f"runner-control-{self.role}", daemon=True)
+        self._thread.start()
+        os.makedirs(os.path.dirname(self.endpoint), exist_ok=True)
+        payload = {
+            "port": sock.getsockname()[1],
+            "token": self._token,
+            "pid": os.getpid(),
+            "serial": self.serial,
+            "role": self.role,
+        }
+        tmp_path = f"{self.endpoint}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+        os.replace(tmp_path, self.endpoint)
+        return self
+
+    def close(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        try:
+            with open(self.endpoint, "r", encoding="utf-8") as handle:
+                owner = json.load(handle).get("pid")
+            if owner == os.getpid():
+                os.remove(self.endpoint)
+        except (OSError, ValueError):
+            pass
+        with self._cond:
+            self._cond.notify_all()
+
+    def __enter__(self) -> "RunnerControl":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ---------- estado ----------
+    def apply(self, command: str) -> dict:
+        command = str(command or "").strip().lower()
+        with self._cond:
+            if command == "pause":
+                # Steps pedidos antes da pausa nao podem liberar acoes da nova pausa.
+                self._paused = True
+                self._steps = 0
+            elif command == "resume":
+                self._paused = False
+                self._steps = 0
+            elif command == "stop":
+                self._stop = True
+            elif command == "step":
+                self._steps += 1
+            elif command != "status":
+                return {"ok": False, "error": f"comando desconhecido: {command}"}
+            self._cond.notify_all()
+            return {"ok": True, **self._state_locked()}
+
+    def _state_locked(self) -> dict:
+        return {"paused": self._paused or self._flag_paused, "stop": self._stop or self._flag_stop, "steps": self._steps}
+
+    def _refresh_flags(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_flag_check < self.flag_poll_s:
+            return
+        self._last_flag_check = now
+        self._flag_paused = bool(self.pause_flag and os.path.exists(self.pause_flag))
+        self._flag_stop = bool(self.stop_flag and os.path.exists(self.stop_flag))
+
+    def stop_requested(self) -> bool:
+        """Checagem barata para loops quentes: memoria sempre, arquivo no maximo a cada flag_poll_s."""
+        if self._stop:
+            return True
+        self._refresh_flags()
+        return self._flag_stop
+
+    def paused(self) -> bool:
+        self._refresh_flags()
+        return self._paused or self._flag_paused
+
+    def wait_if_paused(self, on_wait=None) -> bool:
+        """Bloqueia enquanto pausado. Retorna False se um stop chegou durante a espera.
+
+        Um `step` libera exatamente uma passagem e mantem a execucao pausada.
+        """
+        notified = False
+        with self._cond:
+            while True:
+                self._refresh_flags(force=True)
+                if self._stop or self._flag_stop:
+                    return False
+                if not (self._paused or self._flag_paused):
+                    return True
+                if self._steps > 0:
+                    self._steps -= 1
+                    return True
+                if on_wait is not None and not notified:
+                    on_wait()
+                    notified = True
+                self._cond.wait(timeout=self.flag_poll_s)
+
+    # ---------- servidor ----------
+    def _serve(self) -> None:
+        while self._sock is not None:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            with conn:
+                conn.settimeout(CLIENT_TIMEOUT_S)
+                try:
+                    raw = conn.makefile("r", encoding="utf-8").readline()
+                    request = json.loads(raw or "{}")
+                    if request.get("token") != self._token:
+                        response = {"ok": False, "error": "token invalido"}
+                    else:
+                        response = self.apply(request.get("command", ""))
+                    conn.sendall((json.dumps(response) + "\n").encode("utf-8"))
+                except (OSError, ValueError):
+                    continue
+
+
+def send_command(
+    command: str,
+    serial: str | None = None,
+    role: str = "runner",
+    timeout: float = CLIENT_TIMEOUT_S,
+    control_dir: str | None = None,
+) -> list[dict]:
+    """Envia um comando para o(s) processo(s) do papel informado.
+
+    Sem serial, envia para todas as execucoes ativas daquele papel. Retorna uma
+    resposta por endpoint alcancado; lista vazia significa "use os arquivos de flag".
+    """
+    if serial:
+        endpoints = [endpoint_path(serial, role, control_dir)]
+    else:
+        endpoints = sorted(glob.glob(os.path.join(control_dir or CONTROL_DIR, f"{_safe_name(role)}_*.json")))
+
+    responses: list[dict] = []
+    for path in endpoints:
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                info = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        try:
+            with socket.create_connection(("127.0.0.1", int(info["port"])), timeout=timeout) as conn:
+                conn.settimeout(timeout)
+                message = {"command": command, "token": info.get("token")}
+                conn.sendall((json.dumps(message) + "\n").encode("utf-8"))
+                reply = conn.makefile("r", encoding="utf-8").readline()
+            response = json.loads(reply or "{}")
+        except ConnectionRefusedError:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        except (OSError, ValueError, KeyError):
+            continue
+        response["serial"] = info.get("serial")
+        responses.append(response)
+    return responses
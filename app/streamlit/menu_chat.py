@@ -40,6 +40,7 @@ from typing import TypedDict
 from colorama import Fore, Style
 from app.shared.project_paths import project_root, root_path
 from app.shared.adb_utils import resolve_adb_path
+from app.shared.runner_control import send_command as _send_runner_command
 from app.shared import ui_theme as _ui_theme
 
 apply_dark_background = _ui_theme.apply_dark_background
@@ -3155,8 +3156,10 @@ def listar_testes(categoria):
 
 def pausar_execucao():
     """
-    Cria o arquivo pause.flag para pausar a execucao em andamento.
+    Pausa a execucao via canal de controle; sem runner alcancavel, cria pause.flag.
     """
+    if _send_runner_command("pause"):
+        return "Execucao pausada."
     try:
         with open(PAUSE_FLAG_PATH, "w") as f:
             f.write("PAUSED")
@@ -3166,21 +3169,36 @@ def pausar_execucao():
 
 def retomar_execucao():
     """
-    Remove o arquivo pause.flag, permitindo continuar a execucao.
+    Retoma via canal de controle e remove o pause.flag de fallback, se existir.
     """
+    respostas = _send_runner_command("resume")
     try:
         if os.path.exists(PAUSE_FLAG_PATH):
             os.remove(PAUSE_FLAG_PATH)
             return "Execucao retomada."
-        else:
-            return "Aviso: nenhuma execucao estava pausada."
+        if respostas:
+            return "Execucao retomada."
+        return "Aviso: nenhuma execucao estava pausada."
     except Exception as e:
         return f"ERRO: falha ao retomar execucao: {e}"
 
+def avancar_passo_execucao():
+    """
+    Com a execucao pausada, libera exatamente uma acao.
+    """
+    respostas = _send_runner_command("step")
+    if not respostas:
+        return "Aviso: nenhuma execucao ativa aceitou o comando de passo."
+    if not any(item.get("paused") for item in respostas):
+        return "Aviso: a execucao nao esta pausada; o passo sera ignorado ate a proxima pausa."
+    return "Executando proxima acao."
+
 def parar_execucao():
     """
-    Cria o arquivo stop.flag para parar completamente o runner.
+    Para o runner via canal de controle; sem runner alcancavel, cria stop.flag.
     """
+    if _send_runner_command("stop"):
+        return "Execucao interrompida completamente."
     stop_path = os.path.join(PROJECT_ROOT, "stop.flag")
     try:
         with open(stop_path, "w") as f:
@@ -3788,6 +3806,9 @@ def interpretar_comando(comando: str) -> str:
             return "Aviso: especifique o teste para resetar (ex: `reset geral_1 na bancada 1`)."
 
     # 8) CONTROLE DE EXECUÃ‡ÃƒO (pausar, retomar, parar)
+    if any(_norm(p) in texto_norm for p in ["proximo passo", "avancar passo", "step"]):
+        return avancar_passo_execucao()
+
     if any(_norm(p) in texto_norm for p in ["pausar", "pause", "parar teste", "interromper", "stop"]):
         return pausar_execucao()
 
@@ -19,6 +19,7 @@ from streamlit_autorefresh import st_autorefresh
 from datetime import datetime
 from app.shared.project_paths import project_root, root_path
 from app.shared.adb_utils import resolve_adb_path
+from app.shared.runner_control import send_command as _send_runner_command
 from app.shared import ui_theme as _ui_theme
 
 apply_dark_background = _ui_theme.apply_dark_background
@@ -721,6 +722,22 @@ def _iniciar_execucoes_configuradas(execucoes):
 
 
 
+def _comando_execucoes_ativas(comando):
+
+    respostas = []
+
+    for item in st.session_state.get("execucao_unica_processos") or []:
+
+        serial = str(item.get("serial") or "").strip()
+
+        if serial:
+
+            respostas.extend(_send_runner_command(comando, serial))
+
+    return respostas
+
+
+
 def _iniciar_execucoes_teste_unico(categoria_exec, nome_teste_exec, seriais):
 
     seriais_validos = [str(serial).strip() for serial in seriais if str(serial).strip()]
@@ -871,9 +888,11 @@ with col2:
 
             try:
 
-                with open(STOP_FLAG_PATH, "w") as f:
+                if not _send_runner_command("stop", serial_sel or None, role="coletor"):
 
-                    f.write("stop")
+                    with open(STOP_FLAG_PATH, "w") as f:
+
+                        f.write("stop")
 
                 st.warning("Toque na tela do rádio para capturar o print final...")
 
@@ -1370,9 +1389,11 @@ with col_b:
 
             if st.button("Pausar Teste", key="pause_teste", use_container_width=True):
 
-                with open(os.path.join(BASE_DIR, "pause.flag"), "w") as f:
+                if not _comando_execucoes_ativas("pause"):
+
+                    with open(os.path.join(BASE_DIR, "pause.flag"), "w") as f:
 
-                    f.write("pause")
+                        f.write("pause")
 
                 st.session_state["teste_pausado"] = True
 
@@ -1386,6 +1407,8 @@ with col_b:
 
             if st.button("Retomar Teste", key="resume_teste", use_container_width=True):
 
+                _comando_execucoes_ativas("resume")
+
                 pause_path = os.path.join(BASE_DIR, "pause.flag")
 
                 if os.path.exists(pause_path):
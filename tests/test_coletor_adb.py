@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import queue
+
+from Scripts.coletor_adb import GestureParser, capture_worker, parse_getevent_line
+
+
+RANGES = {
+    "ABS_X": {"min": 0, "max": None},
+    "ABS_Y": {"min": 0, "max": None},
+    "ABS_MT_POSITION_X": {"min": 0, "max": 1919},
+    "ABS_MT_POSITION_Y": {"min": 0, "max": 1079},
+}
+
+
+def _touch(t0, t1, start, end):
+    return [
+        f"[{t0:>14.6f}] EV_KEY       BTN_TOUCH            DOWN",
+        f"[{t0:>14.6f}] EV_ABS       ABS_MT_POSITION_X    {start[0]:08x}",
+        f"[{t0:>14.6f}] EV_ABS       ABS_MT_POSITION_Y    {start[1]:08x}",
+        f"[{t1:>14.6f}] EV_ABS       ABS_MT_POSITION_X    {end[0]:08x}",
+        f"[{t1:>14.6f}] EV_ABS       ABS_MT_POSITION_Y    {end[1]:08x}",
+        f"[{t1:>14.6f}] EV_KEY       BTN_TOUCH            UP",
+    ]
+
+
+def test_parse_getevent_line_accepts_device_prefix():
+    line = "[  123.456789] /dev/input/event2: EV_ABS       ABS_MT_TRACKING_ID   ffffffff"
+    assert parse_getevent_line(line) == (123.456789, "EV_ABS", "ABS_MT_TRACKING_ID", "ffffffff")
+    assert parse_getevent_line("add device 1: /dev/input/event2") is None
+
+
+def test_gesture_durations_come_from_kernel_timestamps():
+    parser = GestureParser((1920, 1080), RANGES)
+    lines = _touch(100.0, 100.120, (500, 300), (502, 301)) + _touch(100.2, 101.4, (800, 600), (800, 600))
+    lines += _touch(102.0, 102.250, (100, 500), (900, 500))
+
+    actions = [action for action in (parser.feed(line) for line in lines) if action]
+
+    assert actions[0] == {"tipo": "tap", "x": 500, "y": 300, "duracao_s": 0.12}
+    assert actions[1]["tipo"] == "long_press"
+    assert actions[1]["duracao_s"] == 1.2
+    assert actions[2] == {"tipo": "swipe", "x1": 100, "y1": 500, "x2": 900, "y2": 500, "duracao_ms": 250}
+
+
+def test_gesture_parser_skips_malformed_coordinates(capsys):
+    parser = GestureParser((1920, 1080), RANGES)
+    lines = _touch(100.0, 100.120, (500, 300), (502, 301))
+    lines.insert(3, "[    100.050000] EV_ABS       ABS_MT_POSITION_X    0000zz1")
+
+    actions = [action for action in (parser.feed(line) for line in lines) if action]
+
+    assert actions == [{"tipo": "tap", "x": 500, "y": 300, "duracao_s": 0.12}]
+    assert "0000zz1" in capsys.readouterr().out
+
+
+def test_capture_worker_keeps_gesture_order(monkeypatch, tmp_path):
+    taken = []
+
+    def fake_screenshot(path, serial=None):
+        taken.append(path)
+        with open(path, "wb") as handle:
+            handle.write(b"png")
+        return path
+
+    monkeypatch.setattr("Scripts.coletor_adb.take_screenshot", fake_screenshot)
+    pending = queue.Queue()
+    for idx in (1, 2, 3):
+        pending.put((idx, {"tipo": "tap", "x": idx, "y": idx}, 0.0, f"t{idx}"))
+    pending.put(None)
+    actions = []
+
+    capture_worker(pending, str(tmp_path), actions)
+
+    assert [item["id"] for item in actions] == [1, 2, 3]
+    assert [item["imagem"] for item in actions] == ["frame_01.png", "frame_02.png", "frame_03.png"]
+    assert len(taken) == 3
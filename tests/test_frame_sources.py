@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+import struct
+
+import pytest
+
+from app.shared.frame_sources import (
+    AdbStreamFrameSource,
+    FrameSource,
+    _LatestFrameSource,
+    detect_raw_header_size,
+    read_raw_frame,
+)
+
+
+def _raw_frame(width: int, height: int, rgba: tuple[int, int, int, int], header_size: int = 16) -> bytes:
+    header = struct.pack("<III", width, height, 1)
+    if header_size == 16:
+        header += struct.pack("<I", 1)
+    return header + bytes(rgba) * (width * height)
+
+
+@pytest.mark.parametrize("header_size", [12, 16])
+def test_detect_raw_header_size_for_old_and_new_screencap(header_size):
+    assert detect_raw_header_size(_raw_frame(4, 3, (0, 0, 0, 255), header_size)) == header_size
+
+
+def test_read_raw_frame_parses_consecutive_frames_from_single_pipe():
+    stream = io.BytesIO(_raw_frame(4, 2, (255, 0, 0, 255)) + _raw_frame(4, 2, (0, 0, 255, 255)))
+
+    first = read_raw_frame(stream, 16)
+    second = read_raw_frame(stream, 16)
+
+    assert first.size == (4, 2) and first.mode == "RGB"
+    assert first.getpixel((0, 0)) == (255, 0, 0)
+    assert second.getpixel((3, 1)) == (0, 0, 255)
+    assert read_raw_frame(stream, 16) is None
+
+
+def test_read_raw_frame_returns_none_for_truncated_payload():
+    payload = _raw_frame(4, 2, (1, 2, 3, 255))
+    assert read_raw_frame(io.BytesIO(payload[:-5]), 16) is None
+
+
+class _ManualFrameSource(_LatestFrameSource):
+    name = "manual"
+
+    def _produce(self) -> None:
+        return None
+
+
+def test_frame_source_bases_are_abstract():
+    with pytest.raises(TypeError):
+        FrameSource()
+    with pytest.raises(TypeError):
+        _LatestFrameSource()
+
+
+def test_latest_frame_source_drops_superseded_frames():
+    source = _ManualFrameSource()
+    source._publish("frame-1")
+    source._publish("frame-2")
+
+    assert source.read(timeout=0.01) == "frame-2"
+    assert source.read(timeout=0.01) is None
+    assert source.frames_received == 2
+
+
+def test_device_loop_command_keeps_single_long_lived_capture_loop():
+    source = AdbStreamFrameSource(["adb", "-s", "X"], interval_s=0.25)
+    command = source.device_loop_command()
+
+    assert command.startswith("while true; do screencap;")
+    assert "sleep 0.25" in command
+    assert "-p" not in command.split()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from HMI.hmi_compare_stage import CompareStage
+from HMI.validacao_hmi import _live_compare_stage_caption
+
+
+def _blocking_compare(release: threading.Event):
+    def compare(file_path: str) -> dict:
+        release.wait(timeout=5)
+        return {"screenshot_path": file_path, "status": "PASS"}
+
+    return compare
+
+
+def test_compare_stage_keeps_only_latest_pending_frame_per_source(tmp_path):
+    release = threading.Event()
+    stored: list[str] = []
+    state_path = tmp_path / "monitor_state.json"
+    state_path.write_text(json.dumps({"pid": 123}), encoding="utf-8")
+    stage = CompareStage(
+        on_result=lambda job, result: stored.append(job.file_name),
+        workers=1,
+        queue_limit=4,
+        state_path=str(state_path),
+        compare_fn=_blocking_compare(release),
+    )
+
+    stage.submit("a.png", "/tmp/a.png", "screen_change")
+    stage.submit("b.png", "/tmp/b.png", "screen_change")
+    stage.submit("t.png", "/tmp/t.png", "touch")
+    stage.submit("c.png", "/tmp/c.png", "screen_change")
+    pending = stage.snapshot()
+    release.set()
+    stage.close(drain_timeout=5)
+
+    assert pending["queue_depth"] == 2
+    assert pending["in_flight"] == 1
+    assert stored == ["a.png", "t.png", "c.png"]
+    assert stage.stats["dropped"] == 1
+    assert stage.stats["completed"] == 3
+    saved = json.loads(state_path.read_text(encoding="utf-8"))
+    assert saved["pid"] == 123
+    assert saved["compare_stage"]["queue_depth"] == 0
+    assert saved["compare_stage"]["dropped"] == 1
+    assert "descartadas 1" in _live_compare_stage_caption(saved)
+
+
+def test_compare_stage_bounds_queue_across_sources():
+    release = threading.Event()
+    stage = CompareStage(on_result=lambda job, result: None, workers=1, queue_limit=2, compare_fn=_blocking_compare(release))
+
+    for source in ("busy", "s1", "s2", "s3"):
+        stage.submit(f"{source}.png", f"/tmp/{source}.png", source)
+
+    assert stage.snapshot()["queue_depth"] == 2
+    assert stage.stats["dropped"] == 1
+    release.set()
+    stage.close(drain_timeout=5)
+
+
+def test_compare_stage_counts_failures_without_stalling_queue():
+    calls: list[str] = []
+
+    def flaky(file_path: str) -> dict:
+        calls.append(file_path)
+        if file_path.endswith("bad.png"):
+            raise ValueError("imagem corrompida")
+        return {"status": "PASS"}
+
+    stage = CompareStage(on_result=lambda job, result: None, workers=2, compare_fn=flaky)
+    stage.submit("bad.png", "/tmp/bad.png", "touch")
+    stage.submit("ok.png", "/tmp/ok.png", "screen_change")
+    stage.close(drain_timeout=5)
+
+    assert sorted(calls) == ["/tmp/bad.png", "/tmp/ok.png"]
+    assert stage.stats["failed"] == 1
+    assert stage.stats["completed"] == 1
+
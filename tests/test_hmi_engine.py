@@ -4,7 +4,7 @@ import os
 import cv2
 import numpy as np
 
-from HMI.hmi_engine import ValidationConfig, collect_result_screens, validate_execution_images
+from HMI.hmi_engine import ValidationConfig, collect_result_screens, compare_screenshot_pair, validate_execution_images
 from HMI.hmi_indexer import build_library_index
 
 
@@ -139,3 +139,25 @@ def test_collect_result_screens_auto_falls_back_to_frames(tmp_path):
 
     assert len(auto_files) == 1
     assert auto_files == frame_files
+
+
+def test_compare_screenshot_pair_matches_single_reference_index(tmp_path):
+    figma_dir = tmp_path / "figma"
+    figma_dir.mkdir()
+    reference = figma_dir / "audio.png"
+    cv2.imwrite(str(reference), _make_screen((110, 30, 30), toggle_on=True))
+
+    cfg = ValidationConfig(top_k=1)
+    index = build_library_index(str(figma_dir))
+    for name, shot in (
+        ("same.png", _make_screen((110, 30, 30), toggle_on=True)),
+        ("toggle.png", _make_screen((110, 30, 30), toggle_on=False)),
+    ):
+        path = tmp_path / name
+        cv2.imwrite(str(path), shot)
+        indexed = validate_execution_images([str(path)], index, cfg)["items"][0]
+        paired = compare_screenshot_pair(str(path), str(reference), cfg)
+
+        assert paired["status"] == indexed["status"]
+        assert paired["scores"] == indexed["scores"]
+        assert paired["diff_summary"] == indexed["diff_summary"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from HMI.hmi_engine import _average_hash_local, _difference_hash_local
+from HMI.hmi_hashing import average_hash, bits_to_hash, difference_hash, hash_distance, hash_to_bits
+from HMI.hmi_result_cache import DEDUP_CONFIRM_DISTANCE, frame_hashes_from_path
+from Scripts import hmi_touch_monitor as monitor
+
+
+def _legacy_average_hash(img_bgr: np.ndarray, hash_size: int = 8) -> str:
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    resized = cv2.resize(gray, (hash_size, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (resized >= float(resized.mean())).astype(np.uint8).flatten()
+    return "".join(str(int(bit)) for bit in bits)
+
+
+def _screen(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, size=(90, 160, 3), dtype=np.uint8)
+    frame[10:50, 20:120] = (30, 180, 240)
+    return frame
+
+
+def test_packed_hash_matches_engine_bit_strings():
+    for seed in range(5):
+        frame = _screen(seed)
+        assert hash_to_bits(average_hash(frame)) == _legacy_average_hash(frame) == _average_hash_local(frame)
+        assert hash_to_bits(difference_hash(frame)) == _difference_hash_local(frame)
+        assert bits_to_hash(_average_hash_local(frame)) == average_hash(frame)
+
+
+def test_distance_is_popcount_and_missing_hash_is_far():
+    assert hash_distance(0b1011, 0b0010) == 2
+    assert hash_distance(None, 5) == 999
+    first, second = _screen(1), _screen(2)
+    expected = sum(a != b for a, b in zip(_average_hash_local(first), _average_hash_local(second)))
+    assert hash_distance(average_hash(first), average_hash(second)) == expected
+
+
+def test_monitor_in_memory_hash_equals_engine_hash_of_saved_png(tmp_path):
+    frame_bgr = _screen(3)
+    image = Image.fromarray(cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB))
+    path = tmp_path / "frame.png"
+    image.save(path)
+
+    in_memory = monitor._average_hash_from_image(image)
+
+    assert hash_to_bits(in_memory) == _average_hash_local(cv2.imread(str(path)))
+    assert monitor._frame_hashes_from_image(image)[0] == in_memory
+
+
+def test_monitor_dedup_hashes_in_memory_match_saved_png(tmp_path):
+    image = Image.fromarray(cv2.cvtColor(_screen(4), cv2.COLOR_BGR2RGB))
+    path = tmp_path / "frame.png"
+    image.save(path)
+
+    in_memory = monitor._frame_hashes_from_image(image)
+    from_disk = frame_hashes_from_path(str(path))
+
+    # o decoder do PNG arredonda o cinza diferente do cvtColor; so o dHash sente isso
+    assert in_memory[0] == from_disk[0]
+    assert hash_distance(in_memory[1], from_disk[1]) <= DEDUP_CONFIRM_DISTANCE
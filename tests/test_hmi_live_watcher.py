@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from HMI.hmi_live_watcher import MAX_RETRY_ATTEMPTS, LiveShotsWatcher
+
+
+def _write_capture(path, name: str, age_s: float = 5.0) -> str:
+    file_path = path / name
+    file_path.write_bytes(b"\x89PNG" + b"0" * 600)
+    stamp = time.time() - age_s
+    os.utime(file_path, (stamp, stamp))
+    return str(file_path)
+
+
+def test_watcher_polling_fallback_only_returns_new_stable_files(tmp_path):
+    shots = tmp_path / "screenshots"
+    shots.mkdir()
+    cursor = str(tmp_path / "cursor.json")
+    _write_capture(shots, "screen_001.png", age_s=10)
+    _write_capture(shots, "hmi_watch_native.png", age_s=10)
+    _write_capture(shots, "screen_002.png", age_s=0)
+
+    watcher = LiveShotsWatcher(str(shots), cursor, use_watchdog=False, poll_interval_s=0).start()
+    ready = watcher.take_stable(stable_age_s=1.0)
+
+    assert [name for name, _path, _mtime in ready] == ["screen_001.png"]
+    assert watcher.pending_count() == 2
+    name, _path, mtime_ns = ready[0]
+    watcher.commit(name, mtime_ns)
+    assert watcher.latest_path().endswith("screen_002.png")
+
+
+def test_watcher_cursor_survives_restart(tmp_path):
+    shots = tmp_path / "screenshots"
+    shots.mkdir()
+    cursor = str(tmp_path / "cursor.json")
+    _write_capture(shots, "screen_001.png", age_s=20)
+    _write_capture(shots, "screen_002.png", age_s=10)
+
+    first = LiveShotsWatcher(str(shots), cursor, use_watchdog=False, poll_interval_s=0).start()
+    for name, _path, mtime_ns in first.take_stable(stable_age_s=0):
+        first.commit(name, mtime_ns)
+    _write_capture(shots, "screen_003.png", age_s=5)
+
+    second = LiveShotsWatcher(str(shots), cursor, use_watchdog=False, poll_interval_s=0).start()
+    assert [name for name, _path, _mtime in second.take_stable(stable_age_s=0)] == ["screen_003.png"]
+
+
+def test_watcher_picks_up_atomic_replace_events(tmp_path):
+    pytest.importorskip("watchdog")
+    shots = tmp_path / "screenshots"
+    shots.mkdir()
+    watcher = LiveShotsWatcher(str(shots), str(tmp_path / "cursor.json"), use_watchdog=True).start()
+    try:
+        assert watcher.mode == "watchdog"
+        temp = _write_capture(shots, "screen_010.png.tmp", age_s=5)
+        os.replace(temp, shots / "screen_010.png")
+        deadline = time.monotonic() + 5
+        ready = []
+        while time.monotonic() < deadline and not ready:
+            ready = watcher.take_stable(stable_age_s=0)
+            time.sleep(0.05)
+        assert [name for name, _path, _mtime in ready] == ["screen_010.png"]
+    finally:
+        watcher.close()
+
+
+def test_watcher_retries_failed_capture_after_cursor_moves_past_it(tmp_path):
+    shots = tmp_path / "screenshots"
+    shots.mkdir()
+    cursor = str(tmp_path / "cursor.json")
+    _write_capture(shots, "screen_001.png", age_s=20)
+    _write_capture(shots, "screen_002.png", age_s=10)
+
+    watcher = LiveShotsWatcher(str(shots), cursor, use_watchdog=False, poll_interval_s=0).start()
+    (failed, _path, failed_mtime), (ok, _path2, ok_mtime) = watcher.take_stable(stable_age_s=0)
+    assert watcher.fail(failed, failed_mtime)
+    watcher.commit(ok, ok_mtime)
+
+    assert [name for name, _path, _mtime in watcher.take_stable(stable_age_s=0)] == ["screen_001.png"]
+    restarted = LiveShotsWatcher(str(shots), cursor, use_watchdog=False, poll_interval_s=0).start()
+    assert [name for name, _path, _mtime in restarted.take_stable(stable_age_s=0)] == ["screen_001.png"]
+
+    restarted.commit(failed, failed_mtime)
+    assert restarted.take_stable(stable_age_s=0) == []
+    assert restarted.cursor == (ok_mtime, "screen_002.png")
+
+
+def test_watcher_gives_up_after_max_retry_attempts(tmp_path):
+    shots = tmp_path / "screenshots"
+    shots.mkdir()
+    _write_capture(shots, "screen_001.png", age_s=10)
+    watcher = LiveShotsWatcher(str(shots), str(tmp_path / "cursor.json"), use_watchdog=False, poll_interval_s=0).start()
+
+    results = []
+    for _ in range(MAX_RETRY_ATTEMPTS):
+        (name, _path, mtime_ns), = watcher.take_stable(stable_age_s=0)
+        results.append(watcher.fail(name, mtime_ns))
+
+    assert results == [True] * (MAX_RETRY_ATTEMPTS - 1) + [False]
+    assert watcher.take_stable(stable_age_s=0) == []
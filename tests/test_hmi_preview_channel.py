@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from HMI.hmi_preview_channel import READ_RETRIES, PreviewChannelReader, PreviewChannelWriter, preview_channel_path
+
+
+def _frame(height: int, width: int, value: int) -> np.ndarray:
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:, : width // 2] = value
+    return frame
+
+
+def test_reader_sees_latest_frame_without_png(tmp_path):
+    descriptor = preview_channel_path(str(tmp_path))
+    writer = PreviewChannelWriter(descriptor)
+    reader = PreviewChannelReader(descriptor)
+    try:
+        first_seq = writer.publish(_frame(90, 160, 10))
+        second_seq = writer.publish(_frame(90, 160, 200))
+        frame = reader.read(copy=True)
+
+        assert second_seq > first_seq
+        assert frame is not None
+        assert frame.seq == second_seq
+        assert frame.image.shape == (90, 160, 3)
+        assert int(frame.image[0, 0, 0]) == 200
+        assert reader.read(after_seq=frame.seq) is None
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_writer_grows_segment_and_reader_follows(tmp_path):
+    descriptor = preview_channel_path(str(tmp_path))
+    writer = PreviewChannelWriter(descriptor)
+    reader = PreviewChannelReader(descriptor)
+    try:
+        writer.publish(_frame(9, 16, 1))
+        first_name = json.loads(open(descriptor, encoding="utf-8").read())["name"]
+        assert reader.read(copy=True) is not None
+
+        writer.publish(_frame(90, 160, 7))
+        frame = reader.read(copy=True)
+
+        assert json.loads(open(descriptor, encoding="utf-8").read())["name"] != first_name
+        assert frame is not None
+        assert frame.image.shape == (90, 160, 3)
+        assert reader.still_valid(frame)
+    finally:
+        reader.close()
+        writer.close()
+    assert not (tmp_path / "preview_channel.json").exists()
+
+
+def test_reader_without_monitor_returns_none(tmp_path):
+    reader = PreviewChannelReader(preview_channel_path(str(tmp_path)))
+    assert reader.read() is None
+    (tmp_path / "preview_channel.json").write_text(json.dumps({"name": "hmip_inexistente"}), encoding="utf-8")
+    assert reader.read() is None
+
+
+def test_read_encoded_works_on_the_shared_view_and_copies_only_after_a_torn_read(tmp_path):
+    descriptor = preview_channel_path(str(tmp_path))
+    writer = PreviewChannelWriter(descriptor)
+    reader = PreviewChannelReader(descriptor)
+    try:
+        writer.publish(_frame(9, 16, 40))
+        seen = []
+
+        def encode(pixels):
+            seen.append(pixels.flags.owndata)
+            return int(pixels[0, 0, 0])
+
+        frame = reader.read_encoded(encode)
+        assert frame is not None and frame.image == 40
+        assert seen == [False]
+
+        seen.clear()
+        values = iter(range(100, 200))
+
+        def encode_while_monitor_writes(pixels):
+            seen.append(pixels.flags.owndata)
+            value = int(pixels[0, 0, 0])
+            writer.publish(_frame(9, 16, next(values)))
+            return value
+
+        frame = reader.read_encoded(encode_while_monitor_writes)
+        assert seen[-1] is True and seen.count(False) == READ_RETRIES
+        assert frame.seq == reader.read().seq - 2
+    finally:
+        reader.close()
+        writer.close()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from HMI.hmi_replay import ReplayFrameSource, ReplayTiming, load_replay_frames
+
+
+def _recorded_folder(tmp_path, count: int = 4, step_s: int = 2):
+    folder = tmp_path / "HMI_TESTE"
+    folder.mkdir()
+    rows = []
+    for index in range(count):
+        name = f"malagueta_{index}.png"
+        image = Image.new("RGB", (32, 16), (10, 10, 10))
+        if index % 2:
+            image.paste((240, 240, 240), (0, 0, 16, 16))
+        image.save(folder / name)
+        rows.append({"captured_at": f"2026-04-07T11:16:{10 + index * step_s:02d}", "file": name, "action": "host_click"})
+    (folder / "manifest.jsonl").write_text("\n".join(json.dumps(row) for row in rows) + "\n", encoding="utf-8")
+    return folder
+
+
+def test_load_replay_frames_uses_manifest_offsets(tmp_path):
+    frames = load_replay_frames(str(_recorded_folder(tmp_path)))
+
+    assert [frame.file_name for frame in frames] == [f"malagueta_{index}.png" for index in range(4)]
+    assert [frame.offset_s for frame in frames] == [0.0, 2.0, 4.0, 6.0]
+
+
+def test_replay_timing_profiles():
+    assert ReplayTiming.parse("recorded", speed=4).label() == "recorded x4"
+    assert ReplayTiming.parse("fps=10").fps == 10.0
+    with pytest.raises(ValueError):
+        ReplayTiming.parse("depressa")
+
+
+def test_replay_source_skips_frames_superseded_while_consumer_was_busy(tmp_path):
+    frames = load_replay_frames(str(_recorded_folder(tmp_path)))
+    source = ReplayFrameSource(frames, ReplayTiming.parse("recorded", speed=10)).start()
+
+    first = source.read()
+    time.sleep(0.5)
+    second = source.read()
+
+    third = source.read()
+
+    assert first is not None and second is not None and third is not None
+    assert source.frames_skipped == 1
+    assert source.frames_read == 3
+    assert source.closed()
+
+
+def test_replay_recorded_frames_reports_throughput_and_compare_lag(tmp_path, monkeypatch):
+    import Scripts.hmi_touch_monitor as monitor
+    from HMI.hmi_compare_stage import CompareStage
+    from HMI.hmi_engine import ValidationConfig
+    from HMI.hmi_result_cache import ValidationResultCache
+
+    folder = _recorded_folder(tmp_path, count=6)
+    shots_dir = tmp_path / "replay" / "screenshots"
+    shots_dir.mkdir(parents=True)
+    results_path = str(tmp_path / "replay" / "results.sqlite3")
+    monkeypatch.setattr(monitor, "RESULT_CACHE", ValidationResultCache())
+    monkeypatch.setattr(monitor, "PENDING_HASHES", {})
+    monkeypatch.setattr(
+        monitor,
+        "COMPARE_STAGE",
+        CompareStage(
+            on_result=lambda job, result: monitor._store_compare_result(results_path, job, result),
+            workers=1,
+            compare_fn=lambda path: {"screen_name": "Tela Home", "status": "PASS", "screenshot_path": path},
+            use_processes=False,
+        ),
+    )
+
+    report = monitor.replay_recorded_frames(
+        str(shots_dir),
+        str(folder),
+        ReplayTiming.parse("max"),
+        None,
+        results_path=results_path,
+        library_index={"screens": []},
+        cfg=ValidationConfig(),
+        report_path=str(tmp_path / "replay" / "replay_report.json"),
+    )
+    monitor.COMPARE_STAGE.close()
+
+    assert report["frames_read"] == 6 and report["frames_saved"] == 6
+    assert report["frames_per_s"] > 0
+    assert report["compare_drained"] is True
+    assert report["compare"]["completed"] + report["dedup"]["hits"] == 6
+    assert report["dedup"]["hits"] >= 1
+    assert {"p50_lag_s", "p95_lag_s", "p99_lag_s"} <= set(report["compare"])
+    assert report["resources"]["cpu_s"] >= 0.0
+    assert json.loads((tmp_path / "replay" / "replay_report.json").read_text(encoding="utf-8"))["frames_read"] == 6
+
+
+def test_replay_output_stays_out_of_the_live_session(tmp_path):
+    import Scripts.hmi_touch_monitor as monitor
+
+    live_dir = tmp_path / "session" / "screenshots"
+    replay_dir = monitor._replay_output_dir(str(live_dir))
+
+    assert os.path.basename(replay_dir) == "screenshots"
+    replay_root = os.path.dirname(replay_dir)
+    assert os.path.dirname(os.path.dirname(replay_root)) == str(tmp_path / "session")
+    assert os.path.basename(os.path.dirname(replay_root)) == "replay"
+    assert monitor._monitor_state_output_path(replay_dir) != monitor._monitor_state_output_path(str(live_dir))
+    assert monitor._replay_output_dir(str(live_dir), str(tmp_path / "bench")) == str(tmp_path / "bench")
+
+
+@pytest.mark.parametrize("platform, expected", [("darwin", 4096), ("linux", 4096 * 1024)])
+def test_peak_rss_reads_ru_maxrss_in_the_platform_unit(monkeypatch, platform, expected):
+    import HMI.hmi_replay as replay
+
+    class FakeResource:
+        RUSAGE_SELF = 0
+
+        @staticmethod
+        def getrusage(_who):
+            return SimpleNamespace(ru_maxrss=4096)
+
+    monkeypatch.setattr(replay, "resource", FakeResource)
+    monkeypatch.setattr(replay.sys, "platform", platform)
+    assert replay._peak_rss_bytes() == expected
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import numpy as np
+from PIL import Image
+
+from HMI.hmi_result_cache import ValidationResultCache, frame_hashes_from_path, hash_distance
+
+
+def _screen(path, offset: int) -> str:
+    pixels = np.zeros((90, 160, 3), dtype=np.uint8)
+    pixels[20:70, 30 + offset : 90 + offset] = 230
+    Image.fromarray(pixels).save(path)
+    return str(path)
+
+
+def test_frame_hashes_are_stable_for_identical_frames(tmp_path):
+    first = frame_hashes_from_path(_screen(tmp_path / "a.png", 0))
+    second = frame_hashes_from_path(_screen(tmp_path / "b.png", 0))
+    moved = frame_hashes_from_path(_screen(tmp_path / "c.png", 60))
+
+    assert first == second
+    assert hash_distance(first[0], moved[0]) > 6
+
+
+def test_cache_reuses_only_candidates_confirmed_by_callback():
+    confirms: list[tuple[str, str]] = []
+
+    def confirm(new_path: str, cached_path: str) -> bool:
+        confirms.append((new_path, cached_path))
+        return new_path.endswith("same.png")
+
+    cache = ValidationResultCache(confirm_distance=4, confirm=confirm)
+    cache.remember("home.png", "/tmp/home.png", 0b1111_0000, 0b1010, {"screen_name": "Home"})
+
+    exact_other = cache.lookup("/tmp/other.png", 0b1111_0000, 0b1010)
+    borderline_same = cache.lookup("/tmp/same.png", 0b1111_0111, 0b1010)
+    far = cache.lookup("/tmp/far_same.png", 0b0000_1111, 0b0101)
+
+    assert exact_other is None and far is None
+    assert borderline_same[0].result["screen_name"] == "Home" and borderline_same[1:] == (3, 0)
+    assert confirms == [("/tmp/other.png", "/tmp/home.png"), ("/tmp/same.png", "/tmp/home.png")]
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert ValidationResultCache(confirm=None).lookup("/tmp/same.png", 0b1111_0000, 0b1010) is None
+
+
+def test_close_hashes_with_different_content_are_not_reused(tmp_path):
+    base = np.full((360, 640, 3), 40, dtype=np.uint8)
+    base[40:320, 40:600] = 200
+    changed = base.copy()
+    changed[150:190, 300:324] = 20  # um "digito" diferente no meio da tela
+    Image.fromarray(base).save(tmp_path / "validated.png")
+    Image.fromarray(base).save(tmp_path / "same.png")
+    Image.fromarray(changed).save(tmp_path / "changed.png")
+
+    validated = frame_hashes_from_path(str(tmp_path / "validated.png"))
+    changed_hashes = frame_hashes_from_path(str(tmp_path / "changed.png"))
+    assert max(hash_distance(a, b) for a, b in zip(validated, changed_hashes)) <= 2
+
+    cache = ValidationResultCache()
+    cache.remember("validated.png", str(tmp_path / "validated.png"), *validated, {"status": "PASS"})
+
+    assert cache.lookup(str(tmp_path / "changed.png"), *changed_hashes) is None
+    assert cache.lookup(str(tmp_path / "same.png"), *frame_hashes_from_path(str(tmp_path / "same.png"))) is not None
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+
+from HMI.hmi_results_store import LiveResultsStore, load_results_payload
+
+
+def _row(name: str) -> dict:
+    return {"capturado_em": name, "status": "PASS", "processed_at": "2026-01-01T00:00:00"}
+
+
+def test_results_store_appends_and_returns_last_n_in_order(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    with LiveResultsStore(path) as store:
+        for idx in range(120):
+            store.add(f"shot_{idx:03d}.png", _row(f"shot_{idx:03d}.png"), {"screenshot_path": f"shot_{idx:03d}.png"})
+
+        history = store.history(50)
+        full = store.full_results(100)
+
+        assert [row["capturado_em"] for row in history] == [f"shot_{idx:03d}.png" for idx in range(70, 120)]
+        assert len(full) == 100 and full[-1]["screenshot_path"] == "shot_119.png"
+        assert store.latest()["screenshot_path"] == "shot_119.png"
+        assert store.contains("shot_000.png") and not store.contains("shot_999.png")
+        assert store.processed(["shot_001.png", "nova.png"]) == {"shot_001.png"}
+        assert store.add("shot_001.png", _row("dup"), {}) is False
+        assert store.count() == 120
+
+
+def test_results_store_allows_reader_while_writer_inserts(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    writer = LiveResultsStore(path)
+    errors: list[Exception] = []
+
+    def write() -> None:
+        try:
+            for idx in range(200):
+                writer.add(f"w_{idx}.png", _row(f"w_{idx}.png"), {"idx": idx})
+        except Exception as exc:  # pragma: no cover - falha aparece no assert
+            errors.append(exc)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    seen = 0
+    while thread.is_alive():
+        seen = max(seen, load_results_payload(path)["processed_count"])
+    thread.join()
+    writer.close()
+
+    assert not errors
+    assert load_results_payload(path)["processed_count"] == 200
+    assert seen <= 200
+
+
+def test_load_results_payload_without_database_is_empty(tmp_path):
+    payload = load_results_payload(str(tmp_path / "missing.sqlite3"))
+    assert payload == {"processed_count": 0, "history": [], "full_results": []}
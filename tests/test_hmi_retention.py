@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from HMI.hmi_retention import CaptureRetention, RetentionPolicy
+
+
+def _capture(directory, idx: int, color: int) -> str:
+    name = f"screen_{idx:04d}.png"
+    pixels = np.zeros((32, 48, 3), dtype=np.uint8)
+    pixels[:, : 8 + (color % 32)] = 255 if color % 2 else 120
+    Image.fromarray(pixels).save(directory / name)
+    stamp = 1_700_000_000 + idx
+    os.utime(directory / name, (stamp, stamp))
+    with open(directory / "manifest.jsonl", "a", encoding="utf-8") as fh:
+        fh.write(json.dumps({"file": name, "action": "screen_change"}) + "\n")
+    return name
+
+
+def _manifest_files(directory) -> list[dict]:
+    return [json.loads(line) for line in (directory / "manifest.jsonl").read_text(encoding="utf-8").splitlines()]
+
+
+def test_policy_parse_reads_limits_and_rejects_unknown_keys():
+    policy = RetentionPolicy.parse("files=100, mb=1.5, hours=2, archive=1, keep=3")
+
+    assert (policy.max_files, policy.max_bytes, policy.max_age_s) == (100, int(1.5 * 1024 * 1024), 7200.0)
+    assert policy.archive is True and policy.keep_recent == 3
+    assert RetentionPolicy.parse("").enabled is False
+    with pytest.raises(ValueError):
+        RetentionPolicy.parse("frames=10")
+
+
+def test_count_limit_trims_oldest_and_drops_manifest_lines(tmp_path):
+    retention = CaptureRetention(str(tmp_path), RetentionPolicy(max_files=10, keep_recent=2))
+    for idx in range(11):
+        retention.track(_capture(tmp_path, idx, idx))
+
+    remaining = sorted(path.name for path in tmp_path.glob("screen_*.png"))
+    assert remaining == [f"screen_{idx:04d}.png" for idx in range(2, 11)]
+    assert [item["file"] for item in _manifest_files(tmp_path)] == remaining
+    assert retention.file_count == 9
+
+
+def test_archive_mode_stores_identical_screens_once(tmp_path):
+    retention = CaptureRetention(str(tmp_path), RetentionPolicy(max_files=4, archive=True, keep_recent=1))
+    for idx in range(5):
+        retention.track(_capture(tmp_path, idx, 0 if idx < 4 else 1))
+
+    archived = sorted(path.name for path in (tmp_path / "archive").glob("*.png"))
+    manifest = _manifest_files(tmp_path)
+    assert len(archived) == 1
+    assert sorted(path.name for path in tmp_path.glob("screen_*.png")) == ["screen_0002.png", "screen_0003.png", "screen_0004.png"]
+    assert [item.get("archived") for item in manifest[:2]] == [f"archive/{archived[0]}"] * 2
+    assert "archived" not in manifest[-1]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from HMI.hmi_state_file import merge_state_file, write_state_file
+
+
+def test_merge_state_file_serializes_concurrent_writers(tmp_path):
+    state_path = tmp_path / "monitor_state.json"
+    state_path.write_text(json.dumps({"pid": 123, "session_token": "abc"}), encoding="utf-8")
+
+    def writer(key: str) -> None:
+        for i in range(25):
+            assert merge_state_file(str(state_path), key, {"i": i})
+
+    threads = [threading.Thread(target=writer, args=(f"k{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    saved = json.loads(state_path.read_text(encoding="utf-8"))
+    assert saved["pid"] == 123 and saved["session_token"] == "abc"
+    assert all(saved[f"k{n}"] == {"i": 24} for n in range(4))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_merge_state_file_skips_unparseable_state(tmp_path):
+    state_path = tmp_path / "monitor_state.json"
+    state_path.write_text('{"pid": 123, "session_', encoding="utf-8")
+
+    assert merge_state_file(str(state_path), "compare_stage", {"queue_depth": 0}) is False
+    assert state_path.read_text(encoding="utf-8") == '{"pid": 123, "session_'
+
+
+def test_write_state_file_and_merges_do_not_tear_each_other(tmp_path):
+    state_path = tmp_path / "monitor_state.json"
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    def reader() -> None:
+        while not stop.is_set():
+            try:
+                if state_path.exists():
+                    json.loads(state_path.read_text(encoding="utf-8"))
+            except BaseException as exc:  # any torn read fails the test
+                errors.append(exc)
+
+    watcher = threading.Thread(target=reader)
+    watcher.start()
+    for i in range(50):
+        write_state_file(str(state_path), {"pid": i, "session_token": "abc"})
+        merge_state_file(str(state_path), "hybrid_latency", {"p50_ms": float(i)})
+    stop.set()
+    watcher.join()
+
+    saved = json.loads(state_path.read_text(encoding="utf-8"))
+    assert errors == []
+    assert saved == {"pid": 49, "session_token": "abc", "hybrid_latency": {"p50_ms": 49.0}}
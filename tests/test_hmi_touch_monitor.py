@@ -2,7 +2,12 @@ from __future__ import annotations
 
 import json
 
+from PIL import Image
+
+from HMI.hmi_results_store import load_results_payload
+from Scripts import hmi_touch_monitor
 from Scripts.hmi_touch_monitor import (
+    _configure_retention,
     _touch_axis_range,
     _store_validation_result,
     is_touch_end_line,
@@ -41,8 +46,20 @@ def test_should_stop_accepts_flag_in_live_lookup_root(tmp_path):
     assert should_stop(str(shots_dir)) is True
 
 
+def test_retention_is_disabled_unless_requested(tmp_path):
+    _configure_retention(str(tmp_path), hmi_touch_monitor.OUTPUT_RETENTION_SPEC)
+    assert str(tmp_path) not in hmi_touch_monitor.RETENTION
+
+    _configure_retention(str(tmp_path), "files=10")
+    try:
+        assert str(tmp_path) in hmi_touch_monitor.RETENTION
+    finally:
+        _configure_retention(str(tmp_path), "")
+    assert str(tmp_path) not in hmi_touch_monitor.RETENTION
+
+
 def test_store_validation_result_persists_serializable_live_history(tmp_path):
-    results_path = tmp_path / "results.json"
+    results_path = tmp_path / "results.sqlite3"
     result = {
         "screenshot_path": str(tmp_path / "touch_01.png"),
         "screen_name": "Tela Home",
@@ -61,15 +78,245 @@ def test_store_validation_result_persists_serializable_live_history(tmp_path):
         ],
     }
 
-    _store_validation_result(str(results_path), "touch_01.png", result, capture_source="screen_change")
-    _store_validation_result(str(results_path), "touch_01.png", result, capture_source="screen_change")
+    assert _store_validation_result(str(results_path), "touch_01.png", result, capture_source="screen_change")
+    assert not _store_validation_result(str(results_path), "touch_01.png", result, capture_source="screen_change")
 
-    saved = json.loads(results_path.read_text(encoding="utf-8"))
+    saved = load_results_payload(str(results_path))
+    json.dumps(saved)
 
-    assert saved["processed"] == ["touch_01.png"]
+    assert saved["processed_count"] == 1
     assert len(saved["history"]) == 1
     assert saved["history"][0]["screen_name"] == "Tela Home"
     assert saved["history"][0]["capture_source"] == "screen_change"
     assert saved["full_results"][0]["debug_images"] == {}
     assert saved["full_results"][0]["capture_source"] == "screen_change"
     assert saved["full_results"][0]["candidate_results"][0]["debug_images"] == {}
+
+
+class _FakeFrameSource:
+    name = "fake"
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read(self, timeout=1.0):
+        return self.frames.pop(0) if self.frames else None
+
+    def closed(self):
+        return not self.frames
+
+    def close(self):
+        pass
+
+
+def test_watch_frame_source_only_encodes_changed_frames(tmp_path):
+    from Scripts.hmi_touch_monitor import _watch_frame_source
+
+    shots_dir = tmp_path / "screenshots"
+    shots_dir.mkdir()
+    dark = Image.new("RGB", (32, 16), (10, 10, 10))
+    split = Image.new("RGB", (32, 16), (10, 10, 10))
+    split.paste((240, 240, 240), (0, 0, 16, 16))
+
+    saved = _watch_frame_source(
+        str(shots_dir),
+        _FakeFrameSource([split, split.copy(), dark, dark, split]),
+        target_size=(16, 8),
+    )
+
+    pngs = sorted(path.name for path in shots_dir.glob("screen_*.png"))
+    manifest = (shots_dir / "manifest.jsonl").read_text(encoding="utf-8").splitlines()
+    assert saved == 3
+    assert len(pngs) == 3 and len(manifest) == 3
+    assert Image.open(shots_dir / pngs[0]).size == (16, 8)
+    assert (tmp_path / "preview_latest.png").exists()
+
+
+def test_repeated_screen_reuses_cached_validation(tmp_path, monkeypatch):
+    import numpy as np
+    from PIL import Image
+
+    import Scripts.hmi_touch_monitor as monitor
+    from HMI.hmi_compare_stage import CompareJob
+    from HMI.hmi_result_cache import ValidationResultCache
+
+    monkeypatch.setattr(monitor, "RESULT_CACHE", ValidationResultCache())
+    monkeypatch.setattr(monitor, "PENDING_HASHES", {})
+    results_path = str(tmp_path / "results.sqlite3")
+    pixels = np.zeros((60, 100, 3), dtype=np.uint8)
+    pixels[10:40, 20:70] = 200
+    for name in ("touch_1.png", "touch_2.png"):
+        Image.fromarray(pixels).save(tmp_path / name)
+    hashes = monitor._frame_hashes_from_image(Image.fromarray(pixels))
+
+    assert monitor._reuse_cached_validation("touch_1.png", str(tmp_path / "touch_1.png"), results_path, "touch") is False
+    assert monitor._reuse_cached_validation(
+        "touch_1.png", str(tmp_path / "touch_1.png"), results_path, "touch", hashes
+    ) is False
+    monitor._store_compare_result(
+        results_path,
+        CompareJob("touch_1.png", str(tmp_path / "touch_1.png"), "touch", 0.0),
+        {"screen_name": "Tela Home", "status": "PASS", "screenshot_path": str(tmp_path / "touch_1.png")},
+    )
+    assert monitor._reuse_cached_validation(
+        "touch_2.png", str(tmp_path / "touch_2.png"), results_path, "touch", hashes
+    ) is True
+
+    latest = load_results_payload(results_path)["full_results"][-1]
+    assert latest["screen_name"] == "Tela Home"
+    assert latest["screenshot_path"].endswith("touch_2.png")
+    assert latest["dedup"]["reused_from"] == "touch_1.png"
+    assert monitor.RESULT_CACHE.hits == 1
+
+
+def _fake_adb(tmp_path, frames):
+    """adb falso: cada `exec-out screencap -p` devolve o proximo PNG da lista (o ultimo se repete)."""
+    import sys
+
+    frame_paths = []
+    for index, image in enumerate(frames):
+        path = tmp_path / f"frame_{index}.png"
+        image.save(path)
+        frame_paths.append(str(path))
+    counter = tmp_path / "adb_calls.txt"
+    script = tmp_path / "adb"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"frames = {frame_paths!r}\n"
+        f"counter = {str(counter)!r}\n"
+        "try:\n"
+        "    calls = int(open(counter).read())\n"
+        "except (OSError, ValueError):\n"
+        "    calls = 0\n"
+        "open(counter, 'w').write(str(calls + 1))\n"
+        "sys.stdout.buffer.write(open(frames[min(calls, len(frames) - 1)], 'rb').read())\n",
+        encoding="utf-8",
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_hybrid_collector_captures_click_while_watching_with_fake_adb(tmp_path, monkeypatch):
+    import asyncio
+    import threading
+    import time
+
+    from PIL import Image
+
+    import Scripts.hmi_touch_monitor as monitor
+
+    shots_dir = tmp_path / "screenshots"
+    shots_dir.mkdir()
+    dark = Image.new("RGB", (32, 16), (10, 10, 10))
+    split = Image.new("RGB", (32, 16), (10, 10, 10))
+    split.paste((240, 240, 240), (0, 0, 16, 16))
+    monkeypatch.setattr(monitor, "resolve_adb_path", lambda: _fake_adb(tmp_path, [dark, dark, split]))
+    monkeypatch.setattr(monitor, "_hmi_teste_output_dir", lambda: str(tmp_path / "hmi_teste"))
+    monkeypatch.setattr(monitor, "HOST_CLICK_CAPTURE_DELAY_S", 0.05)
+    monkeypatch.setattr(monitor, "SCREEN_WATCH_INTERVAL_S", 0.05)
+
+    clicks = iter([(12, 34)])
+    collector = monitor.HybridCollector(
+        str(shots_dir),
+        None,
+        None,
+        click_poller=lambda: next(clicks, None),
+        window_cache=None,
+    )
+    runner = threading.Thread(target=lambda: asyncio.run(collector.run()))
+    runner.start()
+    deadline = time.time() + 10
+    while time.time() < deadline and not (collector.clicks_captured and len(list(shots_dir.glob("screen_*.png")))):
+        time.sleep(0.05)
+    (tmp_path / "stop.flag").write_text("stop", encoding="utf-8")
+    runner.join(timeout=10)
+
+    manifest = [json.loads(line) for line in (shots_dir / "manifest.jsonl").read_text(encoding="utf-8").splitlines()]
+    actions = [row["action"] for row in manifest]
+    state = json.loads((tmp_path / "monitor_state.json").read_text(encoding="utf-8"))
+    assert not runner.is_alive()
+    assert actions[0] == "initial_state"
+    assert "host_click" in actions and "screen_change" in actions
+    assert next(row for row in manifest if row["action"] == "host_click")["x"] == 12
+    assert state["hybrid_latency"]["clicks_captured"] == 1
+    assert state["hybrid_latency"]["last_ms"] >= 50.0
+
+
+def test_scrcpy_window_cache_reuses_lookup_until_invalidated():
+    from Scripts.hmi_touch_monitor import ScrcpyWindowCache
+
+    calls = []
+    cache = ScrcpyWindowCache(ttl_s=60.0, finder=lambda: calls.append(1) or {"hwnd": None, "title": ""})
+
+    cache.get()
+    cache.get()
+    assert len(calls) == 1
+    cache.invalidate()
+    cache.get()
+    assert len(calls) == 2
+
+
+def test_throttled_preview_png_is_flushed_with_the_last_frame(tmp_path, monkeypatch):
+    class _Channel:
+        def publish(self, pixels):
+            return 0
+
+    shots_dir = tmp_path / "screenshots"
+    monkeypatch.setattr(hmi_touch_monitor, "PREVIEW_CHANNEL", _Channel())
+    monkeypatch.setattr(hmi_touch_monitor, "PREVIEW_PNG_INTERVAL_S", 3600.0)
+    monkeypatch.setattr(hmi_touch_monitor, "_LAST_PREVIEW_PNG_AT", float("-inf"))
+    monkeypatch.setattr(hmi_touch_monitor, "_PENDING_PREVIEW_PNG", None)
+
+    hmi_touch_monitor._write_preview_image(Image.new("RGB", (8, 8), (10, 10, 10)), str(shots_dir))
+    hmi_touch_monitor._write_preview_image(Image.new("RGB", (8, 8), (200, 0, 0)), str(shots_dir))
+    with Image.open(tmp_path / "preview_latest.png") as written:
+        assert written.getpixel((0, 0)) == (10, 10, 10)
+
+    assert hmi_touch_monitor._flush_preview_png() is True
+    with Image.open(tmp_path / "preview_latest.png") as written:
+        assert written.getpixel((0, 0)) == (200, 0, 0)
+    assert hmi_touch_monitor._flush_preview_png() is False
+
+
+def test_touch_and_hybrid_captures_publish_the_frame_to_the_preview_channel(tmp_path, monkeypatch):
+    import os
+
+    import numpy as np
+
+    from HMI.hmi_preview_channel import PreviewChannelReader, PreviewChannelWriter, preview_channel_path
+
+    shots_dir = tmp_path / "screenshots"
+    shots_dir.mkdir()
+    dark = Image.new("RGB", (32, 16), (10, 10, 10))
+    split = Image.new("RGB", (32, 16), (10, 10, 10))
+    split.paste((240, 240, 240), (0, 0, 16, 16))
+    descriptor = preview_channel_path(str(tmp_path))
+    writer = PreviewChannelWriter(descriptor)
+    reader = PreviewChannelReader(descriptor)
+    monkeypatch.setattr(hmi_touch_monitor, "resolve_adb_path", lambda: _fake_adb(tmp_path, [dark, split]))
+    monkeypatch.setattr(hmi_touch_monitor, "_hmi_teste_output_dir", lambda: str(tmp_path / "hmi_teste"))
+    monkeypatch.setattr(hmi_touch_monitor, "PREVIEW_CHANNEL", writer)
+    monkeypatch.setattr(hmi_touch_monitor, "PREVIEW_PNG_INTERVAL_S", 3600.0)
+    monkeypatch.setattr(hmi_touch_monitor, "_LAST_PREVIEW_PNG_AT", float("-inf"))
+    monkeypatch.setattr(hmi_touch_monitor, "_PENDING_PREVIEW_PNG", None)
+    try:
+        hmi_touch_monitor._capture_output_frame(str(shots_dir), None, "touch", 1, 2, None)
+        touch_frame = reader.read(copy=True)
+        assert touch_frame is not None
+        assert np.array_equal(touch_frame.image, np.asarray(dark))
+
+        hashes, file_name, _file_path = hmi_touch_monitor._capture_screen_change_frame(
+            str(shots_dir), None, None, hmi_touch_monitor._average_hash_from_image(dark)
+        )
+        hybrid_frame = reader.read(after_seq=touch_frame.seq, copy=True)
+        assert hashes is not None and file_name is not None
+        assert hybrid_frame is not None
+        assert np.array_equal(hybrid_frame.image, np.asarray(split))
+        # o PNG ficou no frame do toque (taxa limitada); o dashboard usa o frame da memoria
+        with Image.open(tmp_path / "preview_latest.png") as written:
+            assert written.getpixel((0, 0)) == (10, 10, 10)
+        assert hybrid_frame.timestamp >= os.path.getmtime(tmp_path / "preview_latest.png")
+    finally:
+        reader.close()
+        writer.close()
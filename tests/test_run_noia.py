@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import io
+import os
+import subprocess
+import tarfile
+
+import cv2
+import numpy as np
+import pytest
+from skimage.metrics import structural_similarity as ssim
+
+from Run import run_noia
+from Run.run_noia import _extrair_tar_stream, _ssim_box, comparar_imagens, validar_comparacao_rapida
+
+
+def _make_screen(shift=0, clock="12:00"):
+    img = np.zeros((240, 400, 3), dtype=np.uint8)
+    img[:] = (30, 40, 50)
+    cv2.rectangle(img, (0, 0), (400, 28), (10, 10, 10), -1)
+    cv2.putText(img, clock, (330, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+    cv2.rectangle(img, (40 + shift, 60), (200 + shift, 120), (200, 120, 0), -1)
+    cv2.circle(img, (300, 170), 30, (240, 240, 240), -1)
+    cv2.putText(img, "Audio", (60, 200), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (220, 220, 220), 2)
+    return img
+
+
+def test_ssim_box_matches_skimage_at_full_resolution():
+    gray_a = cv2.cvtColor(_make_screen(), cv2.COLOR_BGR2GRAY)
+    gray_b = cv2.cvtColor(_make_screen(shift=6, clock="12:01"), cv2.COLOR_BGR2GRAY)
+
+    assert abs(_ssim_box(gray_a, gray_b) - ssim(gray_a, gray_b)) < 1e-6
+
+
+def test_fast_mode_stays_within_tolerance_of_full_score(tmp_path):
+    expected_path = tmp_path / "frame_01.png"
+    cv2.imwrite(str(expected_path), _make_screen())
+    capture = _make_screen(shift=4, clock="12:07")
+
+    report = validar_comparacao_rapida(capture, str(expected_path))
+
+    assert report["dentro_tolerancia"] is True
+    assert 0.0 < report["rapido"] <= 1.0
+
+
+def test_ignore_regions_remove_clock_from_score(tmp_path):
+    expected_path = tmp_path / "frame_01.png"
+    cv2.imwrite(str(expected_path), _make_screen())
+    capture = _make_screen(clock="18:45")
+
+    plain = comparar_imagens(capture, str(expected_path))
+    masked = comparar_imagens(capture, str(expected_path), ignore_regions=[[0, 0, 400, 28]])
+
+    assert plain < 1.0
+    assert masked == pytest.approx(1.0)
+
+
+def test_full_map_only_built_on_request(tmp_path):
+    expected_path = tmp_path / "frame_01.png"
+    cv2.imwrite(str(expected_path), _make_screen())
+
+    score = comparar_imagens(_make_screen(), str(expected_path))
+    score_full, ssim_map = comparar_imagens(_make_screen(), str(expected_path), full=True)
+
+    assert isinstance(score, float)
+    assert score_full == score
+    assert ssim_map.shape == (120, 200)
+
+
+def _tar_bytes(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for name, payload in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(payload)
+            archive.addfile(info, io.BytesIO(payload))
+    buffer.seek(0)
+    return buffer
+
+
+def test_extract_tar_stream_groups_members_by_pattern(tmp_path):
+    stream = _tar_bytes(
+        {
+            "data/anr/trace_01.txt": b"anr",
+            "data/log/session/main.log": b"main",
+            "data/misc/bluetooth/btsnoop_hci.log": b"bt",
+        }
+    )
+    logs_root = tmp_path / "radio_logs"
+    patterns = ("/data/tombstones/*", "/data/anr/*", "/data/log/*", "/data/misc/bluetooth*")
+
+    payloads, total = _extrair_tar_stream(stream, str(logs_root), str(tmp_path), patterns)
+
+    assert total == 3
+    assert [item["status"] for item in payloads] == ["vazio", "capturado", "capturado", "capturado"]
+    assert payloads[2]["artifacts"] == [os.path.join("radio_logs", "03_log", "session")]
+    assert (logs_root / "02_anr" / "trace_01.txt").read_bytes() == b"anr"
+    assert (logs_root / "03_log" / "session" / "main.log").read_bytes() == b"main"
+    assert (logs_root / "04_bluetooth" / "bluetooth" / "btsnoop_hci.log").read_bytes() == b"bt"
+
+
+def test_bulk_cleanup_reports_status_per_pattern(monkeypatch):
+    def fake_run(cmd, timeout=None, quiet=False):
+        lines = [f"{idx}:{1 if idx == 2 else 0}" for idx in range(len(run_noia.DEFAULT_FAILURE_LOG_PATTERNS))]
+        return subprocess.CompletedProcess(cmd, 0, stdout="\n".join(lines), stderr="")
+
+    monkeypatch.setattr(run_noia, "run_subprocess", fake_run)
+
+    cleaned = run_noia.preparar_logs_pos_falha("SERIAL")
+
+    assert len(cleaned) == len(run_noia.DEFAULT_FAILURE_LOG_PATTERNS)
+    assert cleaned[2]["status"] == "erro"
+    assert all(item["status"] == "ok" for idx, item in enumerate(cleaned) if idx != 2)
+
+
+def test_compile_dataset_pairs_swipes_and_reports_errors_up_front():
+    linhas = [
+        {"x": 10, "y": 20, "tipo": "tap"},
+        {"x": 100, "y": 200, "tipo": "swipe_inicio"},
+        {"x": 300, "y": 400, "tipo": "swipe_fim"},
+        {"x": 5, "y": 6, "tipo": "long_press", "duracao_s": 1.5},
+        {"x": None, "y": 7, "tipo": "tap"},
+    ]
+
+    acoes, erros, avisos = run_noia.compilar_dataset(linhas)
+
+    assert [acao.tipo for acao in acoes] == ["tap", "swipe_inicio", "long_press", "tap"]
+    assert [acao.idx for acao in acoes] == [1, 2, 3, 4]
+    assert (acoes[1].x, acoes[1].y, acoes[1].x2, acoes[1].y2) == (100, 200, 300, 400)
+    assert acoes[2].linha == 4
+    assert acoes[2].duracao_ms == 1500
+    assert erros == ["linha 5: tap exige colunas x e y"]
+    assert avisos == []
+    assert not hasattr(acoes[0], "__dict__")
+
+
+def test_compiled_dataset_sidecar_is_reused_until_csv_changes(tmp_path, monkeypatch):
+    dataset_path = tmp_path / "dataset.csv"
+    dataset_path.write_text("x,y,tipo\n971,1001,tap\n692,1021,tap\n", encoding="utf-8")
+
+    acoes, erros, _ = run_noia.carregar_dataset_compilado(str(dataset_path))
+    assert erros == []
+    assert acoes[0].coordenadas == {"x": 971, "y": 1001, "tipo": "tap"}
+    assert (tmp_path / "dataset.csv.compilado.json").exists()
+
+    def fail_compile(_linhas):
+        raise AssertionError("sidecar deveria ter sido reutilizado")
+
+    monkeypatch.setattr(run_noia, "compilar_dataset", fail_compile)
+    cached, _, _ = run_noia.carregar_dataset_compilado(str(dataset_path))
+    assert [(acao.x, acao.y) for acao in cached] == [(971, 1001), (692, 1021)]
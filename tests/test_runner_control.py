@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+
+from app.shared.runner_control import RunnerControl, send_command
+
+
+def test_commands_reach_runner_through_local_socket(tmp_path):
+    control_dir = str(tmp_path / "control")
+    with RunnerControl("SERIAL01", control_dir=control_dir) as control:
+        replies = send_command("pause", "SERIAL01", control_dir=control_dir)
+        assert replies[0]["ok"] is True
+        assert replies[0]["paused"] is True
+        assert control.paused() is True
+
+        send_command("resume", control_dir=control_dir)
+        assert control.paused() is False
+
+    assert send_command("status", "SERIAL01", control_dir=control_dir) == []
+
+
+def test_step_releases_exactly_one_action_while_paused(tmp_path):
+    control = RunnerControl("SERIAL02", control_dir=str(tmp_path), flag_poll_s=0.05)
+    control.apply("pause")
+    control.apply("step")
+
+    assert control.wait_if_paused() is True
+    released = []
+    waiter = threading.Thread(target=lambda: released.append(control.wait_if_paused()))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive()
+
+    control.apply("stop")
+    waiter.join(timeout=1.0)
+    assert released == [False]
+
+
+def test_pause_discards_steps_requested_before_it(tmp_path):
+    control = RunnerControl("SERIAL04", control_dir=str(tmp_path), flag_poll_s=0.05)
+    control.apply("step")
+    control.apply("step")
+    assert control.wait_if_paused() is True
+
+    state = control.apply("pause")
+    assert state["steps"] == 0
+    waiter = threading.Thread(target=control.wait_if_paused)
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive()
+
+    control.apply("stop")
+    waiter.join(timeout=1.0)
+
+
+def test_flag_files_remain_a_fallback(tmp_path):
+    pause_flag = tmp_path / "pause.flag"
+    stop_flag = tmp_path / "stop.flag"
+    control = RunnerControl(
+        "SERIAL03",
+        pause_flag=str(pause_flag),
+        stop_flag=str(stop_flag),
+        flag_poll_s=0.0,
+        control_dir=str(tmp_path),
+    )
+
+    pause_flag.write_text("pause", encoding="utf-8")
+    assert control.paused() is True
+    stop_flag.write_text("stop", encoding="utf-8")
+    assert control.stop_requested() is True
+    assert control.wait_if_paused() is False
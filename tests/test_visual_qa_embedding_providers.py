@@ -8,8 +8,10 @@ import numpy as np
 import pytest
 from PIL import Image
 
+from visual_qa.infrastructure.embeddings.fallback_provider import LocalFeatureEmbeddingProvider
 from visual_qa.infrastructure.embeddings.mobileclip_provider import MobileCLIPEmbeddingProvider
 from visual_qa.infrastructure.embeddings.openclip_provider import OpenCLIPEmbeddingProvider
+from visual_qa.interfaces.cli.benchmark_embeddings_cli import benchmark_provider
 
 
 class _DummyTensor:
@@ -112,3 +114,57 @@ def test_openclip_rejects_unsupported_extension(tmp_path: Path, monkeypatch: pyt
 
     with pytest.raises(ValueError, match="Unsupported image extension"):
         provider.embed_image(str(image_path))
+
+
+class _FakeBatch:
+    def __init__(self, rows: int) -> None:
+        self.rows = rows
+
+
+class _BatchModel(_FakeModel):
+    def __init__(self) -> None:
+        self.batch_rows = []
+
+    def encode_image(self, tensor) -> np.ndarray:
+        self.batch_rows.append(tensor.rows)
+        return np.tile(np.array([[3.0, 4.0]], dtype=np.float32), (tensor.rows, 1))
+
+
+def test_openclip_embed_images_stacks_batches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    _patch_clip_deps(monkeypatch)
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"sample_{i}.png"
+        _write_image(path)
+        paths.append(str(path))
+
+    provider = OpenCLIPEmbeddingProvider()
+    model = _BatchModel()
+    provider._model = model
+    provider._torch = SimpleNamespace(no_grad=lambda: _NoGrad(), stack=lambda tensors: _FakeBatch(len(tensors)))
+
+    vectors = provider.embed_images(paths, batch_size=2)
+
+    assert model.batch_rows == [2, 2, 1]
+    assert vectors.shape == (5, 2)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+
+def test_local_feature_embed_images_matches_single_image_path(tmp_path: Path):
+    rng = np.random.default_rng(7)
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"screen_{i}.png"
+        Image.fromarray(rng.integers(0, 256, size=(90, 160, 3), dtype=np.uint8)).save(path)
+        paths.append(str(path))
+
+    provider = LocalFeatureEmbeddingProvider()
+    batched = provider.embed_images(paths, batch_size=2)
+    single = np.vstack([provider.embed_image(path) for path in paths])
+
+    assert batched.shape == single.shape
+    assert np.allclose(batched, single, atol=1e-6)
+
+    report = benchmark_provider(provider, paths, batch_size=4)
+    assert report["images"] == 5 and report["batched_images_per_s"] > 0
+    assert report["max_abs_diff"] < 1e-6
@@ -16,35 +16,27 @@ def test_existing_pixel_adapter_maps_legacy_dict_result(monkeypatch, tmp_path: P
     _touch(actual)
     _touch(baseline)
 
-    calls = {"build": None, "validate": None}
+    calls = {"compare": None}
 
     class FakeValidationConfig:
         def __init__(self, top_k: int, stage1_enabled: bool):
             self.top_k = top_k
             self.stage1_enabled = stage1_enabled
 
-    def fake_build_library_index(reference_dir: str):
-        calls["build"] = reference_dir
-        return {"screens": [{"image_path": "baseline.png"}]}
-
-    def fake_validate_execution_images(screenshot_paths, library_index, cfg):
-        calls["validate"] = (screenshot_paths, library_index, cfg)
+    def fake_compare_screenshot_pair(screenshot_path, reference_path, cfg):
+        calls["compare"] = (screenshot_path, reference_path, cfg)
         return {
-            "items": [
-                {
-                    "status": "PASS",
-                    "scores": {"global": 0.97},
-                    "diff_summary": {"diff_area_ratio": 0.0125},
-                    "toggle_changes": [],
-                    "critical_region_failures": [],
-                    "debug_images": {"overlay": "/tmp/overlay.png"},
-                }
-            ]
+            "status": "PASS",
+            "scores": {"global": 0.97},
+            "diff_summary": {"diff_area_ratio": 0.0125},
+            "toggle_changes": [],
+            "critical_region_failures": [],
+            "debug_images": {"overlay": "/tmp/overlay.png"},
         }
 
     monkeypatch.setattr(
         "visual_qa.infrastructure.pixel_compare.existing_pixel_adapter._load_legacy_pixel_api",
-        lambda: (FakeValidationConfig, fake_validate_execution_images, fake_build_library_index),
+        lambda: (FakeValidationConfig, fake_compare_screenshot_pair),
     )
 
     adapter = ExistingPixelAdapter()
@@ -56,9 +48,9 @@ def test_existing_pixel_adapter_maps_legacy_dict_result(monkeypatch, tmp_path: P
     assert result.diff_image_path == "/tmp/overlay.png"
     assert result.issues == []
     assert result.raw["legacy_result"]["items"][0]["status"] == "PASS"
-    assert calls["build"] is not None
-    screenshot_paths, _library_index, cfg = calls["validate"]
-    assert screenshot_paths == [str(actual.resolve())]
+    screenshot_path, reference_path, cfg = calls["compare"]
+    assert screenshot_path == str(actual.resolve())
+    assert reference_path == str(baseline.resolve())
     assert cfg.top_k == 1
     assert cfg.stage1_enabled is False
 
@@ -74,15 +66,12 @@ def test_existing_pixel_adapter_handles_missing_fields(monkeypatch, tmp_path: Pa
             self.top_k = top_k
             self.stage1_enabled = stage1_enabled
 
-    def fake_build_library_index(_reference_dir: str):
+    def fake_compare_screenshot_pair(_screenshot_path, _reference_path, _cfg):
         return {}
 
-    def fake_validate_execution_images(_screenshot_paths, _library_index, _cfg):
-        return {"items": [{}]}
-
     monkeypatch.setattr(
         "visual_qa.infrastructure.pixel_compare.existing_pixel_adapter._load_legacy_pixel_api",
-        lambda: (FakeValidationConfig, fake_validate_execution_images, fake_build_library_index),
+        lambda: (FakeValidationConfig, fake_compare_screenshot_pair),
     )
 
     adapter = ExistingPixelAdapter()
@@ -109,22 +98,15 @@ def test_existing_pixel_adapter_captures_saved_debug_image_paths(monkeypatch, tm
             self.top_k = top_k
             self.stage1_enabled = stage1_enabled
 
-    def fake_build_library_index(_reference_dir: str):
-        return {}
-
-    def fake_validate_execution_images(_screenshot_paths, _library_index, _cfg):
+    def fake_compare_screenshot_pair(_screenshot_path, _reference_path, _cfg):
         return {
-            "items": [
-                {
-                    "status": "FAIL_SCREEN_MISMATCH",
-                    "debug_images": {"overlay": object()},
-                }
-            ]
+            "status": "FAIL_SCREEN_MISMATCH",
+            "debug_images": {"overlay": object()},
         }
 
     monkeypatch.setattr(
         "visual_qa.infrastructure.pixel_compare.existing_pixel_adapter._load_legacy_pixel_api",
-        lambda: (FakeValidationConfig, fake_validate_execution_images, fake_build_library_index),
+        lambda: (FakeValidationConfig, fake_compare_screenshot_pair),
     )
     monkeypatch.setattr(
         "visual_qa.infrastructure.pixel_compare.existing_pixel_adapter._write_debug_image",
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+from visual_qa.infrastructure.vector_index.faiss_repository import (
+    INDEX_TYPES,
+    FaissVectorIndexRepository,
+    index_factory_spec,
+)
+from visual_qa.interfaces.cli.benchmark_index_cli import measure_recall
+
+
+def _vectors(count: int = 300, dimension: int = 32) -> np.ndarray:
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_each_index_type_builds_saves_and_reloads(tmp_path, index_type):
+    vectors = _vectors()
+    metadata = [{"image_path": f"s{i}.png", "screen_type": f"screen_{i}"} for i in range(len(vectors))]
+    repo = FaissVectorIndexRepository(index_dir=tmp_path / "idx", index_type=index_type, nprobe=16)
+    repo.build(vectors, metadata)
+    repo.save()
+
+    loaded = FaissVectorIndexRepository(index_dir=tmp_path / "idx", nprobe=16)
+    loaded.load()
+
+    assert loaded.index_type == index_type
+    assert loaded.search(vectors[42], top_k=1)[0].screen_type == "screen_42"
+
+
+def test_metadata_is_written_compactly(tmp_path):
+    repo = FaissVectorIndexRepository(index_dir=tmp_path)
+    repo.build(np.eye(2, dtype=np.float32), [{"image_path": "a.png", "screen_type": "home", "tags": ["x"]}, {}])
+    repo.save()
+
+    raw = (tmp_path / "metadata.json").read_text(encoding="utf-8")
+    assert "\n" not in raw and ": " not in raw
+    assert json.loads(raw) == {
+        "0": {"image_path": "a.png", "screen_type": "home", "tags": ["x"]},
+        "1": {"image_path": "", "screen_type": "unknown"},
+    }
+
+
+def test_trained_types_reject_add_item_before_build(tmp_path):
+    class _Provider:
+        def embed_image(self, _path):
+            return np.ones(8, dtype=np.float32)
+
+    repo = FaissVectorIndexRepository(embedding_provider=_Provider(), index_type="ivf_flat")
+    with pytest.raises(RuntimeError, match="needs training"):
+        repo.add_item("a.png", "home")
+    assert index_factory_spec("ivf_pq", 512, 100) == "IVF40,PQ128x6np"
+    with pytest.raises(ValueError, match="index_type"):
+        FaissVectorIndexRepository(index_type="lsh")
+
+
+def test_recall_benchmark_uses_flat_as_ground_truth():
+    vectors = _vectors(400, 16)
+    rows = measure_recall(vectors, vectors[:20], k=3, index_types=["hnsw", "ivf_sq8"], nprobe=64)
+
+    assert [row["index_type"] for row in rows] == ["flat", "hnsw", "ivf_sq8"]
+    assert rows[0]["recall_at_k"] == 1.0
+    assert all(0.5 <= row["recall_at_k"] <= 1.0 for row in rows)
+    assert rows[2]["index_bytes"] < rows[0]["index_bytes"]
@@ -1,3 +1,5 @@
+import threading
+
 import numpy as np
 
 from visual_qa.infrastructure.vector_index.faiss_repository import FaissVectorIndexRepository
@@ -29,3 +31,42 @@ def test_faiss_repository_save_load_search(tmp_path):
     assert len(result) == 2
     assert result[0]["metadata"]["screen_type"] == "home"
     assert result[0]["score"] >= result[1]["score"]
+
+
+def test_faiss_repository_search_waits_for_incremental_sync():
+    repo = FaissVectorIndexRepository(use_faiss=True)
+    repo.build(
+        np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype=np.float32),
+        [
+            {"image_path": "a.png", "screen_type": "home", "content_hash": "a"},
+            {"image_path": "b.png", "screen_type": "login", "content_hash": "b"},
+        ],
+    )
+    embedding = threading.Event()
+    release = threading.Event()
+
+    def slow_embed(paths):
+        embedding.set()
+        release.wait(5)
+        return np.array([[0.0, 0.0, 1.0]] * len(paths), dtype=np.float32)
+
+    entries = [
+        {"image_path": "a.png", "screen_type": "home", "content_hash": "a"},
+        {"image_path": "c.png", "screen_type": "settings", "content_hash": "c"},
+    ]
+    sync = threading.Thread(target=repo.sync_entries, args=(entries, slow_embed))
+    sync.start()
+    assert embedding.wait(5)
+
+    found = []
+    search = threading.Thread(
+        target=lambda: found.extend(repo.search(np.array([0.0, 0.0, 1.0], dtype=np.float32), top_k=1))
+    )
+    search.start()
+    search.join(0.2)
+    assert search.is_alive()
+
+    release.set()
+    sync.join(5)
+    search.join(5)
+    assert [match["metadata"]["screen_type"] for match in found] == ["settings"]
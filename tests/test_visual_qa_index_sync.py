@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+faiss = pytest.importorskip("faiss")
+
+from visual_qa.infrastructure.vector_index.faiss_repository import FaissVectorIndexRepository
+
+
+class _BytesProvider:
+    """Embeds a file from its bytes and records which paths were embedded."""
+
+    name = "BytesProvider"
+
+    def __init__(self) -> None:
+        self.embedded: list[str] = []
+
+    def embed_images(self, image_paths, batch_size=16):
+        self.embedded.extend(image_paths)
+        rows = []
+        for path in image_paths:
+            seed = int.from_bytes(open(path, "rb").read()[:8].ljust(8, b"\0"), "little")
+            rows.append(np.random.default_rng(seed).normal(size=16))
+        return np.asarray(rows, dtype=np.float32)
+
+
+def _write(path, payload: str) -> None:
+    path.write_bytes(payload.encode("utf-8"))
+
+
+def _refs(tmp_path, names):
+    ref_dir = tmp_path / "refs"
+    ref_dir.mkdir(exist_ok=True)
+    for name in names:
+        _write(ref_dir / f"{name}.png", name)
+    return ref_dir
+
+
+def test_sync_embeds_only_new_or_changed_images(tmp_path):
+    ref_dir = _refs(tmp_path, ["home", "login", "media", "radio"])
+    provider = _BytesProvider()
+    repo = FaissVectorIndexRepository(index_dir=tmp_path / "idx", embedding_provider=provider)
+    repo.build_from_folder(str(ref_dir))
+    repo.save()
+    assert len(provider.embedded) == 4
+
+    _write(ref_dir / "login.png", "login-v2")
+    (ref_dir / "radio.png").unlink()
+    _write(ref_dir / "phone.png", "phone")
+    provider.embedded.clear()
+
+    reloaded = FaissVectorIndexRepository(index_dir=tmp_path / "idx", embedding_provider=provider)
+    reloaded.load()
+    summary = reloaded.sync_folder(str(ref_dir), compact_ratio=1.0)
+    reloaded.save()
+
+    assert sorted(p.rsplit("/", 1)[-1] for p in provider.embedded) == ["login.png", "phone.png"]
+    assert {k: summary[k] for k in ("mode", "added", "updated", "removed", "unchanged")} == {
+        "mode": "incremental",
+        "added": 1,
+        "updated": 1,
+        "removed": 1,
+        "unchanged": 2,
+    }
+    assert summary["ntotal"] == 4
+
+    fresh = _BytesProvider().embed_images([str(ref_dir / "login.png")])[0]
+    hit = reloaded.search(fresh, top_k=1)[0]
+    assert hit.screen_type == "login" and hit.score == pytest.approx(1.0, abs=1e-5)
+    assert hit.vector_id == 4  # changed images get a new id; old ids are never reused
+    assert "radio" not in {c.screen_type for c in reloaded.search(fresh, top_k=10)}
+
+
+def test_hnsw_tombstones_until_compaction(tmp_path):
+    ref_dir = _refs(tmp_path, [f"screen{i}" for i in range(8)])
+    provider = _BytesProvider()
+    repo = FaissVectorIndexRepository(embedding_provider=provider, index_type="hnsw")
+    repo.build_from_folder(str(ref_dir))
+
+    (ref_dir / "screen0.png").unlink()
+    summary = repo.sync_folder(str(ref_dir), compact_ratio=0.5)
+    assert summary["removed"] == 1 and not summary["compacted"]
+    assert repo.describe()["dead"] == 1
+    assert all(c.vector_id != 0 for c in repo.search(np.ones(16, dtype=np.float32), top_k=8))
+    assert len(repo.search(np.ones(16, dtype=np.float32), top_k=7)) == 7
+
+    for i in range(1, 5):
+        (ref_dir / f"screen{i}.png").unlink()
+    summary = repo.sync_folder(str(ref_dir), compact_ratio=0.5)
+    assert summary["compacted"]
+    assert repo.describe()["dead"] == 0 and repo.describe()["ntotal"] == 3
+
+
+def test_ivf_removes_by_id_and_retrains_after_growth(tmp_path):
+    ref_dir = _refs(tmp_path, [f"s{i:02d}" for i in range(40)])
+    provider = _BytesProvider()
+    repo = FaissVectorIndexRepository(embedding_provider=provider, index_type="ivf_flat", nprobe=64)
+    repo.build_from_folder(str(ref_dir))
+
+    (ref_dir / "s00.png").unlink()
+    assert repo.sync_folder(str(ref_dir))["removed"] == 1
+    assert repo.describe()["ntotal"] == 39
+
+    for i in range(40, 60):
+        _write(ref_dir / f"s{i:02d}.png", f"s{i:02d}")
+    summary = repo.sync_folder(str(ref_dir), compact_ratio=0.25)
+    assert summary["added"] == 20 and summary["compacted"]
+    query = provider.embed_images([str(ref_dir / "s55.png")])[0]
+    assert repo.search(query, top_k=1)[0].image_path.endswith("s55.png")
+
+
+def test_save_is_atomic_and_load_rejects_mismatched_pair(tmp_path):
+    repo = FaissVectorIndexRepository(index_dir=tmp_path)
+    repo.build(np.eye(3, dtype=np.float32), [{"screen_type": s} for s in ("a", "b", "c")])
+    repo.save()
+
+    state = json.loads((tmp_path / "index_state.json").read_text(encoding="utf-8"))
+    assert state["next_id"] == 3 and state["index_type"] == "flat"
+    assert not list(tmp_path.glob(".*.tmp"))
+
+    other = FaissVectorIndexRepository()
+    other.build(np.eye(2, dtype=np.float32), [{"screen_type": "x"}, {"screen_type": "y"}])
+    (tmp_path / "index.faiss").write_bytes(faiss.serialize_index(other._index).tobytes())
+    with pytest.raises(RuntimeError, match="index_state.json"):
+        FaissVectorIndexRepository(index_dir=tmp_path).load()
+
+
+def test_legacy_flat_index_is_converted_on_first_sync(tmp_path):
+    ref_dir = _refs(tmp_path, ["home", "login"])
+    provider = _BytesProvider()
+    vectors = provider.embed_images([str(ref_dir / "home.png"), str(ref_dir / "login.png")])
+    legacy = faiss.IndexFlatIP(16)
+    legacy.add(vectors / np.linalg.norm(vectors, axis=1, keepdims=True))
+    faiss.write_index(legacy, str(tmp_path / "index.faiss"))
+    metadata = {str(i): {"image_path": str(ref_dir / f"{n}.png"), "screen_type": n} for i, n in enumerate(["home", "login"])}
+    (tmp_path / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+
+    repo = FaissVectorIndexRepository(index_dir=tmp_path, embedding_provider=provider)
+    repo.load()
+    provider.embedded.clear()
+    summary = repo.sync_folder(str(ref_dir))
+
+    # Legacy metadata has no content hashes, so both files count as changed once.
+    assert summary["mode"] == "incremental" and summary["updated"] == 2
+    assert repo.describe()["index_class"] == "IndexIDMap2"
+    provider.embedded.clear()
+    assert repo.sync_folder(str(ref_dir))["unchanged"] == 2
+    assert provider.embedded == []
+
+
+def test_build_use_case_incremental_reuses_saved_index(tmp_path):
+    from visual_qa.application.use_cases.build_vector_index import BuildVectorIndex
+
+    ref_dir = _refs(tmp_path, ["home", "login"])
+    provider = _BytesProvider()
+    index_dir = str(tmp_path / "idx")
+    use_case = BuildVectorIndex(embedding_provider=provider, vector_repo=FaissVectorIndexRepository())
+    use_case.execute(str(ref_dir), index_dir, incremental=True)
+    assert len(provider.embedded) == 2
+
+    _write(ref_dir / "media.png", "media")
+    provider.embedded.clear()
+    rerun = BuildVectorIndex(embedding_provider=provider, vector_repo=FaissVectorIndexRepository())
+    summary = rerun.execute(str(ref_dir), index_dir, incremental=True)
+
+    assert [p.rsplit("/", 1)[-1] for p in provider.embedded] == ["media.png"]
+    assert summary["sync"]["unchanged"] == 2 and summary["sync"]["added"] == 1
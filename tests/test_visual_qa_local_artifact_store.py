@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import json
+import os
+import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+
 from visual_qa.domain.entities import PixelDiffResult, ScreenMatch, ValidationRun
+from visual_qa.infrastructure.storage import run_history
 from visual_qa.infrastructure.storage.local_artifact_store import LocalArtifactStore
 
 
@@ -125,3 +130,97 @@ def test_local_artifact_store_copies_diff_images_when_present(tmp_path: Path):
     assert len(copied) >= 1
     assert any(Path(path).exists() for path in copied)
     assert (tmp_path / "runs" / "run-456" / "diff_images" / "overlay.png").exists()
+
+
+def test_local_artifact_store_imports_jsonl_and_keeps_rolling_stats(tmp_path: Path):
+    runs_dir = tmp_path / "runs"
+    runs_dir.mkdir()
+    legacy = [
+        {
+            "run_id": f"r{i}",
+            "predicted_screen_type": "home",
+            "pixel_status": "PASS" if i % 2 else "FAIL",
+            "difference_percent": float(i),
+        }
+        for i in range(40)
+    ]
+    (runs_dir / "index.jsonl").write_text("\n".join(json.dumps(r) for r in legacy) + "\nnot json\n", encoding="utf-8")
+    (runs_dir / "logs.jsonl").write_text(
+        json.dumps({"run_id": "r0", "screen_type": "home", "similarity": 0.5}) + "\n", encoding="utf-8"
+    )
+
+    store = LocalArtifactStore(runs_dir=str(runs_dir), history_window=30)
+    assert [r["run_id"] for r in store.load_runs_index()] == [f"r{i}" for i in range(40)]
+    assert store.compute_historical_metrics("home")["average_similarity"] == 0.5
+
+    stats = store.historical_stats("home")
+    assert stats["count"] == 30
+    assert stats["average_difference_percent"] == sum(range(10, 40)) / 30
+    assert stats["pass_rate"] == 0.5
+
+    store.append_runs_index(
+        {"run_id": "r40", "predicted_screen_type": "home", "pixel_status": "PASS", "difference_percent": 40.0}
+    )
+    stats = store.historical_stats("home")
+    assert stats["average_difference_percent"] == sum(range(11, 41)) / 30
+    assert store.historical_stats("home", last_n=2)["average_difference_percent"] == 39.5
+    assert store.historical_stats("settings") == {"count": 0}
+    assert [r["run_id"] for r in store.load_runs_index(screen_type="home", limit=2)] == ["r39", "r40"]
+
+    # Reopening must not import the JSONL a second time.
+    reopened = LocalArtifactStore(runs_dir=str(runs_dir))
+    assert len(reopened.load_runs_index()) == 41
+    assert reopened.compute_historical_metrics("home")["runs_considered"] == 2
+
+
+def test_local_artifact_store_reopen_skips_schema_setup_and_close_releases_db(tmp_path: Path, monkeypatch):
+    runs_dir = tmp_path / "runs"
+    with LocalArtifactStore(runs_dir=str(runs_dir)) as store:
+        store.append_runs_index({"run_id": "a", "predicted_screen_type": "home"})
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.history_db.load_runs()
+
+    statements: list[str] = []
+    real_connect = sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(run_history.sqlite3, "connect", traced_connect)
+    with LocalArtifactStore(runs_dir=str(runs_dir)) as reopened:
+        assert [r["run_id"] for r in reopened.load_runs_index()] == ["a"]
+    assert not [s for s in statements if "CREATE" in s or "BEGIN IMMEDIATE" in s]
+
+
+def test_local_artifact_store_links_diff_images_and_writes_compact_json(tmp_path: Path):
+    store = LocalArtifactStore(runs_dir=str(tmp_path / "runs"))
+    source_diff = tmp_path / "runs" / "run-789" / "pixel_artifacts" / "diff.png"
+    source_diff.parent.mkdir(parents=True)
+    source_diff.write_bytes(b"img")
+
+    json_path = store.save_json("run-789", {"pixel_result": {"diff_image_path": str(source_diff)}}, filename="result.json")
+
+    linked = tmp_path / "runs" / "run-789" / "diff_images" / "diff.png"
+    assert os.path.samefile(source_diff, linked)
+    raw = json_path.read_text(encoding="utf-8")
+    assert "\n" not in raw and ": " not in raw
+    assert json.loads(raw)["diff_image_artifacts"] == [str(linked)]
+
+
+def test_local_artifact_store_background_writes_are_flushed_in_order(tmp_path: Path):
+    store = LocalArtifactStore(runs_dir=str(tmp_path / "runs"), background_writes=True)
+    paths = [store.save_markdown("run-bg", f"# Report {i}", filename=f"report_{i}.md") for i in range(20)]
+    for i in range(5):
+        store.append_runs_index({"run_id": f"bg{i}", "predicted_screen_type": "home"})
+
+    store.flush()
+    assert [p.read_text(encoding="utf-8") for p in paths] == [f"# Report {i}" for i in range(20)]
+    lines = (tmp_path / "runs" / "index.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["run_id"] for line in lines] == [f"bg{i}" for i in range(5)]
+
+    store.save_markdown("run-bg", "x", filename="missing_dir/report.md")
+    with pytest.raises(RuntimeError, match="artifact write"):
+        store.flush()
+    store.close()
@@ -1,7 +1,15 @@
+import json
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from pathlib import Path
 
+import numpy as np
+
+from visual_qa.application.use_cases import visual_qa_pipeline as pipeline_module
+from visual_qa.application.use_cases.classify_screenshot import ClassifyScreenshot
 from visual_qa.application.use_cases.generate_report import GenerateReport
+from visual_qa.application.use_cases.validate_screenshot import ValidateScreenshot
 from visual_qa.application.use_cases.visual_qa_pipeline import VisualQaPipeline
 from visual_qa.domain.entities import PixelDiffResult, Report, ScreenMatch, ValidationRun
 from visual_qa.infrastructure.storage.local_artifact_store import LocalArtifactStore
@@ -45,7 +53,7 @@ class FakeValidator:
 
 @dataclass
 class FakeReportGenerator:
-    def generate_report(self, payload):
+    def generate_report(self, payload, on_chunk=None):
         return Report(
             provider="fake",
             model="fake-model",
@@ -83,3 +91,205 @@ def test_pipeline_orchestration_with_fakes(tmp_path):
     idx_rows = store.load_runs_index()
     assert len(idx_rows) == 1
     assert idx_rows[0]["predicted_screen_type"] == "home_screen"
+
+
+class CountingEmbeddingProvider:
+    def __init__(self):
+        self.batches = []
+
+    def embed_image(self, image_path):
+        raise AssertionError("batch mode must embed through embed_images")
+
+    def embed_images(self, image_paths, batch_size=16):
+        self.batches.append(list(image_paths))
+        return np.tile(np.array([1.0, 0.0], dtype=np.float32), (len(image_paths), 1))
+
+
+class CountingVectorRepo:
+    def __init__(self):
+        self.loads = 0
+
+    def load(self, index_dir):
+        self.loads += 1
+
+    def search(self, query_vector, top_k):
+        return [{"score": 0.9, "metadata": {"screen_type": "home_screen", "image_path": "/tmp/home.png"}}]
+
+
+class FlakyComparator:
+    def compare(self, actual_image_path, expected_image_path, output_dir=None):
+        if actual_image_path.endswith("broken.png"):
+            raise RuntimeError("decode failed")
+        return PixelDiffResult(
+            status="PASS",
+            baseline_image=expected_image_path,
+            actual_image=actual_image_path,
+            ssim_score=0.99,
+            difference_percent=0.1,
+        )
+
+
+def test_pipeline_run_batch_loads_index_once_and_writes_summary(tmp_path, monkeypatch):
+    git_calls = []
+    monkeypatch.setattr(pipeline_module, "_safe_git_sha", lambda: git_calls.append(1) or "abc123")
+    monkeypatch.setattr(
+        "visual_qa.application.use_cases.validate_screenshot._safe_git_sha",
+        lambda: git_calls.append(1) or "abc123",
+    )
+    provider = CountingEmbeddingProvider()
+    repo = CountingVectorRepo()
+    validator = ValidateScreenshot(
+        classifier=ClassifyScreenshot(embedding_provider=provider, vector_repo=repo),
+        pixel_comparator=FlakyComparator(),
+    )
+    store = LocalArtifactStore(runs_dir=str(tmp_path / "runs"))
+    pipeline = VisualQaPipeline(
+        validator=validator,
+        report_use_case=GenerateReport(report_generator=FakeReportGenerator()),
+        artifact_store=store,
+    )
+    paths = [f"/tmp/shot_{i}.png" for i in range(5)] + ["/tmp/broken.png"]
+
+    batch = pipeline.run_batch(paths, "/tmp/index", top_k=3, threshold=0.5, config_snapshot={}, workers=3, batch_size=4)
+
+    assert repo.loads == 1
+    assert provider.batches == [paths[:4], paths[4:]]
+    assert git_calls == [1]
+    assert len(batch.runs) == 5
+    assert batch.errors[0]["screenshot_path"] == "/tmp/broken.png"
+    summary = json.loads(batch.summary_path.read_text(encoding="utf-8"))
+    assert summary["totals"] == {"screenshots": 6, "completed": 5, "failed": 1}
+    assert summary["status_counts"] == {"PASS": 5}
+    assert all(Path(row["result_json"]).exists() for row in summary["runs"])
+    rows = store.load_runs_index()
+    assert len(rows) == 5 and {row["batch_id"] for row in rows} == {batch.batch_id}
+
+
+
+class UnreadableOnceEmbeddingProvider(CountingEmbeddingProvider):
+    def embed_image(self, image_path):
+        if image_path.endswith("unreadable.png"):
+            raise ValueError("cannot decode image")
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+    def embed_images(self, image_paths, batch_size=16):
+        if any(path.endswith("unreadable.png") for path in image_paths):
+            raise ValueError("cannot decode image")
+        return super().embed_images(image_paths, batch_size=batch_size)
+
+
+def test_pipeline_run_batch_passes_strategy_and_survives_batch_classification_error(tmp_path):
+    validator = ValidateScreenshot(
+        classifier=ClassifyScreenshot(embedding_provider=UnreadableOnceEmbeddingProvider(), vector_repo=CountingVectorRepo()),
+        pixel_comparator=FlakyComparator(),
+    )
+    pipeline = VisualQaPipeline(
+        validator=validator,
+        report_use_case=GenerateReport(report_generator=FakeReportGenerator()),
+        artifact_store=LocalArtifactStore(runs_dir=str(tmp_path / "runs")),
+    )
+    paths = ["/tmp/shot_0.png", "/tmp/unreadable.png", "/tmp/shot_1.png"]
+
+    batch = pipeline.run_batch(paths, "/tmp/index", top_k=3, threshold=0.5, config_snapshot={}, strategy="vote")
+
+    assert [run.screenshot_path for run in batch.runs] == ["/tmp/shot_0.png", "/tmp/shot_1.png"]
+    assert [error["screenshot_path"] for error in batch.errors] == ["/tmp/unreadable.png"]
+    summary = json.loads(batch.summary_path.read_text(encoding="utf-8"))
+    assert summary["totals"] == {"screenshots": 3, "completed": 2, "failed": 1}
+    for run in batch.runs:
+        result = json.loads(run.json_path.read_text(encoding="utf-8"))
+        assert result["classification"]["classification_strategy"] == "vote"
+
+
+def test_pipeline_run_forwards_strategy_to_validator(tmp_path):
+    seen = []
+
+    class RecordingValidator(FakeValidator):
+        def execute(self, **kwargs):
+            seen.append(kwargs.get("strategy"))
+            return super().execute(**kwargs)
+
+    pipeline = VisualQaPipeline(
+        validator=RecordingValidator(),
+        report_use_case=GenerateReport(report_generator=FakeReportGenerator()),
+        artifact_store=LocalArtifactStore(runs_dir=str(tmp_path / "runs")),
+    )
+
+    run = pipeline.run("/tmp/actual.png", "/tmp/index", top_k=5, threshold=0.4, config_snapshot={}, strategy="vote")
+
+    assert seen == ["vote"]
+    assert json.loads(run.json_path.read_text(encoding="utf-8"))["classification"]["classification_strategy"] == "vote"
+
+class BlockingReportGenerator:
+    def __init__(self, fail=False):
+        self.release = threading.Event()
+        self.fail = fail
+
+    def generate_report(self, payload, on_chunk=None):
+        assert self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("llm offline")
+        return FakeReportGenerator().generate_report(payload)
+
+
+def test_pipeline_async_reports_do_not_block_validation(tmp_path):
+    generator = BlockingReportGenerator()
+    completed = []
+    store = LocalArtifactStore(runs_dir=str(tmp_path / "runs"))
+    pipeline = VisualQaPipeline(
+        validator=FakeValidator(),
+        report_use_case=GenerateReport(report_generator=generator),
+        artifact_store=store,
+        async_reports=True,
+        on_report=completed.append,
+    )
+
+    run = pipeline.run(
+        screenshot_path="/tmp/actual.png", index_dir="/tmp/index", top_k=5, threshold=0.4, config_snapshot={}
+    )
+
+    assert run.report_status == "pending"
+    result = json.loads(run.json_path.read_text(encoding="utf-8"))
+    assert result["report"]["status"] == "pending"
+    assert store.load_runs_index()[0]["report_status"] == "pending"
+    assert not pipeline.wait_for_reports(timeout=0.05)
+
+    generator.release.set()
+    assert pipeline.wait_for_reports(timeout=5)
+    pipeline.close()
+
+    result = json.loads(run.json_path.read_text(encoding="utf-8"))
+    assert result["report"]["status"] == "done"
+    assert result["report"]["provider"] == "fake"
+    assert result["pixel_result"]["status"] == "PASS"
+    assert run.report_path.read_text(encoding="utf-8").startswith("# Fake report")
+    status = json.loads((run.json_path.parent / "report_status.json").read_text(encoding="utf-8"))
+    assert status["status"] == "done" and status["run_id"] == run.run_id
+    assert [c["status"] for c in completed] == ["done"]
+    assert store.load_runs_index()[0]["report_status"] == "done"
+
+
+def test_pipeline_async_report_failure_is_recorded(tmp_path):
+    generator = BlockingReportGenerator(fail=True)
+    generator.release.set()
+    store = LocalArtifactStore(runs_dir=str(tmp_path / "runs"))
+    pipeline = VisualQaPipeline(
+        validator=FakeValidator(),
+        report_use_case=GenerateReport(report_generator=generator),
+        artifact_store=store,
+        async_reports=True,
+    )
+
+    run = pipeline.run(
+        screenshot_path="/tmp/actual.png", index_dir="/tmp/index", top_k=5, threshold=0.4, config_snapshot={}
+    )
+    assert pipeline.wait_for_reports(timeout=5)
+    pipeline.close()
+
+    result = json.loads(run.json_path.read_text(encoding="utf-8"))
+    assert result["report"]["status"] == "failed"
+    assert "llm offline" in result["report"]["error"]
+    assert not run.report_path.exists()
+    assert store.load_runs_index()[0]["report_status"] == "failed"
+    status = json.loads((run.json_path.parent / "report_status.json").read_text(encoding="utf-8"))
+    assert status["status"] == "failed"
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from visual_qa.config import load_config
+from visual_qa.infrastructure.registry import ResourceRegistry
+
+
+class _SlowProvider:
+    def __init__(self, label: str) -> None:
+        self.label = label
+
+    @property
+    def name(self) -> str:
+        return f"SlowProvider[{self.label}]"
+
+
+def test_provider_is_built_once_per_embedding_config(tmp_path):
+    built = []
+
+    def factory(config):
+        time.sleep(0.05)
+        built.append(config.embedding_provider)
+        return _SlowProvider(config.embedding_provider)
+
+    registry = ResourceRegistry(provider_factory=factory)
+    config = dataclasses.replace(load_config(), embedding_provider="local")
+
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(registry.get_provider(config))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert built == ["local"]
+    assert len({id(p) for p in got}) == 1
+    # Settings unrelated to the model must not trigger a rebuild.
+    assert registry.get_provider(dataclasses.replace(config, runs_dir=tmp_path)) is got[0]
+    assert registry.get_provider(dataclasses.replace(config, embedding_provider="openclip")) is not got[0]
+
+    registry.invalidate_provider(config)
+    registry.get_provider(config)
+    assert built == ["local", "openclip", "local"]
+    stats = registry.stats()
+    assert stats["misses"] == 3 and stats["hits"] >= 4
+    assert [event["kind"] for event in stats["loads"]] == ["provider"] * 3
+
+
+def test_index_is_reloaded_only_when_files_change(tmp_path):
+    pytest.importorskip("faiss")
+    from visual_qa.infrastructure.vector_index.faiss_repository import FaissVectorIndexRepository
+
+    index_dir = tmp_path / "idx"
+    writer = FaissVectorIndexRepository(index_dir=index_dir)
+    writer.build(np.eye(2, dtype=np.float32), [{"screen_type": "home"}, {"screen_type": "login"}])
+    writer.save()
+
+    registry = ResourceRegistry()
+    repo = registry.get_index(index_dir)
+    assert registry.get_index(index_dir) is repo
+    assert repo.load(index_dir) is False
+    assert registry.stats()["misses"] == 1
+
+    writer.build(np.eye(3, dtype=np.float32), [{"screen_type": s} for s in ("a", "b", "c")])
+    writer.save()
+    stamp = time.time() + 5
+    os.utime(index_dir / "index.faiss", (stamp, stamp))
+
+    assert registry.get_index(index_dir) is repo
+    assert repo.search(np.array([0.0, 0.0, 1.0], dtype=np.float32), top_k=1)[0].screen_type == "c"
+    assert registry.stats()["misses"] == 2
+
+    registry.invalidate_index(index_dir)
+    assert registry.get_index(index_dir) is not repo
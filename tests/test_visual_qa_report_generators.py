@@ -1,68 +1,139 @@
 from __future__ import annotations
 
 import json
-import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
+import pytest
+
+from visual_qa.application.use_cases.generate_report import GenerateReport
 from visual_qa.infrastructure.llm.null_report_generator import NullReportGenerator
 from visual_qa.infrastructure.llm.ollama_report_generator import OllamaReportGenerator
 
 
-class _FakeResponse:
-    def __init__(self, payload: dict):
-        self._payload = payload
-
-    def __enter__(self):
-        return self
+_REPORT = "## Summary\nok\n## Findings\nok\n## Issues\nnone\n## Risk\nlow\n## Recommendation\nship"
+
+
+class _StubOllama:
+    """Local HTTP/1.1 server answering /api/generate with a chunked NDJSON token stream."""
+
+    def __init__(self, drop_first: int = 0, delay_s: float = 0.0) -> None:
+        self.requests: list[dict] = []
+        self.paths: list[str] = []
+        self.clients: set = set()
+        self.drop_first = drop_first
+        self.delay_s = delay_s
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *_args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.paths.append(self.path)
+                stub.clients.add(self.client_address)
+                stub.requests.append(json.loads(body))
+                if len(stub.requests) <= stub.drop_first:
+                    self.close_connection = True
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                tokens = [_REPORT[i : i + 8] for i in range(0, len(_REPORT), 8)]
+                for token in tokens:
+                    time.sleep(stub.delay_s)
+                    self._chunk(json.dumps({"response": token, "done": False}) + "\n")
+                self._chunk(json.dumps({"response": "", "done": True}) + "\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chunk(self, text: str) -> None:
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_ollama():
+    servers = []
+
+    def _start(**kwargs):
+        server = _StubOllama(**kwargs)
+        servers.append(server)
+        return server
+
+    yield _start
+    for server in servers:
+        server.close()
+
+
+def test_ollama_report_generator_uses_env_and_retries(monkeypatch, stub_ollama):
+    server = stub_ollama(drop_first=1)
+    monkeypatch.setenv("OLLAMA_BASE_URL", server.url)
+    monkeypatch.setenv("OLLAMA_MODEL", "llama3")
 
-    def __exit__(self, exc_type, exc, tb):
-        return False
+    generator = OllamaReportGenerator(timeout_s=3, max_retries=2)
+    report = generator.generate_report({"run": {"run_id": "abc"}})
 
-    def read(self) -> bytes:
-        return json.dumps(self._payload).encode("utf-8")
+    assert len(server.requests) == 2
+    assert report.provider == "ollama"
+    assert report.model == "llama3"
+    assert report.markdown == _REPORT
+    assert server.paths == ["/api/generate", "/api/generate"]
+    assert server.requests[-1]["model"] == "llama3" and server.requests[-1]["stream"] is True
 
 
-def test_ollama_report_generator_uses_env_and_retries(monkeypatch):
-    monkeypatch.setenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    monkeypatch.setenv("OLLAMA_MODEL", "llama3")
+def test_ollama_report_generator_raises_after_max_retries(stub_ollama):
+    server = stub_ollama(drop_first=99)
+    generator = OllamaReportGenerator(base_url=server.url, model="llama3", max_retries=2)
 
-    attempts = {"count": 0}
-    seen_requests = []
+    with pytest.raises(RuntimeError, match="after 3 attempt\\(s\\)"):
+        generator.generate_report({"run": {"run_id": "x"}})
+    assert len(server.requests) == 3
 
-    def fake_urlopen(req, timeout):
-        attempts["count"] += 1
-        seen_requests.append((req, timeout))
-        if attempts["count"] == 1:
-            raise socket.timeout("timeout")
-        return _FakeResponse(
-            {
-                "response": "## Summary\nok\n## Findings\nok\n## Issues\nnone\n## Risk\nlow\n## Recommendation\nship",
-            }
-        )
 
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
+def test_ollama_streams_over_one_pooled_connection_and_caches(tmp_path, stub_ollama):
+    server = stub_ollama(delay_s=0.01)
+    generator = OllamaReportGenerator(base_url=server.url, model="llama3", cache_dir=tmp_path, partial_interval_s=0)
+    payload = {
+        "run": {"run_id": "r1", "reproducibility": {"python": "3.11"}},
+        "classification": {"predicted_screen_type": "home", "winning_score": 0.912345678, "matches": []},
+        "pixel_result": {"status": "PASS", "difference_percent": 0.4, "raw": {"huge": "x" * 5000}},
+    }
 
-    generator = OllamaReportGenerator(timeout_s=3, max_retries=2)
-    report = generator.generate_report({"run": {"run_id": "abc"}})
+    partials: list[str] = []
+    first = generator.generate_report(payload, on_chunk=partials.append)
+    assert len(partials) > 2 and partials[-1] == _REPORT
+    assert all(_REPORT.startswith(p.strip()) for p in partials)
 
-    assert attempts["count"] == 2
-    assert report.provider == "ollama"
-    assert report.model == "llama3"
-    assert "## Summary" in report.markdown
-    req, timeout = seen_requests[-1]
-    assert req.full_url == "http://localhost:11434/api/generate"
-    assert timeout == 3
+    prompt = server.requests[0]["prompt"]
+    assert "reproducibility" not in prompt and "huge" not in prompt and "r1" not in prompt
+    assert '"winning_score":0.9123' in prompt
 
+    # A different run with the same outcome is served from the cache.
+    second = generator.generate_report({**payload, "run": {"run_id": "r2"}})
+    assert second.markdown == first.markdown and len(server.requests) == 1
 
-def test_ollama_report_generator_raises_after_max_retries(monkeypatch):
-    monkeypatch.setattr("urllib.request.urlopen", lambda *_args, **_kwargs: (_ for _ in ()).throw(socket.timeout()))
-    generator = OllamaReportGenerator(base_url="http://127.0.0.1:11434", model="llama3", max_retries=2)
+    generator.generate_report({**payload, "pixel_result": {"status": "FAIL", "difference_percent": 9.0}})
+    assert len(server.requests) == 2
+    assert generator.connections_opened == 1 and len(server.clients) == 1
 
-    try:
-        generator.generate_report({"run": {"run_id": "x"}})
-    except RuntimeError as exc:
-        assert "after 3 attempt(s)" in str(exc)
-    else:
-        raise AssertionError("Expected RuntimeError when Ollama keeps timing out")
+    reloaded = OllamaReportGenerator(base_url=server.url, model="llama3", cache_dir=tmp_path)
+    assert reloaded.generate_report(payload).markdown == _REPORT
+    assert len(server.requests) == 2
+    generator.close()
 
 
 def test_null_report_generator_output_is_stable():
@@ -91,3 +162,12 @@ def test_null_report_generator_output_is_stable():
     assert "## Issues" in md1
     assert "## Risk" in md1
     assert "## Recommendation" in md1
+
+
+
+def test_generate_report_forwards_on_chunk_to_port_implementations():
+    chunks: list[str] = []
+    report = GenerateReport(report_generator=NullReportGenerator()).execute({}, on_chunk=chunks.append)
+
+    assert chunks == [report.markdown]
+    assert GenerateReport(report_generator=NullReportGenerator()).execute({}).markdown == report.markdown
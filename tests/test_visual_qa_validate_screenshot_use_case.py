@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import json
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
+from visual_qa.application.use_cases.generate_report import GenerateReport
+from visual_qa.application.use_cases.report_worker import ReportWorker
 from visual_qa.application.use_cases.validate_screenshot import ValidateScreenshot
 from visual_qa.domain.entities import PixelDiffResult, Report, ScreenMatch
 from visual_qa.domain.scaffold_entities import ScreenMatch as Stage1ScreenMatch
+from visual_qa.infrastructure.storage.local_artifact_store import LocalArtifactStore
 
 
 @dataclass
@@ -40,7 +44,7 @@ class FakePixelComparator:
 class FakeReportGenerator:
     calls: list
 
-    def generate_report(self, payload):
+    def generate_report(self, payload, on_chunk=None):
         self.calls.append(payload)
         return Report(
             provider="fake",
@@ -238,3 +242,80 @@ def test_validate_screenshot_handles_unknown_without_baseline(monkeypatch, tmp_p
     assert "no baseline image" in payload["pixel_compare_skipped_reason"].lower()
     assert run.report_path is not None and run.report_path.exists()
     assert run.json_path is not None and run.json_path.exists()
+
+
+class StreamingReportGenerator:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.streamed = threading.Event()
+        self.release = threading.Event()
+
+    def generate_report(self, payload, on_chunk=None):
+        on_chunk("## Summary\npartial")
+        self.streamed.set()
+        assert self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("llm offline")
+        return FakeReportGenerator(calls=[]).generate_report(payload)
+
+
+def _queued_use_case(tmp_path: Path, generator) -> tuple[ValidateScreenshot, LocalArtifactStore, ReportWorker]:
+    store = LocalArtifactStore(runs_dir=str(tmp_path / "runs"))
+    worker = ReportWorker(GenerateReport(report_generator=generator), store)
+    classifier = FakeClassifier(
+        result={"predicted_screen_type": "home_screen", "selected_baseline_image": "/tmp/home.png", "matches": [_base_match()]},
+        calls=[],
+    )
+    pixel = FakePixelComparator(
+        response=PixelDiffResult(
+            status="PASS",
+            baseline_image="/tmp/home.png",
+            actual_image="/tmp/actual.png",
+            ssim_score=0.99,
+            difference_percent=0.1,
+        ),
+        calls=[],
+    )
+    use_case = ValidateScreenshot(classifier=classifier, pixel_comparator=pixel, artifact_store=store, report_worker=worker)
+    return use_case, store, worker
+
+
+def test_validate_screenshot_queues_report_and_updates_index_when_done(tmp_path: Path):
+    generator = StreamingReportGenerator()
+    use_case, store, worker = _queued_use_case(tmp_path, generator)
+
+    run = use_case.execute(screenshot_path="/tmp/actual.png", index_dir="/tmp/index", top_k=3, threshold=0.5)
+
+    assert run.report_status == "pending"
+    assert json.loads(run.json_path.read_text(encoding="utf-8"))["report"]["status"] == "pending"
+    assert store.load_runs_index()[0]["report_status"] == "pending"
+    assert generator.streamed.wait(5)
+    assert (run.json_path.parent / "report.partial.md").read_text(encoding="utf-8").endswith("partial")
+    assert not run.report_path.exists()
+
+    generator.release.set()
+    assert worker.wait(timeout=5)
+    worker.close()
+
+    assert run.report_path.read_text(encoding="utf-8") == "# Summary\n\nok"
+    assert not (run.json_path.parent / "report.partial.md").exists()
+    assert json.loads(run.json_path.read_text(encoding="utf-8"))["report"]["status"] == "done"
+    assert store.load_runs_index()[0]["report_status"] == "done"
+
+
+def test_validate_screenshot_failed_queued_report_leaves_no_report_file(tmp_path: Path):
+    generator = StreamingReportGenerator(fail=True)
+    generator.release.set()
+    use_case, store, worker = _queued_use_case(tmp_path, generator)
+
+    run = use_case.execute(screenshot_path="/tmp/actual.png", index_dir="/tmp/index", top_k=3, threshold=0.5)
+    assert worker.wait(timeout=5)
+    worker.close()
+
+    run_dir = run.json_path.parent
+    assert not run.report_path.exists()
+    assert not (run_dir / "report.partial.md").exists()
+    result = json.loads(run.json_path.read_text(encoding="utf-8"))
+    assert result["report"]["status"] == "failed" and "llm offline" in result["report"]["error"]
+    assert json.loads((run_dir / "report_status.json").read_text(encoding="utf-8"))["status"] == "failed"
+    assert store.load_runs_index()[0]["report_status"] == "failed"
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Sequence
 
 import numpy as np
 
@@ -12,6 +13,16 @@ class EmbeddingProvider(ABC):
     def embed_image(self, image_path: str) -> np.ndarray:
         """Return a L2-normalized float32 vector with shape (D,)."""
 
+    def embed_images(self, image_paths: Sequence[str], batch_size: int = 16) -> np.ndarray:
+        """Return L2-normalized float32 rows with shape (N, D), in input order.
+
+        Default loops over `embed_image`; providers override it with a real batched path.
+        """
+        vectors = [np.asarray(self.embed_image(str(path)), dtype=np.float32).reshape(-1) for path in image_paths]
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
     @property
     def name(self) -> str:
         return self.__class__.__name__
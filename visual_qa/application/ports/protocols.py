@@ -6,7 +6,7 @@ Ports are modeled as Protocols to support dependency inversion and easy mocking.
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Mapping, Protocol, runtime_checkable
+from typing import Any, Callable, Mapping, Protocol, runtime_checkable
 
 import numpy as np
 
@@ -55,8 +55,12 @@ class PixelComparator(Protocol):
 class ReportGenerator(Protocol):
     """Generates Markdown/JSON report artifacts from structured payloads."""
 
-    def generate_report(self, payload: Mapping[str, Any]) -> Report:
-        """Generate report artifacts using only structured fields."""
+    def generate_report(
+        self,
+        payload: Mapping[str, Any],
+        on_chunk: Callable[[str], None] | None = None,
+    ) -> Report:
+        """Generate report artifacts using only structured fields; `on_chunk` receives partial Markdown."""
 
 
 @runtime_checkable
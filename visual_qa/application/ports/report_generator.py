@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from visual_qa.domain.entities import Report
 
 
 class ReportGenerator(ABC):
-    """Generates markdown reports from structured JSON-like payloads."""
+    """Generates markdown reports from structured JSON-like payloads.
+
+    Streaming implementations call `on_chunk` with the Markdown accumulated so far; others
+    may ignore it.
+    """
 
     @abstractmethod
-    def generate_report(self, payload: Dict[str, Any]) -> Report:
+    def generate_report(
+        self,
+        payload: Dict[str, Any],
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> Report:
         pass
@@ -37,21 +37,26 @@ def _read_sidecar(path: Path) -> Dict[str, Any]:
 class BuildVectorIndex:
     embedding_provider: EmbeddingProvider
     vector_repo: VectorIndexRepository
+    batch_size: int = 16
 
-    def execute(self, reference_dir: str, index_dir: str) -> Dict[str, Any]:
+    def execute(self, reference_dir: str, index_dir: str, incremental: bool = False) -> Dict[str, Any]:
+        """Embed the reference images into `index_dir`.
+
+        With `incremental=True` and a repository exposing `sync_entries`, the existing index is
+        loaded and only new or modified images are embedded; vanished ones are removed.
+        """
         reference_root = Path(reference_dir).resolve()
         if not reference_root.exists() or not reference_root.is_dir():
             raise FileNotFoundError(f"Reference directory not found: {reference_root}")
 
-        vectors: List[np.ndarray] = []
+        image_paths: List[Path] = []
         metadata: List[Dict[str, Any]] = []
 
         for image_path in sorted(reference_root.rglob("*")):
             if not image_path.is_file() or image_path.suffix.lower() not in IMAGE_EXTENSIONS:
                 continue
             sidecar = _read_sidecar(image_path)
-            vector = self.embedding_provider.embed_image(str(image_path))
-            vectors.append(vector.astype(np.float32))
+            image_paths.append(image_path)
             rel_path = str(image_path.relative_to(reference_root)).replace("\\", "/")
             metadata.append(
                 {
@@ -63,10 +68,17 @@ class BuildVectorIndex:
                 }
             )
 
-        if not vectors:
+        if not image_paths:
             raise ValueError(f"No reference images found in {reference_root}")
 
-        matrix = np.vstack(vectors).astype(np.float32)
+        sync_entries = getattr(self.vector_repo, "sync_entries", None)
+        if incremental and callable(sync_entries):
+            return self._sync(reference_root, index_dir, metadata, sync_entries)
+
+        matrix = np.asarray(
+            self.embedding_provider.embed_images([str(p) for p in image_paths], batch_size=self.batch_size),
+            dtype=np.float32,
+        )
         self.vector_repo.build(matrix, metadata)
         self.vector_repo.save(index_dir)
 
@@ -77,3 +89,27 @@ class BuildVectorIndex:
             "embedding_dim": int(matrix.shape[1]),
             "embedding_provider": self.embedding_provider.name,
         }
+
+    def _sync(
+        self,
+        reference_root: Path,
+        index_dir: str,
+        metadata: List[Dict[str, Any]],
+        sync_entries: Any,
+    ) -> Dict[str, Any]:
+        if Path(index_dir, "index.faiss").exists():
+            self.vector_repo.load(index_dir)
+        summary = sync_entries(
+            metadata,
+            lambda paths: np.asarray(
+                self.embedding_provider.embed_images(paths, batch_size=self.batch_size), dtype=np.float32
+            ),
+        )
+        self.vector_repo.save(index_dir)
+        return {
+            "reference_dir": str(reference_root),
+            "index_dir": str(Path(index_dir).resolve()),
+            "images_indexed": len(metadata),
+            "embedding_provider": self.embedding_provider.name,
+            "sync": summary,
+        }
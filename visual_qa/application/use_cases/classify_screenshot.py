@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Mapping
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
 
 from visual_qa.application.ports.embedding_provider import EmbeddingProvider
 from visual_qa.application.ports.vector_index_repository import VectorIndexRepository
@@ -90,6 +92,13 @@ def _choose_vote(items: list[dict[str, Any]], threshold: float) -> tuple[str, st
     return winner_type, str(winner_best["image_path"] or None), winner_score
 
 
+def _normalize_strategy(strategy: str) -> str:
+    mode = str(strategy or "best").strip().lower()
+    if mode not in {"best", "vote"}:
+        raise ValueError("strategy must be one of: 'best', 'vote'")
+    return mode
+
+
 @dataclass
 class ClassifyScreenshot:
     embedding_provider: EmbeddingProvider
@@ -106,11 +115,48 @@ class ClassifyScreenshot:
         if index_dir:
             self.vector_repo.load(index_dir)
 
-        mode = str(strategy or "best").strip().lower()
-        if mode not in {"best", "vote"}:
-            raise ValueError("strategy must be one of: 'best', 'vote'")
-
+        mode = _normalize_strategy(strategy)
         query = self.embedding_provider.embed_image(screenshot_path)
+        return self._classify_query(screenshot_path, query, top_k, threshold, mode)
+
+    def execute_batch(
+        self,
+        screenshot_paths: Sequence[str],
+        top_k: int,
+        threshold: float,
+        strategy: str = "best",
+        index_dir: str | None = None,
+        batch_size: int = 16,
+    ) -> List[Dict[str, Any]]:
+        """Classify many screenshots with a single index load and batched embeddings."""
+        if index_dir:
+            self.vector_repo.load(index_dir)
+
+        mode = _normalize_strategy(strategy)
+        paths = [str(p) for p in screenshot_paths]
+        results: List[Dict[str, Any]] = []
+        step = max(1, int(batch_size))
+        for start in range(0, len(paths), step):
+            chunk = paths[start : start + step]
+            for path, query in zip(chunk, self._embed_many(chunk, step)):
+                results.append(self._classify_query(path, query, top_k, threshold, mode))
+        return results
+
+    def _embed_many(self, paths: List[str], batch_size: int) -> List[np.ndarray]:
+        embed_many = getattr(self.embedding_provider, "embed_images", None)
+        if callable(embed_many):
+            vectors = np.asarray(embed_many(paths, batch_size=batch_size), dtype=np.float32)
+            return [vectors[i] for i in range(vectors.shape[0])]
+        return [self.embedding_provider.embed_image(path) for path in paths]
+
+    def _classify_query(
+        self,
+        screenshot_path: str,
+        query: np.ndarray,
+        top_k: int,
+        threshold: float,
+        mode: str,
+    ) -> Dict[str, Any]:
         results = self.vector_repo.search(query, top_k=max(1, int(top_k)))
         normalized = [_normalize_result_item(item) for item in results]
 
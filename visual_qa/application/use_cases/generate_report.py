@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from visual_qa.application.ports.report_generator import ReportGenerator
 from visual_qa.domain.entities import Report
@@ -11,5 +11,6 @@ from visual_qa.domain.entities import Report
 class GenerateReport:
     report_generator: ReportGenerator
 
-    def execute(self, payload: Dict[str, Any]) -> Report:
-        return self.report_generator.generate_report(payload)
+    def execute(self, payload: Dict[str, Any], on_chunk: Optional[Callable[[str], None]] = None) -> Report:
+        """`on_chunk` receives partial Markdown from generators that stream (e.g. Ollama)."""
+        return self.report_generator.generate_report(payload, on_chunk=on_chunk)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from visual_qa.application.ports.artifact_store import ArtifactStore
+from visual_qa.application.use_cases.generate_report import GenerateReport
+
+REPORT_FILENAME = "report.md"
+REPORT_STATUS_FILENAME = "report_status.json"
+REPORT_PARTIAL_FILENAME = "report.partial.md"
+
+
+@dataclass
+class ReportJob:
+    run_id: str
+    run_dir: Path
+    report_payload: Dict[str, Any]
+    result_payload: Dict[str, Any]
+    result_filename: str = "result.json"
+
+
+class ReportWorker:
+    """Runs Stage 3 (report generation) off the validation path.
+
+    At most `max_workers` reports are generated at once. For each job the worker streams
+    partial Markdown into `report.partial.md` and only writes `report.md` once generation
+    succeeded (the partial file is removed either way). It then rewrites the run's result
+    JSON with the final `report` block (status "done" or "failed"), updates the runs-index
+    row when the store supports `update_runs_index`, and writes `report_status.json`, which
+    moves pending -> running -> done/failed. `on_complete(status)` is called with the final
+    status dict; exceptions it raises are ignored so one bad callback cannot stall the queue.
+    """
+
+    def __init__(
+        self,
+        report_use_case: GenerateReport,
+        artifact_store: ArtifactStore,
+        max_workers: int = 1,
+        on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> None:
+        self._report_use_case = report_use_case
+        self._artifact_store = artifact_store
+        self._on_complete = on_complete
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="vqa-report")
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+
+    def _write_status(self, job: ReportJob, status: Dict[str, Any]) -> None:
+        self._artifact_store.save_json(job.run_dir, REPORT_STATUS_FILENAME, status)
+
+    def mark_pending(self, job: ReportJob) -> None:
+        self._write_status(
+            job,
+            {
+                "run_id": job.run_id,
+                "status": "pending",
+                "queued_at": datetime.now(timezone.utc).isoformat(),
+                "report_path": str(job.run_dir / REPORT_FILENAME),
+            },
+        )
+
+    def submit(self, job: ReportJob) -> Future:
+        self.mark_pending(job)
+        future = self._executor.submit(self._process, job)
+        with self._lock:
+            self._futures = [f for f in self._futures if not f.done()] + [future]
+        return future
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for f in self._futures if not f.done())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted report is finished; False if `timeout` expired first."""
+        with self._lock:
+            futures = list(self._futures)
+        _, not_done = wait(futures, timeout=timeout)
+        return not not_done
+
+    def close(self, wait_for_pending: bool = True) -> None:
+        self._executor.shutdown(wait=wait_for_pending)
+
+    def _discard_partial(self, partial_path: Path) -> None:
+        # Partial writes may still be queued on a background artifact writer.
+        flush = getattr(self._artifact_store, "flush", None)
+        if callable(flush):
+            flush()
+        partial_path.unlink(missing_ok=True)
+
+    def _process(self, job: ReportJob) -> Dict[str, Any]:
+        started = datetime.now(timezone.utc)
+        report_path = job.run_dir / REPORT_FILENAME
+        partial_path = job.run_dir / REPORT_PARTIAL_FILENAME
+        self._write_status(
+            job,
+            {
+                "run_id": job.run_id,
+                "status": "running",
+                "started_at": started.isoformat(),
+                "report_path": str(report_path),
+                "partial_path": str(partial_path),
+            },
+        )
+
+        def _partial(markdown: str) -> None:
+            self._artifact_store.save_markdown(job.run_dir, REPORT_PARTIAL_FILENAME, markdown)
+
+        try:
+            report = self._report_use_case.execute(job.report_payload, on_chunk=_partial)
+            report_path = self._artifact_store.save_markdown(job.run_dir, REPORT_FILENAME, report.markdown)
+            block: Dict[str, Any] = {
+                "status": "done",
+                "provider": report.provider,
+                "model": report.model,
+                "generated_at": report.generated_at.isoformat(),
+                "report_path": str(report_path),
+            }
+        except Exception as exc:
+            block = {"status": "failed", "error": f"{type(exc).__name__}: {exc}", "report_path": None}
+        self._discard_partial(partial_path)
+
+        report_block = {**(job.result_payload.get("report") or {}), **block}
+        self._artifact_store.save_json(job.run_dir, job.result_filename, {**job.result_payload, "report": report_block})
+        update_index = getattr(self._artifact_store, "update_runs_index", None)
+        if callable(update_index):
+            update_index(job.run_id, {"report_status": block["status"], "report_path": block["report_path"]})
+
+        finished = datetime.now(timezone.utc)
+        status = {
+            "run_id": job.run_id,
+            **block,
+            "started_at": started.isoformat(),
+            "finished_at": finished.isoformat(),
+            "duration_s": round((finished - started).total_seconds(), 3),
+            "result_json": str(job.run_dir / job.result_filename),
+        }
+        self._write_status(job, status)
+        if self._on_complete is not None:
+            try:
+                self._on_complete(status)
+            except Exception:
+                pass
+        return status
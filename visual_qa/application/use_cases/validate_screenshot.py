@@ -13,6 +13,7 @@ from visual_qa.application.ports.artifact_store import ArtifactStore
 from visual_qa.application.ports.report_generator import ReportGenerator
 from visual_qa.application.ports.pixel_comparator import PixelComparator
 from visual_qa.application.use_cases.classify_screenshot import ClassifyScreenshot
+from visual_qa.application.use_cases.report_worker import REPORT_FILENAME, REPORT_STATUS_FILENAME, ReportJob, ReportWorker
 from visual_qa.domain.entities import PixelDiffResult, Report, ScreenMatch
 from visual_qa.domain.entities import ValidationRun
 from visual_qa.domain.scaffold_entities import ScreenMatch as Stage1ScreenMatch
@@ -120,6 +121,9 @@ class ValidateScreenshot:
     report_generator: Optional[ReportGenerator] = None
     artifact_store: Optional[ArtifactStore] = None
     history_window: int = 30
+    # When set (and an artifact store is configured) the report is queued instead of generated
+    # inline: run_result.json is written with report.status "pending" and the worker fills it in.
+    report_worker: Optional[ReportWorker] = None
 
     def _compute_historical_metrics(self, screen_type: str) -> Dict[str, Any]:
         if self.artifact_store is None:
@@ -155,8 +159,9 @@ class ValidateScreenshot:
             "timestamp_utc": datetime.now(timezone.utc).isoformat(),
             "python": sys.version,
             "platform": platform.platform(),
-            "git_sha": _safe_git_sha(),
         }
+        if not supplied or "git_sha" not in supplied:
+            base["git_sha"] = _safe_git_sha()
         if supplied:
             base.update(supplied)
         return base
@@ -172,19 +177,23 @@ class ValidateScreenshot:
         run_id: Optional[str] = None,
         config_snapshot: Optional[Dict] = None,
         reproducibility: Optional[Dict] = None,
+        classification: Optional[Dict[str, Any]] = None,
     ) -> ValidationRun:
         started = datetime.now(timezone.utc)
         run_id_value = run_id or _new_run_id()
         config_data = dict(config_snapshot or {})
         reproducibility_data = self._build_reproducibility(reproducibility)
 
-        cls = self.classifier.execute(
-            screenshot_path=screenshot_path,
-            index_dir=index_dir,
-            top_k=top_k,
-            threshold=threshold,
-            strategy=strategy,
-        )
+        # Batch callers classify up front (one index load, batched embeddings) and pass it in.
+        cls = classification
+        if cls is None:
+            cls = self.classifier.execute(
+                screenshot_path=screenshot_path,
+                index_dir=index_dir,
+                top_k=top_k,
+                threshold=threshold,
+                strategy=strategy,
+            )
         stage1 = _ensure_stage1_screen_match(cls)
         baseline_image = _selected_baseline_image(cls, stage1)
 
@@ -204,6 +213,7 @@ class ValidateScreenshot:
 
         report_path = None
         json_path = None
+        report_status = None
         finished_at = datetime.now(timezone.utc)
 
         report_payload = {
@@ -231,8 +241,9 @@ class ValidateScreenshot:
             },
         }
 
+        queue_report = self.report_worker is not None and self.artifact_store is not None
         report_obj: Optional[Report] = None
-        if self.report_generator is not None:
+        if self.report_generator is not None and not queue_report:
             generated = self.report_generator.generate_report(report_payload)
             if isinstance(generated, Report):
                 report_obj = generated
@@ -247,8 +258,26 @@ class ValidateScreenshot:
 
         if self.artifact_store is not None:
             run_dir = self.artifact_store.create_run_dir(run_id_value)
-            markdown = report_obj.markdown if report_obj is not None else "# Validation Report\n\nNo report generated."
-            report_path = self.artifact_store.save_markdown(run_dir, "report.md", markdown)
+            if queue_report:
+                report_path = run_dir / REPORT_FILENAME
+                report_block: Dict[str, Any] = {
+                    "status": "pending",
+                    "provider": None,
+                    "model": None,
+                    "generated_at": None,
+                    "report_path": str(report_path),
+                    "status_path": str(run_dir / REPORT_STATUS_FILENAME),
+                }
+            else:
+                markdown = report_obj.markdown if report_obj is not None else "# Validation Report\n\nNo report generated."
+                report_path = self.artifact_store.save_markdown(run_dir, REPORT_FILENAME, markdown)
+                report_block = {
+                    "status": "done",
+                    "provider": report_obj.provider if report_obj else None,
+                    "model": report_obj.model if report_obj else None,
+                    "generated_at": report_obj.generated_at.isoformat() if report_obj else None,
+                    "report_path": str(report_path),
+                }
 
             run_result_payload = {
                 "run": report_payload["run"],
@@ -256,15 +285,11 @@ class ValidateScreenshot:
                 "pixel_result": report_payload["pixel_result"],
                 "historical": historical_metrics,
                 "metadata": report_payload["metadata"],
-                "report": {
-                    "provider": report_obj.provider if report_obj else None,
-                    "model": report_obj.model if report_obj else None,
-                    "generated_at": report_obj.generated_at.isoformat() if report_obj else None,
-                    "report_path": str(report_path),
-                },
+                "report": report_block,
                 "pixel_compare_skipped_reason": skip_reason,
             }
             json_path = self.artifact_store.save_json(run_dir, "run_result.json", run_result_payload)
+            report_status = report_block["status"]
 
             summary_row = {
                 "run_id": run_id_value,
@@ -277,8 +302,19 @@ class ValidateScreenshot:
                 "difference_percent": pixel_result.difference_percent if pixel_result else None,
                 "result_json": str(json_path),
                 "report_path": str(report_path),
+                "report_status": report_status,
             }
             self.artifact_store.append_runs_index(summary_row)
+            if queue_report:
+                self.report_worker.submit(
+                    ReportJob(
+                        run_id=run_id_value,
+                        run_dir=run_dir,
+                        report_payload=report_payload,
+                        result_payload=run_result_payload,
+                        result_filename="run_result.json",
+                    )
+                )
 
         return ValidationRun(
             run_id=run_id_value,
@@ -295,4 +331,5 @@ class ValidateScreenshot:
             config_snapshot=config_data,
             reproducibility=reproducibility_data,
             historical_stats=historical_metrics,
+            report_status=report_status,
         )
@@ -3,16 +3,21 @@ from __future__ import annotations
 import platform
 import subprocess
 import sys
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 from visual_qa.application.ports.artifact_store import ArtifactStore
 from visual_qa.application.use_cases.generate_report import GenerateReport
+from visual_qa.application.use_cases.report_worker import REPORT_FILENAME, REPORT_STATUS_FILENAME, ReportJob, ReportWorker
 from visual_qa.application.use_cases.validate_screenshot import ValidateScreenshot
-from visual_qa.domain.entities import PixelDiffResult, ScreenMatch, ValidationRun
+from visual_qa.domain.entities import BatchValidationRun, PixelDiffResult, ScreenMatch, ValidationRun
 from visual_qa.infrastructure.observability.json_logger import JsonRunLogger
 
+_HISTORY_WINDOW = 30
+
 
 def _safe_git_sha() -> Optional[str]:
     try:
@@ -27,6 +32,15 @@ def _run_id() -> str:
     return f"{stamp}_{uuid.uuid4().hex[:8]}"
 
 
+def _reproducibility() -> Dict[str, Any]:
+    return {
+        "timestamp_utc": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "git_sha": _safe_git_sha(),
+    }
+
+
 def _match_to_dict(match: ScreenMatch) -> Dict[str, Any]:
     return {
         "rank": match.rank,
@@ -54,24 +68,59 @@ def _pixel_to_dict(pixel: Optional[PixelDiffResult]) -> Optional[Dict[str, Any]]
 
 
 class VisualQaPipeline:
-    """Orchestrates Stage 1 -> Stage 2 -> Stage 3 for one screenshot."""
+    """Orchestrates Stage 1 -> Stage 2 -> Stage 3 for one screenshot (or a batch).
+
+    With `async_reports=True` Stage 3 leaves the validation path: `result.json` and the runs
+    index are written as soon as the pixel stage finishes, with `report.status = "pending"`,
+    and a ReportWorker (`report_workers` threads) fills the report in later. Completion is
+    signalled through `on_report(status)` and each run's `report_status.json`; call
+    `wait_for_reports()` before the process exits.
+    """
 
     def __init__(
         self,
         validator: ValidateScreenshot,
         report_use_case: GenerateReport,
         artifact_store: ArtifactStore,
+        async_reports: bool = False,
+        report_workers: int = 1,
+        on_report: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> None:
         self._validator = validator
         self._report_use_case = report_use_case
         self._artifact_store = artifact_store
+        self._index_lock = threading.Lock()
+        self._report_worker: Optional[ReportWorker] = None
+        if async_reports:
+            self._report_worker = ReportWorker(
+                report_use_case, artifact_store, max_workers=report_workers, on_complete=on_report
+            )
+
+    def wait_for_reports(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued reports are written; True when nothing is left pending."""
+        if self._report_worker is None:
+            return True
+        return self._report_worker.wait(timeout=timeout)
+
+    def close(self) -> None:
+        if self._report_worker is not None:
+            self._report_worker.close(wait_for_pending=True)
 
-    def _historical_stats(self, predicted_screen_type: str) -> Dict[str, Any]:
-        rows = self._artifact_store.load_runs_index()
+    def _historical_stats(
+        self,
+        predicted_screen_type: str,
+        rows: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        if rows is None:
+            # Stores with maintained rolling aggregates answer without reading the whole index.
+            stats_fn = getattr(self._artifact_store, "historical_stats", None)
+            if callable(stats_fn):
+                return dict(stats_fn(predicted_screen_type, last_n=_HISTORY_WINDOW))
+            rows = self._artifact_store.load_runs_index()
         if not rows:
             return {"count": 0}
 
-        filtered = [r for r in rows if r.get("predicted_screen_type") == predicted_screen_type][-30:]
+        filtered = [r for r in rows if r.get("predicted_screen_type") == predicted_screen_type][-_HISTORY_WINDOW:]
         if not filtered:
             return {"count": 0}
 
@@ -92,38 +141,64 @@ class VisualQaPipeline:
         top_k: int,
         threshold: float,
         config_snapshot: Dict[str, Any],
+        strategy: str = "best",
+    ) -> ValidationRun:
+        return self._run_one(
+            screenshot_path=screenshot_path,
+            index_dir=index_dir,
+            top_k=top_k,
+            threshold=threshold,
+            config_snapshot=config_snapshot,
+            reproducibility=_reproducibility(),
+            strategy=strategy,
+        )
+
+    def _run_one(
+        self,
+        screenshot_path: str,
+        index_dir: str,
+        top_k: int,
+        threshold: float,
+        config_snapshot: Dict[str, Any],
+        reproducibility: Dict[str, Any],
+        strategy: str = "best",
+        classification: Optional[Dict[str, Any]] = None,
+        history_rows: Optional[List[Dict[str, Any]]] = None,
+        batch_id: Optional[str] = None,
     ) -> ValidationRun:
         run_id = _run_id()
         logger = JsonRunLogger(run_id)
         run_dir = self._artifact_store.create_run_dir(run_id)
         logger.log("run_started", screenshot_path=screenshot_path, index_dir=index_dir)
 
-        reproducibility = {
-            "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-            "python": sys.version,
-            "platform": platform.platform(),
-            "git_sha": _safe_git_sha(),
-        }
+        # Each run keeps its own timestamp; interpreter/platform/git info is shared by the batch.
+        reproducibility = {**reproducibility, "timestamp_utc": datetime.now(timezone.utc).isoformat()}
 
         pixel_artifacts_dir = str((run_dir / "pixel_artifacts").resolve())
+        validator_kwargs: Dict[str, Any] = {}
+        if classification is not None:
+            validator_kwargs["classification"] = classification
         validation = self._validator.execute(
             screenshot_path=screenshot_path,
             index_dir=index_dir,
             top_k=top_k,
             threshold=threshold,
             output_dir=pixel_artifacts_dir,
+            strategy=strategy,
             config_snapshot=config_snapshot,
             reproducibility=reproducibility,
+            **validator_kwargs,
         )
         validation.run_id = run_id
         validation.reproducibility = reproducibility
 
-        historical = self._historical_stats(validation.predicted_screen_type)
+        historical = self._historical_stats(validation.predicted_screen_type, rows=history_rows)
         validation.historical_stats = historical
 
         classification_payload = {
             "predicted_screen_type": validation.predicted_screen_type,
             "classification_threshold": validation.classification_threshold,
+            "classification_strategy": str(strategy or "best").strip().lower(),
             "selected_baseline_image": validation.selected_baseline_image,
             "matches": [_match_to_dict(m) for m in validation.matches],
         }
@@ -135,6 +210,8 @@ class VisualQaPipeline:
             "reproducibility": reproducibility,
             "config_snapshot": config_snapshot,
         }
+        if batch_id:
+            run_payload["batch_id"] = batch_id
 
         structured_for_report = {
             "run": run_payload,
@@ -143,26 +220,37 @@ class VisualQaPipeline:
             "historical_stats": historical,
         }
 
-        report = self._report_use_case.execute(structured_for_report)
-        report_path = self._artifact_store.save_markdown(run_dir, "report.md", report.markdown)
-        logger.log("report_generated", provider=report.provider, model=report.model, report_path=str(report_path))
+        report_path = run_dir / REPORT_FILENAME
+        if self._report_worker is None:
+            report = self._report_use_case.execute(structured_for_report)
+            report_path = self._artifact_store.save_markdown(run_dir, REPORT_FILENAME, report.markdown)
+            logger.log("report_generated", provider=report.provider, model=report.model, report_path=str(report_path))
+            report_block: Dict[str, Any] = {
+                "status": "done",
+                "provider": report.provider,
+                "model": report.model,
+                "generated_at": report.generated_at.isoformat(),
+                "report_path": str(report_path),
+            }
+        else:
+            report_block = {
+                "status": "pending",
+                "provider": None,
+                "model": None,
+                "generated_at": None,
+                "report_path": str(report_path),
+                "status_path": str(run_dir / REPORT_STATUS_FILENAME),
+            }
 
         result_payload: Dict[str, Any] = {
             "run": run_payload,
             "classification": classification_payload,
             "pixel_result": _pixel_to_dict(validation.pixel_result),
             "historical_stats": historical,
-            "report": {
-                "provider": report.provider,
-                "model": report.model,
-                "generated_at": report.generated_at.isoformat(),
-                "report_path": str(report_path),
-            },
+            "report": report_block,
         }
 
         json_path = self._artifact_store.save_json(run_dir, "result.json", result_payload)
-        logger.log("run_finished", result_json=str(json_path), logs=str(run_dir / "logs.jsonl"))
-        logs_path = self._artifact_store.save_json_lines(run_dir, "logs.jsonl", logger.events)
 
         index_row = {
             "run_id": run_id,
@@ -173,10 +261,163 @@ class VisualQaPipeline:
             "difference_percent": validation.pixel_result.difference_percent if validation.pixel_result else None,
             "result_json": str(json_path),
             "report_path": str(report_path),
+            "report_status": report_block["status"],
         }
-        self._artifact_store.append_runs_index(index_row)
+        if batch_id:
+            index_row["batch_id"] = batch_id
+        with self._index_lock:
+            self._artifact_store.append_runs_index(index_row)
+        if self._report_worker is not None:
+            # Queued only once result.json and the index row exist, so the worker's updates land last.
+            self._report_worker.submit(
+                ReportJob(
+                    run_id=run_id,
+                    run_dir=run_dir,
+                    report_payload=structured_for_report,
+                    result_payload=result_payload,
+                )
+            )
+            logger.log("report_queued", report_path=str(report_path))
+        logger.log("run_finished", result_json=str(json_path), logs=str(run_dir / "logs.jsonl"))
+        self._artifact_store.save_json_lines(run_dir, "logs.jsonl", logger.events)
 
         validation.finished_at = datetime.now(timezone.utc)
         validation.report_path = report_path
+        validation.report_status = report_block["status"]
         validation.json_path = json_path
         return validation
+
+    def _classify_batch(
+        self,
+        paths: List[str],
+        index_dir: str,
+        top_k: int,
+        threshold: float,
+        strategy: str,
+        batch_size: int,
+    ) -> List[Optional[Dict[str, Any]]]:
+        classifier = getattr(self._validator, "classifier", None)
+        classify_batch = getattr(classifier, "execute_batch", None)
+        if not callable(classify_batch):
+            # Validator without a batch-capable classifier: it classifies each screenshot itself.
+            return [None] * len(paths)
+        return list(
+            classify_batch(
+                screenshot_paths=paths,
+                top_k=top_k,
+                threshold=threshold,
+                strategy=strategy,
+                index_dir=index_dir,
+                batch_size=batch_size,
+            )
+        )
+
+    def run_batch(
+        self,
+        screenshot_paths: Sequence[str],
+        index_dir: str,
+        top_k: int,
+        threshold: float,
+        config_snapshot: Dict[str, Any],
+        workers: int = 4,
+        strategy: str = "best",
+        batch_size: int = 16,
+    ) -> BatchValidationRun:
+        """Validate a whole execution folder in one pass.
+
+        The vector index is loaded once, queries are embedded in batches of `batch_size`,
+        reproducibility info (and the runs index, for stores without rolling stats) is read
+        once, and the pixel/report stages run on `workers` threads. Each screenshot still gets
+        its own run dir; a consolidated `batch_summary.json` is written to the batch dir.
+        """
+        paths = [str(p) for p in screenshot_paths]
+        batch_id = f"batch_{_run_id()}"
+        started = datetime.now(timezone.utc)
+        logger = JsonRunLogger(batch_id)
+        logger.log("batch_started", screenshots=len(paths), index_dir=index_dir, workers=int(workers))
+
+        reproducibility = _reproducibility()
+        history_rows = None
+        if not callable(getattr(self._artifact_store, "historical_stats", None)):
+            history_rows = self._artifact_store.load_runs_index()
+        try:
+            classifications = self._classify_batch(paths, index_dir, top_k, threshold, strategy, batch_size)
+            logger.log("batch_classified", screenshots=len(paths))
+        except Exception as exc:
+            # One unreadable image must not sink the batch: each run classifies itself instead,
+            # so the failure is reported against that screenshot only.
+            classifications = [None] * len(paths)
+            logger.log("batch_classify_failed", error=f"{type(exc).__name__}: {exc}")
+
+        def _one(position: int) -> ValidationRun:
+            return self._run_one(
+                screenshot_path=paths[position],
+                index_dir=index_dir,
+                top_k=top_k,
+                threshold=threshold,
+                config_snapshot=config_snapshot,
+                reproducibility=reproducibility,
+                strategy=strategy,
+                classification=classifications[position],
+                history_rows=history_rows,
+                batch_id=batch_id,
+            )
+
+        runs: List[Optional[ValidationRun]] = [None] * len(paths)
+        errors: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+            futures = [(i, pool.submit(_one, i)) for i in range(len(paths))]
+            for position, future in futures:
+                try:
+                    runs[position] = future.result()
+                except Exception as exc:
+                    errors.append({"screenshot_path": paths[position], "error": f"{type(exc).__name__}: {exc}"})
+                    logger.log("run_failed", screenshot_path=paths[position], error=str(exc))
+
+        finished = datetime.now(timezone.utc)
+        completed = [run for run in runs if run is not None]
+        status_counts: Dict[str, int] = {}
+        for run in completed:
+            status = run.pixel_result.status if run.pixel_result else "SKIPPED"
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+        summary = {
+            "batch_id": batch_id,
+            "started_at": started.isoformat(),
+            "finished_at": finished.isoformat(),
+            "duration_s": round((finished - started).total_seconds(), 3),
+            "index_dir": index_dir,
+            "workers": max(1, int(workers)),
+            "batch_size": max(1, int(batch_size)),
+            "reproducibility": reproducibility,
+            "config_snapshot": config_snapshot,
+            "totals": {"screenshots": len(paths), "completed": len(completed), "failed": len(errors)},
+            "status_counts": status_counts,
+            "runs": [
+                {
+                    "run_id": run.run_id,
+                    "screenshot_path": run.screenshot_path,
+                    "predicted_screen_type": run.predicted_screen_type,
+                    "selected_baseline_image": run.selected_baseline_image,
+                    "pixel_status": run.pixel_result.status if run.pixel_result else None,
+                    "difference_percent": run.pixel_result.difference_percent if run.pixel_result else None,
+                    "result_json": str(run.json_path) if run.json_path else None,
+                }
+                for run in completed
+            ],
+            "errors": errors,
+        }
+
+        batch_dir = self._artifact_store.create_run_dir(batch_id)
+        summary_path = self._artifact_store.save_json(batch_dir, "batch_summary.json", summary)
+        logger.log("batch_finished", completed=len(completed), failed=len(errors), summary=str(summary_path))
+        self._artifact_store.save_json_lines(batch_dir, "logs.jsonl", logger.events)
+
+        return BatchValidationRun(
+            batch_id=batch_id,
+            started_at=started,
+            finished_at=finished,
+            runs=completed,
+            errors=errors,
+            summary_path=summary_path,
+        )
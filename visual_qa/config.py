@@ -30,6 +30,12 @@ class VisualQaConfig:
     ollama_model: str
     ollama_timeout_s: int
     config_path: Optional[Path]
+    index_type: str = "flat"
+    index_nprobe: int = 8
+    index_ef_search: int = 64
+    background_artifact_writes: bool = False
+    async_reports: bool = False
+    report_workers: int = 1
 
     def snapshot(self) -> Dict[str, Any]:
         data = asdict(self)
@@ -54,6 +60,12 @@ DEFAULTS = {
     "ollama_base_url": "http://127.0.0.1:11434",
     "ollama_model": "llama3.1:8b",
     "ollama_timeout_s": 45,
+    "index_type": "flat",
+    "index_nprobe": 8,
+    "index_ef_search": 64,
+    "background_artifact_writes": False,
+    "async_reports": False,
+    "report_workers": 1,
 }
 
 
@@ -86,6 +98,16 @@ def load_config(explicit_config_path: Optional[str] = None) -> VisualQaConfig:
     merged["ollama_base_url"] = os.getenv("VISUAL_QA_OLLAMA_BASE_URL", merged["ollama_base_url"])
     merged["ollama_model"] = os.getenv("VISUAL_QA_OLLAMA_MODEL", merged["ollama_model"])
     merged["ollama_timeout_s"] = int(os.getenv("VISUAL_QA_OLLAMA_TIMEOUT_S", str(merged["ollama_timeout_s"])))
+    merged["index_type"] = os.getenv("VISUAL_QA_INDEX_TYPE", merged["index_type"])
+    merged["index_nprobe"] = int(os.getenv("VISUAL_QA_INDEX_NPROBE", str(merged["index_nprobe"])))
+    merged["index_ef_search"] = int(os.getenv("VISUAL_QA_INDEX_EF_SEARCH", str(merged["index_ef_search"])))
+    merged["background_artifact_writes"] = _as_bool(
+        os.getenv("VISUAL_QA_BACKGROUND_WRITES", str(merged["background_artifact_writes"])), default=False
+    )
+    merged["async_reports"] = _as_bool(
+        os.getenv("VISUAL_QA_ASYNC_REPORTS", str(merged["async_reports"])), default=False
+    )
+    merged["report_workers"] = int(os.getenv("VISUAL_QA_REPORT_WORKERS", str(merged["report_workers"])))
 
     reference_dir = Path(str(merged["reference_dir"]))
     index_dir = Path(str(merged["index_dir"]))
@@ -113,4 +135,10 @@ def load_config(explicit_config_path: Optional[str] = None) -> VisualQaConfig:
         ollama_model=str(merged["ollama_model"]),
         ollama_timeout_s=max(1, int(merged["ollama_timeout_s"])),
         config_path=config_path,
+        index_type=str(merged["index_type"]).strip().lower(),
+        index_nprobe=max(1, int(merged["index_nprobe"])),
+        index_ef_search=max(1, int(merged["index_ef_search"])),
+        background_artifact_writes=bool(merged["background_artifact_writes"]),
+        async_reports=bool(merged["async_reports"]),
+        report_workers=max(1, int(merged["report_workers"])),
     )
@@ -53,3 +53,14 @@ class ValidationRun:
     config_snapshot: Dict[str, Any]
     reproducibility: Dict[str, Any]
     historical_stats: Dict[str, Any] = field(default_factory=dict)
+    report_status: Optional[str] = None
+
+
+@dataclass
+class BatchValidationRun:
+    batch_id: str
+    started_at: datetime
+    finished_at: Optional[datetime]
+    runs: List[ValidationRun]
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    summary_path: Optional[Path] = None
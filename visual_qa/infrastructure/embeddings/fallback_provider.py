@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
+
 import cv2
 import numpy as np
 
 from visual_qa.application.ports.embedding_provider import EmbeddingProvider
 
+_SIZE = 224
+_HIST_BINS = 6
+_LOW_RES = (20, 12)
+_MAX_LOADER_THREADS = 4
+
 
 def _normalize(vec: np.ndarray) -> np.ndarray:
     arr = np.asarray(vec, dtype=np.float32).reshape(-1)
@@ -14,6 +22,24 @@ def _normalize(vec: np.ndarray) -> np.ndarray:
     return arr / norm
 
 
+def _read_resized(image_path: str) -> np.ndarray:
+    image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"Cannot read image: {image_path}")
+    return cv2.resize(image, (_SIZE, _SIZE), interpolation=cv2.INTER_AREA)
+
+
+def _lab_histograms(lab: np.ndarray) -> np.ndarray:
+    """Same bins as calcHist([lab], [0, 1, 2], None, [6, 6, 6], [0, 256] * 3), for N images at once."""
+    count = lab.shape[0]
+    bins = (lab.reshape(count, -1, 3).astype(np.int32) * _HIST_BINS) >> 8
+    per_image = _HIST_BINS**3
+    codes = bins[..., 0] * _HIST_BINS * _HIST_BINS + bins[..., 1] * _HIST_BINS + bins[..., 2]
+    codes += (np.arange(count, dtype=np.int32) * per_image)[:, None]
+    hist = np.bincount(codes.ravel(), minlength=count * per_image).reshape(count, per_image).astype(np.float32)
+    return hist / np.maximum(np.linalg.norm(hist, axis=1, keepdims=True), 1e-8)
+
+
 class LocalFeatureEmbeddingProvider(EmbeddingProvider):
     """Fully offline embedding fallback using OpenCV descriptors."""
 
@@ -34,3 +60,34 @@ class LocalFeatureEmbeddingProvider(EmbeddingProvider):
         edge_density = np.array([float(np.count_nonzero(edges)) / float(edges.size)], dtype=np.float32)
 
         return _normalize(np.concatenate([hist, low_res, edge_density], axis=0))
+
+    def embed_images(self, image_paths: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """Batched `embed_image`: threaded decode, then color conversion and histograms per chunk."""
+        paths = [str(p) for p in image_paths]
+        if not paths:
+            return np.zeros((0, 0), dtype=np.float32)
+        step = max(1, int(batch_size))
+        chunks = []
+        with ThreadPoolExecutor(max_workers=max(1, min(_MAX_LOADER_THREADS, step, len(paths)))) as pool:
+            for start in range(0, len(paths), step):
+                resized = np.stack(list(pool.map(_read_resized, paths[start : start + step])))
+                chunks.append(self._features(resized))
+        return np.vstack(chunks)
+
+    def _features(self, resized: np.ndarray) -> np.ndarray:
+        count = resized.shape[0]
+        # Stacking the frames vertically keeps the per-pixel conversions to one OpenCV call.
+        tall = resized.reshape(count * _SIZE, _SIZE, 3)
+        lab = cv2.cvtColor(tall, cv2.COLOR_BGR2LAB).reshape(count, _SIZE, _SIZE, 3)
+        gray = cv2.cvtColor(tall, cv2.COLOR_BGR2GRAY).reshape(count, _SIZE, _SIZE)
+
+        hist = _lab_histograms(lab)
+        low_res = np.stack([cv2.resize(g, _LOW_RES, interpolation=cv2.INTER_AREA) for g in gray])
+        low_res = low_res.reshape(count, -1).astype(np.float32) / 255.0
+        edge_density = np.array(
+            [np.count_nonzero(cv2.Canny(g, 60, 180)) for g in gray], dtype=np.float32
+        ).reshape(count, 1) / float(_SIZE * _SIZE)
+
+        features = np.concatenate([hist, low_res, edge_density], axis=1)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        return (features / np.where(norms <= 1e-8, 1.0, norms)).astype(np.float32, copy=False)
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
 import importlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Sequence
 
 import numpy as np
 
 from visual_qa.application.ports.embedding_provider import EmbeddingProvider
 
 _SUPPORTED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+_MAX_LOADER_THREADS = 4
 
 
 def _as_numpy_1d(value: Any) -> np.ndarray:
@@ -48,6 +50,44 @@ def _load_rgb_image(image_path: str):
         return image.convert("RGB")
 
 
+def _as_numpy_2d(value: Any) -> np.ndarray:
+    if hasattr(value, "detach") and hasattr(value, "cpu") and hasattr(value, "numpy"):
+        value = value.detach().cpu().numpy()
+    arr = np.asarray(value, dtype=np.float32)
+    return arr.reshape(arr.shape[0], -1) if arr.ndim > 1 else arr.reshape(1, -1)
+
+
+def _encode_image_batches(
+    torch: Any,
+    model: Any,
+    preprocess: Callable[[Any], Any],
+    image_paths: Sequence[str],
+    batch_size: int,
+) -> np.ndarray:
+    """Shared batched path for the open_clip providers.
+
+    Decode + preprocess run on a small thread pool (PIL releases the GIL while decoding),
+    then each chunk goes through one stacked forward pass under inference_mode.
+    """
+    paths = [str(p) for p in image_paths]
+    if not paths:
+        return np.zeros((0, 0), dtype=np.float32)
+    step = max(1, int(batch_size))
+    grad_off = getattr(torch, "inference_mode", None) or torch.no_grad
+
+    def _prepare(path: str) -> Any:
+        return preprocess(_load_rgb_image(path))
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=max(1, min(_MAX_LOADER_THREADS, step, len(paths)))) as pool:
+        for start in range(0, len(paths), step):
+            tensors = list(pool.map(_prepare, paths[start : start + step]))
+            with grad_off():
+                features = model.encode_image(torch.stack(tensors))
+            rows.extend(_l2_normalize(row) for row in _as_numpy_2d(features))
+    return np.vstack(rows).astype(np.float32, copy=False)
+
+
 class MobileCLIPEmbeddingProvider(EmbeddingProvider):
     """Primary lightweight embedding provider using MobileCLIP via open_clip."""
 
@@ -111,3 +151,6 @@ class MobileCLIPEmbeddingProvider(EmbeddingProvider):
             features = self._model.encode_image(image_tensor)
         vector = _as_numpy_1d(features)
         return _l2_normalize(vector)
+
+    def embed_images(self, image_paths: Sequence[str], batch_size: int = 16) -> np.ndarray:
+        return _encode_image_batches(self._torch, self._model, self._preprocess, image_paths, batch_size)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import importlib
+from typing import Sequence
 
 import numpy as np
 
 from visual_qa.application.ports.embedding_provider import EmbeddingProvider
-from visual_qa.infrastructure.embeddings.mobileclip_provider import _as_numpy_1d, _l2_normalize, _load_rgb_image
+from visual_qa.infrastructure.embeddings.mobileclip_provider import (
+    _as_numpy_1d,
+    _encode_image_batches,
+    _l2_normalize,
+    _load_rgb_image,
+)
 
 
 class OpenCLIPEmbeddingProvider(EmbeddingProvider):
@@ -54,3 +60,6 @@ class OpenCLIPEmbeddingProvider(EmbeddingProvider):
             features = self._model.encode_image(image_tensor)
         vector = _as_numpy_1d(features)
         return _l2_normalize(vector)
+
+    def embed_images(self, image_paths: Sequence[str], batch_size: int = 16) -> np.ndarray:
+        return _encode_image_batches(self._torch, self._model, self._preprocess, image_paths, batch_size)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 from visual_qa.application.ports.report_generator import ReportGenerator
 from visual_qa.config import VisualQaConfig
 from visual_qa.infrastructure.llm.null_report_generator import NullReportGenerator
@@ -13,5 +15,6 @@ def build_report_generator(config: VisualQaConfig) -> ReportGenerator:
             base_url=config.ollama_base_url,
             model=config.ollama_model,
             timeout_s=config.ollama_timeout_s,
+            cache_dir=Path(config.runs_dir) / ".report_cache",
         )
     return NullReportGenerator()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from visual_qa.application.ports.report_generator import ReportGenerator
 from visual_qa.domain.entities import Report
@@ -18,7 +18,11 @@ class NullReportGenerator(ReportGenerator):
     def _j(value: Any) -> str:
         return json.dumps(value, ensure_ascii=False, sort_keys=True)
 
-    def generate_report(self, payload: Dict[str, Any]) -> Report:
+    def generate_report(
+        self,
+        payload: Dict[str, Any],
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> Report:
         classification = payload.get("classification") or {}
         pixel = payload.get("pixel_result") or {}
         run = payload.get("run") or {}
@@ -68,6 +72,8 @@ class NullReportGenerator(ReportGenerator):
         markdown += "\n## Recommendation\n"
         markdown += f"- {recommendation}\n"
         markdown += "- Generated offline by NullReportGenerator from structured JSON only.\n"
+        if on_chunk is not None:
+            on_chunk(markdown)
 
         return Report(
             provider="null",
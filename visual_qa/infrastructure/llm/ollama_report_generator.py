@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import hashlib
+import http.client
 import json
 import os
-import socket
-import urllib.request
+import queue
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any, Dict
-from urllib.error import HTTPError, URLError
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
 
 from visual_qa.application.ports.report_generator import ReportGenerator
 from visual_qa.domain.entities import Report
@@ -25,36 +30,151 @@ SYSTEM_PROMPT = (
     "## Recommendation\n"
 )
 
+# Only what the report sections talk about goes into the prompt: run metadata, config
+# snapshots and raw pixel-adapter output are dropped, and floats are rounded, which keeps
+# the prompt short and lets identical outcomes share a cached report.
+_CLASSIFICATION_FIELDS = (
+    "predicted_screen_type",
+    "selected_baseline_image",
+    "classification_threshold",
+    "winning_score",
+)
+_MATCH_FIELDS = ("rank", "screen_type", "similarity", "image_path")
+_PIXEL_FIELDS = ("status", "ssim_score", "difference_percent", "issues")
+_HISTORY_KEYS = ("historical", "historical_stats")
+_MAX_MATCHES = 5
+_MAX_ISSUES = 20
+_FLOAT_DIGITS = 4
+
+# Connection errors that mean an idle keep-alive socket was closed by the server.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+def _compact(value: Any) -> Any:
+    if isinstance(value, bool) or value is None or isinstance(value, (str, int)):
+        return value
+    if isinstance(value, float):
+        return round(value, _FLOAT_DIGITS)
+    if isinstance(value, dict):
+        return {str(k): _compact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_compact(v) for v in value]
+    return str(value)
+
+
+def _pick(source: Any, fields: tuple) -> Dict[str, Any]:
+    if not isinstance(source, dict):
+        return {}
+    return {name: _compact(source[name]) for name in fields if source.get(name) is not None}
+
+
+def trim_report_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Subset of a pipeline payload that the report template uses."""
+    classification = payload.get("classification") or {}
+    trimmed: Dict[str, Any] = {"classification": _pick(classification, _CLASSIFICATION_FIELDS)}
+    matches = classification.get("matches") if isinstance(classification, dict) else None
+    if isinstance(matches, list):
+        trimmed["classification"]["matches"] = [_pick(m, _MATCH_FIELDS) for m in matches[:_MAX_MATCHES]]
+
+    pixel = _pick(payload.get("pixel_result"), _PIXEL_FIELDS)
+    if isinstance(pixel.get("issues"), list):
+        pixel["issues"] = pixel["issues"][:_MAX_ISSUES]
+    trimmed["pixel_result"] = pixel or None
+
+    for key in _HISTORY_KEYS:
+        if payload.get(key):
+            trimmed[key] = _compact(payload[key])
+    if payload.get("pixel_compare_skipped_reason"):
+        trimmed["pixel_compare_skipped_reason"] = str(payload["pixel_compare_skipped_reason"])
+    return trimmed
+
+
+class _ConnectionPool:
+    """Keep-alive HTTP(S) connections to one Ollama host, reused across reports."""
+
+    def __init__(self, base_url: str, timeout_s: float, size: int = 2) -> None:
+        parts = urllib.parse.urlsplit(base_url)
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port
+        self._timeout_s = timeout_s
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=max(1, int(size)))
+        self.path_prefix = parts.path.rstrip("/")
+        self.opened = 0
+
+    def new(self) -> http.client.HTTPConnection:
+        self.opened += 1
+        cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return cls(self._host, self._port, timeout=self._timeout_s)
+
+    def acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self.new(), False
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
 
 class OllamaReportGenerator(ReportGenerator):
+    """Markdown reports from a local Ollama model.
+
+    Requests use Ollama's streaming API over pooled keep-alive connections; `on_chunk`
+    receives the accumulated Markdown while tokens arrive (throttled to one call per
+    `partial_interval_s`), and the socket timeout applies between chunks instead of to
+    the whole completion. Reports are cached by a hash of model, system prompt and the
+    trimmed payload, in memory and, when `cache_dir` is set, on disk.
+    """
+
     def __init__(
         self,
         base_url: str | None = None,
         model: str | None = None,
-        timeout_s: int = 45,
+        timeout_s: float = 45,
         max_retries: int = 2,
+        cache_dir: str | Path | None = None,
+        cache_size: int = 128,
+        pool_size: int = 2,
+        partial_interval_s: float = 0.2,
     ) -> None:
         self._base_url = (base_url or os.getenv("OLLAMA_BASE_URL") or "http://127.0.0.1:11434").rstrip("/")
         self._model = (model or os.getenv("OLLAMA_MODEL") or "llama3").strip()
-        self._timeout_s = int(timeout_s)
+        self._timeout_s = float(timeout_s)
         self._max_retries = max(0, min(int(max_retries), 2))
+        self._pool = _ConnectionPool(self._base_url, self._timeout_s, size=pool_size)
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._cache_size = max(0, int(cache_size))
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._partial_interval_s = max(0.0, float(partial_interval_s))
+
+    @property
+    def connections_opened(self) -> int:
+        return self._pool.opened
+
+    def close(self) -> None:
+        self._pool.close()
 
     @staticmethod
-    def _sanitize_json(value: Any) -> Any:
-        if value is None or isinstance(value, (str, int, float, bool)):
-            return value
-        if isinstance(value, dict):
-            return {str(k): OllamaReportGenerator._sanitize_json(v) for k, v in value.items()}
-        if isinstance(value, (list, tuple)):
-            return [OllamaReportGenerator._sanitize_json(v) for v in value]
-        return str(value)
-
-    def _build_request_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        structured_payload = self._sanitize_json(payload)
-        user_input = json.dumps(structured_payload, ensure_ascii=False, sort_keys=True, indent=2)
+    def _prompt_input(payload: Dict[str, Any]) -> str:
+        trimmed = trim_report_payload(payload)
+        return json.dumps(trimmed, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+    def _request_for(self, user_input: str) -> Dict[str, Any]:
         return {
             "model": self._model,
-            "stream": False,
+            "stream": True,
             "options": {"temperature": 0.0},
             "prompt": (
                 "[SYSTEM]\n"
@@ -65,28 +185,107 @@ class OllamaReportGenerator(ReportGenerator):
             ),
         }
 
-    def _call_ollama(self, payload: Dict[str, Any]) -> str:
-        request_payload = self._build_request_payload(payload)
-        body = json.dumps(request_payload).encode("utf-8")
-        req = urllib.request.Request(
-            f"{self._base_url}/api/generate",
-            data=body,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
+    def _cache_key(self, user_input: str) -> str:
+        return hashlib.sha256(f"{self._model}\n{SYSTEM_PROMPT}\n{user_input}".encode("utf-8")).hexdigest()
 
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        if self._cache_dir is not None:
+            path = self._cache_dir / f"{key}.md"
+            if path.exists():
+                markdown = path.read_text(encoding="utf-8")
+                self._remember(key, markdown)
+                return markdown
+        return None
+
+    def _remember(self, key: str, markdown: str) -> None:
+        if self._cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = markdown
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_put(self, key: str, markdown: str) -> None:
+        self._remember(key, markdown)
+        if self._cache_dir is not None:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._cache_dir / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+            tmp.write_text(markdown, encoding="utf-8")
+            os.replace(tmp, self._cache_dir / f"{key}.md")
+
+    def _send(self, body: bytes) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        path = f"{self._pool.path_prefix}/api/generate"
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        conn, reused = self._pool.acquire()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            return conn, conn.getresponse()
+        except _STALE_CONNECTION_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        # The server dropped an idle keep-alive socket; that is not a failed attempt.
+        conn = self._pool.new()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    def _stream_completion(self, body: bytes, on_chunk: Optional[Callable[[str], None]]) -> str:
+        conn, resp = self._send(body)
+        try:
+            if resp.status != 200:
+                detail = resp.read().decode("utf-8", errors="ignore")[:200]
+                raise RuntimeError(f"Ollama returned HTTP {resp.status}: {detail}")
+            parts: list[str] = []
+            last_emit = time.monotonic()
+            for raw_line in resp:
+                line = raw_line.strip()
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"Ollama error: {data['error']}")
+                parts.append(str(data.get("response") or ""))
+                if on_chunk is not None and time.monotonic() - last_emit >= self._partial_interval_s:
+                    on_chunk("".join(parts))
+                    last_emit = time.monotonic()
+                if data.get("done"):
+                    break
+            resp.read()  # drain the chunked terminator so the socket can be reused
+        except BaseException:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._pool.release(conn)
+
+        text = "".join(parts).strip()
+        if not text:
+            raise RuntimeError("Ollama returned empty report content.")
+        if on_chunk is not None:
+            on_chunk(text)
+        return text
+
+    def _call_ollama(self, user_input: str, on_chunk: Optional[Callable[[str], None]] = None) -> str:
+        body = json.dumps(self._request_for(user_input)).encode("utf-8")
         attempts = self._max_retries + 1
         last_error: Exception | None = None
         for attempt in range(1, attempts + 1):
             try:
-                with urllib.request.urlopen(req, timeout=self._timeout_s) as resp:
-                    raw = resp.read().decode("utf-8", errors="ignore")
-                data = json.loads(raw)
-                text = str(data.get("response") or "").strip()
-                if not text:
-                    raise RuntimeError("Ollama returned empty report content.")
-                return text
-            except (URLError, HTTPError, socket.timeout, TimeoutError, ValueError, RuntimeError) as exc:
+                return self._stream_completion(body, on_chunk)
+            except (OSError, http.client.HTTPException, ValueError, RuntimeError) as exc:
                 last_error = exc
                 if attempt >= attempts:
                     break
@@ -94,8 +293,19 @@ class OllamaReportGenerator(ReportGenerator):
             f"Failed to generate report with Ollama after {attempts} attempt(s): {type(last_error).__name__}"
         ) from last_error
 
-    def generate_report(self, payload: Dict[str, Any]) -> Report:
-        markdown = self._call_ollama(payload)
+    def generate_report(
+        self,
+        payload: Dict[str, Any],
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> Report:
+        user_input = self._prompt_input(payload)
+        key = self._cache_key(user_input)
+        markdown = self._cache_get(key)
+        if markdown is None:
+            markdown = self._call_ollama(user_input, on_chunk)
+            self._cache_put(key, markdown)
+        elif on_chunk is not None:
+            on_chunk(markdown)
         return Report(
             provider="ollama",
             model=self._model,
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import shutil
-import tempfile
 import inspect
 from pathlib import Path
 from typing import Any, Optional
@@ -12,10 +10,9 @@ from visual_qa.domain.entities import PixelDiffResult
 
 def _load_legacy_pixel_api():
     """Load existing pixel validator API lazily to keep adapter import-safe."""
-    from HMI.hmi_engine import ValidationConfig, validate_execution_images
-    from HMI.hmi_indexer import build_library_index
+    from HMI.hmi_engine import ValidationConfig, compare_screenshot_pair
 
-    return ValidationConfig, validate_execution_images, build_library_index
+    return ValidationConfig, compare_screenshot_pair
 
 
 def _to_float(value: Any) -> float | None:
@@ -101,7 +98,7 @@ def _sanitize_for_json(value: Any) -> Any:
 
 
 class ExistingPixelAdapter(PixelComparator):
-    """Adapter over the current legacy pixel validator (unchanged code path)."""
+    """Adapter over the legacy pixel validator, scoring the pair directly (no library index)."""
 
     def compare(
         self,
@@ -117,7 +114,7 @@ class ExistingPixelAdapter(PixelComparator):
         if not expected.exists():
             raise FileNotFoundError(f"Expected baseline image not found: {expected}")
 
-        ValidationConfig, validate_execution_images, build_library_index = _load_legacy_pixel_api()
+        ValidationConfig, compare_screenshot_pair = _load_legacy_pixel_api()
 
         cfg_kwargs = {"top_k": 1}
         try:
@@ -129,20 +126,11 @@ class ExistingPixelAdapter(PixelComparator):
             if "stage1_enabled" in fields:
                 cfg_kwargs["stage1_enabled"] = False
 
-        with tempfile.TemporaryDirectory(prefix="visual_qa_pixel_adapter_") as tmp_dir:
-            tmp_root = Path(tmp_dir)
-            staged_baseline = tmp_root / expected.name
-            shutil.copy2(expected, staged_baseline)
-
-            library_index = build_library_index(str(tmp_root))
-            cfg = ValidationConfig(**cfg_kwargs)
-            legacy_result = validate_execution_images([str(actual)], library_index, cfg) or {}
-            if not isinstance(legacy_result, dict):
-                legacy_result = {"value": legacy_result}
-
-        item = ((legacy_result.get("items") or [{}])[0]) if isinstance(legacy_result, dict) else {}
+        cfg = ValidationConfig(**cfg_kwargs)
+        item = compare_screenshot_pair(str(actual), str(expected), cfg) or {}
         if not isinstance(item, dict):
             item = {}
+        legacy_result = {"items": [item]}
 
         status = str(item.get("status") or "UNKNOWN")
         scores = item.get("scores") or {}
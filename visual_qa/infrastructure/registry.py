@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from visual_qa.application.ports.embedding_provider import EmbeddingProvider
+from visual_qa.config import VisualQaConfig
+
+# Only these fields change which model gets built; runs_dir, thresholds etc. must not force a reload.
+_PROVIDER_KEY_FIELDS = ("embedding_provider", "mobileclip_model", "openclip_model", "openclip_pretrained")
+_MAX_LOAD_EVENTS = 50
+
+
+@dataclass
+class LoadEvent:
+    kind: str
+    key: str
+    load_s: float
+    loaded_at: str
+
+
+def _default_provider_factory(config: VisualQaConfig) -> EmbeddingProvider:
+    from visual_qa.infrastructure.embeddings.factory import build_embedding_provider
+
+    return build_embedding_provider(config)
+
+
+def _default_index_factory(index_dir: str, use_faiss: bool) -> Any:
+    from visual_qa.infrastructure.vector_index.faiss_repository import FaissVectorIndexRepository
+
+    return FaissVectorIndexRepository(index_dir=index_dir, use_faiss=use_faiss)
+
+
+def provider_key(config: VisualQaConfig) -> str:
+    snapshot = config.snapshot()
+    return "|".join(f"{name}={snapshot.get(name)}" for name in _PROVIDER_KEY_FIELDS)
+
+
+class ResourceRegistry:
+    """Process-wide cache of embedding providers and loaded vector indexes.
+
+    Providers are keyed by the embedding-related part of the config snapshot. Indexes are
+    keyed by resolved dir; the shared repository re-reads its files only when their
+    mtime/size signature changes, so a rebuild is picked up without manual invalidation.
+    Per-key locks keep two threads from initializing the same model twice.
+    """
+
+    def __init__(
+        self,
+        provider_factory: Callable[[VisualQaConfig], EmbeddingProvider] = _default_provider_factory,
+        index_factory: Callable[[str, bool], Any] = _default_index_factory,
+    ) -> None:
+        self._provider_factory = provider_factory
+        self._index_factory = index_factory
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._providers: Dict[str, EmbeddingProvider] = {}
+        self._indexes: Dict[str, Any] = {}
+        self._events: List[LoadEvent] = []
+        self._hits = 0
+        self._misses = 0
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _record(self, kind: str, key: str, started: float) -> None:
+        event = LoadEvent(
+            kind=kind,
+            key=key,
+            load_s=round(time.perf_counter() - started, 4),
+            loaded_at=datetime.now(timezone.utc).isoformat(),
+        )
+        with self._lock:
+            self._misses += 1
+            self._events.append(event)
+            del self._events[:-_MAX_LOAD_EVENTS]
+
+    def _hit(self) -> None:
+        with self._lock:
+            self._hits += 1
+
+    def get_provider(self, config: VisualQaConfig) -> EmbeddingProvider:
+        key = provider_key(config)
+        cached = self._providers.get(key)
+        if cached is not None:
+            self._hit()
+            return cached
+        with self._key_lock(f"provider:{key}"):
+            cached = self._providers.get(key)
+            if cached is not None:
+                self._hit()
+                return cached
+            started = time.perf_counter()
+            provider = self._provider_factory(config)
+            self._providers[key] = provider
+            self._record("provider", f"{key} -> {provider.name}", started)
+            return provider
+
+    def get_index(self, index_dir: str | Path, use_faiss: bool = True) -> Any:
+        """Shared repository for `index_dir`, (re)loaded if the files changed on disk."""
+        key = str(Path(index_dir).resolve())
+        with self._key_lock(f"index:{key}"):
+            repo = self._indexes.get(key)
+            if repo is None:
+                repo = self._index_factory(key, use_faiss)
+                self._indexes[key] = repo
+            started = time.perf_counter()
+            if repo.load(key) is False:
+                self._hit()
+            else:
+                self._record("index", key, started)
+            return repo
+
+    def invalidate_provider(self, config: Optional[VisualQaConfig] = None) -> None:
+        with self._lock:
+            if config is None:
+                self._providers.clear()
+            else:
+                self._providers.pop(provider_key(config), None)
+
+    def invalidate_index(self, index_dir: str | Path | None = None) -> None:
+        with self._lock:
+            if index_dir is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(str(Path(index_dir).resolve()), None)
+
+    def clear(self) -> None:
+        self.invalidate_provider()
+        self.invalidate_index()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "providers": sorted(self._providers),
+                "indexes": sorted(self._indexes),
+                "hits": self._hits,
+                "misses": self._misses,
+                "loads": [asdict(event) for event in self._events],
+            }
+
+
+_REGISTRY: Optional[ResourceRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> ResourceRegistry:
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = ResourceRegistry()
+        return _REGISTRY
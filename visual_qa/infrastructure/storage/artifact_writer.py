@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+_STOP = object()
+
+
+def dumps_compact(payload: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def link_or_copy(src: Path, dst: Path) -> str:
+    """Hard-link `src` at `dst` (no data copied); falls back to copy2 across filesystems.
+
+    The source stays where it is, so paths already recorded by the pixel adapter remain valid.
+    Returns "linked", "copied" or "existing".
+    """
+    try:
+        if dst.exists() and os.path.samefile(src, dst):
+            return "existing"
+    except OSError:
+        pass
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "linked"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copied"
+
+
+class ArtifactWriter:
+    """Writes run artifacts either inline or from one background thread.
+
+    In background mode `write_text`/`append_text` return immediately and a single worker
+    applies the writes in submission order (so JSONL appends stay ordered). `flush()`
+    blocks until the queue is drained and raises if any write failed; it is registered
+    with atexit so pending artifacts are not lost when the process ends. The queue is
+    bounded so a slow disk applies back-pressure instead of buffering without limit.
+    """
+
+    def __init__(self, background: bool = False, max_pending: int = 256) -> None:
+        self._background = bool(background)
+        self._errors: List[BaseException] = []
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        if self._background:
+            self._queue = queue.Queue(maxsize=max(1, int(max_pending)))
+            self._thread = threading.Thread(target=self._drain, name="visual-qa-artifact-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    @property
+    def background(self) -> bool:
+        return self._background
+
+    @staticmethod
+    def _write(path: Path, text: str, mode: str) -> None:
+        if mode == "a":
+            with path.open("a", encoding="utf-8") as fh:
+                fh.write(text)
+            return
+        # Whole-file writes go through a rename so readers (e.g. a dashboard polling
+        # result.json while a report worker rewrites it) never see a truncated file.
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def _submit(self, path: Path, text: str, mode: str) -> Path:
+        if self._queue is None:
+            self._write(path, text, mode)
+        else:
+            self._queue.put((path, text, mode))
+        return path
+
+    def write_text(self, path: Path, text: str) -> Path:
+        return self._submit(Path(path), text, "w")
+
+    def append_text(self, path: Path, text: str) -> Path:
+        return self._submit(Path(path), text, "a")
+
+    def write_json(self, path: Path, payload: Any, default: Optional[Callable[[Any], Any]] = None) -> Path:
+        # Serialize on the caller's thread: the payload may be mutated after this returns.
+        return self.write_text(path, dumps_compact(payload, default=default))
+
+    def _drain(self) -> None:
+        assert self._queue is not None
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._write(*item)
+            except BaseException as exc:  # surfaced by flush()
+                self._errors.append(exc)
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        if self._queue is not None:
+            self._queue.join()
+        if self._errors:
+            errors, self._errors = self._errors, []
+            raise RuntimeError(f"{len(errors)} artifact write(s) failed: {errors[0]}") from errors[0]
+
+    def close(self) -> None:
+        if self._queue is None or self._thread is None:
+            return
+        atexit.unregister(self.close)
+        try:
+            self.flush()
+        finally:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._queue = None
+            self._thread = None
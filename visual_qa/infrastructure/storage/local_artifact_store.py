@@ -2,20 +2,57 @@ from __future__ import annotations
 
 from dataclasses import asdict, is_dataclass
 from datetime import datetime, timezone
-import json
-import shutil
 from pathlib import Path
 from typing import Any, Dict, Iterable, Mapping
 
 from visual_qa.application.ports.artifact_store import ArtifactStore
+from visual_qa.infrastructure.storage.artifact_writer import ArtifactWriter, dumps_compact, link_or_copy
+from visual_qa.infrastructure.storage.run_history import SqliteRunHistory
+
+HISTORY_DB_FILENAME = "runs.sqlite"
 
 
 class LocalArtifactStore(ArtifactStore):
-    def __init__(self, runs_dir: str) -> None:
+    """Run artifacts on disk; runs index/history queried from `runs.sqlite`.
+
+    `index.jsonl` and `logs.jsonl` are still appended for tools that tail them, but reads go
+    through the SQLite store, which imports the existing JSONL the first time it is opened.
+
+    Artifacts are written as compact JSON; pixel artifacts are hard-linked into `diff_images/`
+    rather than copied. With `background_writes=True` file writes are queued to one worker
+    thread and the save methods return the target path right away; call `flush()` (done
+    automatically at exit) before reading those files back.
+    """
+
+    def __init__(self, runs_dir: str, history_window: int = 30, background_writes: bool = False) -> None:
         self._runs_dir = Path(runs_dir).resolve()
         self._runs_dir.mkdir(parents=True, exist_ok=True)
         self._index_path = self._runs_dir / "index.jsonl"
         self._history_path = self._runs_dir / "logs.jsonl"
+        self._history_db = SqliteRunHistory(self._runs_dir / HISTORY_DB_FILENAME, window=history_window)
+        self._history_db.import_jsonl(self._index_path, self._history_path)
+        self._writer = ArtifactWriter(background=background_writes)
+
+    @property
+    def history_db(self) -> SqliteRunHistory:
+        return self._history_db
+
+    def flush(self) -> None:
+        """Block until queued artifact writes are on disk (no-op for inline writes)."""
+        self._writer.flush()
+
+    def close(self) -> None:
+        """Flush pending writes and close the history database."""
+        try:
+            self._writer.close()
+        finally:
+            self._history_db.close()
+
+    def __enter__(self) -> "LocalArtifactStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def create_run_dir(self, run_id: str) -> Path:
         run_dir = self._runs_dir / run_id
@@ -86,7 +123,7 @@ class LocalArtifactStore(ArtifactStore):
             if src.exists() and src.is_file():
                 target = out_dir / src.name
                 if target.resolve() != src.resolve():
-                    shutil.copy2(src, target)
+                    link_or_copy(src, target)
                 copied.append(str(target))
             else:
                 copied.append(str(src))
@@ -112,10 +149,7 @@ class LocalArtifactStore(ArtifactStore):
             data = dict(data)
             data["diff_image_artifacts"] = copied
 
-        path = run_dir / str(filename)
-        with path.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh, ensure_ascii=False, indent=2, default=self._json_default)
-        return path
+        return self._writer.write_json(run_dir / str(filename), data, default=self._json_default)
 
     def save_markdown(self, *args, **kwargs) -> Path:
         """Supports both call styles:
@@ -133,28 +167,22 @@ class LocalArtifactStore(ArtifactStore):
             )
 
         run_dir = self._resolve_run_dir(run_or_id)
-        path = run_dir / str(filename)
-        with path.open("w", encoding="utf-8") as fh:
-            fh.write(markdown)
-        return path
+        return self._writer.write_text(run_dir / str(filename), markdown)
 
     def save_json_lines(self, run_dir: Path, filename: str, rows: Iterable[Dict[str, Any]]) -> Path:
-        path = run_dir / filename
-        with path.open("w", encoding="utf-8") as fh:
-            for row in rows:
-                fh.write(json.dumps(row, ensure_ascii=False) + "\n")
-        return path
+        text = "".join(dumps_compact(row, default=self._json_default) + "\n" for row in rows)
+        return self._writer.write_text(Path(run_dir) / filename, text)
 
     def append_history(self, summary_dict: Mapping[str, Any]) -> Path:
         row = dict(summary_dict)
         row.setdefault("timestamp", datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"))
-        with self._history_path.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(row, ensure_ascii=False, default=self._json_default) + "\n")
+        self._writer.append_text(self._history_path, dumps_compact(row, default=self._json_default) + "\n")
+        self._history_db.add_history(row)
         return self._history_path
 
     def append_runs_index(self, row: Dict[str, Any]) -> Path:
-        with self._index_path.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._writer.append_text(self._index_path, dumps_compact(row, default=self._json_default) + "\n")
+        self._history_db.add_run(row)
         # Keep a unified history log with key summary fields as requested.
         summary = {
             "run_id": row.get("run_id"),
@@ -167,64 +195,25 @@ class LocalArtifactStore(ArtifactStore):
         self.append_history(summary)
         return self._index_path
 
-    def load_runs_index(self) -> list[Dict[str, Any]]:
-        if not self._index_path.exists():
-            return []
-        rows: list[Dict[str, Any]] = []
-        with self._index_path.open("r", encoding="utf-8") as fh:
-            for line in fh:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    row = json.loads(line)
-                except Exception:
-                    continue
-                if isinstance(row, dict):
-                    rows.append(row)
-        return rows
+    def update_runs_index(self, run_id: str, updates: Mapping[str, Any]) -> bool:
+        """Update fields of an indexed run (e.g. `report_status` once a queued report finishes).
+
+        Only the SQLite index is updated; `index.jsonl` keeps the row as it was appended.
+        """
+        return self._history_db.update_run(run_id, updates)
+
+    def load_runs_index(
+        self,
+        screen_type: str | None = None,
+        limit: int | None = None,
+    ) -> list[Dict[str, Any]]:
+        return self._history_db.load_runs(screen_type=screen_type, limit=limit)
+
+    def historical_stats(self, screen_type: str, last_n: int | None = None) -> dict[str, Any]:
+        """Rolling stats of the runs index for one screen type (O(1) at the default window)."""
+        return self._history_db.run_stats(screen_type, last_n=last_n)
 
     def compute_historical_metrics(self, screen_type: str, last_n: int = 30) -> dict[str, Any]:
         if last_n <= 0:
             raise ValueError("last_n must be greater than 0")
-
-        if not self._history_path.exists():
-            return {
-                "screen_type": screen_type,
-                "runs_considered": 0,
-                "average_similarity": None,
-                "average_diff_percent": None,
-                "average_ssim": None,
-            }
-
-        rows: list[dict[str, Any]] = []
-        with self._history_path.open("r", encoding="utf-8") as fh:
-            for line in fh:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    row = json.loads(line)
-                except Exception:
-                    continue
-                if not isinstance(row, dict):
-                    continue
-                if str(row.get("screen_type") or "") != str(screen_type):
-                    continue
-                rows.append(row)
-
-        rows = rows[-last_n:]
-        sims = [float(v) for v in (r.get("similarity") for r in rows) if isinstance(v, (int, float))]
-        diffs = [float(v) for v in (r.get("diff_percent") for r in rows) if isinstance(v, (int, float))]
-        ssims = [float(v) for v in (r.get("ssim") for r in rows) if isinstance(v, (int, float))]
-
-        def _avg(values: list[float]) -> float | None:
-            return (sum(values) / len(values)) if values else None
-
-        return {
-            "screen_type": screen_type,
-            "runs_considered": len(rows),
-            "average_similarity": _avg(sims),
-            "average_diff_percent": _avg(diffs),
-            "average_ssim": _avg(ssims),
-        }
+        return self._history_db.history_stats(screen_type, last_n=last_n)
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    screen_type TEXT NOT NULL,
+    timestamp TEXT,
+    pixel_status TEXT,
+    diff_percent REAL,
+    row_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_screen_seq ON runs (screen_type, seq);
+CREATE INDEX IF NOT EXISTS idx_runs_screen_ts ON runs (screen_type, timestamp);
+
+CREATE TABLE IF NOT EXISTS history (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    screen_type TEXT NOT NULL,
+    timestamp TEXT,
+    similarity REAL,
+    diff_percent REAL,
+    ssim REAL
+);
+CREATE INDEX IF NOT EXISTS idx_history_screen_seq ON history (screen_type, seq);
+CREATE INDEX IF NOT EXISTS idx_history_screen_ts ON history (screen_type, timestamp);
+
+CREATE TABLE IF NOT EXISTS run_stats (
+    screen_type TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    average_difference_percent REAL,
+    pass_rate REAL
+);
+CREATE TABLE IF NOT EXISTS history_stats (
+    screen_type TEXT PRIMARY KEY,
+    runs_considered INTEGER NOT NULL,
+    average_similarity REAL,
+    average_diff_percent REAL,
+    average_ssim REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_RUN_STATS_SQL = """
+SELECT COUNT(*), AVG(diff_percent), AVG(CASE WHEN pixel_status = 'PASS' THEN 1.0 ELSE 0.0 END)
+FROM (SELECT diff_percent, pixel_status FROM runs WHERE screen_type = ? ORDER BY seq DESC LIMIT ?)
+"""
+_HISTORY_STATS_SQL = """
+SELECT COUNT(*), AVG(similarity), AVG(diff_percent), AVG(ssim)
+FROM (SELECT similarity, diff_percent, ssim FROM history WHERE screen_type = ? ORDER BY seq DESC LIMIT ?)
+"""
+
+# Database paths whose schema this process already created; later connections skip the DDL.
+_SCHEMA_READY: set[str] = set()
+_SCHEMA_READY_LOCK = threading.Lock()
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _first(row: Mapping[str, Any], *keys: str) -> Any:
+    for key in keys:
+        value = row.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except Exception:
+                continue
+            if isinstance(row, dict):
+                yield row
+
+
+class SqliteRunHistory:
+    """SQLite-backed runs index and history log for LocalArtifactStore.
+
+    Rows are indexed by (screen_type, seq) and (screen_type, timestamp). Rolling aggregates
+    over the last `window` runs of each screen type live in `run_stats`/`history_stats` and
+    are refreshed on insert (one indexed query over at most `window` rows), so reading the
+    historical stats for a run is a single primary-key lookup however long the history is.
+    """
+
+    def __init__(self, db_path: str | Path, window: int = 30) -> None:
+        if window <= 0:
+            raise ValueError("window must be greater than 0")
+        self._db_path = Path(db_path)
+        self._window = int(window)
+        self._lock = threading.Lock()
+        key = str(self._db_path.resolve())
+        fresh = not self._db_path.exists()
+        self._conn = sqlite3.connect(str(self._db_path), timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with _SCHEMA_READY_LOCK:
+            if fresh or key not in _SCHEMA_READY:
+                with self._conn:
+                    self._conn.execute("PRAGMA journal_mode=WAL")
+                    self._conn.executescript(_SCHEMA)
+                _SCHEMA_READY.add(key)
+
+    @property
+    def path(self) -> Path:
+        return self._db_path
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "SqliteRunHistory":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _run_values(row: Mapping[str, Any]) -> tuple:
+        status = row.get("pixel_status")
+        return (
+            row.get("run_id"),
+            str(_first(row, "predicted_screen_type", "screen_type") or ""),
+            _first(row, "timestamp_utc", "timestamp"),
+            str(status).upper() if status is not None else None,
+            _number(_first(row, "difference_percent", "diff_percent")),
+            json.dumps(dict(row), ensure_ascii=False, separators=(",", ":"), default=str),
+        )
+
+    @staticmethod
+    def _history_values(row: Mapping[str, Any]) -> tuple:
+        return (
+            row.get("run_id"),
+            str(row.get("screen_type") or ""),
+            row.get("timestamp"),
+            _number(row.get("similarity")),
+            _number(row.get("diff_percent")),
+            _number(row.get("ssim")),
+        )
+
+    def _refresh_run_stats(self, screen_type: str) -> None:
+        count, avg_diff, pass_rate = self._conn.execute(_RUN_STATS_SQL, (screen_type, self._window)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO run_stats VALUES (?, ?, ?, ?)", (screen_type, count, avg_diff, pass_rate)
+        )
+
+    def _refresh_history_stats(self, screen_type: str) -> None:
+        count, sim, diff, ssim = self._conn.execute(_HISTORY_STATS_SQL, (screen_type, self._window)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO history_stats VALUES (?, ?, ?, ?, ?)", (screen_type, count, sim, diff, ssim)
+        )
+
+    def add_run(self, row: Mapping[str, Any]) -> None:
+        values = self._run_values(row)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, screen_type, timestamp, pixel_status, diff_percent, row_json) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                values,
+            )
+            self._refresh_run_stats(values[1])
+
+    def add_history(self, row: Mapping[str, Any]) -> None:
+        values = self._history_values(row)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO history (run_id, screen_type, timestamp, similarity, diff_percent, ssim) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                values,
+            )
+            self._refresh_history_stats(values[1])
+
+    def _insert_rows(self, runs: Iterable[Mapping[str, Any]], history: Iterable[Mapping[str, Any]]) -> Dict[str, int]:
+        run_values = [self._run_values(row) for row in runs]
+        history_values = [self._history_values(row) for row in history]
+        self._conn.executemany(
+            "INSERT INTO runs (run_id, screen_type, timestamp, pixel_status, diff_percent, row_json) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            run_values,
+        )
+        self._conn.executemany(
+            "INSERT INTO history (run_id, screen_type, timestamp, similarity, diff_percent, ssim) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            history_values,
+        )
+        for (screen_type,) in self._conn.execute("SELECT DISTINCT screen_type FROM runs").fetchall():
+            self._refresh_run_stats(screen_type)
+        for (screen_type,) in self._conn.execute("SELECT DISTINCT screen_type FROM history").fetchall():
+            self._refresh_history_stats(screen_type)
+        return {"runs": len(run_values), "history": len(history_values)}
+
+    def import_jsonl(self, index_path: str | Path, history_path: str | Path, force: bool = False) -> Dict[str, int]:
+        """Import `index.jsonl`/`logs.jsonl` once; later calls are no-ops unless `force`.
+
+        Runs in one IMMEDIATE transaction so two processes opening a fresh database do not
+        both import the same files; an already imported database is detected with a plain
+        read and never takes the write lock.
+        """
+        with self._lock:
+            if not force and self._conn.execute("SELECT 1 FROM meta WHERE key = 'jsonl_imported_at'").fetchone():
+                return {"runs": 0, "history": 0}
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                done = self._conn.execute("SELECT value FROM meta WHERE key = 'jsonl_imported_at'").fetchone()
+                if done and not force:
+                    self._conn.rollback()
+                    return {"runs": 0, "history": 0}
+                for table in ("runs", "history", "run_stats", "history_stats"):
+                    self._conn.execute(f"DELETE FROM {table}")
+                counts = self._insert_rows(_iter_jsonl(Path(index_path)), _iter_jsonl(Path(history_path)))
+                self._set_meta("jsonl_imported_at", datetime.now(timezone.utc).isoformat())
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return counts
+
+    def update_run(self, run_id: str, updates: Mapping[str, Any]) -> bool:
+        """Merge `updates` into the newest runs-index row of `run_id`; False if there is none."""
+        with self._lock, self._conn:
+            found = self._conn.execute(
+                "SELECT seq, row_json FROM runs WHERE run_id = ? ORDER BY seq DESC LIMIT 1", (str(run_id),)
+            ).fetchone()
+            if found is None:
+                return False
+            seq, raw = found
+            row = {**json.loads(raw), **dict(updates)}
+            self._conn.execute(
+                "UPDATE runs SET row_json = ? WHERE seq = ?",
+                (json.dumps(row, ensure_ascii=False, separators=(",", ":"), default=str), seq),
+            )
+        return True
+
+    def load_runs(
+        self,
+        screen_type: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[Dict[str, Any]]:
+        """Runs-index rows in insertion order, optionally filtered; `limit` keeps the newest."""
+        clauses, params = [], []
+        if screen_type is not None:
+            clauses.append("screen_type = ?")
+            params.append(str(screen_type))
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(str(since))
+        sql = "SELECT row_json FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seq DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(max(0, int(limit)))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(raw) for (raw,) in reversed(rows)]
+
+    def run_stats(self, screen_type: str, last_n: Optional[int] = None) -> Dict[str, Any]:
+        """Pipeline stats (count, average_difference_percent, pass_rate) of the newest runs."""
+        with self._lock:
+            if last_n is None or int(last_n) == self._window:
+                row = self._conn.execute(
+                    "SELECT count, average_difference_percent, pass_rate FROM run_stats WHERE screen_type = ?",
+                    (str(screen_type),),
+                ).fetchone()
+            else:
+                row = self._conn.execute(_RUN_STATS_SQL, (str(screen_type), max(1, int(last_n)))).fetchone()
+        if not row or not row[0]:
+            return {"count": 0}
+        return {"count": int(row[0]), "average_difference_percent": row[1], "pass_rate": row[2]}
+
+    def history_stats(self, screen_type: str, last_n: Optional[int] = None) -> Dict[str, Any]:
+        """Stats of the history log (similarity, diff, SSIM) over the newest runs."""
+        with self._lock:
+            if last_n is None or int(last_n) == self._window:
+                row = self._conn.execute(
+                    "SELECT runs_considered, average_similarity, average_diff_percent, average_ssim "
+                    "FROM history_stats WHERE screen_type = ?",
+                    (str(screen_type),),
+                ).fetchone()
+            else:
+                row = self._conn.execute(_HISTORY_STATS_SQL, (str(screen_type), max(1, int(last_n)))).fetchone()
+        count, sim, diff, ssim = row if row else (0, None, None, None)
+        return {
+            "screen_type": screen_type,
+            "runs_considered": int(count or 0),
+            "average_similarity": sim,
+            "average_diff_percent": diff,
+            "average_ssim": ssim,
+        }
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import math
+import os
 import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import wraps
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, TypeVar
 
 import numpy as np
 
@@ -11,6 +19,38 @@ from visual_qa.application.ports.vector_index_repository import VectorIndexRepos
 from visual_qa.infrastructure.vector_index.dtos import ScreenMatchCandidate
 
 _IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+INDEX_FILENAME = "index.faiss"
+METADATA_FILENAME = "metadata.json"
+STATE_FILENAME = "index_state.json"
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq", "ivf_sq8")
+_INDEX_TYPE_BY_CLASS = {
+    "IndexFlat": "flat",
+    "IndexFlatIP": "flat",
+    "IndexIVFFlat": "ivf_flat",
+    "IndexHNSWFlat": "hnsw",
+    "IndexIVFPQ": "ivf_pq",
+    "IndexIVFScalarQuantizer": "ivf_sq8",
+}
+# Quantized codes only approximate the original embedding; compaction re-embeds them when it can.
+_LOSSY_TYPES = {"ivf_pq", "ivf_sq8"}
+_STATE_FORMAT = 1
+_READ_RETRIES = 5
+_READ_RETRY_DELAY_S = 0.05
+DEFAULT_COMPACT_RATIO = 0.25
+
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _locked(method: _F) -> _F:
+    """Run the method holding the repository lock, so search never sees a half-applied update."""
+
+    @wraps(method)
+    def wrapper(self: "FaissVectorIndexRepository", *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
 
 
 def _l2_normalize_vector(vector: np.ndarray) -> np.ndarray:
@@ -30,6 +70,91 @@ def _l2_normalize_rows(matrix: np.ndarray) -> np.ndarray:
     return (arr / norms).astype(np.float32, copy=False)
 
 
+def index_signature(index_dir: str | Path) -> tuple | None:
+    """(mtime_ns, size) of the index files; None while the index/metadata pair is missing."""
+    root = Path(index_dir)
+    parts = []
+    for name in (INDEX_FILENAME, METADATA_FILENAME, STATE_FILENAME):
+        try:
+            stat = (root / name).stat()
+        except OSError:
+            if name == STATE_FILENAME:
+                continue  # indexes saved before the state file existed
+            return None
+        parts.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(parts)
+
+
+def file_content_hash(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write to a temp file in the same dir, fsync, then rename over `path`."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open("wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _metadata_entry(item: dict[str, Any] | None) -> dict[str, Any]:
+    item = item or {}
+    entry = {
+        "image_path": str(item.get("image_path", "")),
+        "screen_type": str(item.get("screen_type", "unknown")),
+        "tags": list(item.get("tags", [])) if item.get("tags") else [],
+    }
+    if item.get("content_hash"):
+        entry["content_hash"] = str(item["content_hash"])
+    return entry
+
+
+def _pq_subquantizers(dimension: int, requested: int | None) -> int:
+    """Largest divisor of `dimension` not above the request (default: 4 dims per code byte)."""
+    target = max(1, min(int(requested or max(1, dimension // 4)), dimension))
+    for m in range(target, 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def index_factory_spec(
+    index_type: str,
+    dimension: int,
+    count: int,
+    nlist: int | None = None,
+    hnsw_m: int = 32,
+    pq_m: int | None = None,
+) -> str:
+    """faiss.index_factory string for `index_type`, clamped to what `count` vectors can train."""
+    kind = str(index_type or "flat").strip().lower()
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"index_type must be one of {INDEX_TYPES}, got '{index_type}'.")
+    if kind == "flat":
+        return "Flat"
+    if kind == "hnsw":
+        return f"HNSW{max(4, int(hnsw_m))}"
+    count = max(1, int(count))
+    lists = max(1, min(int(nlist or round(4 * math.sqrt(count))), count))
+    if kind == "ivf_flat":
+        return f"IVF{lists},Flat"
+    if kind == "ivf_sq8":
+        return f"IVF{lists},SQ8"
+    # PQ codebooks need at least 2**nbits training points; "np" skips the (slow) polysemous training.
+    nbits = max(1, min(8, int(math.log2(max(2, count)))))
+    return f"IVF{lists},PQ{_pq_subquantizers(dimension, pq_m)}x{nbits}np"
+
+
 def _infer_screen_type(image_path: Path) -> str:
     stem = image_path.stem.strip().lower()
     if not stem:
@@ -39,13 +164,32 @@ def _infer_screen_type(image_path: Path) -> str:
 
 
 class FaissVectorIndexRepository(VectorIndexRepository):
-    """FAISS IndexFlatIP repository with persisted metadata mapping."""
+    """FAISS inner-product repository with persisted metadata mapping.
+
+    `index_type` picks the structure built by `build()`: exact "flat" (default), "ivf_flat",
+    "hnsw", or the compressed "ivf_pq"/"ivf_sq8". IVF/PQ variants are trained on the build
+    vectors; `nprobe` (IVF) and `ef_search` (HNSW) trade recall for speed at query time and
+    are re-applied after `load()`.
+
+    Vectors carry stable ids (IndexIDMap2, or native IVF ids with a hashtable direct map) so
+    `sync_entries()` can drop and re-add single images. HNSW cannot delete in place: removed
+    ids are tombstoned (metadata dropped, skipped at search) until `compact()` rebuilds.
+    `save()` replaces each file atomically and writes `index_state.json` last with checksums
+    of the pair, so `load()` never pairs an index with metadata from another save.
+    """
 
     def __init__(
         self,
         index_dir: str | Path | None = None,
         embedding_provider: Any | None = None,
         use_faiss: bool = True,
+        embed_batch_size: int = 16,
+        index_type: str = "flat",
+        nlist: int | None = None,
+        nprobe: int = 8,
+        hnsw_m: int = 32,
+        ef_search: int = 64,
+        pq_m: int | None = None,
     ) -> None:
         if not use_faiss:
             raise ValueError("FaissVectorIndexRepository requires use_faiss=True.")
@@ -57,51 +201,131 @@ class FaissVectorIndexRepository(VectorIndexRepository):
         self._faiss = faiss
         self._index_dir = Path(index_dir).resolve() if index_dir else None
         self._embedding_provider = embedding_provider
+        self._embed_batch_size = max(1, int(embed_batch_size))
         self._index = None
         self._dimension: int | None = None
         self._metadata_by_id: dict[str, dict[str, Any]] = {}
+        self._next_id = 0
+        self._trained_on = 0
+        self._loaded_from: tuple[Path, tuple] | None = None
+        # Reentrant: sync_entries/compact call build() and remove_ids() while holding it.
+        self._lock = threading.RLock()
+        index_factory_spec(index_type, 1, 1)  # validate early
+        self._index_type = str(index_type).strip().lower()
+        self._nlist = nlist
+        self._nprobe = max(1, int(nprobe))
+        self._hnsw_m = int(hnsw_m)
+        self._ef_search = max(1, int(ef_search))
+        self._pq_m = pq_m
 
     @property
     def backend(self) -> str:
         return "faiss"
 
-    def build(self, vectors: np.ndarray, metadata: list[dict[str, Any]]) -> None:
+    @property
+    def index_type(self) -> str:
+        return self._index_type
+
+    @_locked
+    def describe(self) -> dict[str, Any]:
+        ntotal = int(self._index.ntotal) if self._index is not None else 0
+        return {
+            "index_type": self._index_type,
+            "index_class": type(self._index).__name__ if self._index is not None else None,
+            "ntotal": ntotal,
+            "live": len(self._metadata_by_id),
+            "dead": max(0, ntotal - len(self._metadata_by_id)),
+            "next_id": self._next_id,
+            "dimension": self._dimension,
+            "nprobe": self._nprobe,
+            "ef_search": self._ef_search,
+        }
+
+    @_locked
+    def reconstruct_vectors(self) -> np.ndarray:
+        """Live vectors in id order (exact for flat/hnsw, approximate for PQ/SQ8)."""
+        if self._index is None or self._index.ntotal == 0:
+            return np.zeros((0, int(self._dimension or 0)), dtype=np.float32)
+        return self._reconstruct_ids(sorted(int(key) for key in self._metadata_by_id))
+
+    def _reconstruct_ids(self, ids: list[int]) -> np.ndarray:
+        if not ids:
+            return np.zeros((0, int(self._dimension or 0)), dtype=np.float32)
+        try:
+            return np.vstack([self._index.reconstruct(int(vector_id)) for vector_id in ids]).astype(np.float32)
+        except RuntimeError as exc:
+            raise ValueError(f"Index type '{self._index_type}' cannot reconstruct stored vectors.") from exc
+
+    @_locked
+    def configure_search(self, nprobe: int | None = None, ef_search: int | None = None) -> None:
+        if nprobe is not None:
+            self._nprobe = max(1, int(nprobe))
+        if ef_search is not None:
+            self._ef_search = max(1, int(ef_search))
+        self._apply_search_params()
+
+    def _core_index(self) -> Any:
+        if hasattr(self._index, "id_map"):
+            return self._faiss.downcast_index(self._index.index)
+        return self._index
+
+    def _apply_search_params(self) -> None:
+        if self._index is None:
+            return
+        params = self._faiss.ParameterSpace()
+        if self._index_type.startswith("ivf"):
+            params.set_index_parameter(self._core_index(), "nprobe", self._nprobe)
+        elif self._index_type == "hnsw":
+            params.set_index_parameter(self._core_index(), "efSearch", self._ef_search)
+
+    def _is_id_mapped(self) -> bool:
+        if self._index is None:
+            return False
+        if hasattr(self._index, "id_map"):
+            return True
+        if not self._index_type.startswith("ivf"):
+            return False
+        ivf = self._faiss.extract_index_ivf(self._index)
+        return ivf.direct_map.type == self._faiss.DirectMap.Hashtable
+
+    @_locked
+    def build(
+        self,
+        vectors: np.ndarray,
+        metadata: list[dict[str, Any]],
+        ids: list[int] | None = None,
+    ) -> None:
         if len(metadata) != int(vectors.shape[0]):
             raise ValueError("metadata length must match vectors rows.")
+        ids = list(range(len(metadata))) if ids is None else [int(vector_id) for vector_id in ids]
+        if len(ids) != len(metadata):
+            raise ValueError("ids length must match vectors rows.")
         normalized = _l2_normalize_rows(vectors)
-        self._reset_index(normalized.shape[1])
-        self._index.add(normalized)
-        self._metadata_by_id = {}
-        for idx, item in enumerate(metadata):
-            self._metadata_by_id[str(idx)] = {
-                "image_path": str(item.get("image_path", "")),
-                "screen_type": str(item.get("screen_type", "unknown")),
-                "tags": list(item.get("tags", [])) if item.get("tags") else [],
-            }
-
-    def build_from_folder(
+        self._reset_index(normalized.shape[1], count=normalized.shape[0])
+        self._loaded_from = None
+        if not self._index.is_trained:
+            self._index.train(normalized)
+        self._index.add_with_ids(normalized, np.asarray(ids, dtype=np.int64))
+        self._metadata_by_id = {str(vector_id): _metadata_entry(item) for vector_id, item in zip(ids, metadata)}
+        self._next_id = max(ids) + 1 if ids else 0
+        self._trained_on = len(ids)
+
+    def _folder_entries(
         self,
         reference_dir: str,
-        label_map: dict[str, str] | None = None,
-        recursive: bool = False,
-    ) -> None:
-        if self._embedding_provider is None:
-            raise ValueError("embedding_provider is required for build_from_folder.")
-
+        label_map: dict[str, str] | None,
+        recursive: bool,
+    ) -> list[dict[str, Any]]:
         root = Path(reference_dir).resolve()
         if not root.exists():
             raise FileNotFoundError(f"Reference directory not found: {root}")
         if not root.is_dir():
             raise NotADirectoryError(f"Reference path is not a directory: {root}")
 
-        self._index = None
-        self._dimension = None
-        self._metadata_by_id = {}
-
         label_map = label_map or {}
         pattern = "**/*" if recursive else "*"
         files = sorted(p for p in root.glob(pattern) if p.is_file() and p.suffix.lower() in _IMAGE_EXTENSIONS)
-
+        entries = []
         for image_path in files:
             screen_type = (
                 label_map.get(str(image_path))
@@ -109,7 +333,200 @@ class FaissVectorIndexRepository(VectorIndexRepository):
                 or label_map.get(image_path.stem)
                 or _infer_screen_type(image_path)
             )
-            self.add_item(image_path=str(image_path), screen_type=screen_type, tags=None)
+            entries.append(
+                {
+                    "image_path": str(image_path),
+                    "screen_type": screen_type,
+                    "content_hash": file_content_hash(image_path),
+                }
+            )
+        return entries
+
+    def build_from_folder(
+        self,
+        reference_dir: str,
+        label_map: dict[str, str] | None = None,
+        recursive: bool = False,
+    ) -> None:
+        if self._embedding_provider is None:
+            raise ValueError("embedding_provider is required for build_from_folder.")
+
+        entries = self._folder_entries(reference_dir, label_map, recursive)
+        if not entries:
+            with self._lock:
+                self._clear()
+            return
+        vectors = self._embed_many([item["image_path"] for item in entries])
+        # One batched add (and training pass, for IVF/PQ) instead of per-item inserts.
+        self.build(vectors, entries)
+
+    def sync_folder(
+        self,
+        reference_dir: str,
+        label_map: dict[str, str] | None = None,
+        recursive: bool = False,
+        compact_ratio: float = DEFAULT_COMPACT_RATIO,
+    ) -> dict[str, Any]:
+        """Incremental `build_from_folder`: only new or modified images are embedded."""
+        if self._embedding_provider is None:
+            raise ValueError("embedding_provider is required for sync_folder.")
+        entries = self._folder_entries(reference_dir, label_map, recursive)
+        return self.sync_entries(entries, self._embed_many, compact_ratio=compact_ratio)
+
+    @_locked
+    def sync_entries(
+        self,
+        entries: list[dict[str, Any]],
+        embed_fn: Callable[[list[str]], np.ndarray],
+        compact_ratio: float = DEFAULT_COMPACT_RATIO,
+    ) -> dict[str, Any]:
+        """Bring the index in line with `entries` (image_path, screen_type, tags, content_hash).
+
+        Images whose content hash is unchanged keep their vector (labels/tags are refreshed);
+        changed or vanished images are removed by id; new and changed ones are embedded with
+        `embed_fn(paths)` in one batch. Falls back to a full build when there is no usable
+        id-mapped index yet, and compacts once dead or untrained-for vectors exceed
+        `compact_ratio` of the index.
+        """
+        wanted: dict[str, dict[str, Any]] = {}
+        for item in entries:
+            entry = _metadata_entry(item)
+            if not entry.get("content_hash") and entry["image_path"]:
+                entry["content_hash"] = file_content_hash(entry["image_path"])
+            wanted[entry["image_path"]] = entry
+
+        if not self._ensure_id_mapped():
+            self._clear()
+            if wanted:
+                self.build(embed_fn(list(wanted)), list(wanted.values()))
+            return self._sync_summary("full", added=len(wanted))
+
+        current: dict[str, int] = {}
+        stale: list[int] = []
+        for vector_id in sorted(int(key) for key in self._metadata_by_id):
+            path = self._metadata_by_id[str(vector_id)]["image_path"]
+            if path in current:
+                stale.append(current[path])  # duplicate entry: keep the newest vector
+            current[path] = vector_id
+
+        removed = updated = unchanged = 0
+        pending: list[dict[str, Any]] = []
+        for path, vector_id in current.items():
+            entry = wanted.get(path)
+            if entry is None:
+                stale.append(vector_id)
+                removed += 1
+            elif entry.get("content_hash") != self._metadata_by_id[str(vector_id)].get("content_hash"):
+                stale.append(vector_id)
+                pending.append(entry)
+                updated += 1
+            else:
+                self._metadata_by_id[str(vector_id)] = entry
+                unchanged += 1
+        pending.extend(entry for path, entry in wanted.items() if path not in current)
+
+        self.remove_ids(stale)
+        if pending:
+            vectors = _l2_normalize_rows(embed_fn([entry["image_path"] for entry in pending]))
+            if vectors.shape[1] != int(self._dimension):
+                raise ValueError(f"Vector dimension mismatch: expected {self._dimension}, got {vectors.shape[1]}.")
+            ids = list(range(self._next_id, self._next_id + len(pending)))
+            self._index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+            for vector_id, entry in zip(ids, pending):
+                self._metadata_by_id[str(vector_id)] = entry
+            self._next_id = ids[-1] + 1
+        self._loaded_from = None
+
+        compacted = self.needs_compaction(compact_ratio)
+        if compacted:
+            self.compact(embed_fn)
+        return self._sync_summary(
+            "incremental",
+            added=len(pending) - updated,
+            updated=updated,
+            removed=removed,
+            unchanged=unchanged,
+            compacted=compacted,
+        )
+
+    def _sync_summary(self, mode: str, **counts: Any) -> dict[str, Any]:
+        summary = {"mode": mode, "added": 0, "updated": 0, "removed": 0, "unchanged": 0, "compacted": False}
+        summary.update(counts)
+        summary["ntotal"] = int(self._index.ntotal) if self._index is not None else 0
+        return summary
+
+    def _ensure_id_mapped(self) -> bool:
+        """True when the index supports per-id updates, converting pre-id-map indexes if possible."""
+        if self._index is None or self._index.ntotal == 0:
+            return False
+        if self._is_id_mapped():
+            return True
+        # Legacy sequential index: vector position == id, so rebuild it keyed by the same ids.
+        ids = sorted(int(key) for key in self._metadata_by_id if int(key) < int(self._index.ntotal))
+        try:
+            vectors = self._reconstruct_ids(ids)
+        except ValueError:
+            return False
+        if not ids:
+            return False
+        self.build(vectors, [self._metadata_by_id[str(vector_id)] for vector_id in ids], ids=ids)
+        return True
+
+    @_locked
+    def remove_ids(self, ids: list[int]) -> int:
+        """Drop vectors by id. HNSW cannot delete in place, so its ids are only tombstoned."""
+        targets = sorted({int(vector_id) for vector_id in ids if str(int(vector_id)) in self._metadata_by_id})
+        if not targets:
+            return 0
+        for vector_id in targets:
+            self._metadata_by_id.pop(str(vector_id), None)
+        self._loaded_from = None
+        if self._is_id_mapped():
+            selected = np.asarray(targets, dtype=np.int64)
+            try:
+                # IVF hashtable direct maps only accept IDSelectorArray, not the default batch selector.
+                self._index.remove_ids(self._faiss.IDSelectorArray(len(selected), self._faiss.swig_ptr(selected)))
+            except RuntimeError:
+                pass  # tombstoned: search skips ids without metadata
+        return len(targets)
+
+    @_locked
+    def needs_compaction(self, ratio: float = DEFAULT_COMPACT_RATIO) -> bool:
+        if self._index is None or self._index.ntotal == 0:
+            return False
+        ntotal = int(self._index.ntotal)
+        live = len(self._metadata_by_id)
+        if ntotal - live > ratio * ntotal:
+            return True
+        # IVF centroids drift from the data as it grows or shrinks away from the training set.
+        trained = self._index_type.startswith("ivf") and self._trained_on > 0
+        return trained and abs(live - self._trained_on) > ratio * self._trained_on
+
+    @_locked
+    def compact(self, embed_fn: Callable[[list[str]], np.ndarray] | None = None) -> None:
+        """Rebuild from live vectors (keeping ids): purges tombstones and retrains IVF centroids."""
+        ids = sorted(int(key) for key in self._metadata_by_id)
+        next_id = self._next_id
+        if not ids:
+            self._clear()
+            self._next_id = next_id
+            return
+        metadata = [self._metadata_by_id[str(vector_id)] for vector_id in ids]
+        if self._index_type in _LOSSY_TYPES and embed_fn is not None:
+            vectors = np.asarray(embed_fn([item["image_path"] for item in metadata]), dtype=np.float32)
+        else:
+            vectors = self._reconstruct_ids(ids)
+        self.build(vectors, metadata, ids=ids)
+        self._next_id = max(self._next_id, next_id)
+
+    def _embed_many(self, image_paths: list[str]) -> np.ndarray:
+        embed_many = getattr(self._embedding_provider, "embed_images", None)
+        if callable(embed_many):
+            return np.asarray(embed_many(image_paths, batch_size=self._embed_batch_size), dtype=np.float32)
+        embed_fn: Callable[[str], np.ndarray] | None = getattr(self._embedding_provider, "embed_image", None)
+        if embed_fn is None:
+            raise TypeError("embedding_provider must expose embed_image(path: str) -> np.ndarray.")
+        return np.vstack([np.asarray(embed_fn(path), dtype=np.float32).reshape(-1) for path in image_paths])
 
     def add_item(
         self,
@@ -123,21 +540,41 @@ class FaissVectorIndexRepository(VectorIndexRepository):
         if embed_fn is None:
             raise TypeError("embedding_provider must expose embed_image(path: str) -> np.ndarray.")
 
-        vector = _l2_normalize_vector(embed_fn(str(image_path)))
+        self._add_vector(embed_fn(str(image_path)), image_path=image_path, screen_type=screen_type, tags=tags)
+
+    @_locked
+    def _add_vector(
+        self,
+        raw_vector: np.ndarray,
+        image_path: str,
+        screen_type: str,
+        tags: list[str] | None = None,
+    ) -> None:
+        vector = _l2_normalize_vector(raw_vector)
         if self._index is None:
             self._reset_index(vector.shape[0])
+        if not self._index.is_trained:
+            raise RuntimeError(
+                f"Index type '{self._index_type}' needs training: build it with build()/build_from_folder() "
+                "before add_item()."
+            )
         if vector.shape[0] != int(self._dimension):
             raise ValueError(
                 f"Vector dimension mismatch: expected {self._dimension}, got {vector.shape[0]} for '{image_path}'."
             )
-        self._index.add(vector.reshape(1, -1))
-        vector_id = int(self._index.ntotal) - 1
-        self._metadata_by_id[str(vector_id)] = {
-            "image_path": str(image_path),
-            "screen_type": str(screen_type or "unknown"),
-            "tags": list(tags or []),
-        }
-
+        if self._is_id_mapped():
+            vector_id = self._next_id
+            self._index.add_with_ids(vector.reshape(1, -1), np.asarray([vector_id], dtype=np.int64))
+        else:
+            vector_id = int(self._index.ntotal)  # legacy index: ids are positions
+            self._index.add(vector.reshape(1, -1))
+        self._next_id = max(self._next_id, vector_id + 1)
+        self._loaded_from = None
+        self._metadata_by_id[str(vector_id)] = _metadata_entry(
+            {"image_path": image_path, "screen_type": screen_type or "unknown", "tags": tags}
+        )
+
+    @_locked
     def search(self, query_vec: np.ndarray, top_k: int = 5) -> list[ScreenMatchCandidate]:
         if self._index is None or self._index.ntotal == 0:
             raise RuntimeError("Index is empty. Build or load an index before searching.")
@@ -145,14 +582,17 @@ class FaissVectorIndexRepository(VectorIndexRepository):
         if query.shape[1] != int(self._dimension):
             raise ValueError(f"Query vector dimension mismatch: expected {self._dimension}, got {query.shape[1]}.")
 
-        k = max(1, min(int(top_k), int(self._index.ntotal)))
+        # Over-fetch by the tombstone count so dead ids never push live ones out of the top-k.
+        top_k = max(1, int(top_k))
+        dead = max(0, int(self._index.ntotal) - len(self._metadata_by_id))
+        k = min(top_k + dead, int(self._index.ntotal))
         scores, indices = self._index.search(query.astype(np.float32), k)
 
         results: list[ScreenMatchCandidate] = []
         for score, idx in zip(scores[0], indices[0]):
-            if int(idx) < 0:
+            meta = self._metadata_by_id.get(str(int(idx))) if int(idx) >= 0 else None
+            if meta is None:
                 continue
-            meta = self._metadata_by_id.get(str(int(idx)), {})
             results.append(
                 ScreenMatchCandidate(
                     image_path=str(meta.get("image_path", "")),
@@ -162,53 +602,112 @@ class FaissVectorIndexRepository(VectorIndexRepository):
                     tags=list(meta.get("tags", [])),
                 )
             )
+            if len(results) >= top_k:
+                break
         return results
 
+    @_locked
     def save(self, index_dir: str | Path | None = None) -> None:
         if self._index is None or self._index.ntotal == 0:
             raise RuntimeError("Nothing to save: index is empty.")
         target_dir = self._resolve_index_dir(index_dir)
         target_dir.mkdir(parents=True, exist_ok=True)
 
-        self._faiss.write_index(self._index, str(target_dir / "index.faiss"))
-        with (target_dir / "metadata.json").open("w", encoding="utf-8") as fh:
-            json.dump(self._metadata_by_id, fh, ensure_ascii=False, indent=2)
-
-    def load(self, index_dir: str | Path | None = None) -> None:
-        source_dir = self._resolve_index_dir(index_dir)
-        index_path = source_dir / "index.faiss"
-        metadata_path = source_dir / "metadata.json"
-        if not index_path.exists():
-            raise FileNotFoundError(f"FAISS index not found: {index_path}")
-        if not metadata_path.exists():
-            raise FileNotFoundError(f"Metadata file not found: {metadata_path}")
+        index_bytes = self._faiss.serialize_index(self._index).tobytes()
+        compact = {
+            key: {name: value for name, value in item.items() if not (name == "tags" and not value)}
+            for key, item in self._metadata_by_id.items()
+        }
+        metadata_bytes = json.dumps(compact, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        state = {
+            "format": _STATE_FORMAT,
+            "index_type": self._index_type,
+            "next_id": self._next_id,
+            "trained_on": self._trained_on,
+            "index_crc32": zlib.crc32(index_bytes),
+            "metadata_crc32": zlib.crc32(metadata_bytes),
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+        }
+        # The state file goes last: until it lands, readers see a checksum mismatch and retry.
+        _atomic_write(target_dir / INDEX_FILENAME, index_bytes)
+        _atomic_write(target_dir / METADATA_FILENAME, metadata_bytes)
+        _atomic_write(target_dir / STATE_FILENAME, json.dumps(state, separators=(",", ":")).encode("utf-8"))
+        self._loaded_from = (target_dir, index_signature(target_dir))
 
-        self._index = self._faiss.read_index(str(index_path))
+    @property
+    def loaded_signature(self) -> tuple | None:
+        return self._loaded_from[1] if self._loaded_from else None
+
+    def load(self, index_dir: str | Path | None = None) -> bool:
+        """Load the index pair from disk; no-op when the same files are already in memory.
+
+        Returns True when the files were actually (re)read.
+        """
+        with self._lock:
+            source_dir = self._resolve_index_dir(index_dir)
+            signature = index_signature(source_dir)
+            if (
+                signature is not None
+                and self._index is not None
+                and self._loaded_from == (source_dir, signature)
+            ):
+                return False
+            self._load_files(source_dir)
+            self._loaded_from = (source_dir, signature) if signature is not None else None
+            return True
+
+    def _read_consistent(self, source_dir: Path) -> tuple[bytes, bytes, dict[str, Any] | None]:
+        """Index/metadata bytes matching the checksums in the state file (retrying mid-save reads)."""
+        index_path = source_dir / INDEX_FILENAME
+        metadata_path = source_dir / METADATA_FILENAME
+        state_path = source_dir / STATE_FILENAME
+        for _ in range(_READ_RETRIES):
+            if not index_path.exists():
+                raise FileNotFoundError(f"FAISS index not found: {index_path}")
+            if not metadata_path.exists():
+                raise FileNotFoundError(f"Metadata file not found: {metadata_path}")
+            state = json.loads(state_path.read_bytes()) if state_path.exists() else None
+            index_bytes = index_path.read_bytes()
+            metadata_bytes = metadata_path.read_bytes()
+            if state is None or (
+                zlib.crc32(index_bytes) == state.get("index_crc32")
+                and zlib.crc32(metadata_bytes) == state.get("metadata_crc32")
+            ):
+                return index_bytes, metadata_bytes, state
+            time.sleep(_READ_RETRY_DELAY_S)
+        raise RuntimeError(
+            f"Index files in {source_dir} do not match {STATE_FILENAME} (interrupted save?). Rebuild the index."
+        )
+
+    def _load_files(self, source_dir: Path) -> None:
+        index_bytes, metadata_bytes, state = self._read_consistent(source_dir)
+
+        self._index = self._faiss.deserialize_index(np.frombuffer(index_bytes, dtype=np.uint8))
         self._dimension = int(self._index.d)
+        self._index_type = _INDEX_TYPE_BY_CLASS.get(type(self._core_index()).__name__, self._index_type)
+        self._apply_search_params()
 
-        with metadata_path.open("r", encoding="utf-8") as fh:
-            loaded = json.load(fh)
+        loaded = json.loads(metadata_bytes.decode("utf-8"))
         if isinstance(loaded, list):
-            self._metadata_by_id = {
-                str(i): {
-                    "image_path": str(item.get("image_path", "")),
-                    "screen_type": str(item.get("screen_type", "unknown")),
-                    "tags": list(item.get("tags", [])) if item.get("tags") else [],
-                }
-                for i, item in enumerate(loaded)
-            }
+            self._metadata_by_id = {str(i): _metadata_entry(item) for i, item in enumerate(loaded)}
         elif isinstance(loaded, dict):
-            self._metadata_by_id = {
-                str(key): {
-                    "image_path": str((value or {}).get("image_path", "")),
-                    "screen_type": str((value or {}).get("screen_type", "unknown")),
-                    "tags": list((value or {}).get("tags", [])) if (value or {}).get("tags") else [],
-                }
-                for key, value in loaded.items()
-            }
+            self._metadata_by_id = {str(key): _metadata_entry(value) for key, value in loaded.items()}
         else:
             raise ValueError("metadata.json must be a dict mapping vector_id -> metadata.")
 
+        state = state or {}
+        known_ids = [int(key) for key in self._metadata_by_id]
+        self._next_id = int(state.get("next_id", max(known_ids + [int(self._index.ntotal) - 1]) + 1))
+        self._trained_on = int(state.get("trained_on", self._index.ntotal))
+
+    def _clear(self) -> None:
+        self._index = None
+        self._dimension = None
+        self._metadata_by_id = {}
+        self._next_id = 0
+        self._trained_on = 0
+        self._loaded_from = None
+
     def _resolve_index_dir(self, index_dir: str | Path | None) -> Path:
         if index_dir is not None:
             self._index_dir = Path(index_dir).resolve()
@@ -216,8 +715,21 @@ class FaissVectorIndexRepository(VectorIndexRepository):
             raise ValueError("index_dir is required. Provide it in constructor or method call.")
         return self._index_dir
 
-    def _reset_index(self, dimension: int) -> None:
+    def _reset_index(self, dimension: int, count: int = 1) -> None:
         if dimension <= 0:
             raise ValueError("Index dimension must be positive.")
         self._dimension = int(dimension)
-        self._index = self._faiss.IndexFlatIP(self._dimension)
+        if self._index_type == "flat":
+            core = self._faiss.IndexFlatIP(self._dimension)
+        else:
+            spec = index_factory_spec(
+                self._index_type, self._dimension, count, nlist=self._nlist, hnsw_m=self._hnsw_m, pq_m=self._pq_m
+            )
+            core = self._faiss.index_factory(self._dimension, spec, self._faiss.METRIC_INNER_PRODUCT)
+        if self._index_type.startswith("ivf"):
+            # IVF keeps ids natively; the hashtable direct map enables remove_ids/reconstruct by id.
+            self._faiss.extract_index_ivf(core).set_direct_map_type(self._faiss.DirectMap.Hashtable)
+            self._index = core
+        else:
+            self._index = self._faiss.IndexIDMap2(core)
+        self._apply_search_params()
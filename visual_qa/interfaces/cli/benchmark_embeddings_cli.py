@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from visual_qa.application.ports.embedding_provider import EmbeddingProvider
+from visual_qa.config import load_config
+from visual_qa.infrastructure.embeddings.factory import build_embedding_provider
+
+_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+
+def _collect_images(reference_dir: str, limit: int) -> List[str]:
+    root = Path(reference_dir).resolve()
+    if not root.is_dir():
+        raise NotADirectoryError(f"Reference directory not found: {root}")
+    files = sorted(str(p) for p in root.rglob("*") if p.is_file() and p.suffix.lower() in _IMAGE_EXTENSIONS)
+    return files[:limit] if limit > 0 else files
+
+
+def benchmark_provider(provider: EmbeddingProvider, image_paths: List[str], batch_size: int) -> Dict[str, Any]:
+    """Images/s for per-image `embed_image` vs batched `embed_images` on the same files."""
+    started = time.perf_counter()
+    single = np.vstack([provider.embed_image(path) for path in image_paths])
+    single_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batched = provider.embed_images(image_paths, batch_size=batch_size)
+    batched_s = time.perf_counter() - started
+
+    count = len(image_paths)
+    return {
+        "provider": provider.name,
+        "images": count,
+        "batch_size": int(batch_size),
+        "single_images_per_s": round(count / max(single_s, 1e-9), 2),
+        "batched_images_per_s": round(count / max(batched_s, 1e-9), 2),
+        "speedup": round(single_s / max(batched_s, 1e-9), 2),
+        "max_abs_diff": float(np.max(np.abs(single - batched))) if count else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark embedding throughput (images/s) per provider.")
+    parser.add_argument("--reference-dir", default=None, help="Images to embed")
+    parser.add_argument(
+        "--providers",
+        default="local,mobileclip,openclip",
+        help="Comma-separated providers to try (local, mobileclip, openclip)",
+    )
+    parser.add_argument("--batch-size", type=int, default=16, help="Batch size for embed_images")
+    parser.add_argument("--limit", type=int, default=64, help="Max images to embed (0 = all)")
+    parser.add_argument("--config", default=None, help="Optional JSON config path")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    image_paths = _collect_images(args.reference_dir or str(config.reference_dir), args.limit)
+    if not image_paths:
+        raise ValueError("No images found to benchmark.")
+
+    results: List[Dict[str, Any]] = []
+    for name in [p.strip().lower() for p in args.providers.split(",") if p.strip()]:
+        try:
+            provider = build_embedding_provider(dataclasses.replace(config, embedding_provider=name))
+        except Exception as exc:
+            results.append({"provider": name, "error": f"{type(exc).__name__}: {exc}"})
+            continue
+        results.append(benchmark_provider(provider, image_paths, args.batch_size))
+
+    print(json.dumps({"images": len(image_paths), "results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from visual_qa.infrastructure.vector_index.faiss_repository import INDEX_TYPES, FaissVectorIndexRepository
+
+
+def _load_vectors(index_dir: str) -> np.ndarray:
+    repo = FaissVectorIndexRepository(index_dir=index_dir)
+    repo.load()
+    return repo.reconstruct_vectors()
+
+
+def _synthetic_vectors(count: int, dimension: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors: screens of one product/theme sit close together, like real libraries."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 20), dimension)).astype(np.float32)
+    vectors = centers[rng.integers(0, centers.shape[0], size=count)] + 0.35 * rng.normal(size=(count, dimension))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _queries(vectors: np.ndarray, count: int, noise: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed + 1)
+    picked = vectors[rng.integers(0, vectors.shape[0], size=count)]
+    queries = picked + noise * rng.normal(size=picked.shape).astype(np.float32)
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+def measure_recall(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    index_types: Sequence[str] = INDEX_TYPES,
+    nprobe: int = 8,
+    ef_search: int = 64,
+) -> List[Dict[str, Any]]:
+    """recall@k of each index type against exact flat search, plus build/search cost and size."""
+    metadata = [{"image_path": f"v{i}", "screen_type": "bench"} for i in range(vectors.shape[0])]
+    k = max(1, min(int(k), int(vectors.shape[0])))
+    truth: List[set] = []
+    rows: List[Dict[str, Any]] = []
+    for index_type in ["flat", *[t for t in index_types if t != "flat"]]:
+        repo = FaissVectorIndexRepository(index_type=index_type, nprobe=nprobe, ef_search=ef_search)
+        started = time.perf_counter()
+        repo.build(vectors, metadata)
+        build_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = [{m.vector_id for m in repo.search(query, top_k=k)} for query in queries]
+        search_s = time.perf_counter() - started
+        if index_type == "flat":
+            truth = found
+        recall = float(np.mean([len(hit & exact) / float(k) for hit, exact in zip(found, truth)])) if truth else 0.0
+
+        with tempfile.TemporaryDirectory(prefix="vqa_index_bench_") as tmp_dir:
+            repo.save(tmp_dir)
+            size = (Path(tmp_dir) / "index.faiss").stat().st_size
+        rows.append(
+            {
+                **repo.describe(),
+                "recall_at_k": round(recall, 4),
+                "k": k,
+                "build_s": round(build_s, 4),
+                "search_ms_per_query": round(1000.0 * search_s / max(1, len(queries)), 4),
+                "index_bytes": int(size),
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare FAISS index types (recall@k vs flat, latency, size).")
+    parser.add_argument("--index-dir", default=None, help="Existing flat index to take vectors from")
+    parser.add_argument("--synthetic", type=int, default=5000, help="Synthetic vectors when --index-dir is not given")
+    parser.add_argument("--dim", type=int, default=512, help="Synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of noisy queries")
+    parser.add_argument("--noise", type=float, default=0.05, help="Query noise around indexed vectors")
+    parser.add_argument("--k", type=int, default=5, help="Top-k used for recall")
+    parser.add_argument("--types", default=",".join(INDEX_TYPES), help="Comma-separated index types")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists probed per query")
+    parser.add_argument("--ef-search", type=int, default=64, help="HNSW efSearch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.index_dir:
+        vectors = _load_vectors(args.index_dir)
+    else:
+        vectors = _synthetic_vectors(args.synthetic, args.dim, args.seed)
+    queries = _queries(vectors, args.queries, args.noise, args.seed)
+    types = [t.strip().lower() for t in args.types.split(",") if t.strip()]
+
+    results = measure_recall(vectors, queries, args.k, types, nprobe=args.nprobe, ef_search=args.ef_search)
+    print(json.dumps({"vectors": int(vectors.shape[0]), "dimension": int(vectors.shape[1]), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,8 @@ import json
 from pathlib import Path
 
 from visual_qa.config import load_config
-from visual_qa.infrastructure.embeddings.factory import build_embedding_provider
-from visual_qa.infrastructure.vector_index.faiss_repository import FaissVectorIndexRepository
+from visual_qa.infrastructure.registry import get_registry
+from visual_qa.infrastructure.vector_index.faiss_repository import INDEX_TYPES, FaissVectorIndexRepository
 
 
 def _load_labels(labels_json: str | None) -> dict[str, str] | None:
@@ -35,6 +35,17 @@ def main() -> None:
         default=None,
         help="Optional JSON mapping for labels (inline JSON or file path)",
     )
+    parser.add_argument(
+        "--index-type",
+        default=None,
+        choices=list(INDEX_TYPES),
+        help="FAISS index structure (default from config: flat)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update an existing index: embed only new/changed images and drop removed ones",
+    )
     parser.add_argument("--config", default=None, help="Optional JSON config path")
     args = parser.parse_args()
 
@@ -43,9 +54,21 @@ def main() -> None:
     index_dir = args.index_dir or str(config.index_dir)
     labels = _load_labels(args.labels_json)
 
-    embedding_provider = build_embedding_provider(config)
-    repo = FaissVectorIndexRepository(index_dir=index_dir, embedding_provider=embedding_provider, use_faiss=True)
-    repo.build_from_folder(reference_dir=reference_dir, label_map=labels, recursive=bool(args.recursive))
+    embedding_provider = get_registry().get_provider(config)
+    repo = FaissVectorIndexRepository(
+        index_dir=index_dir,
+        embedding_provider=embedding_provider,
+        use_faiss=True,
+        index_type=args.index_type or config.index_type,
+        nprobe=config.index_nprobe,
+        ef_search=config.index_ef_search,
+    )
+    sync_summary = None
+    if args.incremental and (Path(index_dir) / "index.faiss").exists():
+        repo.load()
+        sync_summary = repo.sync_folder(reference_dir=reference_dir, label_map=labels, recursive=bool(args.recursive))
+    else:
+        repo.build_from_folder(reference_dir=reference_dir, label_map=labels, recursive=bool(args.recursive))
     repo.save()
 
     metadata_path = Path(index_dir).resolve() / "metadata.json"
@@ -62,7 +85,10 @@ def main() -> None:
         "images_indexed": metadata_count,
         "metadata_path": str(metadata_path),
         "index_path": str(Path(index_dir).resolve() / "index.faiss"),
+        "index": repo.describe(),
     }
+    if sync_summary is not None:
+        summary["sync"] = sync_summary
     print(json.dumps(summary, ensure_ascii=False, indent=2))
 
 
@@ -8,9 +8,9 @@ from visual_qa.application.use_cases.generate_report import GenerateReport
 from visual_qa.application.use_cases.validate_screenshot import ValidateScreenshot
 from visual_qa.application.use_cases.visual_qa_pipeline import VisualQaPipeline
 from visual_qa.config import VisualQaConfig
-from visual_qa.infrastructure.embeddings.factory import build_embedding_provider
 from visual_qa.infrastructure.llm.factory import build_report_generator
 from visual_qa.infrastructure.pixel_compare.existing_pixel_adapter import ExistingPixelAdapter
+from visual_qa.infrastructure.registry import get_registry
 from visual_qa.infrastructure.storage.local_artifact_store import LocalArtifactStore
 from visual_qa.infrastructure.vector_index.faiss_repository import FaissVectorIndexRepository
 
@@ -24,9 +24,15 @@ class CliContainer:
 
 
 def make_container(config: VisualQaConfig) -> CliContainer:
-    embedding_provider = build_embedding_provider(config)
-    vector_repo_for_build = FaissVectorIndexRepository(use_faiss=config.use_faiss)
-    vector_repo_for_query = FaissVectorIndexRepository(use_faiss=config.use_faiss)
+    embedding_provider = get_registry().get_provider(config)
+    index_options = {
+        "use_faiss": config.use_faiss,
+        "index_type": config.index_type,
+        "nprobe": config.index_nprobe,
+        "ef_search": config.index_ef_search,
+    }
+    vector_repo_for_build = FaissVectorIndexRepository(**index_options)
+    vector_repo_for_query = FaissVectorIndexRepository(**index_options)
 
     build_index = BuildVectorIndex(embedding_provider=embedding_provider, vector_repo=vector_repo_for_build)
     classify = ClassifyScreenshot(embedding_provider=embedding_provider, vector_repo=vector_repo_for_query)
@@ -36,7 +42,15 @@ def make_container(config: VisualQaConfig) -> CliContainer:
 
     report_generator = build_report_generator(config)
     report_use_case = GenerateReport(report_generator=report_generator)
-    artifact_store = LocalArtifactStore(runs_dir=str(config.runs_dir))
-    pipeline = VisualQaPipeline(validator=validate, report_use_case=report_use_case, artifact_store=artifact_store)
+    artifact_store = LocalArtifactStore(
+        runs_dir=str(config.runs_dir), background_writes=config.background_artifact_writes
+    )
+    pipeline = VisualQaPipeline(
+        validator=validate,
+        report_use_case=report_use_case,
+        artifact_store=artifact_store,
+        async_reports=config.async_reports,
+        report_workers=config.report_workers,
+    )
 
     return CliContainer(build_index=build_index, classify=classify, validate=validate, pipeline=pipeline)
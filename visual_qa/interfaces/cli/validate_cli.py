@@ -1,21 +1,36 @@
 from __future__ import annotations
 
 import argparse
+from pathlib import Path
 
 from visual_qa.config import load_config
 from visual_qa.application.use_cases.classify_screenshot import ClassifyScreenshot
+from visual_qa.application.use_cases.generate_report import GenerateReport
 from visual_qa.application.use_cases.validate_screenshot import ValidateScreenshot
-from visual_qa.infrastructure.embeddings.factory import build_embedding_provider
+from visual_qa.application.use_cases.visual_qa_pipeline import VisualQaPipeline
 from visual_qa.infrastructure.llm.factory import build_report_generator
 from visual_qa.infrastructure.llm.null_report_generator import NullReportGenerator
 from visual_qa.infrastructure.pixel_compare.existing_pixel_adapter import ExistingPixelAdapter
+from visual_qa.infrastructure.registry import get_registry
 from visual_qa.infrastructure.storage.local_artifact_store import LocalArtifactStore
-from visual_qa.infrastructure.vector_index.faiss_repository import FaissVectorIndexRepository
+
+_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+
+
+def _batch_images(batch_dir: str) -> list[str]:
+    root = Path(batch_dir).resolve()
+    if not root.is_dir():
+        raise NotADirectoryError(f"Batch directory not found: {root}")
+    return [str(p) for p in sorted(root.iterdir()) if p.is_file() and p.suffix.lower() in _IMAGE_EXTENSIONS]
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run full Visual QA pipeline.")
-    parser.add_argument("--image", required=True, help="Screenshot path to validate")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--image", help="Screenshot path to validate")
+    target.add_argument("--batch-dir", help="Validate every screenshot in this execution folder")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel pixel/report workers (batch mode)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Embedding batch size (batch mode)")
     parser.add_argument("--index-dir", default=None, help="Vector index directory")
     parser.add_argument("--top-k", type=int, default=None, help="Top K matches")
     parser.add_argument("--threshold", type=float, default=None, help="Classification threshold")
@@ -34,13 +49,42 @@ def main() -> None:
     index_dir = args.index_dir or str(config.index_dir)
     runs_dir = args.runs_dir or str(config.runs_dir)
 
-    embedding_provider = build_embedding_provider(config)
-    vector_repo = FaissVectorIndexRepository(index_dir=index_dir, use_faiss=True)
+    registry = get_registry()
+    embedding_provider = registry.get_provider(config)
+    vector_repo = registry.get_index(index_dir)
+    vector_repo.configure_search(nprobe=config.index_nprobe, ef_search=config.index_ef_search)
     classifier = ClassifyScreenshot(embedding_provider=embedding_provider, vector_repo=vector_repo)
 
     pixel_adapter = ExistingPixelAdapter()
-    artifact_store = LocalArtifactStore(runs_dir=runs_dir)
+    artifact_store = LocalArtifactStore(runs_dir=runs_dir, background_writes=config.background_artifact_writes)
     report_generator = NullReportGenerator() if args.no_llm else build_report_generator(config)
+    top_k = args.top_k or config.top_k
+    threshold = args.threshold if args.threshold is not None else config.classification_threshold
+
+    if args.batch_dir:
+        pipeline = VisualQaPipeline(
+            validator=ValidateScreenshot(classifier=classifier, pixel_comparator=pixel_adapter),
+            report_use_case=GenerateReport(report_generator=report_generator),
+            artifact_store=artifact_store,
+            async_reports=config.async_reports,
+            report_workers=config.report_workers,
+        )
+        batch = pipeline.run_batch(
+            _batch_images(args.batch_dir),
+            index_dir=index_dir,
+            top_k=top_k,
+            threshold=threshold,
+            config_snapshot=config.snapshot(),
+            workers=args.workers,
+            strategy=args.strategy,
+            batch_size=args.batch_size,
+        )
+        artifact_store.flush()
+        print(str(batch.summary_path), flush=True)
+        # Results are already on disk; with async reports only the Markdown is still pending.
+        pipeline.close()
+        artifact_store.close()
+        return
 
     validate = ValidateScreenshot(
         classifier=classifier,
@@ -52,8 +96,8 @@ def main() -> None:
     run = validate.execute(
         screenshot_path=args.image,
         index_dir=index_dir,
-        top_k=args.top_k or config.top_k,
-        threshold=args.threshold if args.threshold is not None else config.classification_threshold,
+        top_k=top_k,
+        threshold=threshold,
         strategy=args.strategy,
         output_dir=None,
         config_snapshot=config.snapshot(),
@@ -61,6 +105,7 @@ def main() -> None:
 
     if run.json_path is None:
         raise RuntimeError("Validation completed but run_result.json was not created.")
+    artifact_store.close()
     print(str(run.json_path))
 
 